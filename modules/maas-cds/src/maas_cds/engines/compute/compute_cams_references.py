@@ -2,14 +2,76 @@
 
 from itertools import chain
 import re
+from typing import Iterable
+
 from opensearchpy import Q
 
+from maas_engine.engine.cache import cached_reference
 from maas_engine.engine.rawdata import DataEngine
 
 
 from maas_cds import model
 
 
+class CamsTicketReferences:
+    """Inverted index from the datatake keys mentioned in the environment of the
+    tickets to the ticket keys"""
+
+    # datatake key like S1A-123456, S2B-12345-1, S3A-123-456 or S5P-12345
+    TOKEN_PATTERN = re.compile(r"S[0-9][A-Z](?:-[0-9]+)+")
+
+    def __init__(self, tickets: Iterable = ()):
+        # datatake key -> ticket keys, in ticket order
+        self.ticket_keys: dict[str, list[str]] = {}
+
+        for ticket in tickets:
+            self.add(ticket.key, ticket.environment)
+
+    @classmethod
+    def tokenize(cls, environment: str) -> list[str]:
+        """Find the datatake keys mentioned in a ticket environment
+
+        Keys are also indexed by their dash separated prefixes, so S2A-12345-1 is
+        found by S2A-12345 like with a substring test.
+
+        Args:
+            environment (str): ticket environment
+
+        Returns:
+            list[str]: distinct datatake keys
+        """
+        tokens = {}
+
+        for match in cls.TOKEN_PATTERN.finditer(environment or ""):
+            parts = match.group().split("-")
+
+            for end in range(2, len(parts) + 1):
+                tokens["-".join(parts[:end])] = None
+
+        return list(tokens)
+
+    def add(self, ticket_key: str, environment: str):
+        """Index the datatake keys of a ticket environment
+
+        Args:
+            ticket_key (str): ticket key
+            environment (str): ticket environment
+        """
+        for token in self.tokenize(environment):
+            self.ticket_keys.setdefault(token, []).append(ticket_key)
+
+    def get(self, datatake_key: str) -> list[str]:
+        """Get the tickets referencing a datatake
+
+        Args:
+            datatake_key (str): datatake key
+
+        Returns:
+            list[str]: ticket keys
+        """
+        return self.ticket_keys.get(datatake_key, [])
+
+
 class ComputeCamsReferencesEngine(DataEngine):
     """Consolidate cams references"""
 
@@ -76,7 +138,7 @@ class ComputeCamsReferencesEngine(DataEngine):
 
             elif isinstance(document, (model.CdsDatatakeS1, model.CdsDatatakeS2)):
                 self.logger.debug("Cams reference update trigged by datatake ingestion")
-                yield from self.update_cams_references_for_datatake()
+                yield from self.update_cams_references_for_datatake(document)
 
             elif isinstance(
                 document, (model.CdsS3Completeness, model.CdsS5Completeness)
@@ -84,7 +146,7 @@ class ComputeCamsReferencesEngine(DataEngine):
                 self.logger.debug(
                     "Cams reference update trigged by s3 or s5 completeness ingestion"
                 )
-                yield from self.update_cams_references_for_s3_s5_completeness()
+                yield from self.update_cams_references_for_s3_s5_completeness(document)
 
             else:
                 self.logger.warning(
@@ -110,54 +172,65 @@ class ComputeCamsReferencesEngine(DataEngine):
 
         return results
 
-    def update_cams_references_for_datatake(self):
-        """update cams reference for datatakes
+    def update_cams_references_for_datatake(self, datatake):
+        """update cams reference for a datatake
+
+        Args:
+            datatake (CdsDatatake): datatake to update
 
         Yields:
-            _type_: _description_
+            dict: bulk action to update the datatake
         """
-        for datatake in self.input_documents:
-            datatake.cams_tickets = []
-            self.logger.info("Clear references of cams for datatake %s", datatake.key)
-            for cams in self.search_all_cams_with_environment_not_empty():
-                if datatake.key in cams.environment:
-                    self.logger.info(
-                        "Create new reference of cams %s on datatake %s referenced on cams environment : %s",
-                        cams.key,
-                        datatake.key,
-                        cams.environment,
-                    )
-                    if cams.key not in datatake.cams_tickets:
-                        datatake.cams_tickets.append(cams.key)
-                    datatake.last_attached_ticket = cams.key
-                    datatake.last_attached_ticket_url = self.base_url + cams.key
-            yield datatake.to_bulk_action()
+        self.logger.info("Clear references of cams for datatake %s", datatake.key)
 
-    def update_cams_references_for_s3_s5_completeness(self):
-        """update cams references for s3 and s5 completeness
+        yield self.attach_referencing_tickets(datatake, datatake.key)
+
+    def update_cams_references_for_s3_s5_completeness(self, completeness):
+        """update cams references for a s3 or s5 completeness
+
+        Args:
+            completeness (CdsS3Completeness | CdsS5Completeness): completeness to
+                update
 
         Yields:
-            _type_: _description_
+            dict: bulk action to update the completeness
+        """
+        self.logger.info(
+            "Clear references of cams for completeness %s",
+            completeness.datatake_id,
+        )
+
+        yield self.attach_referencing_tickets(completeness, completeness.datatake_id)
+
+    def attach_referencing_tickets(self, document, datatake_key: str) -> dict:
+        """Replace the cams references of a document by the tickets mentioning its
+        datatake in their environment
+
+        Args:
+            document (CdsDatatake | CdsS3Completeness | CdsS5Completeness): document
+                to update
+            datatake_key (str): datatake key of the document
+
+        Returns:
+            dict: bulk action to update the document
         """
-        for completeness in self.input_documents:
-            completeness.cams_tickets = []
+        ticket_keys = self.load_ticket_references().get(datatake_key)
+
+        document.cams_tickets = []
+
+        for ticket_key in ticket_keys:
             self.logger.info(
-                "Clear references of cams for completeness %s",
-                completeness.datatake_id,
+                "Create new reference of cams %s on %s referenced on cams environment",
+                ticket_key,
+                datatake_key,
             )
-            for cams in self.search_all_cams_with_environment_not_empty():
-                if completeness.datatake_id in cams.environment:
-                    self.logger.info(
-                        "Create new reference of cams %s on s3 completeness %s referenced on cams environment : %s",
-                        cams.key,
-                        completeness.datatake_id,
-                        cams.environment,
-                    )
-                    if cams.key not in completeness.cams_tickets:
-                        completeness.cams_tickets.append(cams.key)
-                    completeness.last_attached_ticket = cams.key
-                    completeness.last_attached_ticket_url = self.base_url + cams.key
-            yield completeness.to_bulk_action()
+            document.cams_tickets.append(ticket_key)
+
+        if ticket_keys:
+            document.last_attached_ticket = ticket_keys[-1]
+            document.last_attached_ticket_url = self.base_url + ticket_keys[-1]
+
+        return document.to_bulk_action()
 
     def update_impacted_entity(self, cams_id: str, impacted_entity: str):
         """update impacted entity
@@ -361,19 +434,22 @@ class ComputeCamsReferencesEngine(DataEngine):
             .execute()
         )
 
-    def search_all_cams_with_environment_not_empty(self):
-        """return all cams with environment field set
+    @staticmethod
+    @cached_reference(
+        "cams-ticket-references",
+        maxsize=1,
+        ttl=300.0,
+        invalidation_routing_keys=("new.raw.data.cams*",),
+    )
+    def load_ticket_references() -> CamsTicketReferences:
+        """Index the datatake keys mentioned by all the cams with environment field set
 
         Returns:
-            itt: query
+            CamsTicketReferences: ticket references
         """
-        return (
+        return CamsTicketReferences(
             model.CamsTickets.search()
             .filter("exists", field="environment")
-            .params(
-                version=True,
-                seq_no_primary_term=True,
-                size=self.MAX_IMPACTED_DATATAKE_COUNT,
-            )
-            .execute()
+            .source(["key", "environment"])
+            .scan()
         )
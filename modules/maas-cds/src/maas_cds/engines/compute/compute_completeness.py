@@ -1,5 +1,7 @@
 """Product consolidation"""
 
+from collections import defaultdict
+
 from maas_engine.engine.rawdata import DataEngine
 from maas_cds.model.datatake import CdsDatatake
 
@@ -70,6 +72,19 @@ class ComputeCompletenessEngine(DataEngine):
             original_datatake_doc,
         )
 
+    def load_brother_products(self, datatake_product_types):
+        """Load the brother products of all the datatakes to compute in a single
+        query by datatake class, instead of a query by datatake and product type
+
+        Args:
+            datatake_product_types (Iterable[tuple]): (datatake doc, product types)
+        """
+        CdsDatatake.load_brother_products(
+            (datatake_doc, datatake_doc.get_brotherhood_product_types(product_types))
+            for datatake_doc, product_types in datatake_product_types
+            if datatake_doc is not None
+        )
+
     def get_datatake_doc(self, datatake_id):
         """Get a datatake doc from the local cache
 
@@ -113,6 +128,11 @@ class ComputeCompletenessEngine(DataEngine):
 
         self.logger.info("[ITER][Datatake] - start")
 
+        self.load_brother_products(
+            (datatake_doc, datatake_doc.get_all_product_types())
+            for datatake_doc in self.input_documents
+        )
+
         for datatake_doc in self.input_documents:
             original_datatake_dict = datatake_doc.to_dict()
 
@@ -212,6 +232,16 @@ class ComputeCompletenessEngine(DataEngine):
         # Update products sometime
         yield from self.load_compute_keys_from_input_documents()
 
+        product_types_by_datatake = defaultdict(list)
+
+        for datatake_id, product_type in self.tuples_to_compute:
+            product_types_by_datatake[datatake_id].append(product_type)
+
+        self.load_brother_products(
+            (self.get_datatake_doc(datatake_id), product_types)
+            for datatake_id, product_types in product_types_by_datatake.items()
+        )
+
         # compute local completeness
         for (
             datatake_id,
@@ -239,9 +269,7 @@ class ComputeCompletenessEngine(DataEngine):
                 local_value,
             )
 
-            datatake_doc.compute_missing_production(product_type, related_products)
-
-            datatake_doc.compute_duplicated(product_type, related_products)
+            datatake_doc.compute_sensing_indicators(product_type, related_products)
 
             self.logger.info(
                 "[ITER][Product][%s] - Compute local value : %s -> %s",
@@ -1,5 +1,7 @@
 """Publication consolidation"""
 
+from collections import defaultdict
+
 from maas_cds.engines.compute.compute_completeness import ComputeCompletenessEngine
 from maas_engine.engine.rawdata import DataEngine
 from maas_cds.model.cds_completeness import CdsCompleteness
@@ -19,46 +21,72 @@ class ComputeCompletenessEngineV2(ComputeCompletenessEngine):
 
         Args:
             datatake_id (str): The datatake to load
-            mission (str, optional): The mission of the datatake. Defaults to "".
+            satellite_unit (str): The satellite unit of the datatake
+            prip_name (str): The prip service of the completeness
         """
+        self.load_datatake_docs([(datatake_id, satellite_unit, prip_name)])
 
-        target_model_class = f"CdsCompleteness{satellite_unit[:2].upper()}"
+    def load_datatake_docs(self, datatake_keys):
+        """Load datatakes in the local cache, with a single multi get by model class
+        on the partition index of each completeness
 
-        # Fake doc to get index
-        # Maybe externalise this
-        target_index = CdsCompleteness(
-            satellite_unit=satellite_unit, prip_name=prip_name
-        ).partition_index_name
+        Args:
+            datatake_keys (Iterable[tuple]): (datatake_id, satellite_unit, prip_name)
+        """
+        keys_by_model_class = defaultdict(list)
 
-        self.logger.debug(
-            "[CACHE] - Trying to add in cache: %s from %s as %s",
-            datatake_id,
-            target_index,
-            target_model_class,
-        )
+        for datatake_id, satellite_unit, prip_name in dict.fromkeys(datatake_keys):
+            target_model_class = f"CdsCompleteness{satellite_unit[:2].upper()}"
 
-        # TODO FIXME MAAS_CDS-1236: single query !!
-        datatake_doc = getattr(
-            model, target_model_class, model.CdsCompleteness
-        ).get_by_id(datatake_id, [target_index])
+            keys_by_model_class[target_model_class].append(
+                (datatake_id, satellite_unit, prip_name)
+            )
 
-        original_datatake_doc = None
+        for target_model_class, keys in keys_by_model_class.items():
+            # Fake doc to get index
+            # Maybe externalise this
+            target_indices = [
+                CdsCompleteness(
+                    satellite_unit=satellite_unit, prip_name=prip_name
+                ).partition_index_name
+                for _, satellite_unit, prip_name in keys
+            ]
 
-        if datatake_doc is not None:
-            original_datatake_doc = datatake_doc.to_dict()
+            self.logger.debug(
+                "[CACHE] - Trying to add in cache: %s from %s as %s",
+                keys,
+                target_indices,
+                target_model_class,
+            )
 
-        else:
-            self.logger.warning(
-                "[CACHE] - Datatake id not found in cds-datatake index "
-                "can't load it into local cache: %s",
-                datatake_id,
+            datatake_docs = getattr(
+                model, target_model_class, model.CdsCompleteness
+            ).mget_by_ids_in_partitions(
+                [datatake_id for datatake_id, _, _ in keys],
+                target_indices,
+                ignore_missing_index=True,
             )
-        key = f"{datatake_id}-{satellite_unit}-{prip_name}"
 
-        self.local_cache_datatake[key] = (
-            datatake_doc,
-            original_datatake_doc,
-        )
+            for (datatake_id, satellite_unit, prip_name), datatake_doc in zip(
+                keys, datatake_docs
+            ):
+                original_datatake_doc = None
+
+                if datatake_doc is not None:
+                    original_datatake_doc = datatake_doc.to_dict()
+
+                else:
+                    self.logger.warning(
+                        "[CACHE] - Datatake id not found in cds-datatake index "
+                        "can't load it into local cache: %s",
+                        datatake_id,
+                    )
+                key = f"{datatake_id}-{satellite_unit}-{prip_name}"
+
+                self.local_cache_datatake[key] = (
+                    datatake_doc,
+                    original_datatake_doc,
+                )
 
     def get_datatake_doc(self, datatake_id, satellite_unit, prip_name):
         """Get a datatake doc from the local cache
@@ -69,10 +97,11 @@ class ComputeCompletenessEngineV2(ComputeCompletenessEngine):
         Returns:
             CdsDatatake: The cds-datatake doc associate to the asked datatake_id
         """
+        key = f"{datatake_id}-{satellite_unit}-{prip_name}"
 
-        if datatake_id not in self.local_cache_datatake:
+        if key not in self.local_cache_datatake:
             self.load_datatake_doc(datatake_id, satellite_unit, prip_name)
-        key = f"{datatake_id}-{satellite_unit}-{prip_name}"
+
         return self.local_cache_datatake[key][0]
 
     def action_iterator(self):
@@ -103,6 +132,11 @@ class ComputeCompletenessEngineV2(ComputeCompletenessEngine):
 
         # TODO add a cache to load completeness config
 
+        self.load_brother_products(
+            (datatake_doc, datatake_doc.get_all_product_types())
+            for datatake_doc in self.input_documents
+        )
+
         for datatake_doc in self.input_documents:
 
             original_datatake_dict = datatake_doc.to_dict()
@@ -141,6 +175,17 @@ class ComputeCompletenessEngineV2(ComputeCompletenessEngine):
         self.logger.info("[ITER][Publication] - start")
         # input document can be CdsPublication or CdsPublication
 
+        # load all the datatakes of the publications at once
+        self.load_datatake_docs(
+            (
+                publication_document.get_datatake_id(),
+                publication_document.satellite_unit,
+                publication_document.service_id,
+            )
+            for publication_document in self.input_documents
+            if publication_document.get_compute_key()
+        )
+
         for publication_document in self.input_documents:
             self.logger.debug(
                 "[ITER][Publication] - Compute completeness for %s",
@@ -164,12 +209,6 @@ class ComputeCompletenessEngineV2(ComputeCompletenessEngine):
             if key:
                 # TODO refactor this in a signle indentifier
                 datatake_id = publication_document.get_datatake_id()
-                if datatake_id not in self.local_cache_datatake:
-                    self.load_datatake_doc(
-                        datatake_id,
-                        publication_document.satellite_unit,
-                        publication_document.service_id,
-                    )
 
                 datatake_doc = self.get_datatake_doc(
                     datatake_id,
@@ -218,6 +257,24 @@ class ComputeCompletenessEngineV2(ComputeCompletenessEngine):
         # Update publications sometime s2 xctx
         yield from self.load_compute_keys_from_input_documents()
 
+        publication_types_by_datatake = defaultdict(list)
+
+        for datatake_id, publication_type, prip_name in self.tuples_to_compute:
+            publication_types_by_datatake[(datatake_id, prip_name)].append(
+                publication_type
+            )
+
+        self.load_brother_products(
+            (
+                self.get_datatake_doc(datatake_id, datatake_id[:3], prip_name),
+                publication_types,
+            )
+            for (
+                datatake_id,
+                prip_name,
+            ), publication_types in publication_types_by_datatake.items()
+        )
+
         # compute local completeness
         for datatake_id, publication_type, prip_name in self.tuples_to_compute:
             # There is a way to not find a datatake before ?
@@ -1,8 +1,11 @@
 """Update entities after some datatake creation or update"""
 
+from opensearchpy import Q
+
 import maas_model
 from maas_engine.engine.base import EngineReport
 from maas_engine.engine.rawdata import DataEngine
+from maas_engine.engine.update_by_query import UpdateByQueryRequest
 
 
 class ComputeDatatakeRelatedEngine(DataEngine):
@@ -11,7 +14,12 @@ class ComputeDatatakeRelatedEngine(DataEngine):
     ENGINE_ID = "COMPUTE_DATATAKE_RELATED"
 
     def __init__(
-        self, args=None, target_model: str = None, send_reports=True, chunk_size=0
+        self,
+        args=None,
+        target_model: str = None,
+        send_reports=True,
+        chunk_size=0,
+        partial_update=False,
     ):
         """constructor
 
@@ -19,12 +27,16 @@ class ComputeDatatakeRelatedEngine(DataEngine):
             args (namespace, optional): cli options. Defaults to None.
             target_model (str, optional): Model class name. Defaults to None.
             send_reports (bool, optional): flag. Defaults to True.
+            partial_update (bool, optional): only send the modified fields of the
+                related documents. Defaults to False.
         """
 
         super().__init__(args, send_reports=send_reports, chunk_size=chunk_size)
 
         self.target_model = target_model
 
+        self.partial_update = partial_update
+
     def run(self, routing_key: str, message: maas_model.MAASMessage):
         """Override to forward unique message for completeness compute from datatake"""
 
@@ -58,6 +70,10 @@ class ComputeDatatakeRelatedEngine(DataEngine):
             Iterator[typing.Generator]: bulk actions
         """
 
+        if self.use_update_by_query:
+            # related documents are updated in the database by update_by_query_iterator
+            return
+
         target_class = self.get_model(self.target_model)
 
         for datatake in self.input_documents:
@@ -68,20 +84,75 @@ class ComputeDatatakeRelatedEngine(DataEngine):
             )
 
             for document in search_request.scan():
-                initial_dict = document.to_dict()
-
-                if datatake.timeliness:
-                    document.timeliness = datatake.timeliness
+                if self.partial_update:
+                    document.track_changes()
+                else:
+                    initial_dict = document.to_dict()
 
-                document.absolute_orbit = datatake.absolute_orbit
+                for name, value in self.get_propagated_fields(datatake).items():
+                    setattr(document, name, value)
 
-                document.instrument_mode = datatake.instrument_mode
-
-                document.datatake_id = datatake.datatake_id
                 if document.mission == "S1":
                     document.hex_datatake_id = (
                         hex(int(datatake.datatake_id, 10)).replace("0x", "").upper()
                     )
 
-                if initial_dict | document.to_dict() != initial_dict:
+                if self.partial_update:
+                    action = document.to_partial_update_action()
+
+                    if action is not None:
+                        yield action
+
+                elif initial_dict | document.to_dict() != initial_dict:
                     yield document.to_bulk_action()
+
+    def get_propagated_fields(self, datatake) -> dict:
+        """Get the datatake values to set on the related documents. Missing values
+        are not propagated, so the related documents keep theirs.
+
+        Args:
+            datatake (CdsDatatake): datatake
+
+        Returns:
+            dict: field name to value
+        """
+        fields = {
+            "timeliness": datatake.timeliness or None,
+            "absolute_orbit": datatake.absolute_orbit,
+            "instrument_mode": datatake.instrument_mode,
+            "datatake_id": datatake.datatake_id,
+        }
+
+        return {name: value for name, value in fields.items() if value is not None}
+
+    def update_by_query_iterator(self):
+        """override
+
+        Yields:
+            Iterator[UpdateByQueryRequest]: updates of the documents related to the
+                datatakes, when the engine is configured to update by query
+        """
+        if not self.use_update_by_query:
+            return
+
+        target_class = self.get_model(self.target_model)
+
+        for datatake in self.input_documents:
+            query = datatake.get_related_documents_query()
+
+            # run() sends its own reports instead of the updated documents ones
+            yield UpdateByQueryRequest(
+                target_class, query, self.get_propagated_fields(datatake), report=False
+            )
+
+            if datatake.mission == "S1":
+                yield UpdateByQueryRequest(
+                    target_class,
+                    Q("bool", filter=[query, Q("term", mission="S1")]),
+                    {
+                        "hex_datatake_id": hex(int(datatake.datatake_id, 10))
+                        .replace("0x", "")
+                        .upper()
+                    },
+                    report=False,
+                )
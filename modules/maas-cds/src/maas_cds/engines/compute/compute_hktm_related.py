@@ -3,9 +3,10 @@
 from typing import Callable, List, Dict, Tuple, Generator
 from datetime import timedelta
 
-from opensearchpy import MultiSearch
+from opensearchpy import MultiSearch, Q
 
 from maas_engine.engine.rawdata import DataEngine
+from maas_engine.engine.update_by_query import UpdateByQueryRequest
 
 from maas_cds.model import CdsHktmProductionCompleteness, CdsHktmAcquisitionCompleteness
 
@@ -125,6 +126,17 @@ class ComputeHktmRelatedEngine(DataEngine):
 
         return document
 
+    def get_updated_fields(self) -> Dict[str, int]:
+        """Get the fields set by the update methods, for update by query
+
+        Returns:
+            Dict[str, int]: field name to value
+        """
+        if self.target_model == "CdsHktmProductionCompleteness":
+            return {"completeness": 1}
+
+        return {self.SESSION_ID_META[self.input_model.__name__]["hktm_completeness"]: 1}
+
     def search_hktm_production(self, documents) -> Tuple[MultiSearch, List[Dict]]:
         """
         Search for HKTM information within a tolerance window.
@@ -210,6 +222,10 @@ class ComputeHktmRelatedEngine(DataEngine):
         Yields:
             Iterator[Generator]: bulk actions
         """
+        if self.use_update_by_query:
+            # documents are updated in the database by update_by_query_iterator
+            return
+
         search_method = self.search_hktm_factory()
         msearch, valid_input_documents = search_method(self.input_documents)
 
@@ -254,3 +270,34 @@ class ComputeHktmRelatedEngine(DataEngine):
             self.logger.debug(
                 "[SKIPPING] - Nothing to do : no acquisition have an OK status",
             )
+
+    def update_by_query_iterator(self) -> Generator:
+        """override
+
+        Update the hktm completeness matching any input document in the database
+
+        Yields:
+            Iterator[Generator]: update by query requests
+        """
+        if not self.use_update_by_query:
+            return
+
+        search_method = self.search_hktm_factory()
+        msearch, valid_input_documents = search_method(self.input_documents)
+
+        if not valid_input_documents:
+            self.logger.debug(
+                "[SKIPPING] - Nothing to do : no acquisition have an OK status",
+            )
+            return
+
+        # the multi search alternates headers and bodies
+        queries = [Q(body["query"]) for body in msearch.to_dict()[1::2]]
+
+        # as in bulk mode, updated documents are not reported
+        yield UpdateByQueryRequest(
+            getattr(model, self.target_model),
+            Q("bool", should=queries, minimum_should_match=1),
+            self.get_updated_fields(),
+            report=False,
+        )
@@ -8,6 +8,7 @@ from typing import Dict
 from opensearchpy import MultiSearch
 from collections import defaultdict
 
+from maas_engine.engine.cache import cached_reference, get_cache
 from maas_engine.engine.rawdata import RawDataEngine
 from maas_cds.lib.periodutils import Period, reduce_periods
 
@@ -28,6 +29,15 @@ class BaseProductConsolidatorEngine(RawDataEngine):
     # a value in seconds to find the datatake of a product from sensing
     S2_DATATAKE_ATTACHEMENT_DELTA = 15
 
+    # datatakes attached to products, shared by the messages of the process
+    DATATAKE_CACHE = get_cache(
+        "cds-datatake",
+        maxsize=4096,
+        ttl=600.0,
+        invalidation_routing_keys=("update.cds-datatake*",),
+        by_document_id=True,
+    )
+
     def __init__(self, args=None, send_reports=True, min_doi=None, chunk_size=0):
         super().__init__(
             args=args, send_reports=send_reports, min_doi=min_doi, chunk_size=chunk_size
@@ -36,6 +46,10 @@ class BaseProductConsolidatorEngine(RawDataEngine):
         self.all_data_dict = {}
 
     @staticmethod
+    @cached_reference(
+        "cds-dataflow-level-type",
+        invalidation_routing_keys=("update.cds-dataflow*",),
+    )
     def load_level_type_mapping():
         """load the product_type level mapping in CdsDataflow index
 
@@ -237,18 +251,15 @@ class BaseProductConsolidatorEngine(RawDataEngine):
         """
         super().on_pre_consolidate()
 
-        # init mapping if needed
-        if not BaseProductConsolidatorEngine.LEVEL_TYPE_MAPPING:
-            BaseProductConsolidatorEngine.LEVEL_TYPE_MAPPING = (
-                self.load_level_type_mapping()
-            )
+        # mapping is cached by the process and reloaded when expired
+        BaseProductConsolidatorEngine.LEVEL_TYPE_MAPPING = (
+            self.load_level_type_mapping()
+        )
 
-            self.logger.info(
-                "Loaded dataflow product level-type mapping : %s",
-                len(BaseProductConsolidatorEngine.LEVEL_TYPE_MAPPING),
-            )
-        else:
-            self.logger.debug("Dataflow product level-type mapping is already loaded")
+        self.logger.debug(
+            "Dataflow product level-type mapping : %s",
+            len(BaseProductConsolidatorEngine.LEVEL_TYPE_MAPPING),
+        )
 
         self.all_data_dict = self.session.get("all_data_dict")
 
@@ -387,17 +398,35 @@ class BaseProductConsolidatorEngine(RawDataEngine):
         Returns:
             Dict[str, CdsDatatake]: name_without_extension -> datatake
         """
-        return {
-            document.name_without_extension: datatake
-            for document, datatake in zip(
-                documents,
-                CdsDatatake.mget_by_ids(
-                    [
-                        f"{document.satellite_unit}-{document.datatake_id}"
-                        for document in documents
-                    ]
-                ),
+        datatake_ids = {
+            document.name_without_extension: (
+                f"{document.satellite_unit}-{document.datatake_id}"
             )
+            for document in documents
+        }
+
+        datatakes = {}
+
+        missing_ids = []
+
+        for datatake_id in dict.fromkeys(datatake_ids.values()):
+            if (datatake := self.DATATAKE_CACHE.get(datatake_id)) is not None:
+                datatakes[datatake_id] = datatake
+            else:
+                missing_ids.append(datatake_id)
+
+        if missing_ids:
+            for datatake_id, datatake in zip(
+                missing_ids, CdsDatatake.mget_by_ids(missing_ids)
+            ):
+                # unknown datatakes are not cached as they may be created later
+                if datatake is not None:
+                    self.DATATAKE_CACHE.put(datatake_id, datatake)
+                datatakes[datatake_id] = datatake
+
+        return {
+            name_without_extension: datatakes[datatake_id]
+            for name_without_extension, datatake_id in datatake_ids.items()
         }
 
     def _get_datatake_S2_map(
@@ -438,6 +467,68 @@ class BaseProductConsolidatorEngine(RawDataEngine):
 
         return datatake_map
 
+    def _attach_cached_datatakes_S2(
+        self, satellite, documents, datatake_dict
+    ) -> list["ProductDatatakeMixin"]:
+        """
+        Attach the cached datatakes whose observation contains the middle of the
+        product sensing, which is always the nearest datatake
+
+        Args:
+            satellite (str): satellite unit of the documents
+            documents (list[ProductDatatakeMixin]): consolidated documents
+            datatake_dict (dict): name_without_extension -> datatake to fill
+
+        Returns:
+            list[ProductDatatakeMixin]: documents without cached datatake
+        """
+        cached_datatakes = [
+            datatake
+            for datatake in self.DATATAKE_CACHE.values()
+            if datatake.mission == "S2"
+            and datatake.satellite_unit == satellite
+            and datatake.observation_time_start
+            and datatake.observation_time_stop
+        ]
+
+        if not cached_datatakes:
+            return documents
+
+        remaining_documents = []
+
+        for document in documents:
+            if not (document.sensing_start_date and document.sensing_end_date):
+                remaining_documents.append(document)
+                continue
+
+            middle_date = (
+                document.sensing_start_date
+                + (document.sensing_end_date - document.sensing_start_date) / 2
+            )
+
+            datatake = next(
+                (
+                    datatake
+                    for datatake in cached_datatakes
+                    if datatake.observation_time_start
+                    <= middle_date
+                    <= datatake.observation_time_stop
+                ),
+                None,
+            )
+
+            if datatake is None:
+                remaining_documents.append(document)
+            else:
+                datatake_dict[document.name_without_extension] = datatake
+
+        self.logger.debug(
+            "%d S2 products attached to cached datatakes",
+            len(documents) - len(remaining_documents),
+        )
+
+        return remaining_documents
+
     def get_datatake_dict_S2(
         self, documents: list["ProductDatatakeMixin"]
     ) -> Dict[str, CdsDatatake]:
@@ -459,7 +550,12 @@ class BaseProductConsolidatorEngine(RawDataEngine):
         ):
             # Multiple Search by satellite with reduced queries
 
-            grouped_documents = list(grouped_documents)
+            grouped_documents = self._attach_cached_datatakes_S2(
+                satellite, list(grouped_documents), datatake_dict
+            )
+
+            if not grouped_documents:
+                continue
 
             searched_periods = reduce_periods(
                 [
@@ -473,6 +569,9 @@ class BaseProductConsolidatorEngine(RawDataEngine):
                 searched_periods, satellite, tolerance_value, grouped_documents
             )
 
+            for datatake_id, datatake in datatake_map.items():
+                self.DATATAKE_CACHE.put(datatake_id, datatake)
+
             available_datatakes = list(datatake_map.values())
 
             self.logger.info(
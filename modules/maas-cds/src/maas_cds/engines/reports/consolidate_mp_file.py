@@ -10,6 +10,7 @@ from itertools import groupby
 
 from maas_engine.engine.rawdata import DataEngine
 from maas_engine.engine.base import EngineReport
+from maas_engine.engine.cache import cached_reference
 from maas_model import (
     MAASMessage,
     MAASDocument,
@@ -1050,6 +1051,10 @@ class ConsolidateMpFileEngine(MissionMixinEngine, AnomalyImpactMixinEngine, Data
             return self.COMPLETENESS_CONFIG[mp_product.satellite_id]
 
     @staticmethod
+    @cached_reference(
+        "maas-config-completeness",
+        invalidation_routing_keys=("update.maas-config-completeness*",),
+    )
     def load_completeness_configuration():
         """load the completeness configuration
 
@@ -1,12 +1,122 @@
 """Interface status consolidation"""
+
+import copy
 import datetime
 import hashlib
+import threading
+
+from opensearchpy import MultiSearch, Search
+from opensearchpy.exceptions import ConflictError
 
+from maas_engine.engine.cache import ReferenceCache, get_cache
 from maas_engine.engine.rawdata import RawDataEngine
 
 from maas_cds import model
 
 
+class InterfaceStatusTimeline:
+    """Latest status interval of each interface, shared by the engines of the process
+
+    Entries are the database hits of the statuses: documents built from them carry
+    the sequence number of the stored version, so writing a status modified since
+    it was cached fails with a version conflict.
+    """
+
+    def __init__(self, cache: ReferenceCache, size: int = 1024):
+        """Constructor
+
+        Args:
+            cache (ReferenceCache): cache of the status hits by interface name
+            size (int, optional): maximum number of interfaces loaded by the warm up.
+                Defaults to 1024.
+        """
+        self.cache = cache
+
+        self.size = size
+
+        self._warmed = False
+
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        """Load the latest status of every interface with a single aggregation, on
+        first call only"""
+        with self._lock:
+            if self._warmed:
+                return
+
+            search = (
+                model.CdsInterfaceStatus.search()
+                .extra(size=0)
+                .params(ignore_unavailable=True)
+            )
+
+            search.aggs.bucket(
+                "interfaces", "terms", field="interface_name", size=self.size
+            ).metric(
+                "latest",
+                "top_hits",
+                size=1,
+                sort=[{"status_time_stop": {"order": "desc"}}],
+                seq_no_primary_term=True,
+                version=True,
+            )
+
+            aggregations = search.execute().to_dict().get("aggregations")
+
+            for bucket in aggregations["interfaces"]["buckets"] if aggregations else []:
+                self.cache.put(bucket["key"], bucket["latest"]["hits"]["hits"][0])
+
+            self._warmed = True
+
+    def get(self, interface_name: str) -> model.CdsInterfaceStatus | None:
+        """Get the latest status of an interface
+
+        Args:
+            interface_name (str): interface name
+
+        Returns:
+            model.CdsInterfaceStatus | None: a new status instance, None if unknown
+        """
+        hit = self.cache.get(interface_name)
+
+        if hit is None:
+            return None
+
+        return model.CdsInterfaceStatus.from_opensearch(copy.deepcopy(hit))
+
+    def update(self, status: model.CdsInterfaceStatus, details: dict):
+        """Store a written status unless a more recent one is known
+
+        Args:
+            status (model.CdsInterfaceStatus): written status
+            details (dict): Elastic search result details dict of the write
+        """
+        latest = self.get(status.interface_name)
+
+        if latest is not None and latest.status_time_stop > status.status_time_stop:
+            return
+
+        self.cache.put(
+            status.interface_name,
+            {
+                "_index": details["_index"],
+                "_id": details["_id"],
+                "_seq_no": details["_seq_no"],
+                "_primary_term": details["_primary_term"],
+                "_source": status.to_dict(),
+            },
+        )
+
+    def invalidate(self, interface_name: str):
+        """Forget the latest status of an interface, read again from the database
+
+        Args:
+            interface_name (str): interface name
+        """
+        self.cache.invalidate([interface_name])
+
+
 class InterfaceStatusConsolidatorEngine(RawDataEngine):
     """Consolidate raw interface probes to interface status"""
 
@@ -14,13 +124,33 @@ class InterfaceStatusConsolidatorEngine(RawDataEngine):
 
     CONSOLIDATED_MODEL = model.CdsInterfaceStatus
 
+    # latest statuses of the process, so consecutive probes extending the current
+    # status of an interface don't read it again from the database. Only used by the
+    # engines configured with timeline=True
+    TIMELINE = InterfaceStatusTimeline(
+        get_cache("interface-status-timeline", maxsize=4096, ttl=3600.0)
+    )
+
     def __init__(
-        self, args=None, send_reports=False, min_doi=None, refresh_interval_seconds=300
+        self,
+        args=None,
+        send_reports=False,
+        min_doi=None,
+        refresh_interval_seconds=300,
+        timeline=False,
     ):
         super().__init__(args=args, send_reports=send_reports, min_doi=min_doi)
 
         self.refresh_delta = datetime.timedelta(seconds=refresh_interval_seconds)
 
+        # resolve probes from the latest statuses of the process. The statuses
+        # written by other processes are not seen: this requires a single consumer
+        # of the interface probes, so the engine shall not be scaled
+        self.timeline = timeline
+
+        # interfaces which consolidated status is known to be their latest one
+        self._latest_interfaces: set[str] = set()
+
     def consolidate_from_InterfaceProbe(
         self,
         raw_document: model.InterfaceProbe,
@@ -38,6 +168,21 @@ class InterfaceStatusConsolidatorEngine(RawDataEngine):
         Returns:
             model.CdsInterfaceStatus: CdsInterfaceStatus document
         """
+        try:
+            return self._consolidate_probe(raw_document, documents)
+
+        except ConflictError:
+            # the cached status is outdated: the message is requeued and the status
+            # read again from the database
+            self.TIMELINE.invalidate(raw_document.interface_name)
+            raise
+
+    def _consolidate_probe(
+        self,
+        raw_document: model.InterfaceProbe,
+        documents: tuple[model.CdsInterfaceStatus],
+    ) -> model.CdsInterfaceStatus:
+        """Consolidation of consolidate_from_InterfaceProbe()"""
         previous_document, next_document = documents
 
         if (
@@ -116,6 +261,9 @@ class InterfaceStatusConsolidatorEngine(RawDataEngine):
             model.CdsInterfaceStatus: new status from the probe
         """
 
+        # the remaining part is the latest status, not the new one
+        self._latest_interfaces.discard(status.interface_name)
+
         new_status = self.create_status_from_probe(probe)
 
         new_status.status_time_stop = new_status.status_time_start + self.refresh_delta
@@ -190,67 +338,178 @@ class InterfaceStatusConsolidatorEngine(RawDataEngine):
 
         return document
 
+    def get_previous_status_search(self, probe: model.InterfaceProbe) -> Search:
+        """Build the search of the last status started before a probe
+
+        Args:
+            probe (model.InterfaceProbe): probe
+
+        Returns:
+            Search: search request
+        """
+        return (
+            model.CdsInterfaceStatus.search()
+            .filter("term", interface_name=probe.interface_name)
+            .filter("range", status_time_start={"lte": probe.probe_time_start})
+            .sort({"status_time_stop": {"order": "desc"}})
+            .extra(version=True, seq_no_primary_term=True, size=1)
+            .params(ignore_unavailable=True)
+        )
+
+    def get_next_status_search(self, probe: model.InterfaceProbe) -> Search:
+        """Build the search of the first status started after a probe
+
+        Args:
+            probe (model.InterfaceProbe): probe
+
+        Returns:
+            Search: search request
+        """
+        return (
+            model.CdsInterfaceStatus.search()
+            .filter("term", interface_name=probe.interface_name)
+            .filter("range", status_time_start={"gt": probe.probe_time_stop})
+            .sort({"status_time_start": {"order": "asc"}})
+            .extra(version=True, seq_no_primary_term=True, size=1)
+            .params(ignore_unavailable=True)
+        )
+
     def get_consolidated_documents(self) -> list[tuple[model.CdsInterfaceStatus]]:
         """
 
         Get or create the target documents for a one-to-one consolidation.
+
+        With the timeline, probes following the latest status of their interface are
+        resolved from the process. The previous and next statuses of the other probes
+        are searched with a single multi search request.
         """
 
-        consolidated_documents = []
+        if not self.input_documents:
+            return []
 
-        for probe_document in self.input_documents:
-            previous_status, next_status = None, None
+        if self.timeline:
+            self.TIMELINE.warm_up()
 
-            # find the previous status
-            search = (
-                model.CdsInterfaceStatus.search()
-                .filter("term", interface_name=probe_document.interface_name)
-                .filter(
-                    "range", status_time_start={"lte": probe_document.probe_time_start}
-                )
-                .sort({"status_time_stop": {"order": "desc"}})
-                .params(version=True, seq_no_primary_term=True, size=1, ignore=[404])
+        consolidated_documents = {}
+
+        searched_probes = []
+
+        # interfaces with a status after one of the probes
+        unsettled_interfaces = set()
+
+        for index, probe_document in enumerate(self.input_documents):
+            latest_status = (
+                self.TIMELINE.get(probe_document.interface_name)
+                if self.timeline
+                else None
+            )
+
+            if (
+                latest_status is None
+                or probe_document.probe_time_start < latest_status.status_time_start
+            ):
+                searched_probes.append((index, probe_document))
+                continue
+
+            # no status can start after the probe as the latest one starts before
+            consolidated_documents[index] = (
+                self.get_previous_status(probe_document, [latest_status]),
+                None,
             )
 
-            try:
-                result = search.execute()
+            self._latest_interfaces.add(probe_document.interface_name)
 
-                if (
-                    result
-                    and (probe_document.probe_time_start - result[0].status_time_stop)
-                    <= self.refresh_delta
-                ):
-                    previous_status = result[0]
-                    self.logger.debug("Found previous status: %s", previous_status)
+        if searched_probes:
+            msearch = MultiSearch()
 
-            except KeyError:
-                previous_status = None
+            for _, probe_document in searched_probes:
+                msearch = msearch.add(
+                    self.get_previous_status_search(probe_document)
+                ).add(self.get_next_status_search(probe_document))
 
-            # try find the next status. this is not the nominal case but it may happen
-            search = (
-                model.CdsInterfaceStatus.search()
-                .filter("term", interface_name=probe_document.interface_name)
-                .filter(
-                    "range", status_time_start={"gt": probe_document.probe_time_stop}
+            # responses are in the order of the searches: previous then next of each
+            # probe
+            responses = msearch.execute()
+
+            for (index, probe_document), previous_result, next_result in zip(
+                searched_probes, responses[::2], responses[1::2]
+            ):
+                consolidated_documents[index] = (
+                    self.get_previous_status(probe_document, previous_result),
+                    self.get_next_status(probe_document, next_result),
                 )
-                .sort({"status_time_start": {"order": "asc"}})
-                .params(version=True, seq_no_primary_term=True, size=1, ignore=[404])
-            )
 
-            try:
-                result = search.execute()
+                if next_result:
+                    unsettled_interfaces.add(probe_document.interface_name)
+                else:
+                    self._latest_interfaces.add(probe_document.interface_name)
+
+        # a status may start after another probe of the same interface
+        self._latest_interfaces -= unsettled_interfaces
+
+        return [
+            consolidated_documents[index] for index in range(len(self.input_documents))
+        ]
+
+    def get_previous_status(
+        self, probe: model.InterfaceProbe, result
+    ) -> model.CdsInterfaceStatus | None:
+        """Get the previous status of a probe from search results
+
+        Args:
+            probe (model.InterfaceProbe): probe
+            result: statuses matching the previous status search
+
+        Returns:
+            model.CdsInterfaceStatus | None: previous status, None if too old
+        """
+        if result and (probe.probe_time_start - result[0].status_time_stop) <= (
+            self.refresh_delta
+        ):
+            self.logger.debug("Found previous status: %s", result[0])
+            return result[0]
+
+        return None
+
+    def get_next_status(
+        self, probe: model.InterfaceProbe, result
+    ) -> model.CdsInterfaceStatus | None:
+        """Get the next status of a probe from search results. This is not the nominal
+        case but it may happen
+
+        Args:
+            probe (model.InterfaceProbe): probe
+            result: statuses matching the next status search
+
+        Returns:
+            model.CdsInterfaceStatus | None: next status, None if too far
+        """
+        if result and (result[0].status_time_start - probe.probe_time_stop) <= (
+            self.refresh_delta
+        ):
+            self.logger.debug("Found next status: %s", result[0])
+            return result[0]
+
+        return None
+
+    def on_bulk_result(self, success: bool, details: dict):
+        """Keep the timeline up to date with the written statuses
+
+        Args:
+            success (bool): True if the action succeeded
+            details (dict): Elastic search result details dict
+        """
+        if not self.timeline:
+            return
 
-                if (
-                    result
-                    and (result[0].status_time_start - probe_document.probe_time_stop)
-                    <= self.refresh_delta
-                ):
-                    next_status = result[0]
-                    self.logger.debug("Found next status: %s", next_status)
+        status = self._index_id_document_map.get((details["_index"], details["_id"]))
 
-            except KeyError:
-                previous_status = None
+        if status is None:
+            return
 
-            consolidated_documents.append((previous_status, next_status))
+        if success and status.interface_name in self._latest_interfaces:
+            self.TIMELINE.update(status, details)
 
-        return consolidated_documents
+        else:
+            # unknown latest status or version conflict: read it from the database
+            self.TIMELINE.invalidate(status.interface_name)
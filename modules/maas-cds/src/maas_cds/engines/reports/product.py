@@ -60,6 +60,11 @@ class ProductConsolidatorEngine(
 
         self.dd_attrs = dd_attrs or {}
 
+    @classmethod
+    def warm_up(cls) -> None:
+        """Load the coverage masks at startup"""
+        GeoMaskUtils.warm_masks()
+
     def get_consolidated_id(self, raw_document) -> str:
         """Generate consolidated product identifier: md5 sum of the product name
 
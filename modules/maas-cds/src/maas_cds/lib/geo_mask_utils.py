@@ -2,12 +2,17 @@
 
 import logging
 import json
+import math
 
 import pkgutil
+from typing import List
 
 from maas_cds.lib.config import get_good_threshold_config_from_value
+import numpy as np
+import shapely
 from shapely.wkt import loads
 from shapely.geometry import GeometryCollection, shape
+from shapely.geometry.base import BaseGeometry
 from shapely.errors import ShapelyError
 import pyproj
 
@@ -17,6 +22,129 @@ from maas_cds.model.datatake_s1 import CdsDatatakeS1
 from opensearchpy.helpers.utils import AttrDict
 
 
+class MaskIndex:
+    """Mask polygons prepared for coverage computation
+
+    The polygons are tiled in small prepared parts indexed by a STRtree, so that
+    footprints fully outside or fully inside the mask are found without computing
+    any intersection.
+    """
+
+    # size of the tiles in degrees
+    TILE_SIZE = 10.0
+
+    def __init__(self, polygons: List[BaseGeometry], tile_size: float = TILE_SIZE):
+        """Constructor
+
+        Args:
+            polygons (List[BaseGeometry]): mask polygons
+            tile_size (float, optional): size of the tiles in degrees.
+                Defaults to TILE_SIZE.
+        """
+        self.geometry = GeometryCollection(polygons)
+
+        self.polygons = np.array(polygons, dtype=object)
+
+        self.polygon_tree = shapely.STRtree(self.polygons)
+
+        self.tiles = np.array(
+            [tile for polygon in polygons for tile in self.tile(polygon, tile_size)],
+            dtype=object,
+        )
+
+        shapely.prepare(self.tiles)
+
+        self.tile_tree = shapely.STRtree(self.tiles)
+
+    @staticmethod
+    def tile(polygon: BaseGeometry, tile_size: float) -> List[BaseGeometry]:
+        """Split a polygon along a grid
+
+        Args:
+            polygon (BaseGeometry): polygon to split
+            tile_size (float): size of the grid cells in degrees
+
+        Returns:
+            List[BaseGeometry]: non empty parts of the polygon
+        """
+        min_x, min_y, max_x, max_y = polygon.bounds
+
+        tiles = []
+
+        for x in np.arange(math.floor(min_x / tile_size) * tile_size, max_x, tile_size):
+            for y in np.arange(
+                math.floor(min_y / tile_size) * tile_size, max_y, tile_size
+            ):
+                tile = shapely.clip_by_rect(polygon, x, y, x + tile_size, y + tile_size)
+
+                if not tile.is_empty:
+                    tiles.append(tile)
+
+        return tiles
+
+    def coverages(self, shapes: List[BaseGeometry], geod: pyproj.Geod) -> List[float]:
+        """Get the coverage of shapes on the mask
+
+        Args:
+            shapes (List[BaseGeometry]): footprint shapes
+            geod (pyproj.Geod): geodesic calculator
+
+        Returns:
+            List[float]: the percentage of each shape in the mask
+        """
+        shapes = np.array(shapes, dtype=object)
+
+        coverages = np.zeros(len(shapes))
+
+        shape_indices, tile_indices = self.tile_tree.query(
+            shapes, predicate="intersects"
+        )
+
+        # a shape inside a tile is fully inside the mask
+        inside = shapely.contains_properly(
+            self.tiles[tile_indices], shapes[shape_indices]
+        )
+
+        coverages[shape_indices[inside]] = 100.0
+
+        for index in np.setdiff1d(shape_indices, shape_indices[inside]).tolist():
+            coverages[index] = self.partial_coverage(shapes[index], geod)
+
+        return coverages.tolist()
+
+    def partial_coverage(self, product_shape: BaseGeometry, geod: pyproj.Geod):
+        """Get the coverage of a shape intersecting the border of the mask
+
+        Args:
+            product_shape (BaseGeometry): footprint shape
+            geod (pyproj.Geod): geodesic calculator
+
+        Returns:
+            float: the percentage of the shape in the mask
+        """
+        min_x, min_y, max_x, max_y = product_shape.bounds
+
+        # clipping the mask around the footprint only cuts edges outside of the
+        # footprint, so the intersection keeps the same vertices
+        local_mask = shapely.clip_by_rect(
+            self.polygons[self.polygon_tree.query(product_shape)],
+            min_x - 1,
+            min_y - 1,
+            max_x + 1,
+            max_y + 1,
+        )
+
+        intersection = GeometryCollection(list(local_mask)).intersection(product_shape)
+
+        product_area = abs(geod.geometry_area_perimeter(product_shape)[0])
+
+        intersection_area = abs(geod.geometry_area_perimeter(intersection)[0])
+
+        total_coverage = intersection_area / product_area * 100
+
+        return min(total_coverage, 100)
+
+
 class GeoMaskUtils:
     """Class to manage mask and intersection"""
 
@@ -34,8 +162,12 @@ class GeoMaskUtils:
 
     COVERING_AREA_FIELD = "_coverage_percentage"
 
+    # MaskIndex by mask file name
     CACHED_MASK = {}
 
+    # Use geodesic projection
+    GEOD = pyproj.Geod(ellps="WGS84")
+
     def __init__(self) -> None:
         self.logger = logging.getLogger(self.__class__.__name__)
 
@@ -81,14 +213,34 @@ class GeoMaskUtils:
             self.logger.error("[%s] - Mask path invalid : %s", mask_name, mask_filename)
             raise file_error
 
-        mask_shapes = GeometryCollection(
+        self.CACHED_MASK[mask_filename] = MaskIndex(
             [
                 shape(feature["geometry"]).buffer(0)
                 for feature in geojson_data["features"]
             ]
         )
 
-        self.CACHED_MASK[mask_filename] = mask_shapes
+    @classmethod
+    def warm_masks(cls) -> int:
+        """Load all the masks, to avoid slowing down the first messages
+
+        Returns:
+            int: number of loaded masks
+        """
+        geo_mask_utils = cls()
+
+        for mask_name, config_mask in cls.OVER_SPECIFIC_AREA_GEOJSON.items():
+            for time_indicator, mask_filename in config_mask.items():
+                if mask_filename in cls.CACHED_MASK:
+                    continue
+
+                try:
+                    geo_mask_utils.load_mask(mask_name, time_indicator)
+                except FileNotFoundError:
+                    # already logged, the error is raised again on use
+                    continue
+
+        return len(cls.CACHED_MASK)
 
     def get_mask(self, mask_name, time_indicator="0"):
         """Get mask from his identifier (his name)
@@ -99,7 +251,20 @@ class GeoMaskUtils:
         Returns:
             Polygons: The mask with shapely format (Polygons)
         """
-        (nearest_time_indicator, file_name) = get_good_threshold_config_from_value(
+        mask_index = self.get_mask_index(mask_name, time_indicator)
+
+        return mask_index.geometry if mask_index is not None else None
+
+    def get_mask_index(self, mask_name, time_indicator="0"):
+        """Get the prepared mask from his identifier (his name)
+
+        Args:
+            mask_name (str): identifier of the mask
+
+        Returns:
+            MaskIndex: The mask prepared for coverage computation
+        """
+        nearest_time_indicator, file_name = get_good_threshold_config_from_value(
             self.OVER_SPECIFIC_AREA_GEOJSON.get(mask_name, {}), time_indicator
         )
 
@@ -175,29 +340,84 @@ class GeoMaskUtils:
             float: the percentage of the footprint in the mask
         """
 
-        mask = self.get_mask(mask_name, date_indicator)
-
-        if mask is None:
-            self.logger.warning("[%s] - Cannot intersect with this mask", mask_name)
+        mask_index = self.get_coverage_mask_index(mask_name, date_indicator)
 
+        if mask_index is None:
             return 0
 
         product_shape = self.load_area_shape_from_footprint(footprint)
-        if product_shape is None:
-            return 0
 
-        # Use geodesic projection
-        geod = pyproj.Geod(ellps="WGS84")
+        return self.shape_coverages(mask_index, [product_shape])[0]
 
-        product_area = abs(geod.geometry_area_perimeter(product_shape)[0])
+    def area_coverages(self, footprints, mask_name, date_indicator="0"):
+        """Get the coverage of several footprints on the mask identified by the
+        mask_name
 
-        mask = self.get_mask(mask_name, date_indicator)
-        intersection = mask.intersection(product_shape)
-        intersection_area = abs(geod.geometry_area_perimeter(intersection)[0])
+        Args:
+            footprints (list(str | dict)): The footprints
+            mask_name (str):identifier of the mask
 
-        total_coverage = intersection_area / product_area * 100
+        Returns:
+            list(float): the percentage of each footprint in the mask
+        """
+        mask_index = self.get_coverage_mask_index(mask_name, date_indicator)
 
-        return min(total_coverage, 100)
+        if mask_index is None:
+            return [0] * len(footprints)
+
+        return self.shape_coverages(
+            mask_index,
+            [
+                self.load_area_shape_from_footprint(footprint)
+                for footprint in footprints
+            ],
+        )
+
+    def get_coverage_mask_index(self, mask_name, date_indicator="0"):
+        """Get the prepared mask to compute coverages, warning if it is not found
+
+        Args:
+            mask_name (str):identifier of the mask
+
+        Returns:
+            MaskIndex: The mask prepared for coverage computation
+        """
+        mask_index = self.get_mask_index(mask_name, date_indicator)
+
+        if mask_index is None:
+            self.logger.warning("[%s] - Cannot intersect with this mask", mask_name)
+
+        return mask_index
+
+    def shape_coverages(self, mask_index, product_shapes):
+        """Get the coverage of shapes on a prepared mask
+
+        Args:
+            mask_index (MaskIndex): The prepared mask
+            product_shapes (list(Geometry | None)): The shapes, None when the
+                footprint cannot be loaded
+
+        Returns:
+            list(float): the percentage of each shape in the mask
+        """
+        coverages = [0] * len(product_shapes)
+
+        valid_indices = [
+            index
+            for index, product_shape in enumerate(product_shapes)
+            if product_shape is not None
+        ]
+
+        if valid_indices:
+            for index, coverage in zip(
+                valid_indices,
+                mask_index.coverages(
+                    [product_shapes[index] for index in valid_indices], self.GEOD
+                ),
+            ):
+                coverages[index] = coverage
+
+        return coverages
 
     def intersect_with_masks(self, footprint, masks_name, date_indicator="0"):
         """Intersect a footprint with several masks
@@ -211,8 +431,19 @@ class GeoMaskUtils:
         """
         result_coverage = {}
 
+        product_shapes = None
+
         for mask_name in masks_name:
-            total_coverage = self.area_coverage(footprint, mask_name, date_indicator)
+            total_coverage = 0
+
+            mask_index = self.get_coverage_mask_index(mask_name, date_indicator)
+
+            if mask_index is not None:
+                if product_shapes is None:
+                    # loaded once for all the masks
+                    product_shapes = [self.load_area_shape_from_footprint(footprint)]
+
+                total_coverage = self.shape_coverages(mask_index, product_shapes)[0]
 
             self.logger.debug(
                 "[%s] - Footprint intersect of %s %%", mask_name, total_coverage
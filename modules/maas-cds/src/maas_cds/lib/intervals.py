@@ -0,0 +1,383 @@
+"""Interval arithmetic on NumPy arrays of int64 microseconds
+
+Periods are stored as two arrays of the same length: the start and the end of each
+period, in microseconds since the epoch. All the functions are vectorized, so they
+scale to datatakes with thousands of products.
+"""
+
+import datetime
+from collections import namedtuple
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Period = namedtuple("Period", ("start", "end"))
+
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+ZERO = datetime.timedelta(0)
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+EPOCH_UTC = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _epoch(tzinfo: Optional[datetime.tzinfo]) -> datetime.datetime:
+    return EPOCH if tzinfo is None else EPOCH_UTC
+
+
+def datetime_to_microseconds(date: datetime.datetime) -> int:
+    """Convert a datetime to microseconds since the epoch, exactly
+
+    Args:
+        date (datetime.datetime): naive or aware datetime
+
+    Returns:
+        int: microseconds
+    """
+    return (date - _epoch(date.tzinfo)) // ONE_MICROSECOND
+
+
+def microseconds_to_datetime(
+    value: int, tzinfo: Optional[datetime.tzinfo] = datetime.timezone.utc
+) -> datetime.datetime:
+    """Convert microseconds since the epoch to a datetime
+
+    Args:
+        value (int): microseconds
+        tzinfo (Optional[datetime.tzinfo], optional): time zone of the result,
+            None for a naive datetime. Defaults to datetime.timezone.utc.
+
+    Returns:
+        datetime.datetime: the datetime
+    """
+    date = _epoch(tzinfo) + datetime.timedelta(microseconds=int(value))
+
+    if tzinfo is None or tzinfo is datetime.timezone.utc:
+        return date
+
+    if tzinfo.utcoffset(None) == ZERO:
+        return date.replace(tzinfo=tzinfo)
+
+    return date.astimezone(tzinfo)
+
+
+def datetimes_to_microseconds(
+    dates: Sequence[datetime.datetime], tzinfo: Optional[datetime.tzinfo]
+) -> np.ndarray:
+    """Convert datetimes to an array of microseconds since the epoch
+
+    Args:
+        dates (Sequence[datetime.datetime]): datetimes, all naive or all aware
+        tzinfo (Optional[datetime.tzinfo]): None if the datetimes are naive
+
+    Returns:
+        np.ndarray: int64 microseconds
+    """
+    if tzinfo is None:
+        return np.fromiter(
+            ((date - EPOCH) // ONE_MICROSECOND for date in dates),
+            dtype=np.int64,
+            count=len(dates),
+        )
+
+    # float timestamps are exact to the microsecond until year 2255
+    timestamps = np.fromiter(
+        map(datetime.datetime.timestamp, dates), dtype=np.float64, count=len(dates)
+    )
+
+    return np.rint(timestamps * 1e6).astype(np.int64)
+
+
+class PeriodArray:
+    """Periods stored as two int64 arrays of microseconds since the epoch
+
+    Converting datetimes costs about as much as a python loop over the periods,
+    so a PeriodArray is worth building when several period functions use it. The
+    source periods are kept to return their own datetimes instead of rebuilding
+    them.
+    """
+
+    __slots__ = ("starts", "ends", "tzinfo", "source")
+
+    def __init__(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        tzinfo: Optional[datetime.tzinfo] = datetime.timezone.utc,
+        source: Optional[Sequence] = None,
+    ):
+        self.starts = starts
+
+        self.ends = ends
+
+        self.tzinfo = tzinfo
+
+        # periods the arrays were converted from, if any
+        self.source = source
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Period:
+        if self.source is not None:
+            return self.source[index]
+
+        return Period(
+            microseconds_to_datetime(self.starts[index], self.tzinfo),
+            microseconds_to_datetime(self.ends[index], self.tzinfo),
+        )
+
+    @classmethod
+    def from_periods(cls, periods: Iterable) -> "PeriodArray":
+        """Convert periods of datetimes, keeping the input order
+
+        Args:
+            periods (Iterable): objects with start and end datetimes
+
+        Returns:
+            PeriodArray: periods
+        """
+        periods = list(periods)
+
+        tzinfo = periods[0].start.tzinfo if periods else datetime.timezone.utc
+
+        return cls(
+            datetimes_to_microseconds([period.start for period in periods], tzinfo),
+            datetimes_to_microseconds([period.end for period in periods], tzinfo),
+            tzinfo,
+            periods,
+        )
+
+    def to_periods(
+        self, starts: np.ndarray = None, ends: np.ndarray = None
+    ) -> List[Period]:
+        """Convert periods to datetimes in the time zone of this array
+
+        Args:
+            starts (np.ndarray, optional): other period starts. Defaults to None.
+            ends (np.ndarray, optional): other period ends. Defaults to None.
+
+        Returns:
+            List[Period]: periods of datetimes
+        """
+        if starts is None:
+            starts, ends = self.starts, self.ends
+
+        return [
+            Period(
+                microseconds_to_datetime(start, self.tzinfo),
+                microseconds_to_datetime(end, self.tzinfo),
+            )
+            for start, end in zip(starts.tolist(), ends.tolist())
+        ]
+
+    def between(self, indices: np.ndarray) -> List[Period]:
+        """Get the periods from the end of periods to the start of the periods
+        following them
+
+        Args:
+            indices (np.ndarray): indices of the first periods
+
+        Returns:
+            List[Period]: periods between the periods
+        """
+        if self.source is None:
+            return self.to_periods(self.ends[indices], self.starts[indices + 1])
+
+        return [
+            Period(self.source[index].end, self.source[index + 1].start)
+            for index in indices.tolist()
+        ]
+
+
+def sort(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sort periods by start, keeping the order of equal starts
+
+    Args:
+        starts (np.ndarray): period starts
+        ends (np.ndarray): period ends
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: sorted starts and ends
+    """
+    order = np.argsort(starts, kind="stable")
+
+    return starts[order], ends[order]
+
+
+def union(
+    starts: np.ndarray, ends: np.ndarray, merge_contiguous: bool = True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge overlapping periods
+
+    Args:
+        starts (np.ndarray): period starts
+        ends (np.ndarray): period ends
+        merge_contiguous (bool, optional): also merge a period starting exactly at
+            the end of the previous ones. Defaults to True.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: sorted disjoint periods
+    """
+    if not len(starts):
+        return starts, ends
+
+    starts, ends = sort(starts, ends)
+
+    # end of the union of all the previous periods
+    covered_ends = np.maximum.accumulate(ends)
+
+    if merge_contiguous:
+        new_group = starts[1:] > covered_ends[:-1]
+    else:
+        new_group = starts[1:] >= covered_ends[:-1]
+
+    group_starts = np.concatenate(([0], np.flatnonzero(new_group) + 1))
+
+    group_ends = np.concatenate((group_starts[1:] - 1, [len(starts) - 1]))
+
+    return starts[group_starts], covered_ends[group_ends]
+
+
+def union_duration(starts: np.ndarray, ends: np.ndarray) -> int:
+    """Total duration covered by the periods, overlaps counted once
+
+    Args:
+        starts (np.ndarray): period starts
+        ends (np.ndarray): period ends
+
+    Returns:
+        int: duration in microseconds
+    """
+    union_starts, union_ends = union(starts, ends)
+
+    return int(np.sum(union_ends - union_starts))
+
+
+def chained_duration(starts: np.ndarray, ends: np.ndarray) -> int:
+    """Total duration of periods where each period is only compared with the
+    period just before it, as done historically for product sensing
+
+    Args:
+        starts (np.ndarray): period starts, sorted
+        ends (np.ndarray): period ends
+
+    Returns:
+        int: duration in microseconds
+    """
+    if not len(starts):
+        return 0
+
+    previous_ends = ends[:-1]
+
+    next_starts = starts[1:]
+
+    next_ends = ends[1:]
+
+    durations = np.where(
+        next_starts >= previous_ends,
+        next_ends - next_starts,
+        np.maximum(next_ends - previous_ends, 0),
+    )
+
+    return int(ends[0] - starts[0]) + int(np.sum(durations))
+
+
+def gap_indices(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Find the periods followed by a gap, each period being compared with the
+    period just before it
+
+    Args:
+        starts (np.ndarray): period starts, sorted
+        ends (np.ndarray): period ends
+
+    Returns:
+        np.ndarray: indices of the periods ending before the start of the next one
+    """
+    return np.flatnonzero(starts[1:] > ends[:-1])
+
+
+def gaps(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    range_start: int,
+    range_end: int,
+    maximal_offset: float,
+    tolerance_value: float = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the missing periods in a range, each period being compared with the
+    period just before it
+
+    The range end is extended with the tolerance, and with the offset of the first
+    period when this offset does not exceed maximal_offset. Otherwise the offset is
+    a missing period.
+
+    Args:
+        starts (np.ndarray): period starts, sorted
+        ends (np.ndarray): period ends
+        range_start (int): start of the range to evaluate
+        range_end (int): end of the range to evaluate
+        maximal_offset (float): maximal offset of the first period, in microseconds
+        tolerance_value (float, optional): tolerance added to the range end, in
+            microseconds. Defaults to 0.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: starts and ends of the missing periods
+    """
+    if not len(starts):
+        return np.array([range_start], dtype=np.int64), np.array(
+            [range_end], dtype=np.int64
+        )
+
+    range_end += round(tolerance_value)
+
+    start_offset = int(starts[0]) - range_start
+
+    indices = gap_indices(starts, ends)
+
+    gap_starts = [ends[indices]]
+
+    gap_ends = [starts[indices + 1]]
+
+    if start_offset > maximal_offset:
+        # missing period at start
+        if start_offset > 0:
+            gap_starts.insert(0, [range_start])
+            gap_ends.insert(0, starts[:1])
+    else:
+        range_end += start_offset
+
+    # missing period at stop
+    if range_end > ends[-1]:
+        gap_starts.append(ends[-1:])
+        gap_ends.append([range_end])
+
+    return (
+        np.concatenate(gap_starts).astype(np.int64),
+        np.concatenate(gap_ends).astype(np.int64),
+    )
+
+
+def overlaps(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Overlap of each period with the period just before it
+
+    Args:
+        starts (np.ndarray): period starts, sorted
+        ends (np.ndarray): period ends
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: overlap durations and durations of the
+            previous periods, one value by pair of consecutive periods
+    """
+    previous_ends = ends[:-1]
+
+    next_starts = starts[1:]
+
+    durations = np.where(
+        next_starts < previous_ends,
+        np.minimum(previous_ends, ends[1:]) - next_starts,
+        0,
+    )
+
+    return durations, previous_ends - starts[:-1]
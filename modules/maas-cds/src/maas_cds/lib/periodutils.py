@@ -1,10 +1,30 @@
 import datetime
 
-from collections import namedtuple
 from typing import List
 
+import numpy as np
 
-Period = namedtuple("Period", ("start", "end"))
+from maas_cds.lib import intervals
+from maas_cds.lib.intervals import Period
+
+
+def as_period_array(
+    periods: List[Period] | intervals.PeriodArray,
+) -> intervals.PeriodArray:
+    """Convert periods to a PeriodArray, unless they already are one
+
+    Build it once when several functions of this module process the same periods.
+
+    Args:
+        periods (List[Period] | intervals.PeriodArray): periods
+
+    Returns:
+        intervals.PeriodArray: periods
+    """
+    if isinstance(periods, intervals.PeriodArray):
+        return periods
+
+    return intervals.PeriodArray.from_periods(periods)
 
 
 def compute_total_sensing_product(periods: list[Period]) -> int:
@@ -14,6 +34,10 @@ def compute_total_sensing_product(periods: list[Period]) -> int:
 
     """
 
+    if isinstance(periods, intervals.PeriodArray):
+        return float(intervals.chained_duration(periods.starts, periods.ends))
+
+    # a single pass is faster than converting a list to arrays
     sensing = 0
     last_period = None
 
@@ -32,17 +56,18 @@ def compute_total_sensing_product(periods: list[Period]) -> int:
 def compute_total_sensing_period(periods: list[Period]) -> Period:
     """Compute sensing period covered by products"""
 
-    total_period = None
+    if not len(periods):
+        return None
 
-    for period in periods:
-        if total_period is None:
-            total_period = Period(period.start, period.end)
-        else:
-            minstart = min(total_period.start, period.start)
-            maxend = max(total_period.end, period.end)
-            total_period = Period(minstart, maxend)
+    if isinstance(periods, intervals.PeriodArray):
+        return periods.to_periods(
+            periods.starts.min(keepdims=True), periods.ends.max(keepdims=True)
+        )[0]
 
-    return total_period
+    return Period(
+        min(period.start for period in periods),
+        max(period.end for period in periods),
+    )
 
 
 def reduce_periods(
@@ -51,28 +76,16 @@ def reduce_periods(
 ) -> List[Period]:
     """Reduce a list of period"""
 
-    # periods.sort(key=lambda p: (p.start, p.end))  # sort by start date
-    periods.sort(key=lambda p: p.start)  # sort by start date
-
-    reduced = []
-
-    for period in periods:
-
-        adjusted_period = Period(
-            period.start - tolerance_value, period.end + tolerance_value
-        )
+    if not len(periods):
+        return []
 
-        if not reduced:
-            reduced.append(adjusted_period)
+    periods = as_period_array(periods)
 
-        elif adjusted_period.start <= reduced[-1].end:
-            reduced[-1] = Period(
-                reduced[-1].start, max(reduced[-1].end, adjusted_period.end)
-            )
-        else:
-            reduced.append(adjusted_period)
+    tolerance = tolerance_value // intervals.ONE_MICROSECOND
 
-    return reduced
+    return periods.to_periods(
+        *intervals.union(periods.starts - tolerance, periods.ends + tolerance)
+    )
 
 
 def compute_missing_sensing_periods(
@@ -86,93 +99,41 @@ def compute_missing_sensing_periods(
     period_start = range_to_evaluate.start
     period_stop = range_to_evaluate.end
 
-    if not periods:
+    if not len(periods):
         # No coverage at all, return the whole period
         return [Period(period_start, period_stop)]
 
     period_stop += datetime.timedelta(microseconds=tolerance_value)
 
-    previous = None
     missing_periods = []
 
     start_offset = (periods[0].start - period_start).total_seconds() * 1000000
 
     # Missing period at start
     if start_offset > maximal_offset:
-        # Fake product ending at the begin of the datatake
-        previous = Period(period_start, period_start)
+        if start_offset > 0:
+            missing_periods.append(Period(period_start, periods[0].start))
 
     else:
         # move end date cursor
         period_stop += datetime.timedelta(microseconds=start_offset)
 
-    for brother in periods:
-        if previous and brother.start > previous.end:
-            # Missing period between products
-            missing_periods.append(Period(previous.end, brother.start))
-        previous = brother
-
-    end_offset = (period_stop - periods[-1].end).total_seconds()
-
-    if end_offset > 0:
-        # Missing period at stop
-        missing_periods.append(
-            Period(
-                periods[-1].end,
-                period_stop,
-            )
+    # Missing periods between products
+    if isinstance(periods, intervals.PeriodArray):
+        missing_periods.extend(
+            periods.between(intervals.gap_indices(periods.starts, periods.ends))
         )
-
-    return missing_periods
-
-
-def compute_missing_sensing_periods(
-    range_to_evaluate: Period,
-    periods: List[Period],
-    maximal_offset,
-    tolerance_value=0,
-) -> List[Period]:
-    """Identify missing products within sensing period"""
-
-    period_start = range_to_evaluate.start
-    period_stop = range_to_evaluate.end
-
-    if not periods:
-        # No coverage at all, return the whole period
-        return [Period(period_start, period_stop)]
-
-    period_stop += datetime.timedelta(microseconds=tolerance_value)
-
-    previous = None
-    missing_periods = []
-
-    start_offset = (periods[0].start - period_start).total_seconds() * 1000000
-
-    # Missing period at start
-    if start_offset > maximal_offset:
-        # Fake product ending at the begin of the datatake
-        previous = Period(period_start, period_start)
-
     else:
-        # move end date cursor
-        period_stop += datetime.timedelta(microseconds=start_offset)
-
-    for brother in periods:
-        if previous and brother.start > previous.end:
-            # Missing period between products
-            missing_periods.append(Period(previous.end, brother.start))
-        previous = brother
+        previous = None
 
-    end_offset = (period_stop - periods[-1].end).total_seconds()
+        for brother in periods:
+            if previous and brother.start > previous.end:
+                missing_periods.append(Period(previous.end, brother.start))
+            previous = brother
 
-    if end_offset > 0:
+    if period_stop > periods[-1].end:
         # Missing period at stop
-        missing_periods.append(
-            Period(
-                periods[-1].end,
-                period_stop,
-            )
-        )
+        missing_periods.append(Period(periods[-1].end, period_stop))
 
     return missing_periods
 
@@ -191,38 +152,36 @@ def compute_duplicated_indicator(
         "max_duration": 0,
     }
 
-    duplicated_percentage = []
-    duplicated_duration = []
-
     if len(periods) < 2:
         # No coverage at all, return the whole period
         return duplicated_indicator
 
-    for previous, brother in zip(periods[:-1], periods[1:]):
+    periods = as_period_array(periods)
 
-        if brother.start < previous.end:
-            common_time = (
-                min(previous.end, brother.end) - brother.start
-            ).total_seconds() * 1000
-            duplicated_duration.append(common_time)
+    common_times, total_periods = intervals.overlaps(periods.starts, periods.ends)
 
-            total_period = (previous.end - previous.start).total_seconds() * 1000
+    # milliseconds, rounded as timedelta.total_seconds() * 1000
+    duplicated_duration = common_times / 1e6 * 1000
 
-            common_percentage = common_time / total_period * 100
-            duplicated_percentage.append(common_percentage)
-        else:
-            duplicated_duration.append(0)
-            duplicated_percentage.append(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        duplicated_percentage = np.where(
+            common_times > 0,
+            duplicated_duration / (total_periods / 1e6 * 1000) * 100,
+            0.0,
+        )
 
+    # python sums give the same averages as the former loop
     duplicated_indicator = {
-        "min_percentage": float(min(duplicated_percentage)),
+        "min_percentage": float(duplicated_percentage.min()),
         "avg_percentage": float(
-            sum(duplicated_percentage) / len(duplicated_percentage)
+            sum(duplicated_percentage.tolist()) / len(duplicated_percentage)
+        ),
+        "max_percentage": float(duplicated_percentage.max()),
+        "min_duration": int(duplicated_duration.min()),
+        "avg_duration": int(
+            sum(duplicated_duration.tolist()) / len(duplicated_duration)
         ),
-        "max_percentage": float(max(duplicated_percentage)),
-        "min_duration": int(min(duplicated_duration)),
-        "avg_duration": int(sum(duplicated_duration) / len(duplicated_duration)),
-        "max_duration": int(max(duplicated_duration)),
+        "max_duration": int(duplicated_duration.max()),
     }
 
     return duplicated_indicator
@@ -1,6 +1,9 @@
 """ Custom CDS model definition """
 
 import logging
+from typing import List, Tuple
+
+from opensearchpy import Search
 
 from maas_cds.model.datatake import CdsDatatake
 from maas_cds.model.publication import CdsPublication
@@ -15,34 +18,44 @@ LOGGER = logging.getLogger("CdsModelCompleteness")
 
 class CdsCompleteness(generated.CdsCompleteness, CdsDatatake):
 
-    def find_brother_products_scan(self, product_type):
-        """Find products with the same datatake and the same product_type
-
-        Note: Seek only product with a prip_id
+    def get_brother_products_search(self, product_types: List[str]) -> Search:
+        """Build the search of the publications with the same datatake, the same
+        service and one of the product types
 
         Args:
-            product_type (str): product_type searched
+            product_types (List[str]): product_types searched
 
         Returns:
-            list(CdsPublication): list of products matching datatake_id and product_type
+            Search: the search request
         """
-        # TODO MAAS_CDS-1236: make a single query to find all the whole brotherhood
-        # with list of datatake / product types later post-processed to be grouped by
-        # tuple (datatake_id, product_type) in a dict
-
-        search_request = (
+        return (
             CdsPublication.search()
             .filter("term", datatake_id=self.datatake_id)
             .filter("term", satellite_unit=self.satellite_unit)
-            .filter("term", product_type=product_type)
+            .filter("terms", product_type=product_types)
             .filter("term", service_id=self.prip_name)
             .filter("term", service_type="PRIP")
-            .params(ignore=404)
         )
 
-        query_scan = search_request.scan()
+    def get_brotherhood_key(self) -> Tuple:
+        """Key shared by the completeness and its brother publications
+
+        Returns:
+            Tuple: (satellite_unit, datatake_id, prip_name)
+        """
+        return (self.satellite_unit, self.datatake_id, self.prip_name)
 
-        return query_scan
+    @classmethod
+    def get_product_brotherhood_key(cls, product: CdsPublication) -> Tuple:
+        """Key of the completeness a brother publication belongs to
+
+        Args:
+            product (CdsPublication): brother publication
+
+        Returns:
+            Tuple: (satellite_unit, datatake_id, prip_name)
+        """
+        return (product.satellite_unit, product.datatake_id, product.service_id)
 
     def retrieve_additional_fields_from_publication(self, product: CdsPublication):
         """Abstract function which allow to fill additional
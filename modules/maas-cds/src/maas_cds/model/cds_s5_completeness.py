@@ -4,6 +4,9 @@ import logging
 
 
 from opensearchpy import Keyword
+
+from maas_engine.engine.cache import cached_reference
+
 from maas_cds.model import generated
 from maas_cds.model.product_s5 import CdsProductS5
 from maas_cds.model.enumeration import CompletenessStatus
@@ -405,8 +408,6 @@ class CdsS5Completeness(AnomalyMixin, generated.CdsS5Completeness):
 
     COMPLETENESS_TOLERANCE = {}
 
-    _S5_PRODUCTS_TYPES = None
-
     cams_tickets = Keyword(multi=True)
     cams_origin = Keyword(multi=True)
     cams_descriptions = Keyword(multi=True)
@@ -416,11 +417,9 @@ class CdsS5Completeness(AnomalyMixin, generated.CdsS5Completeness):
         """property to get a cache
 
         Returns:
-            dict: cached product_types with dataflow overload or load it for the first time
+            dict: cached product_types with dataflow overload, reloaded when expired
         """
-        if cls._S5_PRODUCTS_TYPES is None:
-            cls._S5_PRODUCTS_TYPES = cls.load_level_product_types()
-        return cls._S5_PRODUCTS_TYPES
+        return cls.load_level_product_types()
 
     @classmethod
     def included_types_for_completeness(cls):
@@ -436,6 +435,10 @@ class CdsS5Completeness(AnomalyMixin, generated.CdsS5Completeness):
         }
 
     @classmethod
+    @cached_reference(
+        "cds-s5-product-types",
+        invalidation_routing_keys=("update.cds-dataflow*",),
+    )
     def load_level_product_types(cls):
         """Overide default product_level with dataflow product_level
 
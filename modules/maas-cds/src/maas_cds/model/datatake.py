@@ -1,14 +1,16 @@
 """ Custom CDS model definition """
 
 import logging
-from typing import List
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
 from functools import cached_property
 
-from opensearchpy import Keyword, Q
+from opensearchpy import Keyword, Q, Search
 from maas_cds.lib import tolerance
 from maas_cds.lib.dateutils import get_microseconds_delta
 from maas_cds.lib.periodutils import (
     Period,
+    as_period_array,
     compute_duplicated_indicator,
     compute_missing_sensing_periods,
 )
@@ -46,6 +48,12 @@ class CdsDatatake(AnomalyMixin, generated.CdsDatatake):
 
     MISSING_PERIODS_MAXIMAL_OFFSET = None
 
+    # maximum number of datatakes in a single brotherhood query
+    BROTHERHOOD_CHUNK_SIZE = 100
+
+    # brother products loaded by load_brother_products(), by product type
+    _brother_products: Dict[str, list] | None = None
+
     cams_tickets = Keyword(multi=True)
 
     datastrip_ids = Keyword(multi=True)
@@ -130,8 +138,24 @@ class CdsDatatake(AnomalyMixin, generated.CdsDatatake):
                 product_type_value,
             )
 
-            self.compute_missing_production(product_type, related_products)
-            self.compute_duplicated(product_type, related_products)
+            self.compute_sensing_indicators(product_type, related_products)
+
+    def compute_sensing_indicators(
+        self, product_type: str, related_products: List[Period]
+    ):
+        """Find and store missing periods and duplicated indicator on this datatake
+
+        Args:
+            product_type (str): The current product type
+            related_products (List[Period]): The list of products for
+                this datatake/product-type
+        """
+        if self.product_type_with_duplicated(product_type):
+            # converted once for the vectorized duplicated and missing periods
+            related_products = as_period_array(related_products)
+
+        self.compute_missing_production(product_type, related_products)
+        self.compute_duplicated(product_type, related_products)
 
     def compute_missing_production(
         self, product_type: str, related_products: List[Period]
@@ -446,21 +470,18 @@ class CdsDatatake(AnomalyMixin, generated.CdsDatatake):
             Q: ES query
         """
 
-    def find_brother_products_scan(self, product_type):
-        """Find products with the same datatake and the same product_type
+    def get_brother_products_search(self, product_types: List[str]) -> Search:
+        """Build the search of the products with the same datatake and one of the
+        product types
 
         Note: Seek only product with a prip_id
 
         Args:
-            product_type (str): product_type searched
+            product_types (List[str]): product_types searched
 
         Returns:
-            list(CdsProduct): list of products matching datatake_id and product_type
+            Search: the search request
         """
-        # TODO MAAS_CDS-1236: make a single query to find all the whole brotherhood
-        # with list of datatake / product types later post-processed to be grouped by
-        # tuple (datatake_id, product_type) in a dict
-
         completeness_service = self.get_service_for_completeness()
 
         if not completeness_service:
@@ -468,23 +489,149 @@ class CdsDatatake(AnomalyMixin, generated.CdsDatatake):
                 "Try to compute completess but no service identified : %s %s %s",
                 self.satellite_unit,
                 self.datatake_id,
-                product_type,
+                product_types,
             )
             completeness_service = ["NO_SERVICE_FOR_THIS"]
 
-        search_request = (
+        return (
             CdsProduct.search()
             .filter("term", datatake_id=self.datatake_id)
             .filter("term", satellite_unit=self.satellite_unit)
-            .filter("term", product_type=product_type)
-            .filter("terms", prip_service=self.get_service_for_completeness())
+            .filter("terms", product_type=product_types)
+            .filter("terms", prip_service=completeness_service)
             .filter("exists", field="prip_id")
-            .params(ignore=404)
         )
 
-        query_scan = search_request.scan()
+    def get_brotherhood_product_types(self, product_types: Iterable[str]) -> List[str]:
+        """Product types to load with the brotherhood of some product types, to
+        include the product types read by the computation of the expected values
+
+        Args:
+            product_types (Iterable[str]): product types to compute
+
+        Returns:
+            List[str]: product types to load
+        """
+        return list(product_types)
+
+    def get_brotherhood_key(self) -> Tuple:
+        """Key shared by the datatake and its brother products
+
+        Returns:
+            Tuple: (satellite_unit, datatake_id)
+        """
+        return (self.satellite_unit, self.datatake_id)
+
+    @classmethod
+    def get_product_brotherhood_key(cls, product: CdsProduct) -> Tuple:
+        """Key of the datatake a brother product belongs to
+
+        Args:
+            product (CdsProduct): brother product
+
+        Returns:
+            Tuple: (satellite_unit, datatake_id)
+        """
+        return (product.satellite_unit, product.datatake_id)
+
+    @staticmethod
+    def load_brother_products(
+        datatake_product_types: Iterable[Tuple["CdsDatatake", Iterable[str]]],
+    ) -> None:
+        """Load the brother products of several datatakes and product types with a
+        single scan by datatake class, instead of one scan by datatake and product
+        type. The products are grouped in memory and later returned by
+        find_brother_products_scan()
+
+        Args:
+            datatake_product_types (Iterable[Tuple[CdsDatatake, Iterable[str]]]):
+                datatakes with the product types to load
+        """
+        requests_by_class = defaultdict(list)
+
+        for datatake, product_types in datatake_product_types:
+            product_types = list(dict.fromkeys(product_types))
+
+            if product_types:
+                requests_by_class[type(datatake)].append((datatake, product_types))
+
+        for datatake_class, requests in requests_by_class.items():
+            for offset in range(
+                0, len(requests), datatake_class.BROTHERHOOD_CHUNK_SIZE
+            ):
+                datatake_class._load_brother_products_chunk(
+                    requests[offset : offset + datatake_class.BROTHERHOOD_CHUNK_SIZE]
+                )
+
+    @classmethod
+    def _load_brother_products_chunk(
+        cls, requests: List[Tuple["CdsDatatake", List[str]]]
+    ) -> None:
+        """Load the brother products of datatakes of this class in a single scan
+
+        Args:
+            requests (List[Tuple[CdsDatatake, List[str]]]): datatakes with the
+                product types to load
+        """
+        datatakes_by_key = defaultdict(list)
+
+        searches = []
+
+        for datatake, product_types in requests:
+            datatake._brother_products = {
+                product_type: [] for product_type in product_types
+            }
+
+            datatakes_by_key[datatake.get_brotherhood_key()].append(datatake)
+
+            searches.append(datatake.get_brother_products_search(product_types))
+
+        should = [search.to_dict()["query"] for search in searches]
+
+        # keep the index and the document class of the searches, with the union of
+        # their queries
+        search_request = searches[0]
+        search_request.query = Q("bool", should=should, minimum_should_match=1)
+
+        product_count = 0
+
+        for product in search_request.params(ignore=404).scan():
+            product_count += 1
+
+            for datatake in datatakes_by_key.get(
+                cls.get_product_brotherhood_key(product), []
+            ):
+                brothers = datatake._brother_products.get(product.product_type)
+
+                if brothers is not None:
+                    brothers.append(product)
+
+        LOGGER.debug(
+            "Loaded %s brother products for %s datatakes",
+            product_count,
+            len(requests),
+        )
+
+    def find_brother_products_scan(self, product_type):
+        """Find products with the same datatake and the same product_type
+
+        Note: Seek only product with a prip_id
+
+        Args:
+            product_type (str): product_type searched
 
-        return query_scan
+        Returns:
+            list(CdsProduct): list of products matching datatake_id and product_type
+        """
+        if (
+            self._brother_products is not None
+            and product_type in self._brother_products
+        ):
+            return self._brother_products[product_type]
+
+        return (
+            self.get_brother_products_search([product_type]).params(ignore=404).scan()
+        )
 
     def retrieve_additional_fields_from_product(self, product: CdsProduct):
         """Abstract function which allow to fill additional
@@ -267,6 +267,17 @@ class CdsDatatakeS2(CdsDatatake):
                     )
                     yield product
 
+    def get_brotherhood_product_types(self, product_types):
+        """Override to also load the reference products of the expected tiles
+
+        Args:
+            product_types (Iterable[str]): product types to compute
+
+        Returns:
+            List[str]: product types to load
+        """
+        return [*product_types, self.REFERENCE_PRODUCT_TYPE_SENSING]
+
     def search_expected_tiles(self) -> set[str]:
         """Look for expected tiles for this datatake
 
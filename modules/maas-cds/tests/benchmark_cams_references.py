@@ -0,0 +1,73 @@
+"""Benchmark of the resolution of the cams tickets referencing datatakes
+
+Run with: python tests/benchmark_cams_references.py [ticket count] [datatake count]
+"""
+
+import random
+import sys
+import timeit
+from types import SimpleNamespace
+
+from maas_cds.engines.compute.compute_cams_references import CamsTicketReferences
+
+
+def make_tickets(count, datatake_keys):
+    """tickets mentioning a few datatakes each in their environment"""
+    generator = random.Random(0)
+
+    return [
+        SimpleNamespace(
+            key=f"CAMS-{index}",
+            environment="; ".join(generator.sample(datatake_keys, 3)),
+        )
+        for index in range(count)
+    ]
+
+
+def legacy_resolve(tickets, datatake_keys):
+    """substring test of every datatake against every ticket"""
+    return {
+        datatake_key: [
+            ticket.key for ticket in tickets if datatake_key in ticket.environment
+        ]
+        for datatake_key in datatake_keys
+    }
+
+
+def resolve(tickets, datatake_keys):
+    references = CamsTicketReferences(tickets)
+
+    return {
+        datatake_key: references.get(datatake_key) for datatake_key in datatake_keys
+    }
+
+
+def main(ticket_count=5000, datatake_count=1000, repeat=3):
+    datatake_keys = [
+        f"S1A-{index:06}" for index in range(100000, 100000 + datatake_count)
+    ]
+
+    tickets = make_tickets(ticket_count, datatake_keys)
+
+    assert legacy_resolve(tickets, datatake_keys) == resolve(tickets, datatake_keys)
+
+    def measure(function):
+        return (
+            min(
+                timeit.repeat(
+                    lambda: function(tickets, datatake_keys), number=1, repeat=repeat
+                )
+            )
+            * 1000
+        )
+
+    print("| Tickets | datatakes | substring scan (ms) | inverted index (ms) |")
+    print("| --: | --: | --: | --: |")
+    print(
+        f"| {ticket_count} | {datatake_count} "
+        f"| {measure(legacy_resolve):.2f} | {measure(resolve):.2f} |"
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,107 @@
+""" Benchmark of the period functions on a synthetic datatake
+
+Run with: python tests/benchmark_periodutils.py [product count]
+"""
+
+import datetime
+import sys
+import timeit
+
+from test_intervals import (
+    legacy_duplicated_indicator,
+    legacy_missing_sensing_periods,
+    legacy_reduce_periods,
+    legacy_total_sensing_product,
+    make_datatake_periods,
+)
+
+from maas_cds.lib.periodutils import (
+    Period,
+    as_period_array,
+    compute_duplicated_indicator,
+    compute_missing_sensing_periods,
+    compute_total_sensing_product,
+    reduce_periods,
+)
+
+
+def compute_sensing_indicators(range_to_evaluate, periods):
+    """missing periods and duplicated indicator as computed for a datatake"""
+    return (
+        compute_missing_sensing_periods(range_to_evaluate, periods, 1_000_000, 500_000),
+        compute_duplicated_indicator(periods),
+    )
+
+
+def legacy_sensing_indicators(range_to_evaluate, periods):
+    return (
+        legacy_missing_sensing_periods(range_to_evaluate, periods, 1_000_000, 500_000),
+        legacy_duplicated_indicator(periods),
+    )
+
+
+def main(count=10000, repeat=5):
+    periods = make_datatake_periods(count)
+
+    range_to_evaluate = Period(periods[0].start, max(period.end for period in periods))
+
+    period_array = as_period_array(periods)
+
+    def measure(function, *args):
+        return (
+            min(timeit.repeat(lambda: function(*args), number=1, repeat=repeat)) * 1000
+        )
+
+    cases = [
+        (
+            "total sensing",
+            legacy_total_sensing_product,
+            compute_total_sensing_product,
+        ),
+        (
+            "missing periods",
+            lambda periods: legacy_missing_sensing_periods(
+                range_to_evaluate, periods, 1_000_000, 500_000
+            ),
+            lambda periods: compute_missing_sensing_periods(
+                range_to_evaluate, periods, 1_000_000, 500_000
+            ),
+        ),
+        (
+            "duplicated",
+            legacy_duplicated_indicator,
+            compute_duplicated_indicator,
+        ),
+        (
+            "missing + duplicated",
+            lambda periods: legacy_sensing_indicators(range_to_evaluate, periods),
+            lambda periods: compute_sensing_indicators(
+                range_to_evaluate, as_period_array(periods)
+            ),
+        ),
+        (
+            "reduce",
+            lambda periods: legacy_reduce_periods(
+                periods, datetime.timedelta(seconds=15)
+            ),
+            lambda periods: reduce_periods(periods, datetime.timedelta(seconds=15)),
+        ),
+    ]
+
+    print(
+        f"Conversion of {count} products to a PeriodArray: "
+        f"{measure(as_period_array, periods):.2f} ms\n"
+    )
+    print("| Function | former loop (ms) | list (ms) | PeriodArray (ms) |")
+    print("| :-- | --: | --: | --: |")
+
+    for name, legacy, current in cases:
+        print(
+            f"| {name} | {measure(legacy, periods):.2f} "
+            f"| {measure(current, periods):.2f} "
+            f"| {measure(current, period_array):.2f} |"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -8,6 +8,9 @@
 """
 
 import pytest
+
+from maas_engine.engine.cache import clear_caches
+
 from data.s5_data_test import *
 from data.s1_data_test import *
 from data.s2_data_test import *
@@ -15,3 +18,11 @@ from data.s3_data_test import *
 from data.dataflow_stub import *
 from data.metrics_product_test import *
 from data.dd_attrs import *
+
+
+@pytest.fixture(autouse=True)
+def clear_reference_caches():
+    # reference caches live in the process: don't leak documents between tests
+    clear_caches()
+    yield
+    clear_caches()
@@ -0,0 +1,57 @@
+from unittest.mock import patch
+
+from opensearchpy import Search
+
+from maas_cds.model import CdsProduct
+from maas_cds.model.datatake import CdsDatatake
+from maas_cds.model.datatake_s1 import CdsDatatakeS1
+
+
+def make_product(satellite_unit, datatake_id, product_type):
+    return CdsProduct(
+        satellite_unit=satellite_unit,
+        datatake_id=datatake_id,
+        product_type=product_type,
+        prip_id="prip",
+    )
+
+
+def test_load_brother_products_single_scan():
+    datatake_1 = CdsDatatakeS1(satellite_unit="S1A", datatake_id="421247")
+    datatake_2 = CdsDatatakeS1(satellite_unit="S1A", datatake_id="421250")
+
+    products = [
+        make_product("S1A", "421247", "WV_RAW__0S"),
+        make_product("S1A", "421250", "EW_RAW__0S"),
+        make_product("S1A", "421250", "EW_SLC__1S"),
+        make_product("S1A", "421250", "EW_SLC__1S"),
+    ]
+
+    queries = []
+
+    def scan(search):
+        queries.append(search.to_dict()["query"])
+        return iter(products)
+
+    with patch.object(Search, "scan", autospec=True, side_effect=scan):
+        CdsDatatake.load_brother_products(
+            [
+                (datatake_1, ["WV_RAW__0S"]),
+                (datatake_2, ["EW_RAW__0S", "EW_SLC__1S", "EW_OCN__2S"]),
+            ]
+        )
+
+        assert len(queries) == 1
+        assert len(queries[0]["bool"]["should"]) == 2
+
+        assert len(datatake_1.find_brother_products_scan("WV_RAW__0S")) == 1
+        assert len(datatake_2.find_brother_products_scan("EW_RAW__0S")) == 1
+        assert len(datatake_2.find_brother_products_scan("EW_SLC__1S")) == 2
+        assert datatake_2.find_brother_products_scan("EW_OCN__2S") == []
+
+        # product types not loaded fall back to a dedicated scan
+        datatake_1.find_brother_products_scan("WV_SLC__1S")
+        assert len(queries) == 2
+
+    # loaded products are not serialized with the datatake
+    assert "_brother_products" not in datatake_1.to_dict()
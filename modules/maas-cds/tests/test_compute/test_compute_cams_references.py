@@ -0,0 +1,109 @@
+"""Cams references of datatakes and completeness"""
+import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from maas_engine.engine.cache import clear_caches
+
+from maas_cds import model
+from maas_cds.engines.compute.compute_cams_references import (
+    CamsTicketReferences,
+    ComputeCamsReferencesEngine,
+)
+
+START = datetime.datetime(2024, 1, 1)
+
+TICKETS = [
+    SimpleNamespace(key="CAMS-1", environment="S1A-123456; S2B-12345-1"),
+    SimpleNamespace(key="CAMS-2", environment="S1A-123456,S3A-123-456"),
+    SimpleNamespace(key="CAMS-3", environment="S1A-1234567 S5P-12345"),
+]
+
+
+class StandInSearch:
+    """search chain scanning the tickets"""
+
+    count = 0
+
+    def __init__(self):
+        StandInSearch.count += 1
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    def source(self, *args, **kwargs):
+        return self
+
+    def scan(self):
+        return iter(TICKETS)
+
+
+@pytest.fixture(autouse=True)
+def ticket_search():
+    clear_caches()
+
+    StandInSearch.count = 0
+
+    with patch.object(model.CamsTickets, "search", StandInSearch):
+        yield
+
+    clear_caches()
+
+
+def test_tokenize_environment():
+    assert CamsTicketReferences.tokenize("S2B-12345-1; S1A-123456, other") == [
+        "S2B-12345",
+        "S2B-12345-1",
+        "S1A-123456",
+    ]
+    assert not CamsTicketReferences.tokenize(None)
+
+
+def test_ticket_references():
+    references = CamsTicketReferences(TICKETS)
+
+    assert references.get("S1A-123456") == ["CAMS-1", "CAMS-2"]
+    assert references.get("S2B-12345") == ["CAMS-1"]
+    assert references.get("S3A-123-456") == ["CAMS-2"]
+    assert references.get("S1A-999999") == []
+
+    # no substring match of a longer key
+    assert "CAMS-3" not in references.get("S1A-123456")
+
+
+def test_update_datatakes_and_completeness():
+    engine = ComputeCamsReferencesEngine(base_url="https://cams/")
+
+    datatake = model.CdsDatatakeS1(
+        key="S1A-123456",
+        cams_tickets=["CAMS-9"],
+        observation_time_start=START,
+    )
+    datatake.meta.id = datatake.key
+
+    other = model.CdsDatatakeS1(key="S1A-000001", observation_time_start=START)
+    other.meta.id = other.key
+
+    completeness = model.CdsS5Completeness(
+        datatake_id="S5P-12345", observation_time_start=START
+    )
+    completeness.meta.id = completeness.datatake_id
+
+    engine.input_documents = [datatake, other, completeness]
+    engine.payload = SimpleNamespace(document_class="CdsDatatakeS1")
+
+    actions = list(engine.action_iterator())
+
+    assert len(actions) == 3
+
+    assert actions[0]["_source"]["cams_tickets"] == ["CAMS-1", "CAMS-2"]
+    assert actions[0]["_source"]["last_attached_ticket_url"] == "https://cams/CAMS-2"
+    assert not actions[1]["_source"].get("cams_tickets")
+    assert actions[2]["_source"]["cams_tickets"] == ["CAMS-3"]
+
+    # tickets are loaded once for all the documents and following messages
+    list(engine.action_iterator())
+
+    assert StandInSearch.count == 1
@@ -0,0 +1,172 @@
+"""Propagation of datatake attributes to the related products"""
+
+import datetime
+from unittest.mock import patch
+
+import pytest
+from opensearchpy import Q
+
+import maas_cds.model
+from maas_cds.engines.compute.compute_datatake_related import (
+    ComputeDatatakeRelatedEngine,
+)
+
+
+class StandInSearch:
+    """search chain scanning the related products"""
+
+    hits = []
+
+    def query(self, *args, **kwargs):
+        return self
+
+    def params(self, *args, **kwargs):
+        return self
+
+    def scan(self):
+        return (maas_cds.model.CdsProduct.from_opensearch(hit) for hit in self.hits)
+
+
+def product_hit(index, datatake_id):
+    return {
+        "_id": f"product-{index}",
+        "_index": "cds-product-2024-01",
+        "_seq_no": index,
+        "_primary_term": 1,
+        "_source": {
+            "name": f"S1A_IW_RAW__0SDV_{index}",
+            "mission": "S1",
+            "satellite_unit": "S1A",
+            "product_type": "IW_RAW__0S",
+            "sensing_start_date": "2024-01-01T00:00:00.000Z",
+            "sensing_end_date": "2024-01-01T00:01:00.000Z",
+            "publication_date": "2024-01-01T01:00:00.000Z",
+            "timeliness": "NRT",
+            "absolute_orbit": "51234",
+            "instrument_mode": "IW",
+            "datatake_id": datatake_id,
+            "hex_datatake_id": hex(int(datatake_id)).replace("0x", "").upper(),
+            "prip_id": f"prip-{index}",
+            "prip_publication_date": "2024-01-01T01:00:00.000Z",
+        },
+    }
+
+
+@pytest.fixture
+def datatake():
+    return maas_cds.model.CdsDatatakeS1(
+        key="S1A-123456",
+        datatake_id="123456",
+        mission="S1",
+        satellite_unit="S1A",
+        timeliness="NRT",
+        absolute_orbit="51234",
+        instrument_mode="EW",
+        observation_time_start=datetime.datetime(2024, 1, 1),
+    )
+
+
+@pytest.mark.parametrize("partial_update", [False, True])
+def test_propagate_datatake(datatake, partial_update):
+    # the first product is already up to date
+    StandInSearch.hits = [product_hit(0, "123456"), product_hit(1, "1")]
+
+    ComputeDatatakeRelatedEngine.MODEL_MODULE = maas_cds.model
+
+    engine = ComputeDatatakeRelatedEngine(
+        target_model="CdsProduct", partial_update=partial_update
+    )
+
+    engine.input_documents = [datatake]
+
+    with patch.object(maas_cds.model.CdsProduct, "search", StandInSearch):
+        actions = list(engine.action_iterator())
+
+    assert [action["_id"] for action in actions] == [
+        "product-0",
+        "product-1",
+    ]
+
+    if not partial_update:
+        assert actions[1]["_source"]["datatake_id"] == "123456"
+        return
+
+    # only the changed fields are sent, on the read version of the products
+    for action in actions:
+        assert action["doc"].pop("updateTime")
+
+    assert actions[0]["doc"] == {"instrument_mode": "EW"}
+
+    assert actions[1] == {
+        "_op_type": "update",
+        "_index": "cds-product-2024-01",
+        "_id": "product-1",
+        "doc": {
+            "instrument_mode": "EW",
+            "datatake_id": "123456",
+            "hex_datatake_id": "1E240",
+        },
+        "if_seq_no": 1,
+        "if_primary_term": 1,
+    }
+
+
+def test_propagate_datatake_by_query(datatake):
+    ComputeDatatakeRelatedEngine.MODEL_MODULE = maas_cds.model
+
+    engine = ComputeDatatakeRelatedEngine(target_model="CdsProduct")
+
+    engine.update_by_query_options = {"requests_per_second": 500}
+
+    engine.input_documents = [datatake]
+
+    # related documents are not loaded
+    assert not list(engine.action_iterator())
+
+    propagation, hex_propagation = engine.update_by_query_iterator()
+
+    assert propagation.document_class is maas_cds.model.CdsProduct
+    assert propagation.query == Q("term", datatake_id="123456")
+    assert propagation.fields == {
+        "absolute_orbit": "51234",
+        "instrument_mode": "EW",
+        "datatake_id": "123456",
+        "timeliness": "NRT",
+    }
+    assert not propagation.report
+
+    assert hex_propagation.query == Q(
+        "bool", filter=[Q("term", datatake_id="123456"), Q("term", mission="S1")]
+    )
+    assert hex_propagation.fields == {"hex_datatake_id": "1E240"}
+
+
+@pytest.mark.parametrize("mode", ["bulk", "partial_update", "update_by_query"])
+def test_propagate_datatake_missing_values(datatake, mode):
+    # the product is up to date, except the values missing from the datatake
+    StandInSearch.hits = [product_hit(0, "123456")]
+
+    datatake.absolute_orbit = None
+
+    datatake.instrument_mode = None
+
+    ComputeDatatakeRelatedEngine.MODEL_MODULE = maas_cds.model
+
+    engine = ComputeDatatakeRelatedEngine(
+        target_model="CdsProduct", partial_update=mode == "partial_update"
+    )
+
+    if mode == "update_by_query":
+        engine.update_by_query_options = {}
+
+    engine.input_documents = [datatake]
+
+    with patch.object(maas_cds.model.CdsProduct, "search", StandInSearch):
+        # the product values are kept
+        assert not list(engine.action_iterator())
+
+    if mode == "update_by_query":
+        propagation, _ = engine.update_by_query_iterator()
+
+        # null parameters would remove the fields from the related documents
+        assert propagation.fields == {"datatake_id": "123456", "timeliness": "NRT"}
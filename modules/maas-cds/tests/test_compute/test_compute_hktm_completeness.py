@@ -155,3 +155,31 @@ def test_search_hktm_factory(target_model, search_method_str):
     search_method = engine.search_hktm_factory()
 
     assert search_method.__name__ == search_method_str
+
+
+def test_update_hktm_acquisition_by_query():
+    engine = ComputeHktmRelatedEngine(target_model="CdsHktmAcquisitionCompleteness")
+    engine.input_model = model.CdsCadipAcquisitionPassStatus
+    engine.update_by_query_options = {}
+
+    engine.input_documents = [
+        model.CdsCadipAcquisitionPassStatus(session_id="session-1", global_status="OK"),
+        model.CdsCadipAcquisitionPassStatus(session_id="session-2", global_status="KO"),
+        model.CdsCadipAcquisitionPassStatus(session_id="session-3", global_status="OK"),
+    ]
+
+    assert not list(engine.action_iterator())
+
+    (request,) = engine.update_by_query_iterator()
+
+    assert request.document_class is model.CdsHktmAcquisitionCompleteness
+    assert request.fields == {"cadip_completeness": 1}
+    assert request.query.to_dict() == {
+        "bool": {
+            "should": [
+                {"bool": {"filter": [{"term": {"session_id": "session-1"}}]}},
+                {"bool": {"filter": [{"term": {"session_id": "session-3"}}]}},
+            ],
+            "minimum_should_match": 1,
+        }
+    }
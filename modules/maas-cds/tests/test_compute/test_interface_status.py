@@ -1,10 +1,17 @@
 from unittest.mock import patch
+import pytest
 from pytest import fixture
+from opensearchpy.exceptions import ConflictError
 
-from maas_cds.engines.reports.interface_status import InterfaceStatusConsolidatorEngine
+from maas_engine.engine.cache import ReferenceCache
+
+from maas_cds.engines.reports.interface_status import (
+    InterfaceStatusConsolidatorEngine,
+    InterfaceStatusTimeline,
+)
 from maas_cds.model.generated import InterfaceProbe
 from maas_cds.model import CdsInterfaceStatus
-from opensearchpy import Search
+from maas_model import datestr_to_utc_datetime, datetime_to_zulu
 import datetime
 import hashlib
 
@@ -48,112 +55,218 @@ def next_probe():
     }
 
 
-class CustomSearch:
-    """Small dataclaas used to mock opensearch functions"""
-
-    def __init__(self, execute_return_values=[]):
-        self.execute_return_values = execute_return_values
-        self.executer_counter = 0
-
-    # pylint: disable=W0613
-    def filter(self, *args, **kwargs) -> Search:
-        "Mock search filter function"
-        return self
-
-    # pylint: disable=W0613
-    def query(self, *args, **kwargs) -> Search:
-        "Mock search query function"
-        return self
-
-    # pylint: disable=W0613
-    def scan(self, *args, **kwargs) -> Search:
-        "Mock search scan function"
-        return self
-
-    # pylint: disable=W0613
-    def execute(self, *args, **kwargs) -> Search:
-        "Mock search execute function"
-
-        retval = self.execute_return_values[self.executer_counter]
-        self.executer_counter += 1
-        return retval
+class StandInOpenSearch:
+    """Local stand-in of opensearch answering the status multi searches"""
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+
+        self.msearch_bodies = []
+
+    @staticmethod
+    def value(value):
+        if isinstance(value, str) and value.endswith("Z"):
+            return datestr_to_utc_datetime(value)
+        return value
+
+    def matches(self, status, clause):
+        (kind, condition), *_ = clause.items()
+
+        (field, expected), *_ = condition.items()
+
+        value = self.value(status[field])
+
+        if kind == "term":
+            return value == expected
+
+        return all(
+            {"lte": value <= bound, "gt": value > bound}[operator]
+            for operator, bound in expected.items()
+        )
+
+    def evaluate(self, body):
+        hits = [
+            status
+            for status in self.statuses
+            if all(
+                self.matches(status, clause)
+                for clause in body["query"]["bool"]["filter"]
+            )
+        ]
+
+        for sort in body["sort"]:
+            (field, order), *_ = sort.items()
+
+            hits.sort(
+                key=lambda status: self.value(status[field]),
+                reverse=order["order"] == "desc",
+            )
+
+        return {
+            "hits": {
+                "total": {"value": len(hits), "relation": "eq"},
+                "hits": [
+                    {
+                        "_index": "cds-interface-status-2022",
+                        "_id": f"status-{self.statuses.index(status)}",
+                        "_seq_no": self.statuses.index(status),
+                        "_primary_term": 1,
+                        "_source": status,
+                    }
+                    for status in hits[: body["size"]]
+                ],
+            }
+        }
+
+    def msearch(self, body, index=None, **kwargs):
+        self.msearch_bodies.append(body)
+
+        return {"responses": [self.evaluate(search) for search in body[1::2]]}
+
+    def search(self, body=None, index=None, **kwargs):
+        """aggregation of the latest status of each interface"""
+        buckets = []
+
+        for interface_name in sorted(
+            {status["interface_name"] for status in self.statuses}
+        ):
+            latest = self.evaluate(
+                {
+                    "query": {
+                        "bool": {
+                            "filter": [{"term": {"interface_name": interface_name}}]
+                        }
+                    },
+                    "sort": [{"status_time_stop": {"order": "desc"}}],
+                    "size": 1,
+                }
+            )
+
+            buckets.append({"key": interface_name, "doc_count": 1, "latest": latest})
+
+        return {
+            "hits": {"total": {"value": 0, "relation": "eq"}, "hits": []},
+            "aggregations": {"interfaces": {"buckets": buckets}},
+        }
+
+
+def consolidate(statuses, probes, timeline=False):
+    opensearch = StandInOpenSearch(statuses)
 
-    # pylint: disable=W0613
-    def sort(self, *args, **kwargs) -> Search:
-        "Mock search sort function"
-        return self
+    interface_status_engine = InterfaceStatusConsolidatorEngine(
+        refresh_interval_seconds=300, timeline=timeline
+    )
+    interface_status_engine.input_documents = probes
 
-    # pylint: disable=W0613
-    def params(self, *args, **kwargs) -> Search:
-        "Mock search params function"
-        return self
+    with patch(
+        "opensearchpy.helpers.search.get_connection", return_value=opensearch
+    ), patch.object(
+        InterfaceStatusConsolidatorEngine,
+        "TIMELINE",
+        InterfaceStatusTimeline(ReferenceCache("test-timeline")),
+    ):
+        consolidated = interface_status_engine.get_consolidated_documents()
 
-    def __getitem__(self, item):
-        return self
+    return consolidated, opensearch.msearch_bodies
 
 
-@patch("maas_model.document.Document.search")
-def test_get_consolidated_documents(
-    mock_search, source_probe, previous_probe, next_probe
-):
+def test_get_consolidated_documents(source_probe, previous_probe, next_probe):
     input_doc = InterfaceProbe(**source_probe)
     input_doc.meta.id = "d38a3bd9b68d85e6d978ea01d815c010"
     input_doc.clean_fields()
 
-    cs = CustomSearch([previous_probe, next_probe])
-    mock_search.return_value = cs
-
-    refresh = 300
-
-    interface_status_engine = InterfaceStatusConsolidatorEngine(
-        refresh_interval_seconds=refresh
-    )
-    interface_status_engine.input_documents = [input_doc]
-
     # Case no previous, no next
-    cs.execute_return_values = [None, None]
-    assert interface_status_engine.get_consolidated_documents() == [(None, None)]
+    assert consolidate([], [input_doc])[0] == [(None, None)]
 
     # Case previous and next exist but out of refresh_delta
     input_doc.probe_time_start = "2022-02-01T00:00:00.000Z"
     input_doc.clean_fields()
 
-    prev_probe_out_of_bound = CdsInterfaceStatus(**previous_probe)
-    prev_probe_out_of_bound.status_time_stop = (
+    previous_status = previous_probe | {"status_time_start": "2022-01-01T00:00:00.000Z"}
+
+    next_status = next_probe | {"status_time_stop": "2022-09-01T08:00:00.000Z"}
+
+    previous_status["status_time_stop"] = datetime_to_zulu(
         input_doc.probe_time_start - datetime.timedelta(seconds=301)
     )
 
-    next_probe_out_of_bound = CdsInterfaceStatus(**next_probe)
-    next_probe_out_of_bound.status_time_start = (
+    next_status["status_time_start"] = datetime_to_zulu(
         input_doc.probe_time_stop + datetime.timedelta(seconds=301)
     )
 
-    cs.executer_counter = 0
-    cs.execute_return_values = [[prev_probe_out_of_bound], [next_probe_out_of_bound]]
-
-    assert interface_status_engine.get_consolidated_documents() == [(None, None)]
+    assert consolidate([previous_status, next_status], [input_doc])[0] == [(None, None)]
 
     # Case previous and next exist in refresh_delta range
-    input_doc.probe_time_start = "2022-02-01T00:00:00.000Z"
-    input_doc.clean_fields()
-
-    prev_probe_out_of_bound = CdsInterfaceStatus(**previous_probe)
-    prev_probe_out_of_bound.status_time_stop = (
+    previous_status["status_time_stop"] = datetime_to_zulu(
         input_doc.probe_time_start - datetime.timedelta(seconds=300)
     )
 
-    next_probe_out_of_bound = CdsInterfaceStatus(**next_probe)
-    next_probe_out_of_bound.status_time_start = (
+    next_status["status_time_start"] = datetime_to_zulu(
         input_doc.probe_time_stop + datetime.timedelta(seconds=300)
     )
 
-    cs.executer_counter = 0
-    cs.execute_return_values = [[prev_probe_out_of_bound], [next_probe_out_of_bound]]
+    ((previous_document, next_document),), _ = consolidate(
+        [previous_status, next_status], [input_doc]
+    )
+
+    assert previous_document.to_dict() == previous_status
+    assert next_document.to_dict() == next_status
 
-    assert interface_status_engine.get_consolidated_documents() == [
-        (prev_probe_out_of_bound, next_probe_out_of_bound)
+    # versions are kept for conflict detection
+    assert previous_document.meta.seq_no == 0
+    assert next_document.meta.primary_term == 1
+
+
+@pytest.mark.parametrize("timeline", [False, True])
+def test_get_consolidated_documents_batched(source_probe, previous_probe, timeline):
+    probes = []
+
+    for interface_name in ("Jira_CAMS", "LTA_Acri", "PRIP_S1A"):
+        probe = InterfaceProbe(**(source_probe | {"interface_name": interface_name}))
+        probe.clean_fields()
+        probes.append(probe)
+
+    statuses = [
+        previous_probe
+        | {
+            "interface_name": interface_name,
+            "status_time_start": "2022-09-01T07:00:00.000Z",
+            "status_time_stop": "2022-09-01T07:25:00.000Z",
+        }
+        for interface_name in ("LTA_Acri", "Jira_CAMS")
     ]
 
+    # an older status of the same interface is not the previous one
+    statuses.append(
+        statuses[0]
+        | {
+            "status_time_start": "2022-09-01T06:00:00.000Z",
+            "status_time_stop": "2022-09-01T07:00:00.000Z",
+        }
+    )
+
+    consolidated, msearch_bodies = consolidate(statuses, probes, timeline)
+
+    # a single request for the previous and next statuses of all the probes
+    assert len(msearch_bodies) == 1
+
+    if timeline:
+        # probes following the latest status of their interface are resolved from
+        # the timeline
+        assert len(msearch_bodies[0]) == 4
+        assert msearch_bodies[0][1]["query"]["bool"]["filter"][0] == {
+            "term": {"interface_name": "PRIP_S1A"}
+        }
+    else:
+        assert len(msearch_bodies[0]) == 4 * len(probes)
+
+    assert [
+        (previous and previous.interface_name, next_status)
+        for previous, next_status in consolidated
+    ] == [("Jira_CAMS", None), ("LTA_Acri", None), (None, None)]
+
+    assert consolidated[1][0].meta.id == "status-0"
+
 
 def test_probe_status_creation(source_probe):
     input_doc = InterfaceProbe(**source_probe)
@@ -441,3 +554,149 @@ def test_status_split_case_after(mock_save, source_probe):
     status = status.to_dict()
     assert status["status_time_start"] == "2022-02-01T00:00:00.000Z"
     assert status["status_time_stop"] == "2022-02-01T00:05:00.000Z"
+
+
+def test_interface_status_timeline(source_probe, previous_probe):
+    timeline = InterfaceStatusTimeline(ReferenceCache("test-timeline"))
+
+    status = previous_probe | {
+        "status_time_start": "2022-09-01T07:00:00.000Z",
+        "status_time_stop": "2022-09-01T07:25:00.000Z",
+    }
+
+    probes = []
+
+    for probe_time_start, probe_time_stop in (
+        ("2022-09-01T07:26:43.892Z", "2022-09-01T07:26:44.882Z"),
+        ("2022-09-01T07:31:43.892Z", "2022-09-01T07:31:44.882Z"),
+    ):
+        probe = InterfaceProbe(
+            **source_probe
+            | {"probe_time_start": probe_time_start, "probe_time_stop": probe_time_stop}
+        )
+        probe.clean_fields()
+        probes.append(probe)
+
+    opensearch = StandInOpenSearch([status])
+
+    for seq_no, probe in enumerate(probes, start=1):
+        interface_status_engine = InterfaceStatusConsolidatorEngine(
+            refresh_interval_seconds=300, timeline=True
+        )
+        interface_status_engine.input_documents = [probe]
+
+        with patch(
+            "opensearchpy.helpers.search.get_connection", return_value=opensearch
+        ), patch.object(InterfaceStatusConsolidatorEngine, "TIMELINE", timeline):
+            ((previous_document, next_document),) = (
+                interface_status_engine.get_consolidated_documents()
+            )
+
+            extended = interface_status_engine.consolidate_from_InterfaceProbe(
+                probe, (previous_document, next_document)
+            )
+
+            details = {
+                "_index": "cds-interface-status-2022",
+                "_id": "status-0",
+                "_seq_no": seq_no,
+                "_primary_term": 1,
+            }
+
+            interface_status_engine._index_id_document_map[
+                (details["_index"], details["_id"])
+            ] = extended
+
+            interface_status_engine.on_bulk_result(True, details)
+
+        assert next_document is None
+
+        # the previous status comes from the timeline with its stored version
+        assert previous_document.meta.seq_no == seq_no - 1
+
+        assert timeline.get("Jira_CAMS").status_time_stop == probe.probe_time_stop
+
+    # consecutive probes extend the status without any search
+    assert not opensearch.msearch_bodies
+
+    # a failed write is read again from the database
+    with patch.object(InterfaceStatusConsolidatorEngine, "TIMELINE", timeline):
+        interface_status_engine.on_bulk_result(False, details)
+
+    assert timeline.get("Jira_CAMS") is None
+
+
+@patch("maas_model.document.Document.save", autospec=True)
+def test_interface_status_timeline_conflict(mock_save, source_probe, previous_probe):
+    timeline = InterfaceStatusTimeline(ReferenceCache("test-timeline"))
+
+    previous_document = CdsInterfaceStatus(
+        **previous_probe | {"status_time_stop": "2022-09-01T07:25:00.000Z"}
+    )
+    previous_document.clean_fields()
+
+    timeline.update(
+        previous_document,
+        {
+            "_index": "cds-interface-status-2022",
+            "_id": "status-0",
+            "_seq_no": 0,
+            "_primary_term": 1,
+        },
+    )
+
+    probe = InterfaceProbe(**source_probe | {"status": "KO"})
+    probe.clean_fields()
+
+    mock_save.side_effect = ConflictError(409, "version_conflict_engine_exception", {})
+
+    interface_status_engine = InterfaceStatusConsolidatorEngine(timeline=True)
+
+    with patch.object(InterfaceStatusConsolidatorEngine, "TIMELINE", timeline):
+        with pytest.raises(ConflictError):
+            interface_status_engine.consolidate_from_InterfaceProbe(
+                probe, (timeline.get("Jira_CAMS"), None)
+            )
+
+    # the outdated status is searched again when the message is requeued
+    assert timeline.get("Jira_CAMS") is None
+
+
+def test_interface_status_without_timeline(source_probe, previous_probe):
+    timeline = InterfaceStatusTimeline(ReferenceCache("test-timeline"))
+
+    status = previous_probe | {
+        "status_time_start": "2022-09-01T07:00:00.000Z",
+        "status_time_stop": "2022-09-01T07:25:00.000Z",
+    }
+
+    probe = InterfaceProbe(**source_probe)
+    probe.clean_fields()
+
+    interface_status_engine = InterfaceStatusConsolidatorEngine()
+    interface_status_engine.input_documents = [probe]
+
+    opensearch = StandInOpenSearch([status])
+
+    with patch(
+        "opensearchpy.helpers.search.get_connection", return_value=opensearch
+    ), patch.object(InterfaceStatusConsolidatorEngine, "TIMELINE", timeline):
+        ((previous_document, _),) = interface_status_engine.get_consolidated_documents()
+
+        interface_status_engine._index_id_document_map[
+            ("cds-interface-status-2022", "status-0")
+        ] = previous_document
+
+        interface_status_engine.on_bulk_result(
+            True,
+            {
+                "_index": "cds-interface-status-2022",
+                "_id": "status-0",
+                "_seq_no": 1,
+                "_primary_term": 1,
+            },
+        )
+
+    # statuses written by other processes would not be seen: always search
+    assert len(opensearch.msearch_bodies) == 1
+    assert not timeline.cache.values()
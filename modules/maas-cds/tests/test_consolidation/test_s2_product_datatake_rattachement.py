@@ -1,6 +1,7 @@
 """Note: Data for this test is partially generated manually"""
 import pytest
 import datetime
+from unittest.mock import patch
 
 from maas_cds.engines.reports.base import BaseProductConsolidatorEngine
 from maas_cds.model import CdsDatatakeS2
@@ -295,3 +296,29 @@ def test_s2_product_rattachement_hardcore_2(s2_product_without_datatake):
     s2_product_without_datatake.fill_from_datatake(nearest_datatake)
 
     assert s2_product_without_datatake.datatake_id
+
+
+def test_s2_product_rattachement_cached_datatake(s2_product_without_datatake):
+    datatake_doc = CdsDatatakeS2(
+        **{
+            "datatake_id": "36678-7",
+            "satellite_unit": s2_product_without_datatake.satellite_unit,
+            "mission": "S2",
+            "observation_time_start": "2022-07-01T00:05:00.000Z",
+            "observation_time_stop": "2022-07-01T00:15:00.000Z",
+            "absolute_orbit": "36678",
+            "timeliness": "NOMINAL",
+        }
+    )
+    datatake_doc.full_clean()
+
+    engine = BaseProductConsolidatorEngine()
+    engine.DATATAKE_CACHE.put("S2A-36678-7", datatake_doc)
+
+    with patch.object(engine, "_get_datatake_S2_map") as datatake_map_mock:
+        datatake_dict = engine.get_datatake_dict_S2([s2_product_without_datatake])
+
+    datatake_map_mock.assert_not_called()
+    assert datatake_dict == {
+        s2_product_without_datatake.name_without_extension: datatake_doc
+    }
@@ -1,6 +1,7 @@
 """ Module to test GeoMaskUtils class"""
 
 from unittest.mock import patch
+import pytest
 import unittest
 from maas_cds import model
 from maas_cds.lib.geo_mask_utils import GeoMaskUtils
@@ -252,3 +253,49 @@ def test_date_masks_impact_bug():
         "OCN_coverage_percentage": 20.870232761754124,
         "EU_coverage_percentage": 0.0,
     }
+
+
+def test_area_coverages_batch():
+    inside = "Polygon((15 79, 15 80, 16 80, 16 79, 15 79))"
+    outside = "POLYGON((128.563 -8.7541,129.2694 -8.6452,128.854 -6.8028,128.1508 -6.9098,128.563 -8.7541))"
+    partial = "Polygon((-39.9765 80.9498,-17.6093 82.9458,-21.0764 83.8781,-44.8408 81.6605,-39.9765 80.9498))"
+
+    geo_mask_utils = GeoMaskUtils()
+
+    coverages = geo_mask_utils.area_coverages(
+        [inside, outside, partial, "Polygon((invalid"], "SLC"
+    )
+
+    assert coverages[:2] == [100, 0]
+    assert coverages[2] == geo_mask_utils.area_coverage(partial, "SLC")
+    assert coverages[3] == 0
+
+
+def test_partial_coverage_same_as_full_mask():
+    footprint = "Polygon((-39.9765 80.9498,-17.6093 82.9458,-21.0764 83.8781,-44.8408 81.6605,-39.9765 80.9498))"
+
+    geo_mask_utils = GeoMaskUtils()
+
+    product_shape = geo_mask_utils.load_area_shape_from_footprint(footprint)
+
+    # intersection with the whole mask, without tiles nor clipping
+    intersection = geo_mask_utils.get_mask("OCN").intersection(product_shape)
+
+    expected = (
+        abs(GeoMaskUtils.GEOD.geometry_area_perimeter(intersection)[0])
+        / abs(GeoMaskUtils.GEOD.geometry_area_perimeter(product_shape)[0])
+        * 100
+    )
+
+    assert geo_mask_utils.area_coverage(footprint, "OCN") == pytest.approx(
+        expected, rel=1e-12
+    )
+
+
+def test_warm_masks():
+    GeoMaskUtils.CACHED_MASK = {}
+
+    loaded = GeoMaskUtils.warm_masks()
+
+    assert loaded == len(GeoMaskUtils.CACHED_MASK) > 0
+    assert "EU_area.json" in GeoMaskUtils.CACHED_MASK
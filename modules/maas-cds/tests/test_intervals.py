@@ -0,0 +1,285 @@
+""" Module to test the vectorized interval functions"""
+
+import datetime
+import random
+
+import numpy as np
+
+from maas_cds.lib import intervals
+from maas_cds.lib.periodutils import (
+    Period,
+    as_period_array,
+    compute_duplicated_indicator,
+    compute_missing_sensing_periods,
+    compute_total_sensing_period,
+    compute_total_sensing_product,
+    reduce_periods,
+)
+from maas_model import datestr_to_utc_datetime
+
+DATATAKE_START = datetime.datetime(2024, 6, 5, 5, 44, 19, tzinfo=datetime.timezone.utc)
+
+
+def make_datatake_periods(count, seed=0):
+    """Products of a synthetic datatake, with overlaps, duplicates and holes"""
+    generator = random.Random(seed)
+
+    periods = []
+
+    start = DATATAKE_START
+
+    for _ in range(count):
+        duration = datetime.timedelta(microseconds=generator.randint(1, 30_000_000))
+
+        periods.append(Period(start, start + duration))
+
+        start += datetime.timedelta(
+            microseconds=generator.randint(-10_000_000, 35_000_000)
+        )
+
+    periods.sort(key=lambda period: (period.start, period.end))
+
+    return periods
+
+
+def legacy_total_sensing_product(periods):
+    sensing = 0
+    last_period = None
+
+    for period in periods:
+        if last_period is None or period.start >= last_period.end:
+            sensing += (period.end - period.start).total_seconds() * 1000000
+        elif period.start < last_period.end and last_period.end < period.end:
+            sensing += (period.end - last_period.end).total_seconds() * 1000000
+
+        last_period = period
+
+    return sensing
+
+
+def legacy_missing_sensing_periods(
+    range_to_evaluate, periods, maximal_offset, tolerance_value=0
+):
+    period_start = range_to_evaluate.start
+    period_stop = range_to_evaluate.end
+
+    if not periods:
+        return [Period(period_start, period_stop)]
+
+    period_stop += datetime.timedelta(microseconds=tolerance_value)
+
+    previous = None
+    missing_periods = []
+
+    start_offset = (periods[0].start - period_start).total_seconds() * 1000000
+
+    if start_offset > maximal_offset:
+        previous = Period(period_start, period_start)
+    else:
+        period_stop += datetime.timedelta(microseconds=start_offset)
+
+    for brother in periods:
+        if previous and brother.start > previous.end:
+            missing_periods.append(Period(previous.end, brother.start))
+        previous = brother
+
+    if (period_stop - periods[-1].end).total_seconds() > 0:
+        missing_periods.append(Period(periods[-1].end, period_stop))
+
+    return missing_periods
+
+
+def legacy_reduce_periods(periods, tolerance_value=datetime.timedelta(seconds=15)):
+    reduced = []
+
+    for period in sorted(periods, key=lambda p: p.start):
+        adjusted_period = Period(
+            period.start - tolerance_value, period.end + tolerance_value
+        )
+
+        if reduced and adjusted_period.start <= reduced[-1].end:
+            reduced[-1] = Period(
+                reduced[-1].start, max(reduced[-1].end, adjusted_period.end)
+            )
+        else:
+            reduced.append(adjusted_period)
+
+    return reduced
+
+
+def legacy_duplicated_indicator(periods):
+    duplicated_percentage = []
+    duplicated_duration = []
+
+    for previous, brother in zip(periods[:-1], periods[1:]):
+        if brother.start < previous.end:
+            common_time = (
+                min(previous.end, brother.end) - brother.start
+            ).total_seconds() * 1000
+            duplicated_duration.append(common_time)
+
+            total_period = (previous.end - previous.start).total_seconds() * 1000
+
+            duplicated_percentage.append(common_time / total_period * 100)
+        else:
+            duplicated_duration.append(0)
+            duplicated_percentage.append(0)
+
+    return {
+        "min_percentage": float(min(duplicated_percentage)),
+        "avg_percentage": float(
+            sum(duplicated_percentage) / len(duplicated_percentage)
+        ),
+        "max_percentage": float(max(duplicated_percentage)),
+        "min_duration": int(min(duplicated_duration)),
+        "avg_duration": int(sum(duplicated_duration) / len(duplicated_duration)),
+        "max_duration": int(max(duplicated_duration)),
+    }
+
+
+def test_datetime_conversion():
+    date = datetime.datetime(2024, 2, 5, 10, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+
+    value = intervals.datetime_to_microseconds(date)
+
+    assert value == 1707127200123456
+    assert intervals.microseconds_to_datetime(value) == date
+
+    naive = date.replace(tzinfo=None)
+
+    assert intervals.datetime_to_microseconds(naive) == value
+    assert intervals.microseconds_to_datetime(value, None) == naive
+
+
+def test_union():
+    starts = np.array([50, 0, 10, 30, 30, 100], dtype=np.int64)
+    ends = np.array([60, 20, 15, 40, 50, 110], dtype=np.int64)
+
+    union_starts, union_ends = intervals.union(starts, ends)
+
+    assert union_starts.tolist() == [0, 30, 100]
+    assert union_ends.tolist() == [20, 60, 110]
+    assert intervals.union_duration(starts, ends) == 60
+
+    union_starts, union_ends = intervals.union(starts, ends, merge_contiguous=False)
+
+    assert union_starts.tolist() == [0, 30, 50, 100]
+    assert union_ends.tolist() == [20, 50, 60, 110]
+
+
+def test_chained_duration_counts_older_overlaps():
+    # the third period overlaps the first one but not the second one
+    starts = np.array([0, 1, 4], dtype=np.int64)
+    ends = np.array([10, 3, 6], dtype=np.int64)
+
+    assert intervals.chained_duration(starts, ends) == 12
+    assert intervals.union_duration(starts, ends) == 10
+
+
+def test_total_sensing_product_same_as_legacy():
+    for seed in range(20):
+        periods = make_datatake_periods(200, seed)
+
+        assert compute_total_sensing_product(periods) == legacy_total_sensing_product(
+            periods
+        )
+        assert compute_total_sensing_product(as_period_array(periods)) == round(
+            legacy_total_sensing_product(periods)
+        )
+
+
+def test_missing_sensing_periods_same_as_legacy():
+    for seed in range(20):
+        periods = make_datatake_periods(200, seed)
+
+        range_start = periods[0].start - datetime.timedelta(seconds=seed % 3)
+        range_to_evaluate = Period(
+            range_start, range_start + datetime.timedelta(hours=1)
+        )
+
+        for maximal_offset in (0, 1_000_000, 5_000_000):
+            for tolerance_value in (0, 2_500_000.4, -1_000_000):
+                expected = legacy_missing_sensing_periods(
+                    range_to_evaluate, periods, maximal_offset, tolerance_value
+                )
+
+                assert (
+                    compute_missing_sensing_periods(
+                        range_to_evaluate, periods, maximal_offset, tolerance_value
+                    )
+                    == expected
+                )
+                assert (
+                    compute_missing_sensing_periods(
+                        range_to_evaluate,
+                        as_period_array(periods),
+                        maximal_offset,
+                        tolerance_value,
+                    )
+                    == expected
+                )
+
+
+def test_reduce_periods_same_as_legacy():
+    for seed in range(20):
+        periods = make_datatake_periods(200, seed)
+        random.Random(seed).shuffle(periods)
+
+        assert reduce_periods(periods) == legacy_reduce_periods(periods)
+
+
+def test_duplicated_indicator_same_as_legacy():
+    for seed in range(20):
+        periods = make_datatake_periods(200, seed)
+
+        assert compute_duplicated_indicator(periods) == legacy_duplicated_indicator(
+            periods
+        )
+
+
+def test_period_array_shared_by_functions():
+    periods = [
+        Period(datestr_to_utc_datetime(start), datestr_to_utc_datetime(end))
+        for start, end in (
+            ("20240205T100000", "20240205T100015"),
+            ("20240205T100010", "20240205T100030"),
+            ("20240205T100100", "20240205T100115"),
+        )
+    ]
+
+    period_array = as_period_array(periods)
+
+    assert as_period_array(period_array) is period_array
+    assert len(period_array) == 3
+
+    range_to_evaluate = Period(periods[0].start, periods[-1].end)
+
+    missing_periods = compute_missing_sensing_periods(
+        range_to_evaluate, period_array, 0
+    )
+
+    assert missing_periods == [Period(periods[1].end, periods[2].start)]
+    assert missing_periods[0].start.tzinfo is periods[1].end.tzinfo
+    assert (
+        compute_missing_sensing_periods(range_to_evaluate, periods, 0)
+        == missing_periods
+    )
+
+    assert compute_total_sensing_product(period_array) == 45_000_000
+    assert compute_total_sensing_period(period_array) == range_to_evaluate
+    assert compute_total_sensing_period(periods) == range_to_evaluate
+    assert compute_duplicated_indicator(period_array) == compute_duplicated_indicator(
+        periods
+    )
+
+    # without source periods, the datetimes are rebuilt in the same time zone
+    bare_array = intervals.PeriodArray(
+        period_array.starts, period_array.ends, period_array.tzinfo
+    )
+
+    assert bare_array[2] == periods[2]
+    assert (
+        compute_missing_sensing_periods(range_to_evaluate, bare_array, 0)
+        == missing_periods
+    )
+    assert reduce_periods(bare_array) == reduce_periods(periods)
@@ -81,6 +81,29 @@ def es_parser() -> ArgumentParser:
         type=int,
     )
 
+    parser.add_argument(
+        "--es-chunk-size",
+        dest="es_chunk_size",
+        help="number of extracted documents fetched from opensearch with a single "
+        "request (default: %(default)s)",
+        action=EnvDefault,
+        envvar="ES_CHUNK_SIZE",
+        required=False,
+        default=1000,
+        type=int,
+    )
+    parser.add_argument(
+        "--es-prefetch-depth",
+        dest="es_prefetch_depth",
+        help="number of document chunks fetched in background while a chunk is "
+        "indexed, 0 to disable (default: %(default)s)",
+        action=EnvDefault,
+        envvar="ES_PREFETCH_DEPTH",
+        required=False,
+        default=1,
+        type=int,
+    )
+
     parser.add_argument(
         "--es-ignore-certs-verification",
         dest="es_ignore_certs_verification",
@@ -164,6 +187,28 @@ def amqp_parser() -> ArgumentParser:
         default=5,
         type=int,
     )
+    parser.add_argument(
+        "--amqp-publish-queue-size",
+        dest="amqp_publish_queue_size",
+        help="number of messages waiting to be published in background, "
+        "0 to publish synchronously (default: %(default)s)",
+        action=EnvDefault,
+        envvar="AMQP_PUBLISH_QUEUE_SIZE",
+        required=False,
+        default=0,
+        type=int,
+    )
+    parser.add_argument(
+        "--amqp-journal",
+        dest="amqp_journal_path",
+        help="file storing the messages that cannot be published in background "
+        "(default: a file of the working directory)",
+        action=EnvDefault,
+        envvar="AMQP_JOURNAL",
+        required=False,
+        default="",
+        type=str,
+    )
     return parser
 
 
@@ -515,6 +560,18 @@ def s3_parser():
         default=False,
     )
 
+    parser.add_argument(
+        "--s3-in-memory-max-size",
+        dest="s3_in_memory_max_size",
+        help="Maximum size in bytes of objects extracted from memory, 0 to always "
+        "download to files (default: %(default)s)",
+        action=EnvDefault,
+        envvar="S3_IN_MEMORY_MAX_SIZE",
+        required=False,
+        type=int,
+        default=16 * 1024 * 1024,
+    )
+
     return parser
 
 
@@ -1065,6 +1122,8 @@ def get_collector_args(classobj, namespace, **kwargs):
     args = classobj(
         es_url=get_es_credentials_url(namespace),
         es_timeout=namespace.es_timeout,
+        es_chunk_size=namespace.es_chunk_size,
+        es_prefetch_depth=namespace.es_prefetch_depth,
         es_ignore_certs_verification=namespace.es_ignore_certs_verification,
         amqp_url=get_amqp_credentials_url(namespace),
         rawdata_config=namespace.rawdata_config,
@@ -1081,6 +1140,8 @@ def get_collector_args(classobj, namespace, **kwargs):
         force_message=namespace.force_message,
         credential_file=namespace.credential_file,
         amqp_priority=namespace.amqp_priority,
+        amqp_publish_queue_size=namespace.amqp_publish_queue_size,
+        amqp_journal_path=namespace.amqp_journal_path,
         **kwargs,
     )
 
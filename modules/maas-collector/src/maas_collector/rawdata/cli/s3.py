@@ -30,6 +30,7 @@ def s3_collector_main(args):
     s3_config = S3Configuration(
         namespace.s3_timeout,
         namespace.s3_keep_files,
+        namespace.s3_in_memory_max_size,
     )
 
     collector = S3Collector(args, s3_config)
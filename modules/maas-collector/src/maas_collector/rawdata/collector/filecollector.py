@@ -38,6 +38,7 @@ from maas_collector.rawdata.backup import (
     instanciate_collector_backup,
 )
 from maas_collector.rawdata.messenger import Messenger
+from maas_collector.rawdata.publisher import PublisherStats
 from maas_collector.rawdata.replay import ReplayArgs
 
 from maas_collector.rawdata.collector.credentialmixin import CredentialMixin
@@ -91,6 +92,20 @@ class CollectorArgs:
 
     es_ignore_certs_verification: bool = False
 
+    # number of extracted documents fetched from the database with a single request
+    es_chunk_size: int = 1000
+
+    # number of chunks fetched in background while the current chunk is indexed
+    es_prefetch_depth: int = 1
+
+    # number of messages waiting to be published in background, 0 to publish
+    # synchronously
+    amqp_publish_queue_size: int = 0
+
+    # file storing the messages that cannot be published in background, default to
+    # a file of the working directory
+    amqp_journal_path: str = ""
+
 
 @dataclasses.dataclass
 class FileCollectorConfiguration:
@@ -226,6 +241,9 @@ class EntityStats:
 
     updates: int = 0
 
+    # documents already up to date in the database
+    unmodified: int = 0
+
     errors: int = 0
 
     last_ingest: str = None
@@ -239,6 +257,9 @@ class CollectorStats:
 
     entities: typing.Dict[str, EntityStats]
 
+    # background message publishing, None if messages are published synchronously
+    messages: PublisherStats = None
+
 
 # collector has too many method because of the number of template methods
 # pylint: disable=R0904
@@ -291,8 +312,15 @@ class FileCollector(CredentialMixin):
             priority=self.args.amqp_priority,
             max_retries=self.args.amqp_retries,
             pipeline_name=self.__class__.__name__,
+            publish_queue_size=self.args.amqp_publish_queue_size,
+            journal_path=self.args.amqp_journal_path
+            or os.path.join(
+                self.args.working_directory, f"{self.__class__.__name__}.amqp.journal"
+            ),
         )
 
+        self.stats.messages = self._messenger.stats
+
         # action iterator reference so it can be found to be stopped
         self._action_iterator = None
         self.action_iterator_errors = []
@@ -453,6 +481,18 @@ class FileCollector(CredentialMixin):
         names.sort()
         return names
 
+    def can_extract_from_memory(self, config: FileCollectorConfiguration) -> bool:
+        """Tell if collected data can be extracted without writing it to a file:
+        the extractor accepts in-memory files and neither backup nor meta need one
+
+        Args:
+            config (FileCollectorConfiguration): configuration extracting the data
+
+        Returns:
+            bool: True if an InMemoryFile can be passed to extract_from_file
+        """
+        return not self._backup and config.extractor.IN_MEMORY and not config.store_meta
+
     def extract_from_file(
         self,
         path: str,
@@ -488,6 +528,8 @@ class FileCollector(CredentialMixin):
             report_name=report_name,
             report_folder=report_folder,
             iter_callback=iter_callback,
+            chunk_size=self.args.es_chunk_size,
+            prefetch_depth=self.args.es_prefetch_depth,
         )
         self.action_iterator_errors = []
         try:
@@ -506,6 +548,10 @@ class FileCollector(CredentialMixin):
                     self.on_document_error(path, config, info)
                     continue
 
+                if "update" in info:
+                    # content hash stored in an unmodified document
+                    continue
+
                 document_id = info["index"]["_id"]
 
                 index = info["index"]["_index"]
@@ -541,6 +587,10 @@ class FileCollector(CredentialMixin):
                 else:
                     self.logger.error("Unexpected result: %s", result)
         finally:
+            self.entity_stats(config).unmodified += len(
+                self._action_iterator.unmodified_ids
+            )
+
             if self.args.force_message and self._action_iterator.unmodified_ids:
                 # publish the untouched document identifier (hole filling)
                 self.logger.info(
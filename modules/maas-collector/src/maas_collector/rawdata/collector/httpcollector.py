@@ -37,6 +37,8 @@ from maas_collector.rawdata.collector.http.abstract_query_strategy import (
 
 from maas_collector.rawdata.collector.http.authentication import build_authentication
 
+from maas_collector.rawdata.extractor.base import InMemoryFile
+
 
 # Désactive la génération automatique de __repr__ pour pouvoir utiliser
 # celui du parent qui masque les données sensible comme les mot de passe
@@ -402,7 +404,8 @@ class HttpCollector(FileCollector, HttpMixin):
         http_session: AbstractHttpQueryStrategy,
         iter_callback,
     ):
-        """Save data in file, extract, and remove the file
+        """Extract data from memory, or save data in file, extract, and remove the
+        file when files are kept or backed up
 
         Args:
             data (Union[dict, bytes]): Data to store in a file and to be extracted
@@ -412,23 +415,33 @@ class HttpCollector(FileCollector, HttpMixin):
 
         self.post_process_data(data, filename, config, http_session)
 
-        filepath = os.path.join(
-            self.args.working_directory,
-            filename,
-        )
+        if not self.http_config.keep_files and self.can_extract_from_memory(config):
+            # the decoded payload is handed to the extractor as is
+            filepath = None
+
+            source = InMemoryFile.from_data(filename, data)
+
+        else:
+            filepath = os.path.join(
+                self.args.working_directory,
+                filename,
+            )
+
+            source = filepath
 
         try:
-            with open(filepath, "w", encoding="UTF-8") as file_desc:
-                if isinstance(data, bytes):
-                    file_desc.write(data.decode("utf-8"))
-                elif isinstance(data, dict):
-                    json.dump(data, file_desc)
-                else:
-                    file_desc.write(data)
+            if filepath:
+                with open(filepath, "w", encoding="UTF-8") as file_desc:
+                    if isinstance(data, bytes):
+                        file_desc.write(data.decode("utf-8"))
+                    elif isinstance(data, dict):
+                        json.dump(data, file_desc)
+                    else:
+                        file_desc.write(data)
 
             # force report name as base url
             self.extract_from_file(
-                filepath,
+                source,
                 config,
                 report_name=config.get_config_product_url(),
                 iter_callback=iter_callback,
@@ -442,7 +455,7 @@ class HttpCollector(FileCollector, HttpMixin):
 
         finally:
             # Clear file
-            if not self.http_config.keep_files:
+            if filepath and not self.http_config.keep_files:
                 self.logger.debug("Deleting %s", filepath)
                 os.remove(filepath)
 
@@ -2,6 +2,7 @@
 
 import datetime
 import logging
+import typing
 
 import opensearchpy.exceptions
 import opensearchpy
@@ -24,15 +25,27 @@ class NoRefreshException(CollectorException):
     """
 
 
+class BucketCheckpoint(opensearchpy.InnerDoc):
+    """Last key of a bucket listing up to which all objects have been collected"""
+
+    bucket = opensearchpy.Keyword()
+
+    key = opensearchpy.Keyword()
+
+
 class JournalDocument(opensearchpy.Document):
     """
     A database document to store informations about a collector's life:
 
      - the last time it ran: last_collect_date
 
+     - the last time it was written, by a tick or at the end of a collect:
+       update_date
+
      - the date of the last ingestion in a business view, like production or
        publication date
 
+     - the listing checkpoints of the S3 buckets
 
     """
 
@@ -44,10 +57,14 @@ class JournalDocument(opensearchpy.Document):
 
     last_collect_date = ZuluDate(default_timezone="UTC")
 
+    update_date = ZuluDate(default_timezone="UTC")
+
     last_date = ZuluDate()
 
     key = opensearchpy.Keyword()
 
+    bucket_checkpoints = opensearchpy.Object(BucketCheckpoint, multi=True)
+
 
 class CollectorJournal:
     """CollectorJournal is a context manager that uses database document to
@@ -68,6 +85,9 @@ class CollectorJournal:
 
         self.__max_date = None
 
+        # bound of the stored last date when data is not collected in date order
+        self.__date_ceiling = None
+
         self.__start_date = None
 
         self.is_a_replay_journal = False
@@ -158,6 +178,59 @@ class CollectorJournal:
             else:
                 self.__max_date = value
 
+    def get_bucket_checkpoint(self, bucket: str) -> typing.Optional[str]:
+        """Get the last key collected in a bucket listing
+
+        Args:
+            bucket (str): bucket name
+
+        Returns:
+            typing.Optional[str]: object key or None if the bucket was never collected
+        """
+        for checkpoint in self.journal.bucket_checkpoints:
+            if checkpoint.bucket == bucket:
+                return checkpoint.key
+
+        return None
+
+    def set_bucket_checkpoint(self, bucket: str, key: str):
+        """Set the last key collected in a bucket listing, saved at next tick
+
+        Args:
+            bucket (str): bucket name
+            key (str): object key
+        """
+        for checkpoint in self.journal.bucket_checkpoints:
+            if checkpoint.bucket == bucket:
+                checkpoint.key = key
+                return
+
+        self.journal.bucket_checkpoints.append(BucketCheckpoint(bucket=bucket, key=key))
+
+    def set_date_ceiling(self, date_ceiling: datetime.datetime):
+        """Bound the last date stored from the iteration callback.
+
+        Used when data is not collected in date order: the ceiling is the date up to
+        which all the data has been collected. Once a ceiling is set, the stored last
+        date only moves forward.
+
+        Args:
+            date_ceiling (datetime.datetime): date up to which data is collected
+        """
+        self.__date_ceiling = date_ceiling
+
+    def _get_max_date(self) -> typing.Optional[datetime.datetime]:
+        """Get the most recent date of interest to store, if any"""
+        if self.__date_ceiling is None or self.__max_date is None:
+            return self.__max_date
+
+        max_date = min(self.__max_date, self.__date_ceiling)
+
+        if self.document.last_date and max_date <= self.document.last_date:
+            return None
+
+        return max_date
+
     def load(self):
         """create or read JournalDocument"""
         try:
@@ -190,14 +263,18 @@ class CollectorJournal:
             tz=datetime.timezone.utc
         )
 
+        self.document.update_date = self.document.tick_collect_date
+
         self.logger.debug(
             "Setting tick_collect_date to %s", self.document.tick_collect_date
         )
 
         try:
-            if self.__max_date:
+            max_date = self._get_max_date()
+
+            if max_date:
                 # save max date of interest
-                self.document.last_date = self.__max_date
+                self.document.last_date = max_date
 
             self.document.save(refresh=True)
 
@@ -216,9 +293,11 @@ class CollectorJournal:
             self.__start_date = None
             return
 
-        if self.__max_date:
+        max_date = self._get_max_date()
+
+        if max_date:
             # save max date of interest
-            self.document.last_date = self.__max_date
+            self.document.last_date = max_date
         else:
             self.logger.debug("No most recent date of interest found: no new data")
 
@@ -232,6 +311,8 @@ class CollectorJournal:
         # drop tick attribute
         self.document.tick_collect_date = None
 
+        self.document.update_date = datetime.datetime.now(tz=datetime.timezone.utc)
+
         # clear internal attribute
         self.__start_date = None
 
@@ -42,6 +42,13 @@ from maas_collector.rawdata.configuration import (
 
 from maas_collector.rawdata.collector.credentialmixin import CredentialMixin
 
+# journals written since this delay before the previous refresh are read again, to
+# cover the clock drift between the collectors
+JOURNAL_REFRESH_OVERLAP = datetime.timedelta(minutes=1)
+
+# delay between two loads of all the journals, forgetting the deleted ones
+JOURNAL_RELOAD_INTERVAL = datetime.timedelta(hours=1)
+
 
 @dataclasses.dataclass
 class InterfaceMonitorCollectorConfiguration(FileCollectorConfiguration):
@@ -349,6 +356,12 @@ class InterfaceMonitor(FileCollector, CredentialMixin):
 
         self.last_modification_date_dict: Dict[str, datetime.datetime] = {}
 
+        # date of the previous refresh of the last modification dates
+        self._journal_refresh_date: datetime.datetime | None = None
+
+        # date of the previous load of all the journals
+        self._journal_reload_date: datetime.datetime | None = None
+
         self.retries: List[ProbeRetry] = []
 
         self.ko_manager: KOManagerThread
@@ -519,12 +532,7 @@ class InterfaceMonitor(FileCollector, CredentialMixin):
             journal (CollectorJournal): journal
         """
 
-        # load all journal documents to store interface_name -> last modification date
-        search = JournalDocument.search().params(ignore=404, size=1024)
-
-        self.last_modification_date_dict = {
-            doc.meta.id: doc.last_date for doc in search.execute()
-        }
+        self.refresh_last_modification_dates()
 
         # Handle retried probes
         if self.ko_manager.data.qsize() > 0:
@@ -582,6 +590,42 @@ class InterfaceMonitor(FileCollector, CredentialMixin):
         if last_modification_values:
             journal.last_date = max(last_modification_values)
 
+    def refresh_last_modification_dates(self):
+        """Update the interface_name -> last modification date dictionnary from the
+        journals written since the previous refresh, and from all the journals
+        periodically
+        """
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+
+        search = (
+            JournalDocument.search().source(["last_date"]).params(ignore=404, size=1024)
+        )
+
+        if (
+            self._journal_reload_date is None
+            or now - self._journal_reload_date >= JOURNAL_RELOAD_INTERVAL
+        ):
+            self.last_modification_date_dict = {
+                doc.meta.id: doc.last_date for doc in search.execute()
+            }
+
+            self._journal_reload_date = now
+
+        else:
+            # journals are written by the ticks of a collect in progress too
+            search = search.filter(
+                "range",
+                update_date={
+                    "gte": self._journal_refresh_date - JOURNAL_REFRESH_OVERLAP
+                },
+            )
+
+            self.last_modification_date_dict.update(
+                {doc.meta.id: doc.last_date for doc in search.execute()}
+            )
+
+        self._journal_refresh_date = now
+
     def ingest_probes(
         self,
         config: InterfaceMonitorCollectorConfiguration,
@@ -1,7 +1,9 @@
 """Contain base class for OData implementations"""
 
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 import datetime
 import typing
+import urllib.parse
 from maas_collector.rawdata.collector.http.abstract_query_strategy import (
     AbstractHttpQueryStrategy,
 )
@@ -12,6 +14,7 @@ from maas_collector.rawdata.collector.journal import (
 )
 
 from maas_model import datetime_to_zulu
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
 
@@ -72,6 +75,9 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
         )
         self._skip_number = 0
 
+        # url of the next page of the current time window for keyset pagination
+        self._next_page_url = None
+
     def get_filename(self, page: int) -> str:
         """get file name of a page for download"""
         return self.FILE_NAME_PATTERN.format(
@@ -91,6 +97,13 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
         Raises:
             NotImplemented: abstract methods
         """
+        if (
+            self.config.concurrent_time_windows > 1
+            and not self.list_of_files_to_retrieve
+        ):
+            yield from self._iter_concurrent_time_windows()
+            return
+
         total_entities = 0
 
         current_query_index = 0
@@ -128,7 +141,9 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
             )
 
             try:
-                entities = self._get_entities(self._skip_number)
+                entities = self._get_entities(
+                    self._skip_number, page_url=self._next_page_url
+                )
 
             except RequestException as connection_error:
                 self.logger.error(
@@ -188,7 +203,7 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
                 self.journal.document.last_date = self._iter_start_date
                 self.journal.document.save(refresh=True)
 
-            if nb_entities < self.product_per_page:
+            if self._is_last_page(entities, nb_entities):
                 # Last iter on the current timerange
 
                 self._iter_start_date = self._iter_end_date
@@ -200,11 +215,25 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
 
                 self._skip_number = 0
 
+                self._next_page_url = None
+
                 self.logger.debug(
                     "[__ITER__][LOCAL] NEXT FROM %s TO %s",
                     self._iter_start_date,
                     self._iter_end_date,
                 )
+            elif self.config.odata_pagination == "keyset":
+                # keep iter in the same time range, after the last product
+                self._next_page_url = self._get_next_page_url(
+                    entities, self._iter_end_date
+                )
+
+                self.logger.debug(
+                    "[__ITER__][LOCAL] _iter keyset %s TO %s: %s",
+                    self._iter_start_date,
+                    self._iter_end_date,
+                    self._next_page_url,
+                )
             else:
                 # keep iter in the same time range
                 # move start page to continue to collect first page (no skip)
@@ -242,11 +271,229 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
             current_query_index,
         )
 
-    def _get_entities(self, page_number):
+    def get_time_windows(self) -> list[tuple[datetime.datetime, datetime.datetime]]:
+        """Split the collect period in time windows of max_time_window minutes
+
+        Returns:
+            list[tuple[datetime.datetime, datetime.datetime]]: start and end dates of
+                the time windows, in date order
+        """
+        max_time_window = datetime.timedelta(minutes=self.config.max_time_window)
+
+        time_windows = []
+
+        window_start = self.start_date
+
+        while window_start < self.end_date:
+            window_end = min(window_start + max_time_window, self.end_date)
+
+            time_windows.append((window_start, window_end))
+
+            window_start = window_end
+
+        return time_windows
+
+    def _iter_concurrent_time_windows(self):
+        """yields pages of product, querying concurrent_time_windows time windows at
+        the same time.
+
+        Pages are yielded as soon as they are received, so the network queries of
+        the other windows go on during extraction. The next page of a time window is
+        only queried once the previous one is received, as the skip query needs it.
+
+        As time windows complete out of order, the journal last date is bounded by
+        the start of the first time window not completely extracted.
+        """
+        time_windows = self.get_time_windows()
+
+        concurrency = self.config.concurrent_time_windows
+
+        self.logger.info(
+            "[%s] Query %d time windows from %s to %s with %d concurrent queries",
+            self.interface_name,
+            len(time_windows),
+            self.start_date,
+            self.end_date,
+            concurrency,
+        )
+
+        # pooled connections shared by the query threads
+        adapter = HTTPAdapter(pool_maxsize=concurrency)
+        self.http_session.mount("http://", adapter)
+        self.http_session.mount("https://", adapter)
+
+        # query => (time window index, page number)
+        queries: dict[Future, tuple[int, int]] = {}
+
+        completed_windows = [False] * len(time_windows)
+
+        next_window_index = 0
+
+        total_entities = 0
+
+        query_count = 0
+
+        self._move_time_window_checkpoint(time_windows, completed_windows)
+
+        executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix=self.interface_name
+        )
+
+        try:
+            while next_window_index < len(time_windows) and len(queries) < concurrency:
+                self._submit_page_query(
+                    executor, queries, time_windows, next_window_index, 0
+                )
+                next_window_index += 1
+
+            while queries and not self.collector.should_stop_loop:
+                done, _ = wait(queries, return_when=FIRST_COMPLETED)
+
+                for query in done:
+                    window_index, page_number = queries.pop(query)
+
+                    try:
+                        entities = query.result()
+                    except (RequestException, ValueError) as error:
+                        self.logger.error(
+                            "[%s][SKIP] Error querying products from %s to %s: %s -> %s",
+                            self.interface_name,
+                            *time_windows[window_index],
+                            self.product_url,
+                            error,
+                        )
+                        raise
+
+                    nb_entities = self._count_item_payload(entities)
+
+                    window_completed = self._is_last_page(entities, nb_entities)
+
+                    # keep the query threads busy during extraction
+                    if not window_completed:
+                        self._submit_page_query(
+                            executor,
+                            queries,
+                            time_windows,
+                            window_index,
+                            page_number + 1,
+                            self._get_next_page_url(
+                                entities, time_windows[window_index][1]
+                            ),
+                        )
+                    elif next_window_index < len(time_windows):
+                        self._submit_page_query(
+                            executor, queries, time_windows, next_window_index, 0
+                        )
+                        next_window_index += 1
+
+                    yield entities
+
+                    total_entities += nb_entities
+
+                    query_count += 1
+
+                    if window_completed:
+                        completed_windows[window_index] = True
+
+                        self._move_time_window_checkpoint(
+                            time_windows, completed_windows
+                        )
+
+                    if self.collector.should_stop_loop:
+                        break
+        finally:
+            # do not wait for pages that will not be extracted
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        self.logger.info(
+            "[%s] Finally retrieve %d products in %s queries",
+            self.interface_name,
+            total_entities,
+            query_count,
+        )
+
+    def _submit_page_query(
+        self,
+        executor: ThreadPoolExecutor,
+        queries: dict,
+        time_windows: list,
+        window_index: int,
+        page_number: int,
+        page_url: str = None,
+    ):
+        """Query a page of a time window in a query thread
+
+        Args:
+            executor (ThreadPoolExecutor): query threads
+            queries (dict): pending queries to add the new query to
+            time_windows (list): start and end dates of the time windows
+            window_index (int): index of the time window to query
+            page_number (int): page to query
+            page_url (str, optional): url of the page for keyset pagination.
+                Defaults to None.
+        """
+        window_start, window_end = time_windows[window_index]
+
+        # headers are built in the collector thread as tokens may be refreshed
+        query = executor.submit(
+            self._get_entities,
+            page_number,
+            window_start,
+            window_end,
+            self.authentication.get_headers(),
+            page_url,
+        )
+
+        queries[query] = (window_index, page_number)
+
+    def _move_time_window_checkpoint(self, time_windows: list, completed: list):
+        """Bound the journal last date to the start of the first time window not
+        completely extracted.
+
+        Args:
+            time_windows (list): start and end dates of the time windows
+            completed (list): tell for each time window if it is completely extracted
+        """
+        checkpoint = self.end_date
+
+        for (window_start, _), window_completed in zip(time_windows, completed):
+            if not window_completed:
+                checkpoint = window_start
+                break
+
+        self.journal.set_date_ceiling(checkpoint)
+
+        if self.collector.get_pending_document_count() != 0:
+            # last date will move with the documents once messages are sent
+            return
+
+        if not self.journal.document.last_date or (
+            checkpoint > self.journal.document.last_date
+        ):
+            self.logger.debug("Keep time window checkpoint in journal: %s", checkpoint)
+            self.journal.document.last_date = checkpoint
+            self.journal.document.save(refresh=True)
+
+    def _get_entities(
+        self,
+        page_number,
+        start_date: datetime.datetime = None,
+        end_date: datetime.datetime = None,
+        headers: dict = None,
+        page_url: str = None,
+    ):
         """Get entities from the url in config between the start_date and the end_date
 
         Args:
             page : page of entities
+            start_date (datetime.datetime, optional): start of the time window.
+                Defaults to the current time window.
+            end_date (datetime.datetime, optional): end of the time window.
+                Defaults to the current time window.
+            headers (dict, optional): request headers. Defaults to authentication
+                headers.
+            page_url (str, optional): url of the page to get, built for keyset
+                pagination. Defaults to None.
 
         Raises:
             ValueError: If no status code 200
@@ -254,6 +501,11 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
         Returns:
             Object: an object who contains the json response between the given date
         """
+        if start_date is None:
+            start_date = self._iter_start_date
+
+        if end_date is None:
+            end_date = self._iter_end_date
 
         # We do not try to query the full list of files in a single GET, we split
         # and retrieve only 'list_of_files_to_retrieve_per_query' at a time
@@ -282,18 +534,48 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
                 f"{self.config.custom_query_suffix}"
             )
 
+        elif page_url:
+            self.logger.debug(
+                "Retrieve entities between %s and %s from %s page %s after the "
+                "previous page",
+                start_date,
+                end_date,
+                self.product_url,
+                page_number,
+            )
+
+        elif self.config.odata_pagination == "keyset":
+            self.logger.debug(
+                "Retrieve entities between %s and %s from %s first page",
+                start_date,
+                end_date,
+                self.product_url,
+            )
+
+            query_config = self.odata_query_filter.format(
+                publication_start_date=self._format_date(start_date),
+                publication_end_date=self._format_date(end_date),
+            )
+
+            full_query = (
+                f"$filter={query_config}"
+                f"&$orderby={self._get_keyset_order_by()}"
+                f"&$top={self.product_per_page}"
+                f"{self.config.custom_query_suffix}"
+            )
+
         else:
             self.logger.debug(
                 "Retrieve entities between %s and %s from %s page %s",
-                self._iter_start_date,
-                self._iter_end_date,
+                start_date,
+                end_date,
                 self.product_url,
                 page_number,
             )
 
             query_config = self.odata_query_filter.format(
-                publication_start_date=self._format_date(self._iter_start_date),
-                publication_end_date=self._format_date(self._iter_end_date),
+                publication_start_date=self._format_date(start_date),
+                publication_end_date=self._format_date(end_date),
             )
 
             full_query = (
@@ -304,14 +586,12 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
                 f"{self.config.custom_query_suffix}"
             )
 
-        query_url = (
-            f"{self.product_url}{self.config.odata_entity_location}"
-            f"{self.config.odata_entities}?{full_query}"
-        )
+        query_url = page_url or self._get_query_url(full_query)
 
         self.logger.debug("URL : %s", query_url)
 
-        headers = self.authentication.get_headers()
+        if headers is None:
+            headers = self.authentication.get_headers()
 
         response = self.http_session.get(
             query_url, headers=headers, timeout=self.collector.http_config.timeout
@@ -329,6 +609,90 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
 
         return self._deserialize_response(response)
 
+    def _get_query_url(self, full_query: str) -> str:
+        """Build the url of an entity query
+
+        Args:
+            full_query (str): query string
+
+        Returns:
+            str: query url
+        """
+        return (
+            f"{self.product_url}{self.config.odata_entity_location}"
+            f"{self.config.odata_entities}?{full_query}"
+        )
+
+    def _is_last_page(self, payload, nb_entities: int) -> bool:
+        """Tell if a page is the last one of its time window.
+
+        Services may return less products than $top per page: when they provide a
+        next link, the time window goes on until a page comes without it.
+
+        Args:
+            payload: page
+            nb_entities (int): number of products of the page
+
+        Returns:
+            bool: True if there is no product after the page in the time window
+        """
+        if self.config.odata_pagination == "keyset" and self._get_next_link(payload):
+            return False
+
+        return nb_entities < self.product_per_page
+
+    def _get_keyset_order_by(self) -> str:
+        """Sort products by keyset attributes so the key of the last product of a
+        page is greater than all the keys of the page"""
+        return ",".join(
+            f"{attribute} asc" for attribute in self.config.odata_keyset_attributes
+        )
+
+    def _get_next_page_url(
+        self, payload, end_date: datetime.datetime
+    ) -> typing.Optional[str]:
+        """Get the url of the page following a full page for keyset pagination.
+
+        The next link of the payload is used when the service provides it, else the
+        next page is queried with the products whose key is greater than the key of
+        the last product of the payload.
+
+        Args:
+            payload: full page
+            end_date (datetime.datetime): end of the time window
+
+        Returns:
+            typing.Optional[str]: url of the next page, None for skip pagination
+        """
+        if self.config.odata_pagination != "keyset":
+            return None
+
+        next_link = self._get_next_link(payload)
+
+        if next_link:
+            return urllib.parse.urljoin(self._get_query_url(""), next_link)
+
+        last_date, last_id = self._get_last_keyset(payload)
+
+        # dates are kept as provided by the service to not lose precision
+        query_config = (
+            self.odata_query_filter.format(
+                publication_start_date=last_date,
+                publication_end_date=self._format_date(end_date),
+            )
+            + " and "
+            + self.config.odata_keyset_filter.format(
+                last_date=last_date, last_id=last_id
+            )
+        )
+
+        return self._get_query_url(
+            f"$filter={query_config}"
+            f"&$orderby={self._get_keyset_order_by()}"
+            f"&$top={self.product_per_page}"
+            f"{self.config.custom_query_suffix}"
+        )
+
     def _format_date(self, date):
         """Default method to insert date in odata query
 
@@ -345,3 +709,9 @@ class AbstractODataQueryStrategy(AbstractHttpQueryStrategy):
 
     def _count_item_payload(self, payload):
         raise NotImplementedError()
+
+    def _get_next_link(self, payload) -> typing.Optional[str]:
+        raise NotImplementedError()
+
+    def _get_last_keyset(self, payload) -> tuple:
+        raise NotImplementedError()
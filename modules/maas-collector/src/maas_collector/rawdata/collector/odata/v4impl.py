@@ -21,3 +21,13 @@ class ODataQueryV4Implementation(AbstractODataQueryStrategy):
 
     def _count_item_payload(self, payload):
         return len(payload["value"])
+
+    def _get_next_link(self, payload):
+        return payload.get("@odata.nextLink")
+
+    def _get_last_keyset(self, payload):
+        last_product = payload["value"][-1]
+
+        return tuple(
+            last_product[attribute] for attribute in self.config.odata_keyset_attributes
+        )
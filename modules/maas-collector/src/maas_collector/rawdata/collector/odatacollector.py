@@ -81,6 +81,22 @@ class ODataCollectorConfiguration(HttpCollectorConfiguration):
     # Maximum time window in minutes
     max_time_window: int = 15
 
+    # Number of time windows queried concurrently, 1 to query them one by one
+    concurrent_time_windows: int = 1
+
+    # "skip" queries pages with $skip, "keyset" queries the products after the last
+    # product of the previous page, or follows @odata.nextLink if provided
+    odata_pagination: str = "skip"
+
+    # keyset pagination: date and identifier attributes sorting the products
+    odata_keyset_attributes: typing.List[str] = field(
+        default_factory=lambda: ["PublicationDate", "Id"]
+    )
+
+    # keyset pagination: products after the last product of a page having the same
+    # date, combined with odata_query_filter starting at the last date
+    odata_keyset_filter: str = "(PublicationDate gt {last_date} or Id gt {last_id})"
+
     # auth argument
 
     client_username: str = ""
@@ -111,6 +127,28 @@ class ODataCollectorConfiguration(HttpCollectorConfiguration):
 
     list_of_files_to_retrieve_query: str = ""
 
+    def __post_init__(self):
+        """Check the pagination options when the configuration is loaded
+
+        Raises:
+            ValueError: if the pagination is unknown or not supported by the
+                protocol version
+        """
+        if self.odata_pagination not in ("skip", "keyset"):
+            raise ValueError(
+                f"Unknown odata_pagination in {self.interface_name}: "
+                f"{self.odata_pagination}"
+            )
+
+        if (
+            self.odata_pagination == "keyset"
+            and self.get_config_protocol_version() == "v3"
+        ):
+            raise ValueError(
+                "Keyset pagination is not supported by OData v3 services: "
+                f"{self.interface_name}"
+            )
+
     def get_config_product_url(self):
         """Retrieve the product_url field from the collector configuration
 
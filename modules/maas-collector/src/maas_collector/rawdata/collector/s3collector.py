@@ -1,5 +1,7 @@
 """Extract files from S3 Bucket"""
 
+import collections
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 import datetime
 import fnmatch
@@ -19,6 +21,8 @@ from maas_collector.rawdata.collector.filecollector import (
 
 from maas_collector.rawdata.collector.httpmixin import HttpMixin
 
+from maas_collector.rawdata.extractor.base import InMemoryFile
+
 from maas_collector.rawdata.collector.journal import (
     CollectorJournal,
     CollectorReplayJournal,
@@ -57,6 +61,12 @@ class S3CollectorConfiguration(FileCollectorConfiguration):
 
     refresh_interval: int = 0
 
+    # start the listing after the last key collected by the previous loop, only
+    # for buckets where new objects are added with greater keys
+    s3_resume_listing: bool = False
+
+    s3_download_workers: int = 4
+
 
 @dataclass
 class S3Configuration:
@@ -66,6 +76,9 @@ class S3Configuration:
 
     keep_files: bool = False
 
+    # objects up to this size are extracted from memory, 0 to always use files
+    in_memory_max_size: int = 16 * 1024 * 1024
+
     # TODO consumme_files ?
 
 
@@ -263,14 +276,7 @@ class S3Collector(FileCollector, HttpMixin):
             matched_configuration,
         )
 
-        self.s3_resource = boto3.client(
-            "s3",
-            endpoint_url=config.s3_endpoint_url,
-            aws_access_key_id=config.s3_access_key,
-            aws_secret_access_key=config.s3_secret_key,
-            config=Config(signature_version=config.s3_signature_version),
-            region_name=config.s3_region,
-        )
+        self.s3_resource = self.build_s3_client(config)
 
         # need to get the current datetime to avoid to collect data that have been post after the collect but before the end
         # this should come from journal
@@ -298,114 +304,308 @@ class S3Collector(FileCollector, HttpMixin):
             "Collect data from %s ",
             __iter_start_date.strftime("%Y-%m-%d %H:%M:%S %Z"),
         )
-        # Paginate through the objects in the bucket
-        # OPTI : get a record for each bucket to allow parralle collect on
-        # same interface but different buckets
-
-        # OPTI : to get optimistic resuming we need to keep the last bucket and also the last document
-        # journal.document.last_s3_key = None
-        # journal.document.last_s3_buckets = None (care about config update)
-        # last_item_from_buckets = journal.document.last_s3_buckets
-
-        last_item_from_buckets = None
-        for bucket in config.buckets:
-
-            # Currently using StartAfter, depend on the interface it is possible to implement new paginator
-            # OPTI switch this to a other paginator way
-            # like ContinuationToken but not already implement
-            need_next = True
-            while need_next:
-                self._healthcheck.tick()
 
+        # downloads run in worker threads while extraction and database access stay
+        # in the collector thread
+        executor = ThreadPoolExecutor(
+            max_workers=max(config.s3_download_workers, 1),
+            thread_name_prefix=f"s3-{config.interface_name}",
+        )
+
+        try:
+            for bucket in config.buckets:
                 if self.should_stop_loop:
                     break
 
-                # Handling iteration
-                if last_item_from_buckets:
-                    response = self.s3_resource.list_objects_v2(
-                        Bucket=bucket,
-                        MaxKeys=config.s3_max_keys,
-                        StartAfter=last_item_from_buckets,
-                    )
+                self.ingest_bucket(
+                    config,
+                    journal,
+                    executor,
+                    bucket,
+                    __iter_start_date,
+                    __iter_end_date,
+                )
+        finally:
+            # do not download objects that will not be extracted
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        journal.document.last_date = __iter_end_date
+        journal.document.save(refresh=True)
+
+    def ingest_bucket(
+        self,
+        config: S3CollectorConfiguration,
+        journal: CollectorJournal,
+        executor: ThreadPoolExecutor,
+        bucket: str,
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+    ):
+        """Collect the objects of a bucket modified between two dates.
+
+        Matching objects are downloaded concurrently, up to twice the number of
+        download workers ahead of the extraction, and extracted in listing order.
+
+        Args:
+            config (S3CollectorConfiguration): interface configuration
+            journal (CollectorJournal): journal storing the bucket checkpoint
+            executor (ThreadPoolExecutor): download executor
+            bucket (str): bucket name
+            start_date (datetime.datetime): objects modified before are skipped
+            end_date (datetime.datetime): objects modified after are skipped
+        """
+        start_after = None
+
+        if config.s3_resume_listing:
+            start_after = journal.get_bucket_checkpoint(bucket)
+
+            self.logger.info(
+                "Resume listing of bucket %s after %s", bucket, start_after
+            )
+
+        # listed objects waiting for extraction, in listing order
+        pending = collections.deque()
+
+        max_pending = 2 * max(config.s3_download_workers, 1)
+
+        # objects modified during the collect are collected by the next loop, so
+        # the checkpoint shall not go beyond them
+        checkpoint_frozen = False
+
+        for page in self.list_bucket_pages(
+            bucket, config.s3_max_keys, start_after=start_after
+        ):
+            self._healthcheck.tick()
+
+            for obj in page:
+                if self.should_stop_loop:
+                    break
+
+                self.logger.debug(
+                    "File Name: %s, Last Modified: %s", obj["Key"], obj["LastModified"]
+                )
+
+                extract_configs = []
+
+                if obj["LastModified"] > end_date:
+                    checkpoint_frozen = True
+
+                if start_date < obj["LastModified"] <= end_date:
+                    extract_configs = self.match_configurations(config, obj["Key"])
                 else:
-                    response = self.s3_resource.list_objects_v2(
-                        Bucket=bucket, MaxKeys=config.s3_max_keys
+                    self.logger.debug(
+                        "This file has been already process or will be in the futur %s %s",
+                        obj["Key"],
+                        obj["LastModified"],
                     )
 
-                # Less key count than max keys
-                if response["KeyCount"] < config.s3_max_keys:
-                    need_next = False
-
-                if "Contents" in response:
-                    for obj in response["Contents"]:
-                        if self.should_stop_loop:
-                            break
-                        file_name = obj["Key"]
-                        last_modified = obj["LastModified"]
-
-                        self.logger.debug(
-                            "File Name: %s, Last Modified: %s", file_name, last_modified
-                        )
-
-                        if not (__iter_start_date < last_modified <= __iter_end_date):
-                            self.logger.debug(
-                                "This file has been already process or will be in the futur %s %s",
-                                file_name,
-                                last_modified,
-                            )
-
-                            last_item_from_buckets = obj["Key"]
-
-                            continue
-
-                        # NEED TO KEEP THIS other stuff may be include in a __iter__ need only filename
-
-                        # try to find a match pattern
-                        for extract_config in self.s3_config_dict[
-                            config.interface_name
-                        ]:
-                            if self.should_stop_loop:
-                                break
-                            # OPTI : Can download 1 time if two config match
-                            if fnmatch.fnmatch(
-                                file_name.lower(), extract_config.file_pattern.lower()
-                            ):
-                                filepath = os.path.join(
-                                    self.args.working_directory, file_name
-                                )
-                                directory = os.path.dirname(filepath)
-                                # Créer les sous-dossiers nécessaires
-                                os.makedirs(directory, exist_ok=True)
-                                self.logger.debug(
-                                    "Find a match for %s %s (%s)",
-                                    extract_config.interface_name,
-                                    file_name,
-                                    filepath,
-                                )
-
-                                self.s3_resource.download_file(
-                                    bucket, file_name, filepath
-                                )
-
-                                self.extract_from_file(
-                                    filepath,
-                                    extract_config,
-                                    report_name=os.path.basename(filepath),
-                                )
-
-                                self.on_ingest_success(filepath, extract_config)
-                        # After ingestion keep this id in collector ?
-
-                        #
-                        last_item_from_buckets = obj["Key"]
-                else:
-                    need_next = False
-                    self.logger.debug("No objects found in the bucket.")
+                download = None
 
-                journal.tick()
+                if extract_configs:
+                    # download only once for all the matching configurations
+                    download = executor.submit(
+                        self.download_object,
+                        bucket,
+                        obj,
+                        self.can_extract_in_memory(obj, extract_configs),
+                    )
 
-        journal.document.last_date = __iter_end_date
-        journal.document.save(refresh=True)
+                pending.append(
+                    (obj["Key"], extract_configs, download, checkpoint_frozen)
+                )
+
+                while len(pending) > max_pending:
+                    self.extract_object(journal, bucket, *pending.popleft())
+
+            if self.should_stop_loop:
+                break
+
+            journal.tick()
+
+        while pending and not self.should_stop_loop:
+            self.extract_object(journal, bucket, *pending.popleft())
+
+    def list_bucket_pages(
+        self, bucket: str, max_keys: int, start_after: str = None
+    ) -> typing.Iterator[list[dict]]:
+        """List a bucket with continuation tokens
+
+        Args:
+            bucket (str): bucket name
+            max_keys (int): page size
+            start_after (str, optional): start listing after this key. Defaults to None.
+
+        Yields:
+            list[dict]: object descriptions of a page
+        """
+        request = {"Bucket": bucket, "MaxKeys": max_keys}
+
+        if start_after:
+            request["StartAfter"] = start_after
+
+        while True:
+            response = self.s3_resource.list_objects_v2(**request)
+
+            if "Contents" in response:
+                yield response["Contents"]
+            else:
+                self.logger.debug("No objects found in the bucket.")
+
+            if not response.get("IsTruncated"):
+                break
+
+            request["ContinuationToken"] = response["NextContinuationToken"]
+
+    def match_configurations(
+        self, config: S3CollectorConfiguration, key: str
+    ) -> list[S3CollectorConfiguration]:
+        """Find the configurations matching an object key
+
+        Args:
+            config (S3CollectorConfiguration): interface configuration
+            key (str): object key
+
+        Returns:
+            list[S3CollectorConfiguration]: matching configurations
+        """
+        return [
+            extract_config
+            for extract_config in self.s3_config_dict[config.interface_name]
+            if fnmatch.fnmatch(key.lower(), extract_config.file_pattern.lower())
+        ]
+
+    def can_extract_in_memory(
+        self, obj: dict, extract_configs: list[S3CollectorConfiguration]
+    ) -> bool:
+        """Tell if an object can be extracted without writing it to a file
+
+        Args:
+            obj (dict): object description from the listing
+            extract_configs (list[S3CollectorConfiguration]): matching configurations
+
+        Returns:
+            bool: True if the object can be kept in memory
+        """
+        if self.config.keep_files:
+            return False
+
+        # 0 always downloads to files, even empty objects
+        if self.config.in_memory_max_size <= 0:
+            return False
+
+        return obj["Size"] <= self.config.in_memory_max_size and all(
+            self.can_extract_from_memory(extract_config)
+            for extract_config in extract_configs
+        )
+
+    def download_object(
+        self, bucket: str, obj: dict, in_memory: bool
+    ) -> typing.Union[str, InMemoryFile]:
+        """Download an object, called from a worker thread
+
+        Args:
+            bucket (str): bucket name
+            obj (dict): object description from the listing
+            in_memory (bool): do not write the object to the working directory
+
+        Returns:
+            typing.Union[str, InMemoryFile]: downloaded file
+        """
+        file_name = obj["Key"]
+
+        if in_memory:
+            self.logger.debug("Download %s in memory", file_name)
+
+            buffer = InMemoryFile(file_name)
+
+            self.s3_resource.download_fileobj(bucket, file_name, buffer)
+
+            return buffer
+
+        filepath = os.path.join(self.args.working_directory, file_name)
+
+        # Créer les sous-dossiers nécessaires
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+        self.logger.debug("Download %s to %s", file_name, filepath)
+
+        self.s3_resource.download_file(bucket, file_name, filepath)
+
+        return filepath
+
+    def extract_object(
+        self,
+        journal: CollectorJournal,
+        bucket: str,
+        file_name: str,
+        extract_configs: list[S3CollectorConfiguration],
+        download: typing.Optional[Future],
+        checkpoint_frozen: bool,
+    ):
+        """Extract a listed object once downloaded, then move the bucket checkpoint
+
+        Args:
+            journal (CollectorJournal): journal storing the bucket checkpoint
+            bucket (str): bucket name
+            file_name (str): object key
+            extract_configs (list[S3CollectorConfiguration]): matching configurations
+            download (typing.Optional[Future]): download of the object, None if
+                there is nothing to extract
+            checkpoint_frozen (bool): do not move the checkpoint to this object
+        """
+        if download is not None:
+            source = download.result()
+
+            filepath = os.path.join(self.args.working_directory, file_name)
+
+            try:
+                for extract_config in extract_configs:
+                    if self.should_stop_loop:
+                        return
+
+                    self.logger.debug(
+                        "Find a match for %s %s (%s)",
+                        extract_config.interface_name,
+                        file_name,
+                        source,
+                    )
+
+                    self.extract_from_file(
+                        source,
+                        extract_config,
+                        report_name=os.path.basename(file_name),
+                    )
+
+                    self.on_ingest_success(filepath, extract_config)
+            finally:
+                if isinstance(source, str) and not self.config.keep_files:
+                    self.logger.debug("Deleting %s", source)
+                    os.remove(source)
+
+        if not checkpoint_frozen:
+            journal.set_bucket_checkpoint(bucket, file_name)
+
+    @staticmethod
+    def build_s3_client(config: S3CollectorConfiguration):
+        """Create a S3 client, thread safe so it is shared with download workers
+
+        Args:
+            config (S3CollectorConfiguration): interface configuration
+
+        Returns:
+            S3.Client: S3 client
+        """
+        return boto3.client(
+            "s3",
+            endpoint_url=config.s3_endpoint_url,
+            aws_access_key_id=config.s3_access_key,
+            aws_secret_access_key=config.s3_secret_key,
+            config=Config(
+                signature_version=config.s3_signature_version,
+                max_pool_connections=max(config.s3_download_workers, 10),
+            ),
+            region_name=config.s3_region,
+        )
 
     # Template method: child class may override and use argument and self
     # pylint: disable=unused-argument,no-self-use
@@ -440,14 +640,7 @@ class S3Collector(FileCollector, HttpMixin):
         Returns:
             str: Returns OK string if query succeeded
         """
-        s3_resource = boto3.client(
-            "s3",
-            endpoint_url=config.s3_endpoint_url,
-            aws_access_key_id=config.s3_access_key,
-            aws_secret_access_key=config.s3_secret_key,
-            config=Config(signature_version=config.s3_signature_version),
-            region_name=config.s3_region,
-        )
+        s3_resource = cls.build_s3_client(config)
 
         # If this raise error catched by probe executor
         s3_resource.list_objects_v2(
@@ -24,6 +24,8 @@ from maas_collector.rawdata.collector.httpmixin import HttpMixin
 
 from maas_collector.rawdata.collector.http.authentication import build_authentication
 
+from maas_collector.rawdata.extractor.base import InMemoryFile
+
 
 # Désactive la génération automatique de __repr__ pour pouvoir utiliser
 # celui du parent qui masque les données sensible comme les mot de passe
@@ -204,7 +206,7 @@ class WebDAVCollector(FileCollector, HttpMixin):
     def save_in_file_and_extract(
         self, data, report_name, config, iter_callback, report_folder=""
     ):
-        """Save data in file
+        """Extract data from memory, or save data in file when backed up
 
         Args:
             data (bytes|str|dict): Data to safe in file
@@ -215,16 +217,24 @@ class WebDAVCollector(FileCollector, HttpMixin):
             RuntimeError: If extractor crash during extraction
         """
 
-        filepath = os.path.join(
-            self.args.working_directory,
-            report_name,
-        )
+        if self.can_extract_from_memory(config):
+            filepath = None
+
+            source = InMemoryFile.from_data(report_name, data)
+
+        else:
+            filepath = os.path.join(
+                self.args.working_directory,
+                report_name,
+            )
+
+            source = filepath
 
         try:
-            if isinstance(data, bytes):
+            if filepath and isinstance(data, bytes):
                 with open(filepath, "wb") as file_desc:
                     file_desc.write(data)
-            else:
+            elif filepath:
                 with open(filepath, "w", encoding="utf-8") as file_desc:
                     if isinstance(data, dict):
                         json.dump(data, file_desc)
@@ -233,7 +243,7 @@ class WebDAVCollector(FileCollector, HttpMixin):
 
             # force report name as base url
             self.extract_from_file(
-                filepath,
+                source,
                 config,
                 report_name=report_name,
                 report_folder=report_folder,
@@ -248,7 +258,8 @@ class WebDAVCollector(FileCollector, HttpMixin):
 
         finally:
             # Clear file
-            os.remove(filepath)
+            if filepath:
+                os.remove(filepath)
 
     @classmethod
     def probe(cls, config: WebDAVCollectorConfiguration, probe_data):
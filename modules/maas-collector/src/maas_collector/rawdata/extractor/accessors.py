@@ -0,0 +1,218 @@
+"""Compiled accessors for the field paths of the extractors
+
+JSONPath and XPath expressions are evaluated for every field of every extracted
+entity. Simple expressions, made of plain keys, indexes or child tags, are compiled
+once into direct accessors. Other expressions keep the generic evaluation of
+jsonpath_ng or ElementTree.
+"""
+import functools
+import re
+import typing
+import xml.etree.ElementTree as ET
+
+from jsonpath_ng import jsonpath, parse
+
+# value of an accessor when the path does not match
+NOT_FOUND = object()
+
+# a child tag, possibly qualified with a namespace uri
+XML_STEP_PATTERN = re.compile(r"(?:\{[^}]*\})?[^/{}\[\]:*.@()=\s]+")
+
+
+def _get_key(key: str) -> typing.Callable:
+    def get_key(value):
+        try:
+            return value.get(key, NOT_FOUND)
+        except (TypeError, AttributeError):
+            # no field in a list or a scalar
+            return NOT_FOUND
+
+    return get_key
+
+
+def _get_index(index: int) -> typing.Callable:
+    def get_index(value):
+        # integer indexes apply to sequences, not mappings
+        if isinstance(value, dict) or not value:
+            return NOT_FOUND
+
+        try:
+            if -len(value) <= index < len(value):
+                return value[index]
+        except TypeError:
+            pass
+
+        return NOT_FOUND
+
+    return get_index
+
+
+def _get_json_steps(expression) -> typing.Optional[list]:
+    """Get the accessors of each step of a parsed JSONPath expression
+
+    Args:
+        expression: parsed expression
+
+    Returns:
+        typing.Optional[list]: accessors, None if the expression is not simple
+    """
+    if isinstance(expression, (jsonpath.Root, jsonpath.This)):
+        # entities are the roots of their expressions
+        return []
+
+    if isinstance(expression, jsonpath.Child):
+        left = _get_json_steps(expression.left)
+
+        right = _get_json_steps(expression.right)
+
+        if left is None or right is None:
+            return None
+
+        return left + right
+
+    if (
+        type(expression) is jsonpath.Fields
+        and len(expression.fields) == 1
+        and expression.fields[0] not in ("*", jsonpath.auto_id_field)
+    ):
+        return [_get_key(expression.fields[0])]
+
+    if type(expression) is jsonpath.Index:
+        # jsonpath_ng < 1.6 has a single index
+        indices = getattr(expression, "indices", None) or (expression.index,)
+
+        if len(indices) == 1:
+            return [_get_index(indices[0])]
+
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def compile_json_path(
+    path: str, parsing_method: typing.Callable = parse
+) -> typing.Callable[[typing.Any], list]:
+    """Compile a JSONPath expression to a function returning the matching values
+
+    Expressions are cached as extraction configurations share many of them.
+
+    Args:
+        path (str): JSONPath expression
+        parsing_method (typing.Callable, optional): jsonpath_ng parse function.
+            Defaults to parse.
+
+    Returns:
+        typing.Callable[[typing.Any], list]: function returning the values matching
+            the expression in a json content
+    """
+    expression = parsing_method(path)
+
+    steps = _get_json_steps(expression)
+
+    if steps is None:
+        # complex expression evaluated by jsonpath_ng
+        def find_values(json_content):
+            return [node.value for node in expression.find(json_content)]
+
+    elif len(steps) == 1:
+        step = steps[0]
+
+        def find_values(json_content):
+            value = step(json_content)
+
+            return [] if value is NOT_FOUND else [value]
+
+    else:
+
+        def find_values(json_content):
+            value = json_content
+
+            for step in steps:
+                value = step(value)
+
+                if value is NOT_FOUND:
+                    return []
+
+            return [value]
+
+    find_values.expression = expression
+
+    return find_values
+
+
+def split_xml_path(path: str) -> typing.Optional[tuple]:
+    """Split an XPath expression made of child tags
+
+    Args:
+        path (str): XPath expression
+
+    Returns:
+        typing.Optional[tuple]: child tags, None if the expression is not a path of
+            child tags
+    """
+    steps = XML_STEP_PATTERN.findall(path)
+
+    if "/".join(steps) != path:
+        return None
+
+    return tuple(steps)
+
+
+def _find_first(element: ET.Element, tags: tuple) -> typing.Optional[ET.Element]:
+    """Find the first element of a path of child tags in document order"""
+    if len(tags) == 1:
+        return element.find(tags[0])
+
+    for child in element.findall(tags[0]):
+        node = _find_first(child, tags[1:])
+
+        if node is not None:
+            return node
+
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_xml_path(
+    path: str, namespaces: typing.Optional[tuple]
+) -> typing.Callable[[ET.Element], typing.Optional[ET.Element]]:
+    tags = None if namespaces else split_xml_path(path)
+
+    if tags is None:
+        # prefixes, wildcards, predicates or axes are handled by ElementTree
+        namespace_dict = dict(namespaces) if namespaces else None
+
+        return lambda element: element.find(path, namespace_dict)
+
+    if len(tags) == 1:
+        tag = tags[0]
+
+        return lambda element: element.find(tag)
+
+    return lambda element: _find_first(element, tags)
+
+
+def compile_xml_path(
+    path: str, namespaces: dict = None
+) -> typing.Callable[[ET.Element], typing.Optional[ET.Element]]:
+    """Compile an XPath expression to a function returning the first matching
+    element, like Element.find
+
+    Paths of child tags are walked directly, each step using the native lookup of
+    simple tags of ElementTree.
+
+    Args:
+        path (str): XPath expression
+        namespaces (dict, optional): prefix to namespace uri mapping.
+            Defaults to None.
+
+    Returns:
+        typing.Callable[[ET.Element], typing.Optional[ET.Element]]: function
+            returning the first matching element, or None
+    """
+    # prefixes only matter if the path uses them
+    if namespaces and (":" in re.sub(r"\{[^}]*\}", "", path) or "" in namespaces):
+        namespace_items = tuple(sorted(namespaces.items()))
+    else:
+        namespace_items = None
+
+    return _compile_xml_path(path, namespace_items)
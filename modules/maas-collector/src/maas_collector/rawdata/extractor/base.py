@@ -1,9 +1,13 @@
 """Abstract base class for extractor"""
 import abc
+import contextlib
 import datetime
 from dateutil.parser import parse as parse_datetime
+import io
+import json
 import logging
 import hashlib
+import os
 import re
 import typing
 
@@ -23,9 +27,79 @@ def get_hash_func(*fields: str) -> typing.Callable[[list], str]:
     return generate_id
 
 
+class InMemoryFile(io.BytesIO):
+    """A downloaded file kept in memory, named after the file it comes from"""
+
+    def __init__(self, name: str, content: bytes = b"", data: typing.Any = None):
+        super().__init__(content)
+        self.name = name
+
+        # payload already decoded by the collector, serialized only if needed
+        self.data = data
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.name}>"
+
+    @classmethod
+    def from_data(
+        cls, name: str, data: typing.Union[bytes, str, typing.IO, dict, list]
+    ) -> "InMemoryFile":
+        """wrap data collected in memory: raw content, a file-like stream or a
+        decoded json payload"""
+        if isinstance(data, bytes):
+            return cls(name, data)
+
+        if isinstance(data, str):
+            return cls(name, data.encode("UTF-8"))
+
+        if hasattr(data, "read"):
+            return cls.from_data(name, data.read())
+
+        return cls(name, data=data)
+
+    def serialize_data(self):
+        """write the decoded payload as json content if there is no content yet"""
+        if self.data is not None and self.seek(0, io.SEEK_END) == 0:
+            self.write(json.dumps(self.data).encode("UTF-8"))
+
+
+def input_name(path: typing.Union[str, InMemoryFile]) -> str:
+    """get the base name of a file path or of an in-memory file"""
+    return os.path.basename(getattr(path, "name", path))
+
+
+@contextlib.contextmanager
+def open_input(path: typing.Union[str, InMemoryFile], encoding: str = None):
+    """open a file path or rewind an in-memory file, in text mode if an encoding is
+    provided"""
+    if isinstance(path, InMemoryFile):
+        path.serialize_data()
+
+        path.seek(0)
+
+        if encoding is None:
+            yield path
+            return
+
+        text_fd = io.TextIOWrapper(path, encoding=encoding)
+        try:
+            yield text_fd
+        finally:
+            # do not close the in-memory file with the wrapper
+            text_fd.detach()
+        return
+
+    with open(path, "rb" if encoding is None else "r", encoding=encoding) as input_fd:
+        yield input_fd
+
+
 class BaseExtractor(abc.ABC):
     """Base class for data file extraction"""
 
+    # tell if extract() also accepts an InMemoryFile, see InMemoryFile.from_data to
+    # extract bytes, streams or decoded payloads
+    IN_MEMORY = False
+
     def __init__(self, converter_map: dict = None, allow_partial: bool = False):
         """constructor
 
@@ -49,7 +123,9 @@ class BaseExtractor(abc.ABC):
         self.should_stop = True
 
     @abc.abstractmethod
-    def extract(self, path: str, report_folder: str = "") -> typing.Iterator[dict]:
+    def extract(
+        self, path: typing.Union[str, InMemoryFile], report_folder: str = ""
+    ) -> typing.Iterator[dict]:
         """generator method that yields data dictionnary extracted from a file"""
 
     def setup_converter_map(self, converter_map):
@@ -6,7 +6,7 @@ import typing
 
 import chardet
 
-from .base import BaseExtractor
+from .base import BaseExtractor, InMemoryFile, input_name, open_input
 
 
 class CSVExtractor(BaseExtractor):
@@ -17,6 +17,8 @@ class CSVExtractor(BaseExtractor):
     if autodetect_encoding: auto detect file encoding. Defaults to False.
     """
 
+    IN_MEMORY = True
+
     def __init__(
         self,
         attr_map,
@@ -41,14 +43,17 @@ class CSVExtractor(BaseExtractor):
         self.logger.debug("Attempting to auto-detect encoding for %s", path)
 
         # Vérification de la taille du fichier
-        file_size = os.path.getsize(path)
+        if isinstance(path, InMemoryFile):
+            file_size = path.getbuffer().nbytes
+        else:
+            file_size = os.path.getsize(path)
         if file_size == 0:
             self.logger.error("File %s is empty.", path)
             raise ValueError("File is empty.")
 
         # Lire un échantillon pour détecter l'encodage
         sample_size = min(file_size, 5000)
-        with open(path, "rb") as file:
+        with open_input(path) as file:
             raw_data = file.read(sample_size)
 
         detected_encoding = chardet.detect(raw_data).get("encoding", default_encoding)
@@ -58,7 +63,7 @@ class CSVExtractor(BaseExtractor):
     def extract(self, path, report_folder: str = "") -> typing.Iterator[dict]:
         """override"""
 
-        basepath = os.path.basename(path)
+        basepath = input_name(path)
         encoding = "utf-8-sig"
         if self.autodetect_encoding:
             encoding = self.detect_file_encoding(path, default_encoding=encoding)
@@ -72,7 +77,7 @@ class CSVExtractor(BaseExtractor):
             else self._extract_with_reader
         )
 
-        with open(path, encoding=encoding) as input_fd:
+        with open_input(path, encoding=encoding) as input_fd:
 
             # automatically setup the csv dialect
             reader_kwargs = {}
@@ -1,11 +1,11 @@
 """JSON extractor implementation """
 import json
-import os
 import typing
 
 from jsonpath_ng import parse
 
-from .base import BaseExtractor
+from .accessors import compile_json_path
+from .base import BaseExtractor, input_name, open_input
 
 
 class JSONExtractor(BaseExtractor):
@@ -16,6 +16,8 @@ class JSONExtractor(BaseExtractor):
     Provide similar iteration mecanism like XML extractor
     """
 
+    IN_MEMORY = True
+
     def __init__(
         self,
         attr_map: dict,
@@ -62,20 +64,22 @@ class JSONExtractor(BaseExtractor):
         Returns:
             [function]: callable function
         """
-        # parse the JSONPath expression
-        jp_expr = parsing_method(jp_value)
+        # compile the JSONPath expression, simple paths skip jsonpath_ng evaluation
+        find_values = compile_json_path(jp_value, parsing_method)
 
         def func(json_content):
-            result = jp_expr.find(json_content)
+            result = find_values(json_content)
 
             if len(result) == 0:
-                raise IndexError(f"JSONPath {jp_expr} returned no value.")
+                raise IndexError(
+                    f"JSONPath {find_values.expression} returned no value."
+                )
 
             if len(result) == 1:
-                value = result[0].value
+                value = result[0]
 
             else:
-                value = [node.value for node in result]
+                value = result
 
             return value
 
@@ -84,8 +88,11 @@ class JSONExtractor(BaseExtractor):
     def extract(self, path: str, report_folder: str = "") -> typing.Iterator[dict]:
         """override"""
 
-        with open(path, encoding="UTF-8") as json_fd:
-            json_content = json.load(json_fd)
+        json_content = getattr(path, "data", None)
+
+        if json_content is None:
+            with open_input(path, encoding="UTF-8") as json_fd:
+                json_content = json.load(json_fd)
 
         if self.iterate_nodes:
             nodes = self.iterate_nodes(json_content)[0].value
@@ -93,7 +100,7 @@ class JSONExtractor(BaseExtractor):
             # single entity
             nodes = [json_content]
 
-        basepath = os.path.basename(path)
+        basepath = input_name(path)
 
         for node_content in nodes:
             if self.should_stop:
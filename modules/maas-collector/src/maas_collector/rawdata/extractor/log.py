@@ -1,14 +1,15 @@
 """LogExtractor implementation"""
-import os
 import re
 import typing
 
-from .base import BaseExtractor
+from .base import BaseExtractor, input_name, open_input
 
 
 class LogExtractor(BaseExtractor):
     """read log text file line per line and extract data using regular expression from one line"""
 
+    IN_MEMORY = True
+
     def __init__(self, pattern, converter_map: dict = None):
         super().__init__(converter_map=converter_map)
         self.regex = re.compile(pattern)
@@ -16,9 +17,9 @@ class LogExtractor(BaseExtractor):
     def extract(self, path, report_folder: str = "") -> typing.Iterator[dict]:
         """override"""
 
-        basepath = os.path.basename(path)
+        basepath = input_name(path)
 
-        with open(path, encoding="UTF-8") as input_fd:
+        with open_input(path, encoding="UTF-8") as input_fd:
 
             for line in input_fd:
 
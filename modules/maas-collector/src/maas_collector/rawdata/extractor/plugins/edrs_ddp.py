@@ -19,6 +19,9 @@ from maas_collector.rawdata.extractor.xml import XMLExtractor
 class EdrsDdpExtractor(XMLExtractor):
     """Custum DDP DSIB extractor for EDRS"""
 
+    # the raw data file may be written back
+    IN_MEMORY = False
+
     def extract(
         self, path: str, report_folder: str = "", modify_rawdata=True
     ) -> Iterator[dict]:
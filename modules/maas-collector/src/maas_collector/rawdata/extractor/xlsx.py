@@ -1,10 +1,9 @@
 """Xlsx extractor implementation"""
-import os
 import typing
 import xlrd3
 
 
-from .base import BaseExtractor
+from .base import BaseExtractor, InMemoryFile, input_name
 
 
 class XLSXExtractor(BaseExtractor):
@@ -12,6 +11,8 @@ class XLSXExtractor(BaseExtractor):
     extract data from xlsx files mapping extracted data attributes.
     """
 
+    IN_MEMORY = True
+
     def __init__(
         self,
         attr_map: dict,
@@ -26,12 +27,20 @@ class XLSXExtractor(BaseExtractor):
 
         self.sheet_id = sheet_id
 
+    @staticmethod
+    def open_workbook(path):
+        """open a workbook from a file path or from an in-memory file"""
+        if isinstance(path, InMemoryFile):
+            return xlrd3.open_workbook(file_contents=path.getvalue())
+
+        return xlrd3.open_workbook(path)
+
     def extract(self, path: str, report_folder: str = "") -> typing.Iterator[dict]:
         """override"""
 
-        basepath = os.path.basename(path)
+        basepath = input_name(path)
 
-        workbook = xlrd3.open_workbook(path)
+        workbook = self.open_workbook(path)
 
         if isinstance(self.sheet_id, int):
             sheet = workbook.sheet_by_index(self.sheet_id)
@@ -278,9 +287,9 @@ class XLSXColumnExtractor(XLSXExtractor):
     def extract(self, path: str, report_folder: str = "") -> typing.Iterator[dict]:
         """override"""
 
-        basepath = os.path.basename(path)
+        basepath = input_name(path)
 
-        workbook = xlrd3.open_workbook(path)
+        workbook = self.open_workbook(path)
 
         if isinstance(self.sheet_id, (int, str)):
             sheet = workbook.sheet_by_index(self.sheet_id)
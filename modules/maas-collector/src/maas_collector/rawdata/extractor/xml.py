@@ -1,16 +1,21 @@
 """XMLExtractor implementation"""
-import os
 import typing
 import xml.etree.ElementTree as ET
 
-from .base import BaseExtractor
+from .accessors import compile_xml_path, split_xml_path
+from .base import BaseExtractor, input_name, open_input
 
 
 class XMLExtractor(BaseExtractor):
     """
     extract data from xml files mapping extracted data attributes with xpath expression.
+
+    In streaming mode, the file is parsed incrementally: each element matching
+    iterate_nodes is extracted as soon as it is parsed, then released.
     """
 
+    IN_MEMORY = True
+
     # yes, extractors need many arguments
     # pylint: disable=R0913
     def __init__(
@@ -21,21 +26,37 @@ class XMLExtractor(BaseExtractor):
         allow_partial: bool = False,
         default_namespace: str = None,
         namespace_map: dict = None,
+        streaming: bool = False,
     ):
         super().__init__(converter_map=converter_map, allow_partial=allow_partial)
         self.attr_map = {}
         self.default_namespace = default_namespace
         self.namespace_map = namespace_map
 
+        # child tags from the root to the elements to extract in streaming mode
+        self.streaming_tags = None
+
         # populate attr_map with callable values
         for name, value in attr_map.items():
             self.attr_map[name] = self._get_xml_mapper_func(name, value)
 
+        # configured value, before the conversion of a path
+        configured_iterate_nodes = iterate_nodes
+
         if isinstance(iterate_nodes, str):
             # convert path to findall lambda
             path = self._path_with_ns(None, iterate_nodes)
             iterate_nodes = lambda root: root.findall(path)
 
+            if streaming:
+                self.streaming_tags = split_xml_path(path)
+
+        if streaming and not self.streaming_tags:
+            raise ValueError(
+                "Streaming needs iterate_nodes as a path of child tags: "
+                f"{configured_iterate_nodes}"
+            )
+
         self.iterate_nodes = iterate_nodes
 
     def _path_with_ns(self, name: str, path: str) -> str:
@@ -72,12 +93,14 @@ class XMLExtractor(BaseExtractor):
             # node text content
             path = self._path_with_ns(name, value)
 
+            find = compile_xml_path(path, self.namespace_map)
+
             def findtext(element):
-                value = element.findtext(path, namespaces=self.namespace_map)
-                if value is None:
+                node = find(element)
+                if node is None:
                     raise ValueError(f"{path} returned None")
 
-                return value
+                return node.text or ""
 
             func = findtext
 
@@ -88,8 +111,10 @@ class XMLExtractor(BaseExtractor):
                 if "path" in value:
                     path = self._path_with_ns(name, value["path"])
 
+                    find = compile_xml_path(path)
+
                     def findattr(element):
-                        node = element.find(path)
+                        node = find(element)
                         if node is None:
                             msg = (
                                 f"Node {path} does not exist. "
@@ -128,7 +153,20 @@ class XMLExtractor(BaseExtractor):
 
     def extract(self, path: str, report_folder: str = "") -> typing.Iterator[dict]:
         """override"""
-        tree = ET.parse(path)
+        basepath = input_name(path)
+
+        if self.streaming_tags:
+            with open_input(path) as input_fd:
+                for element in self._iterparse_nodes(input_fd):
+                    if self.should_stop:
+                        break
+
+                    yield self._extract_element(element, basepath)
+
+            return
+
+        with open_input(path) as input_fd:
+            tree = ET.parse(input_fd)
 
         root = tree.getroot()
 
@@ -138,30 +176,80 @@ class XMLExtractor(BaseExtractor):
             # single entity
             nodes = [root]
 
-        basepath = os.path.basename(path)
-
         for element in nodes:
 
             if self.should_stop:
                 break
 
-            extract_dict = {"reportName": basepath}
+            yield self._extract_element(element, basepath)
+
+    def _iterparse_nodes(self, input_fd: typing.IO) -> typing.Iterator[ET.Element]:
+        """Parse a file incrementally, yielding the complete elements matching the
+        streaming tags and releasing them and the elements around them once used
+
+        Args:
+            input_fd (typing.IO): binary file object
+
+        Yields:
+            ET.Element: element to extract
+        """
+        tags = self.streaming_tags
+
+        depth = len(tags)
+
+        # open elements, from the root
+        ancestors = []
+
+        for event, element in ET.iterparse(input_fd, events=("start", "end")):
+            if event == "start":
+                ancestors.append(element)
+                continue
+
+            ancestors.pop()
+
+            if len(ancestors) > depth or not ancestors:
+                # inside an element to extract, or the root
+                continue
+
+            if (
+                len(ancestors) == depth
+                and element.tag == tags[-1]
+                and all(
+                    ancestor.tag == tag for ancestor, tag in zip(ancestors[1:], tags)
+                )
+            ):
+                yield element
+
+            # all the children of the parent are closed and used
+            del ancestors[-1][:]
+
+    def _extract_element(self, element: ET.Element, basepath: str) -> dict:
+        """Extract the fields of an element
+
+        Args:
+            element (ET.Element): element of an entity
+            basepath (str): report name
+
+        Returns:
+            dict: extracted fields
+        """
+        extract_dict = {"reportName": basepath}
 
-            for name, func in self.attr_map.items():
+        for name, func in self.attr_map.items():
 
-                try:
-                    extract_dict[name] = func(element)
-                # catch broad exception to allow partial extraction if necessary
-                # pylint: disable=W0703
-                except Exception as error:
-                    if not self.allow_partial:
-                        self.logger.critical(
-                            "Can not extract field %s from %s", name, element.tag
-                        )
-                        raise error
+            try:
+                extract_dict[name] = func(element)
+            # catch broad exception to allow partial extraction if necessary
+            # pylint: disable=W0703
+            except Exception as error:
+                if not self.allow_partial:
+                    self.logger.critical(
+                        "Can not extract field %s from %s", name, element.tag
+                    )
+                    raise error
 
-                    extract_dict[name] = None
+                extract_dict[name] = None
 
-                    self.logger.debug("Partial extract: field %s not yet present", name)
+                self.logger.debug("Partial extract: field %s not yet present", name)
 
-            yield extract_dict
+        return extract_dict
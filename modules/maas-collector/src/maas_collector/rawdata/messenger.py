@@ -1,23 +1,86 @@
 """Message bus tools"""
+from collections import deque
 import dataclasses
 import json
 import logging
-from typing import Dict
+from typing import Dict, List
 import socket
 
 
+from amqp import spec
+from amqp.exceptions import MessageNacked
 from kombu import BrokerConnection, Producer
 from kombu.common import maybe_declare
 
 from maas_model import MAASMessage
 
 from maas_collector.queues.queues import PUBLISH_EXCHANGE
+from maas_collector.rawdata.publisher import (
+    BackgroundPublisher,
+    PendingMessage,
+    PublisherStats,
+)
+
+
+class MessageGroup:
+    """Document identifiers of a model waiting to be sent on a routing key
+
+    Identifiers are kept with the index of their document, so each message carries
+    the indices of its own documents only.
+    """
+
+    def __init__(self):
+        # (document identifier, index or None) in arrival order
+        self.entries = deque()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def append(self, document_id: str, index: str | None = None):
+        """Add a document identifier to the group
+
+        Args:
+            document_id (str): document identifier
+            index (str | None, optional): document index. Defaults to None.
+        """
+        self.entries.append((document_id, index))
+
+    def pop_chunk(self, size: int | None = None) -> tuple[list, list]:
+        """Remove the oldest document identifiers of the group
+
+        Args:
+            size (int | None, optional): maximum number of identifiers.
+                Defaults to None for all.
+
+        Returns:
+            tuple[list, list]: document identifiers and their distinct indices
+        """
+        if size is None or size > len(self.entries):
+            size = len(self.entries)
+
+        document_ids = []
+
+        # insertion ordered set
+        document_indices = {}
+
+        for _ in range(size):
+            document_id, index = self.entries.popleft()
+
+            document_ids.append(document_id)
+
+            if index is not None:
+                document_indices[index] = None
+
+        return document_ids, list(document_indices)
 
 
 class Messenger:
     """
     Messenger encapsulates collector message emitting using groups
 
+    With a publish queue size, messages are published in background by batches
+    whose publisher confirms are awaited together, and spilled to a journal file if
+    the message bus is unavailable.
     """
 
     def __init__(
@@ -27,6 +90,10 @@ class Messenger:
         priority: int = 0,
         max_retries: int = 0,
         pipeline_name: str = "Collector",
+        publish_queue_size: int = 0,
+        publish_batch_size: int = 100,
+        journal_path: str = "",
+        confirm_timeout: float = 30,
     ):
         self.logger: logging.Logger = logging.getLogger(pipeline_name)
 
@@ -51,8 +118,52 @@ class Messenger:
         # message group configuration
         self.chunk_config: Dict[str, int] = {}
 
-        # grouped messages
-        self.message_groups = {}
+        # grouped messages: routing key => model name => MessageGroup
+        self.message_groups: Dict[str, Dict[str, MessageGroup]] = {}
+
+        # number of document identifiers in the message groups
+        self._pending_count = 0
+
+        # seconds to wait for the publisher confirms of a batch
+        self.confirm_timeout = confirm_timeout
+
+        # channel with publisher confirms enabled and its last delivery tag
+        self._confirm_channel = None
+
+        self._delivery_tag = 0
+
+        # background publishing, None to publish synchronously
+        self._publisher: BackgroundPublisher | None = None
+
+        if publish_queue_size > 0:
+            if not journal_path:
+                # failed batches would be dropped while the collector journal moves on
+                raise ValueError(
+                    "A journal path is required to publish messages in background"
+                )
+
+            self._publisher = BackgroundPublisher(
+                self._publish_batch,
+                self._close_connection,
+                queue_size=publish_queue_size,
+                batch_size=publish_batch_size,
+                journal_path=journal_path,
+                logger=self.logger,
+            )
+
+    @property
+    def stats(self) -> PublisherStats:
+        """Background publishing statistics
+
+        Returns:
+            PublisherStats: statistics, None if messages are published synchronously
+        """
+        return self._publisher.stats if self._publisher else None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of messages waiting to be published in background"""
+        return self._publisher.queue_depth if self._publisher else 0
 
     @property
     def connection(self) -> BrokerConnection:
@@ -156,68 +267,81 @@ class Messenger:
 
         # get the message group for the routing key
         if config.routing_key in self.message_groups:
-            group = self.message_groups[config.routing_key]
+            groups = self.message_groups[config.routing_key]
         else:
-            group = self.message_groups[config.routing_key] = {}
-
-        # get the document identifier and index list for the model
-        if config.model_name in group:
-            info = group[config.model_name]
+            groups = self.message_groups[config.routing_key] = {}
 
+        # get the document identifier and index group for the model
+        if config.model_name in groups:
+            group = groups[config.model_name]
         else:
-            info = group[config.model_name] = {}
-            info["document_ids"] = []
-            info["document_indices"] = []
+            group = groups[config.model_name] = MessageGroup()
 
-        info["document_ids"].append(document_id)
+        group.append(document_id, index)
 
-        if index is not None and index not in info["document_indices"]:
-            info["document_indices"].append(index)
+        self._pending_count += 1
 
         # send messages by chunk depending the configuration
-        while len(info["document_ids"]) >= chunk_size:
+        while len(group) >= chunk_size:
             self.logger.debug(
                 "%s buffer has reach %d limit, sending payload",
                 config.routing_key,
                 chunk_size,
             )
 
-            # send the chunk
-            self.send_to_queue(
-                config.routing_key,
-                MAASMessage(
-                    document_class=config.model_name,
-                    document_ids=info["document_ids"][:chunk_size],
-                    document_indices=info["document_indices"][:chunk_size],
-                    pipeline=[self.pipeline_name],
-                ),
+            # remove and send the chunk
+            self._send_group_chunk(
+                config.routing_key, config.model_name, group, chunk_size
             )
 
-            # remove the chunk
-            del info["document_ids"][:chunk_size]
-            del info["document_indices"][:chunk_size]
-
     def flush_message_groups(self):
-        """clear the document identifier cache"""
-        for routing_key, group in self.message_groups.items():
-            for model_name, info in group.items():
+        """clear the document identifier cache and wait for messages to be published
+        in background"""
+        for routing_key, groups in self.message_groups.items():
+            for model_name, group in groups.items():
                 # filter empty identifier list
-
-                if not info["document_ids"]:
+                if not group:
                     continue
 
-                self.send_to_queue(
-                    routing_key,
-                    MAASMessage(
-                        document_class=model_name,
-                        document_ids=info["document_ids"],
-                        document_indices=info["document_indices"],
-                        pipeline=[self.pipeline_name],
-                    ),
-                )
+                self._send_group_chunk(routing_key, model_name, group)
 
         self.message_groups.clear()
 
+        self._pending_count = 0
+
+        if self._publisher:
+            self._publisher.flush()
+
+    def _send_group_chunk(
+        self,
+        routing_key: str,
+        model_name: str,
+        group: MessageGroup,
+        chunk_size: int | None = None,
+    ):
+        """Send the oldest document identifiers of a message group
+
+        Args:
+            routing_key (str): routing key on the publishing exchange
+            model_name (str): document class name
+            group (MessageGroup): message group
+            chunk_size (int | None, optional): maximum number of identifiers.
+                Defaults to None for the whole group.
+        """
+        document_ids, document_indices = group.pop_chunk(chunk_size)
+
+        self._pending_count -= len(document_ids)
+
+        self.send_to_queue(
+            routing_key,
+            MAASMessage(
+                document_class=model_name,
+                document_ids=document_ids,
+                document_indices=document_indices,
+                pipeline=[self.pipeline_name],
+            ),
+        )
+
     def send_to_queue(self, routing_key: str, payload: MAASMessage):
         """send creation / update message to rabbitmq
 
@@ -234,26 +358,45 @@ class Messenger:
         else:
             body = dataclasses.asdict(payload)
 
+        self.logger.debug("Message body: %s", body)
+
+        message = PendingMessage(
+            routing_key=routing_key,
+            body=json.dumps(body),
+            message_id=payload.message_id,
+            document_class=payload.document_class,
+            document_count=len(payload.document_ids),
+        )
+
+        if self._publisher:
+            self._publisher.submit(message)
+        else:
+            self._publish_message(message, retry=True)
+
+    def _publish_message(self, message: PendingMessage, retry=False):
+        """Publish a serialized message
+
+        Args:
+            message (PendingMessage): message to publish
+            retry (bool, optional): retry following the retry policy.
+                Defaults to False.
+        """
         self.logger.info(
             "MSG %s PUBLISHING TO %s/%s",
-            payload.message_id,
+            message.message_id,
             PUBLISH_EXCHANGE.name,
-            routing_key,
+            message.routing_key,
         )
 
-        self.logger.debug("Message body: %s", body)
-
-        json_body = json.dumps(body)
-
         try:
             self.producer.publish(
-                json_body,
+                message.body,
                 content_type="application/json",
                 exchange=PUBLISH_EXCHANGE,
-                routing_key=routing_key,
+                routing_key=message.routing_key,
                 delivery_mode="persistent",
                 mandatory=True,
-                retry=True,
+                retry=retry,
                 priority=self.priority,
                 retry_policy={
                     "interval_start": 0,  # First retry immediately,
@@ -264,31 +407,95 @@ class Messenger:
             )
             self.logger.info(
                 "MSG %s PUBLISHED TO %s/%s %d %s",
-                payload.message_id,
+                message.message_id,
                 PUBLISH_EXCHANGE.name,
-                routing_key,
-                len(payload.document_ids),
-                payload.document_class,
+                message.routing_key,
+                message.document_count,
+                message.document_class,
             )
         except Exception as error:
             self.logger.error(
                 "MSG %s FAILED TO PUBLISH TO %s/%s %d %s (%s)",
-                payload.message_id,
+                message.message_id,
                 PUBLISH_EXCHANGE.name,
-                routing_key,
-                len(payload.document_ids),
-                payload.document_class,
+                message.routing_key,
+                message.document_count,
+                message.document_class,
                 error,
             )
-            self.logger.error(
-                "MSG %s UNPUBLISHED on %s/%s PAYLOAD %s",
-                payload.message_id,
-                PUBLISH_EXCHANGE.name,
-                routing_key,
-                json_body,
-            )
+            if not self._publisher:
+                # background publisher journals the message instead
+                self.logger.error(
+                    "MSG %s UNPUBLISHED on %s/%s PAYLOAD %s",
+                    message.message_id,
+                    PUBLISH_EXCHANGE.name,
+                    message.routing_key,
+                    message.body,
+                )
             raise error
 
+    def _publish_batch(self, messages: List[PendingMessage]):
+        """Publish messages then wait for all their publisher confirms, called from
+        the background publisher thread
+
+        Args:
+            messages (List[PendingMessage]): messages to publish
+
+        Raises:
+            MessageNacked: if the broker refused a message
+        """
+        confirms = self._select_confirms()
+
+        for message in messages:
+            self._publish_message(message)
+
+            self._delivery_tag += 1
+
+        if confirms:
+            self._wait_confirms()
+
+    def _select_confirms(self) -> bool:
+        """Enable publisher confirms on the producer channel
+
+        Returns:
+            bool: False if the transport has no publisher confirms
+        """
+        channel = self.producer.channel
+
+        if not hasattr(channel, "confirm_select"):
+            # in-memory transport for instance
+            return False
+
+        if channel is not self._confirm_channel:
+            channel.confirm_select()
+
+            # delivery tags restart with a new channel
+            self._confirm_channel = channel
+
+            self._delivery_tag = 0
+
+        return True
+
+    def _wait_confirms(self):
+        """Wait for the broker to confirm all the messages published on the channel"""
+        confirmed_tag = 0
+
+        def on_confirm(method, delivery_tag, *args):
+            nonlocal confirmed_tag
+
+            if method == spec.Basic.Nack:
+                raise MessageNacked(f"Message {delivery_tag} refused by the broker")
+
+            # acknowledgements may cover all the previous delivery tags
+            confirmed_tag = max(confirmed_tag, delivery_tag)
+
+        while confirmed_tag < self._delivery_tag:
+            self._confirm_channel.wait(
+                [spec.Basic.Ack, spec.Basic.Nack],
+                callback=on_confirm,
+                timeout=self.confirm_timeout,
+            )
+
     def _on_return(self, exception, exchange, routing_key, message):
         """Error callback for message publishing
 
@@ -313,6 +520,16 @@ class Messenger:
 
         Close resources
         """
+        if self._publisher:
+            # publish the queued and journaled messages before closing
+            self._publisher.stop()
+
+        self._close_connection()
+
+    def _close_connection(self):
+        """Close the message bus connection, built again on next publication"""
+        self._confirm_channel = None
+
         for symbol in ["_producer", "_connection"]:
             value = getattr(self, symbol)
             if value is not None:
@@ -328,10 +545,4 @@ class Messenger:
                     setattr(self, symbol, None)
 
     def __len__(self):
-        return sum(
-            [
-                len(info["document_ids"])
-                for info in [group.values() for group in self.message_groups.values()]
-                if info and "document_ids" in info
-            ]
-        )
+        return self._pending_count
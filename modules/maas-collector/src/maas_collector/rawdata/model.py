@@ -1,5 +1,9 @@
 """opensearch model classes for raw database"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import datetime
+import hashlib
+import json
 import logging
 
 
@@ -9,17 +13,31 @@ from maas_collector.rawdata.meta import IngestionMeta
 
 
 class ActionIterator:
-    """Encapsulate Elastic search action building to feed bulk actions"""
+    """Encapsulate Elastic search action building to feed bulk actions
+
+    Extracted data is processed by chunks: existing documents of a chunk are fetched
+    with a single multiple get. The multiple gets run in a background thread: up to
+    prefetch_depth chunks ahead are fetched while the consumer thread extracts the
+    next chunks and the bulk consumes the actions of the current one.
+
+    The hash of each data extract is stored in its document: an existing document
+    having the same hash is unmodified without being deserialized, cleaned and
+    serialized again.
+    """
+
+    # fields not taken into account to detect modifications
+    IGNORED_CONTENT_FIELDS = ("reportName", "contentHash")
 
     def __init__(
         self,
         path: str,
         config,
         force_update=False,
-        chunk_size=1000,  # FIXME magic number
+        chunk_size=1000,
         report_name="",
         report_folder="",
         iter_callback=None,
+        prefetch_depth=1,
     ):
         self.logger = logging.getLogger(self.__class__.__name__)
 
@@ -31,6 +49,9 @@ class ActionIterator:
 
         self.chunk_size = chunk_size
 
+        # number of chunks fetched ahead of the processed chunk, 0 to disable
+        self.prefetch_depth = prefetch_depth
+
         self.report_name = report_name
 
         self.report_folder = report_folder
@@ -55,9 +76,10 @@ class ActionIterator:
         self.has_partial = False
 
         # handle metadata
-        self.meta = IngestionMeta(config, path)
+        self.meta = IngestionMeta(config, path if isinstance(path, str) else "")
 
-        self.has_meta_file = self.meta.has_meta_file(path)
+        # in-memory files have no meta data file
+        self.has_meta_file = isinstance(path, str) and self.meta.has_meta_file(path)
 
     def execute_callback(self, indexname: str, identifier: str):
         """Execute iteration callback.
@@ -96,6 +118,28 @@ class ActionIterator:
         self.should_stop = True
         self.config.extractor.stop()
 
+    @classmethod
+    def get_content_hash(cls, data_extract: dict) -> str:
+        """Compute a stable hash of a data extract
+
+        Args:
+            data_extract (dict): extracted dictionnary
+
+        Returns:
+            str: hexadecimal digest, independent of the order of the fields
+        """
+        content = {
+            name: value
+            for name, value in data_extract.items()
+            if name not in cls.IGNORED_CONTENT_FIELDS
+        }
+
+        serialized = json.dumps(
+            content, sort_keys=True, separators=(",", ":"), default=str
+        )
+
+        return hashlib.blake2b(serialized.encode("UTF-8"), digest_size=16).hexdigest()
+
     def process_document(self, document_id, data_extract, document) -> dict:
         """Insert, update or do nothing
 
@@ -107,6 +151,10 @@ class ActionIterator:
         Returns:
             dict: bulk action ready dictionnary
         """
+        content_hash = self.get_content_hash(data_extract)
+
+        data_extract["contentHash"] = content_hash
+
         if document is None:
             # new document
             document = self.config.model(**data_extract)
@@ -125,6 +173,18 @@ class ActionIterator:
             )
 
             document_dict["_index"] = document.partition_index_name
+
+        elif (
+            getattr(document, "contentHash", None) == content_hash
+            and not self.force_update
+        ):
+            # same extracted data as the stored document
+            self.logger.debug("No need to update %s", document_id)
+
+            self.unmodified_ids.append(document_id)
+
+            document_dict = None
+
         else:
             # store existing dict for later comparison
             existing_dict = document.to_dict(include_meta=True)
@@ -143,9 +203,12 @@ class ActionIterator:
             # then compare with original.
             # this allows additionnal fields to exist in the index
             # remove reportName for comparison because of variable names of api payload
-            source_compare_dict = document_dict["_source"].copy()
-
-            del source_compare_dict["reportName"]
+            # and contentHash as documents ingested before it was introduced miss it
+            source_compare_dict = {
+                name: value
+                for name, value in document_dict["_source"].items()
+                if name not in self.IGNORED_CONTENT_FIELDS
+            }
 
             if (
                 existing_dict["_source"] | source_compare_dict
@@ -156,7 +219,13 @@ class ActionIterator:
                 self.unmodified_ids.append(document_id)
 
                 if not self.force_update:
-                    document_dict = None
+                    # only store the hash so the next collection takes the short path
+                    document_dict = {
+                        "_op_type": "update",
+                        "_index": document_dict["_index"],
+                        "_id": document_dict["_id"],
+                        "doc": {"contentHash": content_hash},
+                    }
 
             else:
                 # update ingestionTime directly in the dict after comparison
@@ -171,23 +240,44 @@ class ActionIterator:
 
         return document_dict
 
-    def process_chunk(self, data_chunk: list[dict]):
+    def fetch_documents(self, document_ids: list[str]) -> list:
+        """Get the existing documents of a chunk, called from the prefetch thread
+
+        Args:
+            document_ids (list[str]): identifiers of the chunk
+
+        Returns:
+            list: existing documents, None for new documents
+        """
+        return self.config.model.mget_by_ids(document_ids, ignore_missing_index=True)
+
+    def process_chunk(self, data_chunk: list[dict], document_ids=None, documents=None):
         """Ingest a list of extracted data
 
         Args:
             data_chunk (list[dict]): list of data extract
+            document_ids (list[str], optional): identifiers of the data extracts.
+                Defaults to None to compute them.
+            documents (list, optional): existing documents already fetched.
+                Defaults to None to fetch them.
 
         Yields:
             [dict]: opensearch document
         """
 
-        # list of identifiers for multiple get
-        document_ids = [self.get_data_id(data_extract) for data_extract in data_chunk]
+        if document_ids is None:
+            # list of identifiers for multiple get
+            document_ids = [
+                self.get_data_id(data_extract) for data_extract in data_chunk
+            ]
+
+        if documents is None:
+            documents = self.fetch_documents(document_ids)
 
         for document_id, data_extract, document in zip(
             document_ids,
             data_chunk,
-            self.config.model.mget_by_ids(document_ids, ignore_missing_index=True),
+            documents,
         ):
             try:
                 document_dict = self.process_document(
@@ -210,7 +300,11 @@ class ActionIterator:
                     # for production
                     self.logger.warning("%s %s", self.path, str(error))
             else:
-                if document_dict is not None:
+                if document_dict is None:
+                    continue
+
+                # content hash of an unmodified document is not a publication
+                if document_dict.get("_op_type") != "update":
                     if self.has_meta_file:
                         self.meta.populate(document_dict)
 
@@ -219,9 +313,14 @@ class ActionIterator:
 
                     self.document_count += 1
 
-                    yield document_dict
+                yield document_dict
 
-    def __iter__(self):
+    def iter_chunks(self):
+        """Group extracted data by chunks
+
+        Yields:
+            list[dict]: data extracts
+        """
         data_chunk = []
 
         for data_extract in self.config.extractor.extract(
@@ -243,22 +342,69 @@ class ActionIterator:
             data_chunk.append(data_extract)
 
             if len(data_chunk) == self.chunk_size:
-                # process chunk
-                for document_dict in self.process_chunk(data_chunk):
-                    if self.should_stop:
-                        break
+                yield data_chunk
 
-                    yield document_dict
-
-                data_chunk.clear()
+                data_chunk = []
 
         if data_chunk:
             # flush remaining
-            for document_dict in self.process_chunk(data_chunk):
+            yield data_chunk
+
+    def __iter__(self):
+        # chunks waiting to be processed: (data chunk, identifiers, fetch)
+        pending_chunks = deque()
+
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ActionIteratorPrefetch"
+        )
+
+        try:
+            for data_chunk in self.iter_chunks():
+                document_ids = [
+                    self.get_data_id(data_extract) for data_extract in data_chunk
+                ]
+
+                pending_chunks.append(
+                    (
+                        data_chunk,
+                        document_ids,
+                        executor.submit(self.fetch_documents, document_ids),
+                    )
+                )
+
+                if len(pending_chunks) <= self.prefetch_depth:
+                    # keep extracting while the documents are fetched
+                    continue
+
+                yield from self._process_pending_chunk(pending_chunks.popleft())
+
                 if self.should_stop:
                     break
 
-                yield document_dict
+            while pending_chunks and not self.should_stop:
+                yield from self._process_pending_chunk(pending_chunks.popleft())
+
+        finally:
+            executor.shutdown(cancel_futures=True)
 
         if self.config.store_meta and not self.has_meta_file:
             self.meta.dump(self.path)
+
+    def _process_pending_chunk(self, pending_chunk: tuple):
+        """Process a chunk once its documents are fetched
+
+        Args:
+            pending_chunk (tuple): data chunk, identifiers and fetch future
+
+        Yields:
+            [dict]: opensearch document
+        """
+        data_chunk, document_ids, fetch = pending_chunk
+
+        for document_dict in self.process_chunk(
+            data_chunk, document_ids, fetch.result()
+        ):
+            if self.should_stop:
+                break
+
+            yield document_dict
@@ -0,0 +1,286 @@
+"""Background publishing of collector messages
+
+Messages are published by a background thread from a bounded queue so a slow
+message bus does not stall database ingestion. Messages that cannot be published are
+spilled to a journal file and published again once the message bus is back.
+"""
+import dataclasses
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import typing
+
+
+@dataclasses.dataclass
+class PendingMessage:
+    """A serialized message waiting to be published"""
+
+    routing_key: str
+
+    body: str
+
+    message_id: str
+
+    document_class: str
+
+    document_count: int
+
+
+@dataclasses.dataclass
+class PublisherStats:
+    """dataclass for background publishing statistics"""
+
+    # number of messages waiting in the publish queue
+    queue_depth: int = 0
+
+    published: int = 0
+
+    journaled: int = 0
+
+    replayed: int = 0
+
+    # seconds to get the publisher confirms of the last published batch
+    last_confirm_latency: float = 0.0
+
+    max_confirm_latency: float = 0.0
+
+
+class MessageJournal:
+    """Append-only file of unpublished messages, one json object per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __bool__(self):
+        return os.path.exists(self.path)
+
+    def append(self, messages: typing.List[PendingMessage]):
+        """Write messages at the end of the journal
+
+        Args:
+            messages (typing.List[PendingMessage]): unpublished messages
+        """
+        with open(self.path, "a", encoding="UTF-8") as journal_fd:
+            for message in messages:
+                journal_fd.write(json.dumps(dataclasses.asdict(message)) + "\n")
+
+            journal_fd.flush()
+
+            os.fsync(journal_fd.fileno())
+
+    def read(self) -> typing.List[PendingMessage]:
+        """Load the journaled messages
+
+        Returns:
+            typing.List[PendingMessage]: messages in publication order
+        """
+        with open(self.path, "r", encoding="UTF-8") as journal_fd:
+            return [
+                PendingMessage(**json.loads(line))
+                for line in journal_fd
+                if line.strip()
+            ]
+
+    def clear(self):
+        """Remove the journal once its messages are published"""
+        os.remove(self.path)
+
+
+class BackgroundPublisher:
+    """Publish messages by batches from a bounded queue in a background thread
+
+    The thread is started with the first message and stopped by stop(), so the
+    message bus connection is only used by one thread at a time.
+    """
+
+    # end of the publishing thread
+    STOP = object()
+
+    def __init__(
+        self,
+        publish_batch: typing.Callable[[typing.List[PendingMessage]], None],
+        on_error: typing.Callable[[], None],
+        queue_size: int = 1000,
+        batch_size: int = 100,
+        journal_path: str = "",
+        retry_interval: float = 30,
+        logger: logging.Logger = None,
+    ):
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+        # publish a list of messages and wait for their confirms, raise on failure
+        self.publish_batch = publish_batch
+
+        # reset the message bus connection after a failure
+        self.on_error = on_error
+
+        self.batch_size = batch_size
+
+        # seconds during which messages go straight to the journal after a failure
+        self.retry_interval = retry_interval
+
+        self.journal = MessageJournal(journal_path) if journal_path else None
+
+        self.stats = PublisherStats()
+
+        self._queue = queue.Queue(maxsize=queue_size)
+
+        self._thread: threading.Thread | None = None
+
+        self._unavailable_until = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of messages waiting to be published"""
+        return self._queue.qsize()
+
+    def submit(self, message: PendingMessage):
+        """Queue a message, waiting for room when the queue is full
+
+        Args:
+            message (PendingMessage): message to publish
+        """
+        self.start()
+
+        self._queue.put(message)
+
+        self.stats.queue_depth = self._queue.qsize()
+
+    def flush(self):
+        """Wait for all the queued messages to be published or journaled"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def start(self):
+        """Start the publishing thread if it is not running"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="MessengerPublisher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Publish remaining messages, journaled ones included, and stop the thread"""
+        if self._thread is None and not self.journal:
+            return
+
+        self.start()
+
+        self._queue.put(self.STOP)
+
+        self._thread.join()
+
+        self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+
+            # gather the messages queued meanwhile
+            while len(batch) < self.batch_size and batch[-1] is not self.STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            messages = [message for message in batch if message is not self.STOP]
+
+            try:
+                self._process(messages)
+
+            # never lose messages nor kill the thread because of a publication error
+            # pylint: disable=broad-exception-caught
+            except Exception as error:
+                self.logger.exception(error)
+            # pylint: enable=broad-exception-caught
+
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+                self.stats.queue_depth = self._queue.qsize()
+
+            if batch[-1] is self.STOP:
+                break
+
+    def _process(self, messages: typing.List[PendingMessage]):
+        """Publish journaled messages then a batch, journal them on failure"""
+        if time.monotonic() < self._unavailable_until:
+            self._spill(messages)
+            return
+
+        try:
+            if self.journal:
+                self._replay()
+
+            if messages:
+                self._publish(messages)
+
+        # any transport error means the message bus is unavailable
+        # pylint: disable=broad-exception-caught
+        except Exception as error:
+            self.logger.error("Message bus unavailable: %s", error)
+
+            self._unavailable_until = time.monotonic() + self.retry_interval
+
+            self.on_error()
+
+            self._spill(messages)
+        # pylint: enable=broad-exception-caught
+
+    def _replay(self):
+        """Publish the journaled messages and clear the journal
+
+        On failure, the journal is kept whole: some messages may be published twice.
+        """
+        messages = self.journal.read()
+
+        self.logger.info(
+            "Publishing %d journaled messages from %s", len(messages), self.journal.path
+        )
+
+        for start in range(0, len(messages), self.batch_size):
+            self._publish(messages[start : start + self.batch_size])
+
+        self.journal.clear()
+
+        self.stats.replayed += len(messages)
+
+    def _publish(self, messages: typing.List[PendingMessage]):
+        start = time.perf_counter()
+
+        self.publish_batch(messages)
+
+        latency = time.perf_counter() - start
+
+        self.stats.published += len(messages)
+
+        self.stats.last_confirm_latency = latency
+
+        self.stats.max_confirm_latency = max(self.stats.max_confirm_latency, latency)
+
+    def _spill(self, messages: typing.List[PendingMessage]):
+        """Write unpublished messages in the journal"""
+        if not messages:
+            return
+
+        if self.journal is None:
+            for message in messages:
+                self.logger.error(
+                    "MSG %s UNPUBLISHED on %s PAYLOAD %s",
+                    message.message_id,
+                    message.routing_key,
+                    message.body,
+                )
+            return
+
+        self.journal.append(messages)
+
+        self.stats.journaled += len(messages)
+
+        self.logger.warning(
+            "%d messages written to journal %s", len(messages), self.journal.path
+        )
@@ -0,0 +1,149 @@
+"""Benchmark of the compiled field accessors of the JSON and XML extractors
+
+Run with: python tests/benchmark_extractors.py [entity count]
+"""
+
+import copy
+import json
+import os
+import sys
+import timeit
+
+from jsonpath_ng import parse
+
+from maas_collector.rawdata.extractor import JSONExtractor, XMLExtractor
+from maas_collector.rawdata.extractor.base import InMemoryFile
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+PRIP_FILE = "PRIP_S2A_ATOS_20240124T162320_20240124T163320_1000_P000000.json"
+
+PRIP_ATTR_MAP = {
+    "product_id": "$.Id",
+    "product_name": "$.Name",
+    "eviction_date": "$.EvictionDate",
+    "origin_date": "$.OriginDate",
+    "publication_date": "$.PublicationDate",
+    "content_type": "$.ContentType",
+    "content_length": "$.ContentLength",
+    "start_date": "$.ContentDate.Start",
+    "end_date": "$.ContentDate.End",
+    "production_type": "$.ProductionType",
+    "checksum_algorithm": "$.Checksum[0].Algorithm",
+    "checksum": "$.Checksum[0].Value",
+    "footprint_type": "$.GeoFootprint.type",
+}
+
+MTD_FILE = "S2A_OPER_MTD_L0U_DS_SGS__20201201T141044_S20191208T030316.xml"
+
+MTD_ATTR_MAP = {
+    "detector_id": {"attr": "detectorId"},
+    "first_granule_id": {"path": "Granule_List/Granule", "attr": "granuleId"},
+    "first_position": "Granule_List/Granule/POSITION",
+}
+
+
+def legacy_json_mapper_func(jp_value):
+    jp_expr = parse(jp_value)
+
+    def func(json_content):
+        result = jp_expr.find(json_content)
+
+        if len(result) == 0:
+            raise IndexError(f"JSONPath {jp_expr} returned no value.")
+
+        if len(result) == 1:
+            return result[0].value
+
+        return [node.value for node in result]
+
+    return func
+
+
+def legacy_xml_mapper_func(value):
+    if isinstance(value, str):
+        return lambda element: element.findtext(value)
+
+    if "path" in value:
+        return lambda element: element.find(value["path"]).attrib[value["attr"]]
+
+    return lambda element: element.attrib[value["attr"]]
+
+
+def make_prip_page(count):
+    """a PRIP page with count products, copied from the fixture products"""
+    with open(os.path.join(DATA_DIR, PRIP_FILE), encoding="UTF-8") as prip_fd:
+        page = json.load(prip_fd)
+
+    products = page["value"]
+
+    page["value"] = [copy.deepcopy(products[i % len(products)]) for i in range(count)]
+
+    return page
+
+
+def main(count=10000, repeat=5):
+    def measure(extractor, make_input):
+        return (
+            min(
+                timeit.repeat(
+                    lambda: list(extractor.extract(make_input())),
+                    number=1,
+                    repeat=repeat,
+                )
+            )
+            * 1000
+        )
+
+    page = make_prip_page(count)
+
+    def make_page():
+        return InMemoryFile.from_data(PRIP_FILE, page)
+
+    json_extractor = JSONExtractor(PRIP_ATTR_MAP, iterate_nodes="$.value")
+
+    legacy_json_extractor = JSONExtractor(PRIP_ATTR_MAP, iterate_nodes="$.value")
+
+    legacy_json_extractor.attr_map = {
+        name: legacy_json_mapper_func(value) for name, value in PRIP_ATTR_MAP.items()
+    }
+
+    with open(os.path.join(DATA_DIR, MTD_FILE), "rb") as mtd_fd:
+        mtd_content = mtd_fd.read()
+
+    def make_mtd():
+        return InMemoryFile(MTD_FILE, mtd_content)
+
+    iterate_detectors = "Image_Data_Info/Granules_Information/Detector_List/Detector"
+
+    xml_extractor = XMLExtractor(MTD_ATTR_MAP, iterate_nodes=iterate_detectors)
+
+    legacy_xml_extractor = XMLExtractor(MTD_ATTR_MAP, iterate_nodes=iterate_detectors)
+
+    legacy_xml_extractor.attr_map = {
+        name: legacy_xml_mapper_func(value) for name, value in MTD_ATTR_MAP.items()
+    }
+
+    assert list(json_extractor.extract(make_page())) == list(
+        legacy_json_extractor.extract(make_page())
+    )
+    assert list(xml_extractor.extract(make_mtd())) == list(
+        legacy_xml_extractor.extract(make_mtd())
+    )
+
+    print("| Extraction | jsonpath_ng / ElementTree (ms) | compiled (ms) |")
+    print("| :-- | --: | --: |")
+    print(
+        f"| {PRIP_FILE}: {count} products, {len(PRIP_ATTR_MAP)} fields "
+        f"| {measure(legacy_json_extractor, make_page):.2f} "
+        f"| {measure(json_extractor, make_page):.2f} |"
+    )
+    print(
+        f"| {MTD_FILE}: detectors, {len(MTD_ATTR_MAP)} fields "
+        f"| {measure(legacy_xml_extractor, make_mtd):.2f} "
+        f"| {measure(xml_extractor, make_mtd):.2f} |"
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
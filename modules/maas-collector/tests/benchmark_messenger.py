@@ -0,0 +1,103 @@
+"""Benchmark of the message group accounting of the messenger
+
+Run with: python tests/benchmark_messenger.py [identifier count]
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+
+from maas_collector.rawdata.messenger import Messenger
+
+ROUTING_KEYS = ["new.raw.data.prip", "new.raw.data.auxip", "new.raw.data.lta"]
+
+MODEL_NAMES = ["PripProduct", "AuxipProduct", "LtaProduct", "CadipProduct"]
+
+# daily partitions over three years
+INDEX_COUNT = 1000
+
+# identifiers collected per page, the pending count being checked after each page
+PAGE_SIZE = 1000
+
+
+class LegacyMessenger(Messenger):
+    """list based message groups"""
+
+    # pylint: disable=arguments-differ
+    def handle_message(self, config, document_id, index=None):
+        chunk_size = self.chunk_config[config.routing_key]
+
+        group = self.message_groups.setdefault(config.routing_key, {})
+
+        info = group.setdefault(
+            config.model_name, {"document_ids": [], "document_indices": []}
+        )
+
+        info["document_ids"].append(document_id)
+
+        if index is not None and index not in info["document_indices"]:
+            info["document_indices"].append(index)
+
+        while len(info["document_ids"]) >= chunk_size:
+            self.send_to_queue(
+                config.routing_key,
+                (
+                    info["document_ids"][:chunk_size],
+                    info["document_indices"][:chunk_size],
+                ),
+            )
+
+            del info["document_ids"][:chunk_size]
+            del info["document_indices"][:chunk_size]
+
+    def __len__(self):
+        return sum(
+            len(info["document_ids"])
+            for group in self.message_groups.values()
+            for info in group.values()
+        )
+
+
+def run(messenger_class, count, chunk_size):
+    messenger = messenger_class("memory://")
+
+    messenger.send_to_queue = lambda routing_key, payload: None
+
+    configs = [
+        SimpleNamespace(routing_key=routing_key, model_name=model_name)
+        for routing_key in ROUTING_KEYS
+        for model_name in MODEL_NAMES
+    ]
+
+    for config in configs:
+        messenger.chunk_config[config.routing_key] = chunk_size
+
+    start = time.perf_counter()
+
+    for identifier in range(count):
+        messenger.handle_message(
+            configs[identifier % len(configs)],
+            f"document-{identifier}",
+            f"index-{identifier % INDEX_COUNT}",
+        )
+
+        if identifier % PAGE_SIZE == 0:
+            len(messenger)
+
+    return (time.perf_counter() - start) * 1000
+
+
+def main(count=1000000):
+    print("| Identifiers | chunk size | lists (ms) | deques and counters (ms) |")
+    print("| --: | --: | --: | --: |")
+
+    for chunk_size in (1000, 100000):
+        print(
+            f"| {count} | {chunk_size} "
+            f"| {run(LegacyMessenger, count, chunk_size):.0f} "
+            f"| {run(Messenger, count, chunk_size):.0f} |"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
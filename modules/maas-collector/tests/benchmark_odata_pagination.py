@@ -0,0 +1,130 @@
+"""Benchmark of $skip and keyset pagination against a local stub OData server
+
+Run with: python tests/benchmark_odata_pagination.py [product count]
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import datetime
+import json
+import threading
+import time
+from types import SimpleNamespace
+import sys
+
+import requests
+
+from test_odata_keyset import CONF, END_DATE, ODataCatalogue, make_products
+
+from maas_collector.rawdata.collector.httpcollector import HttpConfiguration
+from maas_collector.rawdata.collector.journal import CollectorJournal, JournalDocument
+from maas_collector.rawdata.collector.odatacollector import (
+    ODataCollectorConfiguration,
+)
+from maas_collector.rawdata.collector.odata.v4impl import ODataQueryV4Implementation
+
+
+def serve(catalogue):
+    """serve the catalogue on a local port in a daemon thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(catalogue.query(self.path)).encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def page_latencies(server, pagination, start_date):
+    """query a single time window page by page, timing each page"""
+    config = ODataCollectorConfiguration(
+        **(
+            CONF
+            | {
+                "product_url": f"http://127.0.0.1:{server.server_port}",
+                "product_per_page": 100,
+                "max_time_window": int((END_DATE - start_date).total_seconds() // 60),
+                "odata_pagination": pagination,
+            }
+        )
+    )
+
+    journal = CollectorJournal(config)
+
+    journal.document = JournalDocument(last_date=start_date)
+
+    journal.document.save = lambda **kwargs: None
+
+    collector = SimpleNamespace(
+        should_stop_loop=False,
+        http_config=HttpConfiguration(),
+        get_pending_document_count=lambda: 1,
+    )
+
+    strategy = ODataQueryV4Implementation(
+        collector, config, requests.Session(), None, END_DATE, journal
+    )
+
+    latencies = []
+
+    pages = iter(strategy)
+
+    while True:
+        start = time.perf_counter()
+
+        page = next(pages, None)
+
+        if page is None:
+            break
+
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        journal.tick()
+
+    return latencies
+
+
+def main(count=100_000):
+    # all the products in the window, keeping the 3 hours of the test module
+    products = make_products(count, per_date=max(1, count // 170))
+
+    start_date = END_DATE - datetime.timedelta(minutes=180)
+
+    server = serve(ODataCatalogue(products))
+
+    try:
+        results = {
+            pagination: page_latencies(server, pagination, start_date)
+            for pagination in ("skip", "keyset")
+        }
+    finally:
+        server.shutdown()
+
+    print(f"{count} products, 100 products per page\n")
+    print(
+        "| Pagination | pages | first 10 pages (ms) | last 10 pages (ms) | total (s) |"
+    )
+    print("| :-- | --: | --: | --: | --: |")
+
+    for pagination, latencies in results.items():
+        print(
+            f"| {pagination} | {len(latencies)} "
+            f"| {sum(latencies[:10]) / 10:.2f} "
+            f"| {sum(latencies[-10:]) / 10:.2f} "
+            f"| {sum(latencies) / 1000:.2f} |"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,95 @@
+"""Compiled JSONPath and XPath accessors give the same values as their generic
+evaluation"""
+import xml.etree.ElementTree as ET
+
+import jsonpath_ng
+import jsonpath_ng.ext
+import pytest
+
+from maas_collector.rawdata.extractor.accessors import (
+    compile_json_path,
+    compile_xml_path,
+)
+
+JSON_CONTENT = {
+    "Name": "product",
+    "Empty": None,
+    "ContentDate": {"Start": "2024-01-24T14:06:12.454Z"},
+    "Checksum": [{"Algorithm": "MD5"}, {"Algorithm": "XXH"}],
+    "Attributes": [
+        {"Name": "qualityStatus", "Value": "NOMINAL"},
+        {"Name": "cloudCover", "Value": 10.2},
+    ],
+    "with space": {"key": "value"},
+}
+
+JSON_PATHS = [
+    "Name",
+    "$.Name",
+    "`this`.ContentDate.Start",
+    "$.Empty",
+    "$.Missing",
+    "$.Name.Missing",
+    "$.Checksum[0].Algorithm",
+    "$.Checksum[-1].Algorithm",
+    "$.Checksum[2].Algorithm",
+    "$.Checksum.Algorithm",
+    "$.ContentDate[0]",
+    '$."with space".key',
+    "$",
+    # generic evaluation
+    "$.Checksum[*].Algorithm",
+    "$.Checksum[0,1].Algorithm",
+    "$..Algorithm",
+    "$.ContentDate.*",
+]
+
+
+@pytest.mark.parametrize("parsing_method", [jsonpath_ng.parse, jsonpath_ng.ext.parse])
+@pytest.mark.parametrize("path", JSON_PATHS)
+def test_compile_json_path(path, parsing_method):
+    expected = [node.value for node in parsing_method(path).find(JSON_CONTENT)]
+
+    assert compile_json_path(path, parsing_method)(JSON_CONTENT) == expected
+
+
+def test_compile_json_path_ext_filter():
+    path = '`this`.Attributes[?Name=="qualityStatus"].Value'
+
+    assert compile_json_path(path, jsonpath_ng.ext.parse)(JSON_CONTENT) == ["NOMINAL"]
+
+
+def test_compiled_paths_cached():
+    assert compile_json_path("$.Name") is compile_json_path("$.Name")
+    assert compile_xml_path("a/b") is compile_xml_path("a/b")
+
+
+XML_CONTENT = ET.fromstring("""<Root xmlns:ns="http://namespace">
+        <Product name="first"><Size>1</Size></Product>
+        <Product name="second"><Size>2</Size><Empty/></Product>
+        <ns:Item>namespaced</ns:Item>
+        <Item>plain</Item>
+    </Root>""")
+
+XML_PATHS = [
+    "Product",
+    "Product/Size",
+    "Product/Empty",
+    "Product/Missing",
+    "Item",
+    "{http://namespace}Item",
+    "ns:Item",
+    "./Product/Size",
+    "Product[2]/Size",
+    "*/Size",
+    ".//Size",
+]
+
+
+@pytest.mark.parametrize("path", XML_PATHS)
+def test_compile_xml_path(path):
+    namespaces = {"ns": "http://namespace"}
+
+    assert compile_xml_path(path, namespaces)(XML_CONTENT) is XML_CONTENT.find(
+        path, namespaces
+    )
@@ -0,0 +1,240 @@
+"""Pipelined document fetch and change detection of the action iterator"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from maas_collector.rawdata.model import ActionIterator
+
+
+class StandInDocument:
+    """raw document keeping its fields in a dict, with a multiple get recording the
+    requested chunks"""
+
+    partition_index_name = "raw-data-test"
+
+    fetches = []
+
+    fetched = {}
+
+    # fields of the stored documents by identifier
+    stored = {}
+
+    clean_count = 0
+
+    def __init__(self, **fields):
+        self.__dict__["fields"] = fields
+        self.__dict__["meta"] = SimpleNamespace(id=None)
+
+    def __getattr__(self, name):
+        try:
+            return self.fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        self.fields[name] = value
+
+    def full_clean(self):
+        StandInDocument.clean_count += 1
+
+    def to_dict(self, include_meta=False):
+        return {
+            "_index": self.partition_index_name,
+            "_id": self.meta.id,
+            "_source": dict(self.fields),
+        }
+
+    @classmethod
+    def mget_by_ids(cls, document_ids, ignore_missing_index=False):
+        cls.fetches.append((list(document_ids), threading.current_thread().name))
+
+        cls.fetched[document_ids[0]].set()
+
+        documents = []
+
+        for document_id in document_ids:
+            if document_id in cls.stored:
+                document = cls(**cls.stored[document_id])
+
+                document.meta.id = document_id
+
+                documents.append(document)
+            else:
+                documents.append(None)
+
+        return documents
+
+
+class StandInExtractor:
+    def __init__(self, count):
+        self.count = count
+
+    def extract(self, path, report_folder=""):
+        for index in range(self.count):
+            yield {"id": f"{index:04}", "value": index}
+
+    def stop(self):
+        pass
+
+
+def build_iterator(count, stored=None, **kwargs):
+    StandInDocument.fetches = []
+
+    StandInDocument.stored = stored or {}
+
+    StandInDocument.clean_count = 0
+
+    StandInDocument.fetched = {
+        f"{index:04}": threading.Event() for index in range(0, count, 10)
+    }
+
+    config = SimpleNamespace(
+        model=StandInDocument,
+        extractor=StandInExtractor(count),
+        get_id_func=lambda: lambda data_extract: data_extract["id"],
+        store_meta=None,
+    )
+
+    return ActionIterator("report.json", config, chunk_size=10, **kwargs)
+
+
+@pytest.mark.parametrize("prefetch_depth", [0, 1, 3])
+def test_action_iterator_yields_all_chunks(prefetch_depth):
+    iterator = build_iterator(35, prefetch_depth=prefetch_depth)
+
+    actions = list(iterator)
+
+    assert [action["_id"] for action in actions] == [f"{i:04}" for i in range(35)]
+    assert [len(ids) for ids, _ in StandInDocument.fetches] == [10, 10, 10, 5]
+    assert iterator.document_count == 35
+
+
+def test_action_iterator_prefetches_next_chunk():
+    actions = iter(build_iterator(30, prefetch_depth=1))
+
+    assert next(actions)["_id"] == "0000"
+
+    # the next chunk is fetched in background while the first one is consumed
+    assert StandInDocument.fetched["0010"].wait(timeout=5)
+    assert not StandInDocument.fetched["0020"].is_set()
+
+    assert all(
+        thread_name.startswith("ActionIteratorPrefetch")
+        for _, thread_name in StandInDocument.fetches
+    )
+
+    assert len(list(actions)) == 29
+
+
+def test_action_iterator_without_prefetch():
+    actions = iter(build_iterator(30, prefetch_depth=0))
+
+    assert next(actions)["_id"] == "0000"
+
+    assert [ids[0] for ids, _ in StandInDocument.fetches] == ["0000"]
+
+
+def test_action_iterator_stop():
+    iterator = build_iterator(100, prefetch_depth=2)
+
+    actions = iter(iterator)
+
+    next(actions)
+
+    iterator.stop()
+
+    assert not list(actions)
+    assert len(StandInDocument.fetches) <= 3
+
+
+def test_content_hash_is_stable():
+    content_hash = ActionIterator.get_content_hash({"id": "0000", "value": 0})
+
+    assert content_hash == ActionIterator.get_content_hash(
+        {"value": 0, "id": "0000", "reportName": "other.json"}
+    )
+    assert content_hash != ActionIterator.get_content_hash({"id": "0000", "value": 1})
+
+
+def stored_documents(count, with_hash=True, **changes):
+    stored = {}
+
+    for index in range(count):
+        fields = {"id": f"{index:04}", "value": index}
+
+        fields |= changes.get(fields["id"], {})
+
+        if with_hash:
+            fields["contentHash"] = ActionIterator.get_content_hash(fields)
+
+        stored[fields["id"]] = fields
+
+    return stored
+
+
+def test_new_documents_store_content_hash():
+    actions = list(build_iterator(3))
+
+    assert [action["_source"]["contentHash"] for action in actions] == [
+        ActionIterator.get_content_hash({"id": f"{i:04}", "value": i}) for i in range(3)
+    ]
+
+
+def test_unmodified_documents_detected_by_hash():
+    iterator = build_iterator(10, stored=stored_documents(10))
+
+    assert not list(iterator)
+
+    assert len(iterator.unmodified_ids) == 10
+
+    # no deserialization nor cleaning of unmodified documents
+    assert StandInDocument.clean_count == 0
+
+
+def test_modified_documents_updated():
+    stored = stored_documents(10, **{"0003": {"value": -1}})
+
+    iterator = build_iterator(10, stored=stored)
+
+    actions = list(iterator)
+
+    assert [action["_id"] for action in actions] == ["0003"]
+    assert actions[0]["_source"]["value"] == 3
+    assert actions[0]["_source"]["contentHash"] == ActionIterator.get_content_hash(
+        {"id": "0003", "value": 3}
+    )
+    assert "ingestionTime" in actions[0]["_source"]
+    assert len(iterator.unmodified_ids) == 9
+    assert StandInDocument.clean_count == 1
+
+
+def test_unmodified_documents_without_hash_store_it():
+    iterator = build_iterator(2, stored=stored_documents(2, with_hash=False))
+
+    actions = list(iterator)
+
+    assert actions == [
+        {
+            "_op_type": "update",
+            "_index": StandInDocument.partition_index_name,
+            "_id": f"{i:04}",
+            "doc": {
+                "contentHash": ActionIterator.get_content_hash(
+                    {"id": f"{i:04}", "value": i}
+                )
+            },
+        }
+        for i in range(2)
+    ]
+    assert iterator.unmodified_ids == ["0000", "0001"]
+    assert iterator.document_count == 0
+
+
+def test_force_update_unmodified_documents():
+    iterator = build_iterator(10, stored=stored_documents(10), force_update=True)
+
+    actions = list(iterator)
+
+    assert len(actions) == 10
+    assert all(action["_source"]["contentHash"] for action in actions)
@@ -3,9 +3,17 @@ Test extractor classes with first bunch of data provided by Cap Gemini Italy.
 
 Data format will surely change and some rewrite of the tests will happen.
 """
+
+import io
+import json
 import os
 
-from maas_collector.rawdata.extractor.base import BaseExtractor, get_hash_func
+from maas_collector.rawdata.extractor.base import (
+    BaseExtractor,
+    InMemoryFile,
+    get_hash_func,
+    open_input,
+)
 
 from maas_collector.rawdata.extractor import (
     XMLExtractor,
@@ -96,7 +104,7 @@ def test_json_iterate():
         attr_map={
             "jiraKey": "`this`.id",
             "author": "`this`.author.emailAddress",
-            "creationDate": "`this`.created"
+            "creationDate": "`this`.created",
             # "globalStatus": "$.Quality_report.Quality_cheks.'-global_status'",
         },
         iterate_nodes="$.changelog.histories",
@@ -313,6 +321,65 @@ def test_xml_iterate_nodes_w_lambda():
     )
 
 
+def test_xml_iterate_nodes_streaming():
+    path = os.path.join(
+        DATA_DIR, "S2A_OPER_MTD_L0U_DS_SGS__20201201T141044_S20191208T030316.xml"
+    )
+
+    attr_map = {
+        "detector_id": {"attr": "detectorId"},
+        "first_granule_id": {"path": "Granule_List/Granule", "attr": "granuleId"},
+        "first_position": "Granule_List/Granule/POSITION",
+    }
+
+    iterate_nodes = "Image_Data_Info/Granules_Information/Detector_List/Detector"
+
+    streaming_xext = XMLExtractor(attr_map, iterate_nodes=iterate_nodes, streaming=True)
+
+    extract_list = list(streaming_xext.extract(path))
+
+    assert len(extract_list) == 12
+    assert extract_list == list(
+        XMLExtractor(attr_map, iterate_nodes=iterate_nodes).extract(path)
+    )
+
+    with pytest.raises(ValueError, match="Detector_List//Detector"):
+        XMLExtractor(attr_map, iterate_nodes="Detector_List//Detector", streaming=True)
+
+
+def test_xml_streaming_extracts_while_parsing():
+    content = (
+        b"<Report><Header><Name>report</Name></Header><Sessions>"
+        + b"".join(
+            b'<Session id="%d"><Size>%d</Size></Session><Other/>' % (index, index)
+            for index in range(10000)
+        )
+        + b"</Sessions></Report>"
+    )
+
+    in_memory_file = InMemoryFile("report.xml", content)
+
+    xext = XMLExtractor(
+        {"session_id": {"attr": "id"}, "size": "Size"},
+        converter_map={"size": int},
+        iterate_nodes="Sessions/Session",
+        streaming=True,
+    )
+
+    extract_iterator = xext.extract(in_memory_file)
+
+    assert next(extract_iterator) == {
+        "reportName": "report.xml",
+        "session_id": "0",
+        "size": 0,
+    }
+
+    # the rest of the file is not parsed yet
+    assert in_memory_file.tell() < len(content)
+
+    assert [extract["size"] for extract in extract_iterator] == list(range(1, 10000))
+
+
 def test_xml_default_namespace():
     pass
 
@@ -600,3 +667,77 @@ def test_json_extraction_with_advanced_extraction_path():
         "qualityStatus": "NOMINAL",
         "cloudCover": 10.2811222880479,
     }
+
+
+@pytest.mark.parametrize(
+    "extractor,filename",
+    [
+        (
+            JSONExtractor(
+                attr_map={"productName": "$.Quality_report.Processing_data.Input_PDI"}
+            ),
+            "PRIP_QA_20200714144443_S2B_OPER_MSI_L2A_TL_SGS__20200714T120236_A015250_T26QPE_N02.14_report.json",
+        ),
+        (
+            XMLExtractor(attr_map={"size": "Product/Size"}),
+            "S2A_OPER_PRD_L0__DS_SGS__20200420T205828_S20200322T173347_SIZE.xml",
+        ),
+        (
+            CSVExtractor({"satellite": "SatelliteID"}, autodetect_encoding=True),
+            "MP_ALL__MTL_20210722T120000_20210809T150000.csv",
+        ),
+        (
+            XLSXExtractor({"satellite_id": "Satellite", "doy": "DOY"}),
+            "S2_COP_REP_PERF_CGS-INS__20220522T122038_V20220521T120000_20220522T115959.xlsx",
+        ),
+    ],
+)
+def test_extract_in_memory_file(extractor, filename):
+    path = os.path.join(DATA_DIR, filename)
+
+    with open(path, "rb") as input_fd:
+        in_memory_file = InMemoryFile(os.path.join("bucket", filename), input_fd.read())
+
+    assert extractor.IN_MEMORY
+
+    extract = list(extractor.extract(in_memory_file))
+
+    assert extract == list(extractor.extract(path))
+    assert extract[0]["reportName"] == filename
+
+    # extraction can be repeated for another configuration
+    assert list(extractor.extract(in_memory_file)) == extract
+    assert not in_memory_file.closed
+
+
+def test_extract_in_memory_data():
+    filename = "PRIP_QA_20200714144443_S2B_OPER_MSI_L2A_TL_SGS__20200714T120236_A015250_T26QPE_N02.14_report.json"
+
+    path = os.path.join(DATA_DIR, filename)
+
+    extractor = JSONExtractor(
+        attr_map={"productName": "$.Quality_report.Processing_data.Input_PDI"}
+    )
+
+    expected = list(extractor.extract(path))
+
+    with open(path, "rb") as input_fd:
+        content = input_fd.read()
+
+    # decoded payload is extracted as is, without serialization
+    decoded = InMemoryFile.from_data(filename, json.loads(content))
+
+    assert list(extractor.extract(decoded)) == expected
+    assert decoded.getvalue() == b""
+
+    # raw content and streams
+    for data in (content, content.decode("UTF-8"), io.BytesIO(content)):
+        assert (
+            list(extractor.extract(InMemoryFile.from_data(filename, data))) == expected
+        )
+
+    # extractors reading the content get a serialized payload
+    decoded.data = {"Product": "name"}
+
+    with open_input(decoded, encoding="UTF-8") as input_fd:
+        assert json.load(input_fd) == decoded.data
@@ -0,0 +1,68 @@
+"""Extraction of the pages collected by the http collectors"""
+import os
+
+from maas_collector.rawdata.collector.filecollector import CollectorArgs
+from maas_collector.rawdata.collector.httpcollector import (
+    HttpCollector,
+    HttpCollectorConfiguration,
+    HttpConfiguration,
+)
+from maas_collector.rawdata.extractor import JSONExtractor
+from maas_collector.rawdata.extractor.base import InMemoryFile
+
+CONF = {
+    "id_field": "",
+    "routing_key": "",
+    "interface_name": "HTTP_TEST",
+    "product_url": "http://http",
+    "model": {"fields": [], "index": "", "name": "EmptyModel6"},
+    "model_meta": {},
+}
+
+PAGE = {"value": [{"Name": "first"}, {"Name": "second"}]}
+
+
+def build_collector(tmp_path, keep_files=False):
+    collector = HttpCollector(
+        CollectorArgs(working_directory=str(tmp_path)),
+        HttpConfiguration(keep_files=keep_files),
+    )
+
+    config = HttpCollectorConfiguration(
+        extractor=JSONExtractor({"name": "$.Name"}, iterate_nodes="$.value"), **CONF
+    )
+
+    extracted = []
+
+    def extract_from_file(path, extract_config, **kwargs):
+        # file content is checked while it exists
+        extracted.append((path, list(extract_config.extractor.extract(path))))
+
+    collector.extract_from_file = extract_from_file
+
+    return collector, config, extracted
+
+
+def test_extract_page_from_memory(tmp_path):
+    collector, config, extracted = build_collector(tmp_path)
+
+    collector.save_in_file_and_extract(PAGE, "page.json", config, None, None)
+
+    path, documents = extracted[0]
+
+    assert isinstance(path, InMemoryFile)
+    assert path.data is PAGE
+    assert [document["name"] for document in documents] == ["first", "second"]
+    assert not os.listdir(tmp_path)
+
+
+def test_extract_page_from_kept_file(tmp_path):
+    collector, config, extracted = build_collector(tmp_path, keep_files=True)
+
+    collector.save_in_file_and_extract(PAGE, "page.json", config, None, None)
+
+    path, documents = extracted[0]
+
+    assert path == os.path.join(tmp_path, "page.json")
+    assert [document["name"] for document in documents] == ["first", "second"]
+    assert os.listdir(tmp_path) == ["page.json"]
@@ -1,4 +1,5 @@
 from datetime import timedelta
+from unittest.mock import patch
 from maas_collector.rawdata.collector.journal import CollectorJournal, CollectorReplayJournal
 from maas_collector.rawdata.collector.odatacollector import (
     ODataCollectorConfiguration
@@ -45,3 +46,23 @@ def test_replay_journal():
     journal = CollectorReplayJournal(config, start_date, end_date, suffix="scissors")
 
     assert journal.id == "face_palm_scissors"
+
+
+@patch("maas_collector.rawdata.collector.journal.JournalDocument.save")
+def test_journal_update_date(mock_save):
+    config = ODataCollectorConfiguration(**CONF3)
+
+    journal = CollectorJournal(config)
+
+    journal._create_document_instance()
+
+    # a collect in progress is visible from its ticks
+    journal.tick()
+
+    assert journal.document.update_date == journal.document.tick_collect_date
+
+    journal.write()
+
+    assert journal.document.tick_collect_date is None
+    assert journal.document.update_date >= journal.document.last_collect_date
+    assert mock_save.call_count == 2
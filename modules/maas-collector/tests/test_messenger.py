@@ -0,0 +1,283 @@
+"""Background publishing of the messenger"""
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+from amqp import spec
+from amqp.exceptions import MessageNacked
+from kombu import BrokerConnection, Queue
+
+from maas_model import MAASMessage
+
+from maas_collector.queues.queues import PUBLISH_EXCHANGE
+from maas_collector.rawdata.messenger import Messenger
+from maas_collector.rawdata.publisher import BackgroundPublisher, PendingMessage
+
+
+def make_message(index):
+    return PendingMessage(
+        routing_key="test.key",
+        body=json.dumps([f"id-{index}"]),
+        message_id=f"message-{index}",
+        document_class="TestDocument",
+        document_count=1,
+    )
+
+
+class StandInBroker:
+    """publish batches, blocked until released or failing on demand"""
+
+    def __init__(self):
+        self.batches = []
+
+        self.released = threading.Event()
+
+        self.released.set()
+
+        self.available = True
+
+        self.errors = 0
+
+    def publish_batch(self, messages):
+        self.released.wait(timeout=5)
+
+        if not self.available:
+            raise ConnectionError("broker unavailable")
+
+        self.batches.append([message.message_id for message in messages])
+
+    def on_error(self):
+        self.errors += 1
+
+    @property
+    def published(self):
+        return [message_id for batch in self.batches for message_id in batch]
+
+
+def test_publisher_does_not_block_producer():
+    broker = StandInBroker()
+
+    broker.released.clear()
+
+    publisher = BackgroundPublisher(
+        broker.publish_batch, broker.on_error, queue_size=100, batch_size=10
+    )
+
+    for index in range(25):
+        publisher.submit(make_message(index))
+
+    assert not broker.batches
+
+    broker.released.set()
+
+    publisher.flush()
+
+    assert publisher.queue_depth == 0
+    assert broker.published == [f"message-{index}" for index in range(25)]
+
+    # messages queued while the first batch was published are grouped
+    assert max(len(batch) for batch in broker.batches) == 10
+    assert publisher.stats.published == 25
+    assert publisher.stats.max_confirm_latency > 0
+
+    publisher.stop()
+
+
+def test_publisher_journals_unpublished_messages(tmp_path):
+    journal_path = os.path.join(tmp_path, "messages.journal")
+
+    broker = StandInBroker()
+
+    broker.available = False
+
+    publisher = BackgroundPublisher(
+        broker.publish_batch,
+        broker.on_error,
+        journal_path=journal_path,
+        retry_interval=0,
+    )
+
+    for index in range(3):
+        publisher.submit(make_message(index))
+
+    publisher.flush()
+
+    assert publisher.stats.journaled == 3
+    assert broker.errors >= 1
+
+    with open(journal_path, encoding="UTF-8") as journal_fd:
+        assert [json.loads(line)["message_id"] for line in journal_fd] == [
+            f"message-{index}" for index in range(3)
+        ]
+
+    broker.available = True
+
+    publisher.submit(make_message(3))
+
+    publisher.flush()
+
+    # journaled messages are published first
+    assert broker.published == [f"message-{index}" for index in range(4)]
+    assert publisher.stats.replayed == 3
+    assert not os.path.exists(journal_path)
+
+    publisher.stop()
+
+
+def test_publisher_replays_journal_on_stop(tmp_path):
+    journal_path = os.path.join(tmp_path, "messages.journal")
+
+    broker = StandInBroker()
+
+    BackgroundPublisher(
+        broker.publish_batch, broker.on_error, journal_path=journal_path
+    ).journal.append([make_message(0), make_message(1)])
+
+    publisher = BackgroundPublisher(
+        broker.publish_batch, broker.on_error, journal_path=journal_path
+    )
+
+    publisher.stop()
+
+    assert broker.published == ["message-0", "message-1"]
+    assert not os.path.exists(journal_path)
+
+
+def test_messenger_publishes_groups_in_background(tmp_path):
+    queue = Queue("test-background", PUBLISH_EXCHANGE, routing_key="test.background")
+
+    messenger = Messenger(
+        "memory://",
+        publish_queue_size=10,
+        journal_path=os.path.join(tmp_path, "messages.journal"),
+    )
+
+    messenger.chunk_config["test.background"] = 2
+
+    with BrokerConnection("memory://") as connection:
+        consumer = connection.SimpleQueue(queue)
+
+        config = SimpleNamespace(
+            routing_key="test.background", model_name="TestDocument"
+        )
+
+        for index in range(5):
+            messenger.handle_message(config, f"id-{index}", "test-index")
+
+        messenger.flush_message_groups()
+
+        assert messenger.queue_depth == 0
+        assert messenger.stats.published == 3
+
+        document_ids = []
+
+        for _ in range(3):
+            message = consumer.get(timeout=1)
+
+            document_ids.extend(message.payload["document_ids"])
+
+            message.ack()
+
+        assert document_ids == [f"id-{index}" for index in range(5)]
+
+        consumer.close()
+
+    messenger.close()
+
+
+def test_messenger_background_requires_journal():
+    # failed batches shall be kept until published
+    with pytest.raises(ValueError):
+        Messenger("memory://", publish_queue_size=10)
+
+
+def test_messenger_publishes_synchronously_by_default():
+    queue = Queue("test-sync", PUBLISH_EXCHANGE, routing_key="test.sync")
+
+    messenger = Messenger("memory://")
+
+    with BrokerConnection("memory://") as connection:
+        consumer = connection.SimpleQueue(queue)
+
+        messenger.send_to_queue(
+            "test.sync", MAASMessage(document_class="TestDocument", document_ids=["a"])
+        )
+
+        assert messenger.stats is None
+        assert consumer.get(timeout=1).payload["document_ids"] == ["a"]
+
+        consumer.close()
+
+    messenger.close()
+
+
+class StandInChannel:
+    """channel sending a sequence of publisher confirms"""
+
+    def __init__(self, confirms):
+        self.confirms = list(confirms)
+
+    def wait(self, method, callback=None, timeout=None):
+        callback(*self.confirms.pop(0))
+
+
+def test_messenger_waits_batch_confirms():
+    messenger = Messenger("memory://")
+
+    messenger._delivery_tag = 5
+
+    # acknowledgement of several messages at once
+    messenger._confirm_channel = StandInChannel(
+        [(spec.Basic.Ack, 2, False), (spec.Basic.Ack, 5, True)]
+    )
+
+    messenger._wait_confirms()
+
+    assert not messenger._confirm_channel.confirms
+
+    messenger._confirm_channel = StandInChannel([(spec.Basic.Nack, 1, True, False)])
+
+    with pytest.raises(MessageNacked):
+        messenger._wait_confirms()
+
+
+def test_message_groups_accounting():
+    messenger = Messenger("memory://")
+
+    messenger.chunk_config["test.groups"] = 3
+
+    sent = []
+
+    messenger.send_to_queue = lambda routing_key, payload: sent.append(
+        (routing_key, payload)
+    )
+
+    first = SimpleNamespace(routing_key="test.groups", model_name="FirstDocument")
+
+    second = SimpleNamespace(routing_key="test.groups", model_name="SecondDocument")
+
+    for index in range(4):
+        messenger.handle_message(first, f"first-{index}", f"index-{index // 2}")
+
+    messenger.handle_message(second, "second-0")
+
+    assert len(messenger) == 2
+
+    # each message only carries the indices of its documents
+    assert [
+        (payload.document_ids, payload.document_indices) for _, payload in sent
+    ] == [(["first-0", "first-1", "first-2"], ["index-0", "index-1"])]
+
+    messenger.flush_message_groups()
+
+    assert len(messenger) == 0
+
+    assert [
+        (payload.document_class, payload.document_ids, payload.document_indices)
+        for _, payload in sent[1:]
+    ] == [
+        ("FirstDocument", ["first-3"], ["index-1"]),
+        ("SecondDocument", ["second-0"], []),
+    ]
@@ -1,11 +1,15 @@
 """ This file test monitoring configuration """
 
+import datetime
 import os
 import logging
 import sys
+from types import SimpleNamespace
 from unittest.mock import patch
 
+from maas_collector.rawdata.collector.journal import JournalDocument
 from maas_collector.rawdata.collector.monitorcollector import (
+    JOURNAL_RELOAD_INTERVAL,
     InterfaceMonitorConfiguration,
     InterfaceMonitor,
 )
@@ -66,3 +70,85 @@ def test_monitoring_disable(amqp_mock, es_mock, find_conf_mock):
     assert list(monitoring.meta_dict.values())[0].name == "basic_test"
 
     monitoring.exit_gracefully(9, "")
+
+
+class StandInJournalSearch:
+    """journal search chain returning the journals written after a date"""
+
+    def __init__(self, journals):
+        self.journals = journals
+
+        self.written_after = None
+
+    def source(self, *args, **kwargs):
+        return self
+
+    def params(self, *args, **kwargs):
+        return self
+
+    def filter(self, kind, update_date):
+        search = StandInJournalSearch(self.journals)
+
+        search.written_after = update_date["gte"]
+
+        return search
+
+    def execute(self):
+        return [
+            SimpleNamespace(
+                meta=SimpleNamespace(id=name), last_date=last_date, written=written
+            )
+            for name, (last_date, written) in self.journals.items()
+            if self.written_after is None or written >= self.written_after
+        ]
+
+
+def test_monitoring_refresh_last_modification_dates():
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+
+    journals = {
+        "old_interface": (
+            now - datetime.timedelta(days=3),
+            now - datetime.timedelta(days=2),
+        ),
+        "interface": (now - datetime.timedelta(days=1), now),
+    }
+
+    monitoring = InterfaceMonitor(
+        CollectorArgs(rawdata_config=TEST_CONF, credential_file=CREDENTIAL_FILE),
+        InterfaceMonitorConfiguration(**{"interface_name": "OMCS_Monitoring"}),
+    )
+
+    searches = []
+
+    def search():
+        searches.append(StandInJournalSearch(journals))
+        return searches[-1]
+
+    with patch.object(JournalDocument, "search", search):
+        # all the journals are loaded first
+        monitoring.refresh_last_modification_dates()
+
+        assert monitoring.last_modification_date_dict == {
+            "old_interface": journals["old_interface"][0],
+            "interface": journals["interface"][0],
+        }
+
+        journals["interface"] = (now, now)
+
+        del journals["old_interface"]
+
+        # then only the recently written journals
+        monitoring.refresh_last_modification_dates()
+
+        assert monitoring.last_modification_date_dict == {
+            "old_interface": now - datetime.timedelta(days=3),
+            "interface": now,
+        }
+
+        # and all the journals again after the reload interval
+        monitoring._journal_reload_date -= JOURNAL_RELOAD_INTERVAL
+
+        monitoring.refresh_last_modification_dates()
+
+        assert monitoring.last_modification_date_dict == {"interface": now}
@@ -0,0 +1,255 @@
+"""Keyset pagination of the odata query strategy"""
+import bisect
+import datetime
+import urllib.parse
+from types import SimpleNamespace
+
+import pytest
+
+from maas_collector.rawdata.collector.httpcollector import HttpConfiguration
+from maas_collector.rawdata.collector.journal import CollectorJournal, JournalDocument
+from maas_collector.rawdata.collector.odatacollector import (
+    ODataCollectorConfiguration,
+)
+from maas_collector.rawdata.collector.odata.v4impl import ODataQueryV4Implementation
+from maas_model import datetime_to_zulu, datestr_to_utc_datetime
+
+CONF = {
+    "id_field": "",
+    "routing_key": "",
+    "interface_name": "ODATA_TEST",
+    "product_url": "http://odata",
+    "odata_version": "",
+    "protocol_version": "v4",
+    "product_per_page": 4,
+    "max_time_window": 60,
+    "end_date_time_offset": 0,
+    "odata_pagination": "keyset",
+    "model": {"fields": [], "index": "", "name": "EmptyModel5"},
+    "model_meta": {},
+    "extractor": {},
+}
+
+START_DATE = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+END_DATE = START_DATE + datetime.timedelta(hours=3)
+
+
+def make_products(count, per_date=5):
+    """products sorted by (PublicationDate, Id), several products sharing a date"""
+    return [
+        {
+            "Id": f"{index:08}",
+            "PublicationDate": datetime_to_zulu(
+                START_DATE + datetime.timedelta(minutes=index // per_date)
+            ),
+        }
+        for index in range(count)
+    ]
+
+
+class ODataCatalogue:
+    """answer the product queries of the odata query strategy, either with $skip
+    by scanning the skipped products like a database would, or after a key with a
+    binary search of the sorted products"""
+
+    def __init__(self, products, next_link=False, max_page_size=None):
+        self.products = products
+
+        # maximum number of products of a page, whatever $top
+        self.max_page_size = max_page_size
+
+        self.keys = [
+            (datestr_to_utc_datetime(product["PublicationDate"]), product["Id"])
+            for product in products
+        ]
+
+        # provide @odata.nextLink instead of letting the client build the next page
+        self.next_link = next_link
+
+        self.queries = []
+
+    def query(self, url: str) -> dict:
+        split_url = urllib.parse.urlsplit(url)
+
+        query = urllib.parse.parse_qs(split_url.query)
+
+        self.queries.append(query)
+
+        # PublicationDate ge {start} and PublicationDate le {end}
+        # [and (PublicationDate gt {last_date} or Id gt {last_id})]
+        terms = query["$filter"][0].replace("(", "").replace(")", "").split()
+
+        start = datestr_to_utc_datetime(terms[2])
+
+        end = datestr_to_utc_datetime(terms[6])
+
+        top = int(query["$top"][0])
+
+        page_size = min(top, self.max_page_size or top)
+
+        if "$skiptoken" in query:
+            # identifier, here the index, of the last product of the previous page
+            after = self.keys[int(query["$skiptoken"][0])]
+        elif len(terms) > 7:
+            after = (datestr_to_utc_datetime(terms[10]), terms[14])
+        else:
+            after = None
+
+        if "$skip" in query:
+            matching = (
+                product
+                for key, product in zip(self.keys, self.products)
+                if start <= key[0] <= end
+            )
+
+            for _ in range(int(query["$skip"][0])):
+                next(matching, None)
+
+            page = [product for product, _ in zip(matching, range(page_size))]
+
+            more = next(matching, None) is not None
+        else:
+            if after is None:
+                first = bisect.bisect_left(self.keys, (start,))
+            else:
+                first = bisect.bisect_right(self.keys, after)
+
+            last = bisect.bisect_right(self.keys, (end, "￿"))
+
+            page = self.products[first : min(last, first + page_size)]
+
+            more = first + len(page) < last
+
+        payload = {"value": page}
+
+        if self.next_link and more:
+            next_query = {
+                "$filter": " ".join(terms[:7]),
+                "$top": top,
+                "$skiptoken": page[-1]["Id"],
+            }
+
+            # relative to the entity set url
+            payload["@odata.nextLink"] = (
+                f"{split_url.path.rsplit('/', 1)[-1]}?"
+                f"{urllib.parse.urlencode(next_query, safe='$ :')}"
+            )
+
+        return payload
+
+
+class StandInODataSession:
+    """serve the queries from a catalogue"""
+
+    def __init__(self, catalogue):
+        self.catalogue = catalogue
+
+        self.urls = []
+
+        self.adapters = {}
+
+    def mount(self, prefix, adapter):
+        self.adapters[prefix] = adapter
+
+    def get(self, url, headers=None, timeout=None):
+        self.urls.append(url)
+
+        payload = self.catalogue.query(url)
+
+        return SimpleNamespace(status_code=200, json=lambda: payload)
+
+
+def collect(session, **conf):
+    config = ODataCollectorConfiguration(**(CONF | conf))
+
+    journal = CollectorJournal(config)
+
+    journal.document = JournalDocument(last_date=START_DATE)
+
+    journal.document.save = lambda **kwargs: None
+
+    collector = SimpleNamespace(
+        should_stop_loop=False,
+        http_config=HttpConfiguration(),
+        get_pending_document_count=lambda: 1,
+    )
+
+    strategy = ODataQueryV4Implementation(
+        collector, config, session, None, END_DATE, journal
+    )
+
+    product_ids = []
+
+    for page in strategy:
+        product_ids.extend(product["Id"] for product in page["value"])
+
+        journal.tick()
+
+    return product_ids
+
+
+def test_keyset_pagination_with_same_dates():
+    catalogue = ODataCatalogue(make_products(100))
+
+    product_ids = collect(StandInODataSession(catalogue), max_time_window=180)
+
+    assert product_ids == [product["Id"] for product in catalogue.products]
+
+    assert all("$skip" not in query for query in catalogue.queries)
+    assert catalogue.queries[0]["$orderby"] == ["PublicationDate asc,Id asc"]
+    assert "Id gt 00000003" in catalogue.queries[1]["$filter"][0]
+
+
+def test_keyset_pagination_follows_next_link():
+    catalogue = ODataCatalogue(make_products(30), next_link=True)
+
+    session = StandInODataSession(catalogue)
+
+    product_ids = collect(session, max_time_window=180)
+
+    assert product_ids == [product["Id"] for product in catalogue.products]
+
+    assert session.urls[1].startswith("http://odata/odata/v1/Products?")
+    assert all("$skiptoken" in query for query in catalogue.queries[1:])
+
+
+@pytest.mark.parametrize("concurrent_time_windows", [1, 3])
+def test_keyset_pagination_with_capped_pages(concurrent_time_windows):
+    # the service returns 3 products per page when 4 are requested
+    catalogue = ODataCatalogue(make_products(50), next_link=True, max_page_size=3)
+
+    product_ids = collect(
+        StandInODataSession(catalogue),
+        concurrent_time_windows=concurrent_time_windows,
+    )
+
+    assert sorted(set(product_ids)) == [product["Id"] for product in catalogue.products]
+
+
+def test_keyset_pagination_rejected_for_v3():
+    with pytest.raises(ValueError):
+        ODataCollectorConfiguration(
+            **(CONF | {"odata_version": "v3", "protocol_version": ""})
+        )
+
+
+def test_keyset_pagination_with_concurrent_time_windows():
+    catalogue = ODataCatalogue(make_products(500, per_date=3))
+
+    product_ids = collect(StandInODataSession(catalogue), concurrent_time_windows=3)
+
+    # products at window bounds are queried twice as the filter includes both bounds
+    assert sorted(set(product_ids)) == [product["Id"] for product in catalogue.products]
+    assert len(product_ids) < len(catalogue.products) + 3 * 3
+
+
+def test_skip_pagination_unchanged():
+    catalogue = ODataCatalogue(make_products(20, per_date=1))
+
+    product_ids = collect(
+        StandInODataSession(catalogue), odata_pagination="skip", max_time_window=180
+    )
+
+    assert sorted(set(product_ids)) == [product["Id"] for product in catalogue.products]
+    assert all("$skip" in query for query in catalogue.queries)
@@ -0,0 +1,168 @@
+"""Concurrent time window queries of the odata query strategy"""
+import datetime
+import time
+import urllib.parse
+from types import SimpleNamespace
+
+from maas_collector.rawdata.collector.httpcollector import HttpConfiguration
+from maas_collector.rawdata.collector.journal import CollectorJournal, JournalDocument
+from maas_collector.rawdata.collector.odatacollector import (
+    ODataCollectorConfiguration,
+)
+from maas_collector.rawdata.collector.odata.v4impl import ODataQueryV4Implementation
+from maas_model import datetime_to_zulu, datestr_to_utc_datetime
+
+CONF = {
+    "id_field": "",
+    "routing_key": "",
+    "interface_name": "ODATA_TEST",
+    "product_url": "http://odata",
+    "odata_version": "",
+    "protocol_version": "v4",
+    "product_per_page": 3,
+    "max_time_window": 60,
+    "concurrent_time_windows": 3,
+    "end_date_time_offset": 0,
+    "model": {"fields": [], "index": "", "name": "EmptyModel4"},
+    "model_meta": {},
+    "extractor": {},
+}
+
+START_DATE = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+END_DATE = START_DATE + datetime.timedelta(hours=6)
+
+
+class StandInODataSession:
+    """serve products published every 7 minutes, the first windows being the
+    slowest to answer"""
+
+    def __init__(self):
+        self.products = [
+            {
+                "Id": str(index),
+                "PublicationDate": datetime_to_zulu(
+                    START_DATE + datetime.timedelta(minutes=7 * index)
+                ),
+            }
+            for index in range(6 * 60 // 7 + 1)
+        ]
+
+        self.adapters = {}
+
+    def mount(self, prefix, adapter):
+        self.adapters[prefix] = adapter
+
+    def get(self, url, headers=None, timeout=None):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+
+        # PublicationDate ge {start} and PublicationDate le {end}
+        terms = query["$filter"][0].split()
+
+        start, end = datestr_to_utc_datetime(terms[2]), datestr_to_utc_datetime(
+            terms[6]
+        )
+
+        products = [
+            product
+            for product in self.products
+            if start <= datestr_to_utc_datetime(product["PublicationDate"]) <= end
+        ]
+
+        skip, top = int(query["$skip"][0]), int(query["$top"][0])
+
+        time.sleep(max(0.0, 0.1 - (start - START_DATE).total_seconds() / 36000))
+
+        return SimpleNamespace(
+            status_code=200,
+            json=lambda: {"value": products[skip : skip + top]},
+        )
+
+
+def test_concurrent_time_windows():
+    config = ODataCollectorConfiguration(**CONF)
+
+    journal = CollectorJournal(config)
+
+    journal.document = JournalDocument(last_date=START_DATE)
+
+    saved_dates = []
+
+    journal.document.save = lambda **kwargs: saved_dates.append(
+        journal.document.last_date
+    )
+
+    collector = SimpleNamespace(
+        should_stop_loop=False,
+        http_config=HttpConfiguration(),
+        get_pending_document_count=lambda: 0,
+    )
+
+    session = StandInODataSession()
+
+    strategy = ODataQueryV4Implementation(
+        collector, config, session, None, END_DATE, journal
+    )
+
+    assert len(strategy.get_time_windows()) == 6
+
+    product_ids = []
+
+    window_order = []
+
+    for page in strategy:
+        product_ids.extend(product["Id"] for product in page["value"])
+
+        if page["value"]:
+            last_date = datestr_to_utc_datetime(page["value"][-1]["PublicationDate"])
+
+            window_order.append((last_date - START_DATE).total_seconds() // 3600)
+
+            # documents extracted from a late window can not move the journal beyond
+            # the first window not extracted
+            journal.iter_callback(SimpleNamespace(publication_date=last_date))
+
+        journal.tick()
+
+    # products at window bounds are queried twice as the filter includes both bounds
+    assert set(product_ids) == {product["Id"] for product in session.products}
+
+    # windows did not complete in date order
+    assert window_order != sorted(window_order)
+
+    assert saved_dates == sorted(saved_dates)
+    assert journal.document.last_date == END_DATE
+    assert session.adapters["https://"]._pool_maxsize == 3
+
+
+def test_time_window_checkpoint_bounds_journal():
+    config = ODataCollectorConfiguration(**CONF)
+
+    journal = CollectorJournal(config)
+
+    journal.document = JournalDocument(last_date=START_DATE)
+
+    journal.document.save = lambda **kwargs: None
+
+    collector = SimpleNamespace(get_pending_document_count=lambda: 1)
+
+    strategy = ODataQueryV4Implementation(
+        collector, config, StandInODataSession(), None, END_DATE, journal
+    )
+
+    time_windows = strategy.get_time_windows()
+
+    journal.iter_callback(SimpleNamespace(publication_date=END_DATE))
+
+    strategy._move_time_window_checkpoint(
+        time_windows, [True, False, True, True, True, True]
+    )
+    journal.tick()
+
+    assert journal.document.last_date == time_windows[1][0]
+
+    # never moves backward
+    strategy._move_time_window_checkpoint(time_windows, [False] * 6)
+    journal.tick()
+
+    assert journal.document.last_date == time_windows[1][0]
@@ -0,0 +1,250 @@
+"""S3 collector pipeline testing with an in-process stand-in of the S3 client"""
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import os
+from unittest.mock import Mock
+
+from maas_collector.rawdata.collector.filecollector import CollectorArgs
+from maas_collector.rawdata.collector.journal import CollectorJournal, JournalDocument
+from maas_collector.rawdata.collector.s3collector import (
+    S3Collector,
+    S3CollectorConfiguration,
+    S3Configuration,
+)
+from maas_collector.rawdata.extractor import LogExtractor
+from maas_collector.rawdata.extractor.base import InMemoryFile
+
+CONF = {
+    "id_field": "",
+    "routing_key": "",
+    "interface_name": "S3_TEST",
+    "file_pattern": "*.log",
+    "buckets": ["bucket"],
+    "s3_max_keys": 2,
+    "s3_download_workers": 2,
+    "model": {"fields": [], "index": "", "name": "EmptyModel3"},
+    "model_meta": {},
+}
+
+LOOP_START = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+
+
+class StandInS3Client:
+    """list objects by pages and serve their content"""
+
+    def __init__(self, objects: dict):
+        # key => (last modified, content)
+        self.objects = objects
+
+        self.requests = []
+
+        self.downloads = []
+
+    def list_objects_v2(self, Bucket, MaxKeys, StartAfter="", ContinuationToken=""):
+        self.requests.append(
+            {"StartAfter": StartAfter, "ContinuationToken": ContinuationToken}
+        )
+
+        keys = sorted(key for key in self.objects if key > StartAfter)
+
+        offset = int(ContinuationToken or 0)
+
+        page = keys[offset : offset + MaxKeys]
+
+        response = {
+            "KeyCount": len(page),
+            "IsTruncated": offset + MaxKeys < len(keys),
+            "NextContinuationToken": str(offset + MaxKeys),
+            "Contents": [
+                {
+                    "Key": key,
+                    "LastModified": self.objects[key][0],
+                    "Size": len(self.objects[key][1]),
+                }
+                for key in page
+            ],
+        }
+
+        if not page:
+            del response["Contents"]
+
+        return response
+
+    def download_fileobj(self, bucket, key, fileobj):
+        self.downloads.append(key)
+        fileobj.write(self.objects[key][1])
+
+    def download_file(self, bucket, key, filename):
+        self.downloads.append(key)
+        with open(filename, "wb") as file:
+            file.write(self.objects[key][1])
+
+
+def build_config(**conf):
+    return S3CollectorConfiguration(
+        extractor=LogExtractor(r"(?P<line>.*)"), **(CONF | conf)
+    )
+
+
+def build_collector(tmp_path, client, s3_config=None, **conf):
+    config = build_config(**conf)
+
+    collector = S3Collector(
+        CollectorArgs(working_directory=str(tmp_path)), s3_config or S3Configuration()
+    )
+
+    collector.configs = [config]
+
+    collector.s3_config_dict = {config.interface_name: [config]}
+
+    collector.s3_resource = client
+
+    collector._healthcheck = Mock()
+
+    journal = CollectorJournal(config)
+
+    journal.document = JournalDocument()
+
+    journal.tick = Mock()
+
+    extracted = []
+
+    def extract_from_file(path, extract_config, **kwargs):
+        extracted.append(
+            (
+                path,
+                kwargs["report_name"],
+                list(extract_config.extractor.extract(path)),
+            )
+        )
+
+    collector.extract_from_file = extract_from_file
+
+    return collector, config, journal, extracted
+
+
+def ingest(collector, config, journal, end_date):
+    with ThreadPoolExecutor(max_workers=config.s3_download_workers) as executor:
+        collector.ingest_bucket(
+            config, journal, executor, "bucket", LOOP_START, end_date
+        )
+
+
+def test_list_bucket_pages_with_continuation_token():
+    objects = {f"{index}.log": (LOOP_START, b"") for index in range(5)}
+
+    client = StandInS3Client(objects)
+
+    collector = S3Collector(CollectorArgs(), S3Configuration())
+
+    collector.s3_resource = client
+
+    pages = list(collector.list_bucket_pages("bucket", 2, start_after="0.log"))
+
+    assert [[obj["Key"] for obj in page] for page in pages] == [
+        ["1.log", "2.log"],
+        ["3.log", "4.log"],
+    ]
+
+    assert client.requests == [
+        {"StartAfter": "0.log", "ContinuationToken": ""},
+        {"StartAfter": "0.log", "ContinuationToken": "2"},
+    ]
+
+
+def test_ingest_bucket_in_memory_and_checkpoint(tmp_path):
+    modified = LOOP_START + datetime.timedelta(hours=1)
+
+    client = StandInS3Client(
+        {
+            "a/1.log": (modified, b"first\n"),
+            "a/2.txt": (modified, b"ignored\n"),
+            "a/3.log": (modified, b"third\n"),
+            "a/4.log": (LOOP_START, b"already collected\n"),
+            "a/5.log": (modified + datetime.timedelta(hours=2), b"future\n"),
+            "a/6.log": (modified, b"sixth\n"),
+        }
+    )
+
+    collector, config, journal, extracted = build_collector(tmp_path, client)
+
+    ingest(collector, config, journal, modified + datetime.timedelta(hours=1))
+
+    # extracted in listing order, from memory
+    assert [report_name for _, report_name, _ in extracted] == [
+        "1.log",
+        "3.log",
+        "6.log",
+    ]
+    assert all(isinstance(path, InMemoryFile) for path, _, _ in extracted)
+    assert extracted[0][2][0]["line"] == "first"
+    assert extracted[0][2][0]["reportName"] == "1.log"
+
+    assert sorted(client.downloads) == ["a/1.log", "a/3.log", "a/6.log"]
+
+    # the checkpoint stops before the object modified during the collect
+    assert journal.get_bucket_checkpoint("bucket") == "a/4.log"
+    assert not os.listdir(tmp_path)
+
+
+def test_ingest_bucket_resume_listing(tmp_path):
+    modified = LOOP_START + datetime.timedelta(hours=1)
+
+    client = StandInS3Client(
+        {f"{index}.log": (modified, b"line\n") for index in range(4)}
+    )
+
+    collector, config, journal, extracted = build_collector(
+        tmp_path, client, s3_resume_listing=True
+    )
+
+    journal.set_bucket_checkpoint("bucket", "1.log")
+
+    ingest(collector, config, journal, modified)
+
+    assert [report_name for _, report_name, _ in extracted] == ["2.log", "3.log"]
+    assert client.requests[0]["StartAfter"] == "1.log"
+    assert journal.get_bucket_checkpoint("bucket") == "3.log"
+
+
+def test_ingest_bucket_download_once_to_file(tmp_path):
+    modified = LOOP_START + datetime.timedelta(hours=1)
+
+    client = StandInS3Client({"dir/1.log": (modified, b"line\n")})
+
+    # too big for memory
+    collector, config, journal, extracted = build_collector(
+        tmp_path, client, S3Configuration(in_memory_max_size=1)
+    )
+
+    other_config = build_config(interface_name="OTHER")
+
+    collector.s3_config_dict[config.interface_name].append(other_config)
+
+    ingest(collector, config, journal, modified)
+
+    assert client.downloads == ["dir/1.log"]
+    assert [path for path, _, _ in extracted] == [
+        os.path.join(tmp_path, "dir", "1.log")
+    ] * 2
+    assert extracted[0][2] == extracted[1][2]
+
+    # downloaded file is removed once extracted
+    assert not os.path.exists(os.path.join(tmp_path, "dir", "1.log"))
+
+
+def test_ingest_bucket_in_memory_disabled(tmp_path):
+    modified = LOOP_START + datetime.timedelta(hours=1)
+
+    client = StandInS3Client({"dir/empty.log": (modified, b"")})
+
+    collector, config, journal, extracted = build_collector(
+        tmp_path, client, S3Configuration(in_memory_max_size=0)
+    )
+
+    ingest(collector, config, journal, modified)
+
+    # even empty objects are downloaded to files
+    assert [path for path, _, _ in extracted] == [
+        os.path.join(tmp_path, "dir", "empty.log")
+    ]
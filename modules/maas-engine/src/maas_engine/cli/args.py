@@ -154,6 +154,55 @@ def es_parser() -> ArgumentParser:
         default=False,
     )
 
+    parser.add_argument(
+        "--es-bulk-refresh",
+        dest="es_bulk_refresh",
+        help="Default refresh mode of bulk requests, can be overriden per engine "
+        "(default: %(default)s)",
+        action=EnvDefault,
+        envvar="ES_BULK_REFRESH",
+        required=False,
+        choices=["true", "wait_for", "false", "deferred"],
+        default="true",
+        type=str,
+    )
+
+    parser.add_argument(
+        "--es-pool-maxsize",
+        dest="es_pool_maxsize",
+        help="Maximum number of opensearch connections kept alive in the pool "
+        "(default: %(default)s)",
+        action=EnvDefault,
+        envvar="ES_POOL_MAXSIZE",
+        required=False,
+        default=10,
+        type=int,
+    )
+
+    parser.add_argument(
+        "--es-health-check-interval",
+        dest="es_health_check_interval",
+        help="Minimum delay in seconds between two opensearch connection health "
+        "checks (default: %(default)s)",
+        action=EnvDefault,
+        envvar="ES_HEALTH_CHECK_INTERVAL",
+        required=False,
+        default=60.0,
+        type=float,
+    )
+
+    parser.add_argument(
+        "--es-connection-per-message",
+        dest="es_connection_per_message",
+        help="If set, use the legacy mode: open and close an opensearch connection "
+        "for every message (default: %(default)s)",
+        action=EnvDefault,
+        envvar="ES_CONNECTION_PER_MESSAGE",
+        required=False,
+        type=bool,
+        default=False,
+    )
+
     return parser
 
 
@@ -393,6 +442,44 @@ def engine_parser() -> ArgumentParser:
         type=str,
     )
 
+    parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        help="Maximum number of messages with the same routing key and document "
+        "class merged in a single pipeline execution. 1 disables micro-batching "
+        "(default: %(default)s)",
+        action=EnvDefault,
+        envvar="MAAS_ENGINE_BATCH_SIZE",
+        required=False,
+        type=int,
+        default=1,
+    )
+
+    parser.add_argument(
+        "--batch-max-wait",
+        dest="batch_max_wait",
+        help="Maximum time in milliseconds a message waits for its batch to be "
+        "complete (default: %(default)s)",
+        action=EnvDefault,
+        envvar="MAAS_ENGINE_BATCH_MAX_WAIT",
+        required=False,
+        type=int,
+        default=200,
+    )
+
+    parser.add_argument(
+        "--worker-threads",
+        dest="worker_threads",
+        help="Number of threads executing pipelines for each routing key, unless "
+        "the queue configuration sets a concurrency. Acks stay in the consumer "
+        "thread. 0 disables worker threads (default: %(default)s)",
+        action=EnvDefault,
+        envvar="MAAS_ENGINE_WORKER_THREADS",
+        required=False,
+        type=int,
+        default=0,
+    )
+
     parser.add_argument(
         "--healthcheck-hostname",
         dest="healthcheck_hostname",
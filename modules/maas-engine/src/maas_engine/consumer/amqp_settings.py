@@ -4,6 +4,29 @@ import logging
 import kombu
 
 
+class QueuePrefetchConsumer(kombu.Consumer):
+    """Consumer applying its prefetch count right before it starts consuming.
+
+    kombu applies the qos when a consumer is created, but RabbitMQ uses the qos in
+    force when basic_consume is sent: consumers created in a row on the same channel
+    would all get the prefetch count of the last one.
+    """
+
+    def revive(self, channel):
+        prefetch_count, self.prefetch_count = self.prefetch_count, None
+
+        try:
+            super().revive(channel)
+        finally:
+            self.prefetch_count = prefetch_count
+
+    def consume(self, no_ack=None):
+        if self.prefetch_count is not None:
+            self.qos(prefetch_count=self.prefetch_count)
+
+        super().consume(no_ack)
+
+
 class AMQPSettings:
     """AMQPSettings store exchanges, queues and event mapping and provides the logic
     to build them from a dictionnary typically loaded from a json file
@@ -23,6 +46,10 @@ class AMQPSettings:
 
         self.event_mapping = {}
 
+        # optional runtime options of queues indexed by queue name, like
+        # {"concurrency": 2, "prefetch_count": 4}
+        self.queue_options = {}
+
     def build_queues(self, config_dict, max_priority):
         """Create exchanges and queues, populate the event mapping from a data
         dictionnary
@@ -62,7 +89,13 @@ class AMQPSettings:
                     queue_dict["events"]
                 )
 
-    def get_consumers(self, Consumer, channel, on_message):
+                self.queue_options[queue_name] = {
+                    key: queue_dict[key]
+                    for key in ("concurrency", "prefetch_count")
+                    if key in queue_dict
+                }
+
+    def get_consumers(self, Consumer, channel, on_message, prefetch_count=1):
         """create consumer list, grouped by exchange"""
         return [
             Consumer(
@@ -71,13 +104,44 @@ class AMQPSettings:
                     for queue in self.queues.values()
                     if queue.exchange.name == exchange_name
                 ],
-                # TODO make a configuration parameter
-                prefetch_count=1,
+                prefetch_count=prefetch_count,
                 callbacks=[on_message],
             )
             for exchange_name in self.exchanges
         ]
 
+    @property
+    def concurrency_dict(self):
+        """number of worker threads by routing key, for configured queues only"""
+        return {
+            queue.routing_key: self.queue_options[queue_name]["concurrency"]
+            for queue_name, queue in self.queues.items()
+            if "concurrency" in self.queue_options.get(queue_name, {})
+        }
+
+    def get_queue_consumers(self, Consumer, channel, on_message, default_concurrency):
+        """create one consumer per queue, so each queue has its own prefetch count:
+        the configured one, or the queue concurrency. Consumer shall apply its
+        prefetch count when consuming, like QueuePrefetchConsumer"""
+        consumers = []
+
+        for queue_name, queue in self.queues.items():
+            options = self.queue_options.get(queue_name, {})
+
+            prefetch_count = options.get(
+                "prefetch_count", options.get("concurrency", default_concurrency)
+            )
+
+            consumers.append(
+                Consumer(
+                    [queue],
+                    prefetch_count=prefetch_count,
+                    callbacks=[on_message],
+                )
+            )
+
+        return consumers
+
     def connect(self) -> kombu.BrokerConnection:
         """initiate the connection to AMQP service
 
@@ -0,0 +1,177 @@
+"""Micro-batching of AMQP messages for the engine consumer"""
+
+import dataclasses
+import time
+import uuid
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import kombu
+
+from maas_model import MAASMessage
+
+# body keys of a MAASMessage: other messages (like queries) are never merged
+MERGEABLE_KEYS = frozenset(field.name for field in dataclasses.fields(MAASMessage))
+
+
+@dataclasses.dataclass
+class MessageBatch:
+    """Messages received on the same routing key for the same document class"""
+
+    exchange_name: str
+
+    routing_key: str
+
+    items: List[Tuple[Dict[str, Any], kombu.Message]] = dataclasses.field(
+        default_factory=list
+    )
+
+    # monotonic time of the first message reception
+    created: float = dataclasses.field(default_factory=time.monotonic)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def bodies(self) -> List[Dict[str, Any]]:
+        """message bodies of the batch"""
+        return [body for body, _ in self.items]
+
+    @property
+    def messages(self) -> List[kombu.Message]:
+        """kombu messages of the batch"""
+        return [message for _, message in self.items]
+
+    def merged_body(self) -> Dict[str, Any]:
+        """Build a single message body from all the messages of the batch.
+
+        Document identifiers and indices are concatenated without duplicates and
+        merged messages become ancestors of the merged one.
+
+        Returns:
+            Dict[str, Any]: merged body
+        """
+        bodies = self.bodies
+
+        merged = dict(bodies[0])
+
+        merged["message_id"] = str(uuid.uuid4())
+
+        merged["ancestor_ids"] = list(
+            dict.fromkeys(
+                ancestor_id
+                for body in bodies
+                for ancestor_id in body.get("ancestor_ids", []) + [body["message_id"]]
+            )
+        )
+
+        merged["document_ids"] = list(
+            dict.fromkeys(
+                document_id
+                for body in bodies
+                for document_id in body.get("document_ids", [])
+            )
+        )
+
+        merged["document_indices"] = list(
+            dict.fromkeys(
+                index for body in bodies for index in body.get("document_indices", [])
+            )
+        )
+
+        return merged
+
+
+class MessageBatcher:
+    """Group mergeable messages until a batch is full or too old"""
+
+    def __init__(self, max_size: int, max_wait: float):
+        """Constructor
+
+        Args:
+            max_size (int): maximum number of messages in a batch
+            max_wait (float): maximum time in seconds a message waits in a batch
+        """
+        self.max_size = max_size
+
+        self.max_wait = max_wait
+
+        self._batches: Dict[Hashable, MessageBatch] = {}
+
+    def __len__(self) -> int:
+        """number of pending messages"""
+        return sum(len(batch) for batch in self._batches.values())
+
+    @staticmethod
+    def batch_key(
+        exchange_name: str, routing_key: str, body: Dict[str, Any]
+    ) -> Optional[Hashable]:
+        """Get the key grouping mergeable messages
+
+        Args:
+            exchange_name (str): exchange
+            routing_key (str): routing key
+            body (Dict[str, Any]): message body
+
+        Returns:
+            Optional[Hashable]: key, or None if the message cannot be merged
+        """
+        if "message_id" not in body or not body.get("document_ids"):
+            return None
+
+        if not set(body).issubset(MERGEABLE_KEYS):
+            return None
+
+        return (
+            exchange_name,
+            routing_key,
+            body.get("document_class", ""),
+            tuple(body.get("pipeline", [])),
+            body.get("force", True),
+        )
+
+    def add(
+        self, key: Hashable, body: Dict[str, Any], message: kombu.Message
+    ) -> Optional[MessageBatch]:
+        """Add a message to its batch
+
+        Args:
+            key (Hashable): batch key from batch_key()
+            body (Dict[str, Any]): message body
+            message (kombu.Message): message
+
+        Returns:
+            Optional[MessageBatch]: the batch if it is full and shall be processed
+        """
+        if key not in self._batches:
+            self._batches[key] = MessageBatch(
+                message.delivery_info["exchange"], message.delivery_info["routing_key"]
+            )
+
+        batch = self._batches[key]
+
+        batch.items.append((body, message))
+
+        if len(batch) >= self.max_size:
+            return self._batches.pop(key)
+
+        return None
+
+    def pop_expired(self, now: Optional[float] = None) -> List[MessageBatch]:
+        """Remove and return the batches waiting for more than max_wait
+
+        Args:
+            now (Optional[float], optional): monotonic time. Defaults to None for now.
+
+        Returns:
+            List[MessageBatch]: expired batches
+        """
+        if now is None:
+            now = time.monotonic()
+
+        expired_keys = [
+            key
+            for key, batch in self._batches.items()
+            if now - batch.created >= self.max_wait
+        ]
+
+        return [self._batches.pop(key) for key in expired_keys]
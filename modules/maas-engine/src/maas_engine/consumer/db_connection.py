@@ -0,0 +1,226 @@
+"""OpenSearch connection management for the engine consumer"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import opensearchpy.connection.connections as db_connections
+from opensearchpy import OpenSearch
+from opensearchpy.exceptions import OpenSearchException
+
+
+class OpenSearchConnectionManager:
+    """Keep a single pooled, keep-alive opensearch client for the whole process.
+
+    The client is registered in opensearch-dsl connection registry under an alias
+    (default: "default") so models keep using the implicit connection.
+
+    The client is checked with a ping every health_check_interval seconds when
+    acquired, and rebuilt when the check fails or when a connection error has been
+    reported with invalidate(). When queries of other threads may still use the
+    client, the previous client can be retired instead of closed on reconnection,
+    then closed with close_retired() once these queries are finished.
+
+    The legacy behaviour, a new connection for every message closed at the end of the
+    message processing, is still available with per_message=True.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        alias: str = "default",
+        pool_maxsize: int = 10,
+        health_check_interval: float = 60.0,
+        per_message: bool = False,
+        **client_kwargs: Any,
+    ):
+        """Constructor
+
+        Args:
+            url (str): opensearch url with credentials
+            alias (str, optional): connection alias in the registry.
+                Defaults to "default".
+            pool_maxsize (int, optional): maximum number of connections kept alive
+                in the http pool. Defaults to 10.
+            health_check_interval (float, optional): minimum delay in seconds between
+                two pings. 0 checks at every acquisition. Defaults to 60.0.
+            per_message (bool, optional): legacy mode, connect and close for every
+                message. Defaults to False.
+            client_kwargs: additional keyword arguments for opensearchpy.OpenSearch
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.url = url
+
+        self.alias = alias
+
+        self.pool_maxsize = pool_maxsize
+
+        self.health_check_interval = health_check_interval
+
+        self.per_message = per_message
+
+        self.client_kwargs: Dict[str, Any] = client_kwargs
+
+        self.client: Optional[OpenSearch] = None
+
+        # replaced clients still used by queries in progress
+        self.retired_clients: List[OpenSearch] = []
+
+        # monotonic timestamp of the last successful health check
+        self._last_check = 0.0
+
+        # set when a connection error has been reported
+        self._invalidated = False
+
+        # connection statistics, exposed in the health check environment
+        self.connect_count = 0
+
+        self.reconnect_count = 0
+
+    @property
+    def is_ok(self) -> bool:
+        """tell if the managed client is usable according to the last known status
+
+        Returns:
+            bool: True if a client is set up and not invalidated
+        """
+        return self.client is not None and not self._invalidated
+
+    def connect(self) -> OpenSearch:
+        """create the client and register it in the connection registry
+
+        Returns:
+            OpenSearch: the new client
+        """
+        self.logger.debug("Create connection to opensearch with alias %s", self.alias)
+
+        self.client = db_connections.create_connection(
+            alias=self.alias,
+            hosts=[self.url],
+            pool_maxsize=self.pool_maxsize,
+            **self.client_kwargs,
+        )
+
+        self.connect_count += 1
+
+        self._invalidated = False
+
+        self._last_check = time.monotonic()
+
+        return self.client
+
+    def _close_client(self, client: OpenSearch) -> None:
+        """close the connections of a client
+
+        Args:
+            client (OpenSearch): client to close
+        """
+        try:
+            client.close()
+        except OpenSearchException as error:
+            self.logger.warning("Error closing opensearch connection: %s", error)
+
+    def close(self) -> None:
+        """close the client and remove it from the connection registry"""
+        self.close_retired()
+
+        if self.client is None:
+            return
+
+        self.logger.debug("Close connection to opensearch with alias %s", self.alias)
+
+        self._close_client(self.client)
+
+        try:
+            db_connections.remove_connection(self.alias)
+        except KeyError:
+            pass
+
+        self.client = None
+
+    def reconnect(self, retire: bool = False) -> OpenSearch:
+        """close and recreate the client
+
+        Args:
+            retire (bool, optional): keep the previous client open for the queries
+                in progress: the new client replaces it in the registry and it is
+                closed by close_retired(). Defaults to False.
+
+        Returns:
+            OpenSearch: the new client
+        """
+        self.logger.info("Reconnecting to opensearch")
+
+        self.reconnect_count += 1
+
+        if retire and self.client is not None:
+            self.retired_clients.append(self.client)
+
+            self.client = None
+
+        else:
+            self.close()
+
+        return self.connect()
+
+    def close_retired(self) -> None:
+        """close the clients replaced by a reconnection with retire=True"""
+        for client in self.retired_clients:
+            self.logger.debug("Close retired connection to opensearch")
+
+            self._close_client(client)
+
+        self.retired_clients.clear()
+
+    def invalidate(self) -> None:
+        """report a connection failure: the client will be rebuilt on next acquire()"""
+        self.logger.warning("Opensearch connection invalidated")
+        self._invalidated = True
+
+    def check_health(self) -> bool:
+        """ping the cluster with the current client
+
+        Returns:
+            bool: True if the cluster answered
+        """
+        if self.client is None:
+            return False
+
+        try:
+            healthy = bool(self.client.ping())
+        except OpenSearchException as error:
+            self.logger.warning("Opensearch health check failed: %s", error)
+            healthy = False
+
+        if healthy:
+            self._last_check = time.monotonic()
+
+        return healthy
+
+    def acquire(self, retire: bool = False) -> OpenSearch:
+        """get a working client, to call before any database access
+
+        Args:
+            retire (bool, optional): retire the previous client instead of closing
+                it if a reconnection is needed. Defaults to False.
+
+        Returns:
+            OpenSearch: the managed client
+        """
+        if self.per_message or self.client is None:
+            return self.connect()
+
+        if self._invalidated:
+            return self.reconnect(retire)
+
+        if time.monotonic() - self._last_check >= self.health_check_interval:
+            if not self.check_health():
+                return self.reconnect(retire)
+
+        return self.client
+
+    def release(self) -> None:
+        """to call when database access is finished: only close in legacy mode"""
+        if self.per_message:
+            self.close()
@@ -1,15 +1,20 @@
 """Core module containing MAASEngine main class"""
 
 import argparse
+import functools
 import json
 import logging
 import signal
+import threading
+from concurrent.futures import Future
 from typing import Any, Dict, List, Optional
 
-from opensearchpy.connection import Connection as OpenSearchConnection
-from amqp import Connection
-import opensearchpy.connection.connections as db_connections
-from opensearchpy.exceptions import OpenSearchException, ImproperlyConfigured
+from opensearchpy import OpenSearch
+from opensearchpy.exceptions import (
+    ConnectionError as OpenSearchConnectionError,
+    ImproperlyConfigured,
+    OpenSearchException,
+)
 
 import kombu
 
@@ -19,13 +24,21 @@ from maas_engine.cli.log import setup_logging
 import maas_engine.cli.args as engine_args
 import maas_engine.exceptions
 from maas_engine.consumer.consumer_mixin import MaasConsumerMixin
-from maas_engine.consumer.amqp_settings import AMQPSettings
+from maas_engine.consumer.amqp_settings import AMQPSettings, QueuePrefetchConsumer
+from maas_engine.consumer.batch import MessageBatch, MessageBatcher
+from maas_engine.consumer.db_connection import OpenSearchConnectionManager
+from maas_engine.consumer.workers import PendingMessage, WorkerPools
 from maas_engine.engine.base import Engine, EngineSession, EngineReport
+from maas_engine.engine.cache import invalidate_caches
 
 
 class MaasEngineConsumer(MaasConsumerMixin):
     """AMQP consumer and message dispatch based on JSON configuration"""
 
+    # maximum delay in seconds between the end of a pipeline executed by a worker
+    # thread and the message acknowledgement
+    WORKER_POLL_INTERVAL = 0.1
+
     def __init__(self, args: argparse.Namespace):
         self.logger = logging.getLogger(self.__class__.__name__)
 
@@ -38,9 +51,33 @@ class MaasEngineConsumer(MaasConsumerMixin):
 
         self.producer: kombu.Producer
 
-        self.current_pipeline: List[str] = []
+        # current pipeline is stored by thread for the worker threads mode
+        self._local = threading.local()
+
+        self.db_connection_manager: OpenSearchConnectionManager | None = None
+
+        self.db_connection: OpenSearch | None = None
+
+        # pending messages in micro-batching mode, None if disabled
+        self.batcher: MessageBatcher | None = None
+
+        # pipelines in progress in worker threads mode, None if disabled
+        self.workers: WorkerPools | None = None
+
+        # pipelines in progress when the opensearch client has been replaced, which
+        # may still use the retired client
+        self._retiring_futures: List[Future] = []
 
-        self.db_connection: OpenSearchConnection | None = None
+    @property
+    def current_pipeline(self) -> List[str]:
+        """identifiers of the engines executed by the current thread"""
+        if not hasattr(self._local, "pipeline"):
+            self._local.pipeline = []
+        return self._local.pipeline
+
+    @current_pipeline.setter
+    def current_pipeline(self, pipeline: List[str]) -> None:
+        self._local.pipeline = pipeline
 
     @property
     def connection(self):
@@ -66,6 +103,9 @@ class MaasEngineConsumer(MaasConsumerMixin):
         if self.args.config_directory:
             Engine.load_config_directory(self.args.config_directory)
 
+        # load slow to build engine resources before consuming
+        Engine.warm_up_engines()
+
         if self.args.force:
             self.logger.info("Data update is forced")
 
@@ -74,6 +114,43 @@ class MaasEngineConsumer(MaasConsumerMixin):
                 "opensearch errors will reject the messages. Use this carefully"
             )
 
+        # setup opensearch connection manager: connections are opened lazily by
+        # on_start_message()
+        self.db_connection_manager = OpenSearchConnectionManager(
+            self.args.es_url,
+            pool_maxsize=self.args.es_pool_maxsize,
+            health_check_interval=self.args.es_health_check_interval,
+            per_message=self.args.es_connection_per_message,
+            retry_on_timeout=True,
+            max_retries=self.args.es_retries,
+            timeout=self.args.es_timeout,
+            verify_certs=not self.args.es_ignore_certs_verification,
+            ssl_show_warn=not self.args.es_ignore_certs_verification,
+        )
+
+        if self.args.es_connection_per_message:
+            self.logger.info("Opensearch connection will be created for each message")
+
+        if self.args.worker_threads:
+            if self.args.batch_size > 1:
+                raise ValueError("Micro-batching cannot be used with worker threads")
+
+            if self.args.es_connection_per_message:
+                raise ValueError(
+                    "Opensearch connection per message cannot be used with "
+                    "worker threads"
+                )
+
+        if self.args.batch_size > 1:
+            self.logger.info(
+                "Micro-batching enabled: up to %d messages waiting at most %d ms",
+                self.args.batch_size,
+                self.args.batch_max_wait,
+            )
+            self.batcher = MessageBatcher(
+                self.args.batch_size, self.args.batch_max_wait / 1000.0
+            )
+
         # setup AMQP
         # TODO add retry policy like in collector
         self.amqp_settings = AMQPSettings(self.args.amqp_url)
@@ -84,6 +161,16 @@ class MaasEngineConsumer(MaasConsumerMixin):
             channel=self.amqp_settings.connection, on_return=self.handle_message_return
         )
 
+        if self.args.worker_threads:
+            self.workers = WorkerPools(
+                self.args.worker_threads, self.amqp_settings.concurrency_dict
+            )
+            self.logger.info(
+                "Worker threads enabled: %d by routing key, configured: %s",
+                self.args.worker_threads,
+                self.amqp_settings.concurrency_dict,
+            )
+
         # connect signal to exit gracefully
         signal.signal(signal.SIGINT, self.exit_gracefully)
         signal.signal(signal.SIGTERM, self.exit_gracefully)
@@ -91,7 +178,59 @@ class MaasEngineConsumer(MaasConsumerMixin):
     def get_consumers(self, Consumer, channel):
         """create consumer list, grouped by exchange"""
         if self.amqp_settings:
-            return self.amqp_settings.get_consumers(Consumer, channel, self.on_message)
+            if self.workers is not None:
+                # one consumer by queue for queue specific prefetch count
+                return self.amqp_settings.get_queue_consumers(
+                    functools.partial(
+                        QueuePrefetchConsumer,
+                        channel,
+                        on_decode_error=self.on_decode_error,
+                    ),
+                    channel,
+                    self.on_message,
+                    self.args.worker_threads,
+                )
+
+            # a batch can only be complete if enough messages are prefetched
+            prefetch_count = self.args.batch_size if self.batcher is not None else 1
+
+            return self.amqp_settings.get_consumers(
+                Consumer, channel, self.on_message, prefetch_count=prefetch_count
+            )
+
+    def consume(self, limit=None, timeout=None, safety_interval=1, **kwargs):
+        """override to wake up often enough to process incomplete batches and
+        completed worker executions in time"""
+        if self.batcher is not None:
+            safety_interval = min(safety_interval, self.batcher.max_wait)
+
+        if self.workers is not None:
+            safety_interval = min(safety_interval, self.WORKER_POLL_INTERVAL)
+
+        return super().consume(limit, timeout, safety_interval, **kwargs)
+
+    def on_iteration(self):
+        """process the batches waiting for more than the maximum wait time and
+        complete messages whose pipeline is finished in worker threads"""
+        if self.batcher is not None:
+            for batch in self.batcher.pop_expired():
+                self.process_batch(batch)
+
+        if self.workers is not None:
+            for pending in self.workers.pop_completed():
+                self.complete_pending_message(pending)
+
+            self.close_retired_db_clients()
+
+    def on_consume_end(self, connection, channel):
+        """wait for the pipelines in progress so their messages are acked before
+        the channel is closed, for example when exiting gracefully"""
+        if self.workers is not None and len(self.workers):
+            self.logger.info(
+                "Waiting for %d messages in progress before exiting", len(self.workers)
+            )
+            for pending in self.workers.pop_completed(timeout=None):
+                self.complete_pending_message(pending)
 
     def on_message(self, body: Dict[str, Any], message: kombu.Message) -> None:
         """
@@ -126,6 +265,29 @@ class MaasEngineConsumer(MaasConsumerMixin):
             self.logger.info("MaasEngine is exiting: not consuming anymore.")
             return
 
+        if self.batcher is not None and (
+            batch_key := self.batcher.batch_key(exchange_name, routing_key, body)
+        ):
+            if batch := self.batcher.add(batch_key, body, message):
+                self.process_batch(batch)
+            return
+
+        if self.workers is not None:
+            self.submit_message(body, message)
+            return
+
+        self.process_message(body, message)
+
+    def process_message(self, body: Dict[str, Any], message: kombu.Message) -> None:
+        """
+        Execute the engine pipeline for a single message, then ack, requeue or reject
+
+        Args:
+            body (Dict[str, Any]): message content
+            message (kombu.Message): kombu Message instance
+        """
+        routing_key = message.delivery_info["routing_key"]
+
         # pylint: disable=W0718
         # catching any error is justified by the design of the on_start_message() method
         # that shall absolutely succeed before doing anything, otherwise requeue.
@@ -138,49 +300,145 @@ class MaasEngineConsumer(MaasConsumerMixin):
         # pylint: enable=W0718
 
         try:
-            # setup db
-
             # execute pipeline to get reports
             reports = self._execute_engines(routing_key, body)
 
-        except maas_engine.exceptions.HandleMessageException as hme:
+        except Exception as error:  # pylint: disable=W0703
+            self.complete_message(body, message, error=error)
+
+        else:
+            self.complete_message(body, message, reports, self.current_pipeline)
+
+        finally:
+            self.on_end_message(body, message)
+
+    def submit_message(self, body: Dict[str, Any], message: kombu.Message) -> None:
+        """
+        Execute the engine pipeline of a message in a worker thread. The message is
+        completed later by complete_pending_message() from the consumer thread.
+
+        Args:
+            body (Dict[str, Any]): message content
+            message (kombu.Message): kombu Message instance
+        """
+        # pylint: disable=W0718
+        # same as process_message(): requeue if pre-pipeline hook fails
+        try:
+            self.on_start_message(body, message)
+        except Exception as error:
+            self.logger.exception(error)
+            message.requeue()
+            return
+        # pylint: enable=W0718
+
+        self.workers.submit(
+            message.delivery_info["routing_key"], body, message, self._run_pipeline
+        )
+
+    def _run_pipeline(self, routing_key: str, body: Dict[str, Any]) -> tuple:
+        """Execute engines in a worker thread
+
+        Args:
+            routing_key (str): routing key
+            body (Dict[str, Any]): message content
+
+        Returns:
+            tuple: reports and executed engine identifiers
+        """
+        reports = self._execute_engines(routing_key, body)
+
+        return reports, list(self.current_pipeline)
+
+    def complete_pending_message(self, pending: PendingMessage) -> None:
+        """
+        Ack, requeue or reject a message whose pipeline has been executed by a worker
+        thread
+
+        Args:
+            pending (PendingMessage): message executed by a worker thread
+        """
+        try:
+            reports, pipeline = pending.future.result()
+
+        except Exception as error:  # pylint: disable=W0703
+            self.complete_message(pending.body, pending.message, error=error)
+
+        else:
+            self.complete_message(pending.body, pending.message, reports, pipeline)
+
+        finally:
+            self.on_end_message(pending.body, pending.message)
+
+    def complete_message(
+        self,
+        body: Dict[str, Any],
+        message: kombu.Message,
+        reports: Optional[List[EngineReport]] = None,
+        executed_pipeline: Optional[List[str]] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        """
+        Publish reports and ack the message after a successful pipeline execution,
+        requeue or reject the message depending the error otherwise
+
+        Args:
+            body (Dict[str, Any]): message content
+            message (kombu.Message): kombu Message instance
+            reports (Optional[List[EngineReport]], optional): pipeline reports.
+                Defaults to None.
+            executed_pipeline (Optional[List[str]], optional): identifiers of the
+                executed engines. Defaults to None.
+            error (Optional[Exception], optional): pipeline execution error.
+                Defaults to None.
+        """
+        routing_key = message.delivery_info["routing_key"]
+
+        message_id = body.get("message_id", "noid")
+
+        if isinstance(error, maas_engine.exceptions.HandleMessageException):
             self.logger.warning(
-                "MSG %s REQUEUE due to previous error: %s", message_id, hme
+                "MSG %s REQUEUE due to previous error: %s", message_id, error
             )
             # requeue the whole message on expected error like conflicts
             message.requeue()
 
-        except (OpenSearchException, ImproperlyConfigured) as es_error:
+        elif isinstance(error, (OpenSearchException, ImproperlyConfigured)):
+            if isinstance(error, OpenSearchConnectionError):
+                # the pooled connection may be broken: rebuild it on next message
+                self.db_connection_manager.invalidate()
+
             self.logger.error(
                 "MSG %s REQUEUE due to opensearch error: %s with payload %s",
                 message_id,
-                es_error,
+                error,
                 body,
             )
             # requeue the whole message
             message.requeue()
 
-        except maas_engine.exceptions.CannotProcessMessageException as cpme:
-            # deliberately separate from except Exception block
-            self.logger.exception(
+        elif isinstance(error, maas_engine.exceptions.CannotProcessMessageException):
+            # deliberately separate from other exceptions
+            self.logger.error(
                 "MSG %s NORMAL_REJECTION due to previous error: %s with payload %s",
                 message_id,
-                cpme,
+                error,
                 body,
+                exc_info=error,
             )
             message.reject()
 
-        except Exception as exception:  # pylint: disable=W0703
-            self.logger.exception(
+        elif error is not None:
+            self.logger.error(
                 "MSG %s ABNORMAL_REJECTION due to previous error: %s with payload %s",
                 message_id,
-                exception,
+                error,
                 body,
+                exc_info=error,
             )
             message.reject()
 
         else:
-            pipeline = body.get("pipeline", []) + self.current_pipeline
+            pipeline = body.get("pipeline", []) + (executed_pipeline or [])
             # send reports before ACK
             if reports:
                 # generate the list of indentifiers of ancestor messages
@@ -206,41 +464,154 @@ class MaasEngineConsumer(MaasConsumerMixin):
 
             message.ack()
 
+    def process_batch(self, batch: MessageBatch) -> None:
+        """
+        Execute the engine pipeline once for a batch of messages merged in a single
+        payload. All messages are acked on success. On failure, each message is
+        processed on its own so only the faulty ones are requeued or rejected.
+
+        Args:
+            batch (MessageBatch): messages to process
+        """
+        if len(batch) == 1:
+            self.process_message(*batch.items[0])
+            return
+
+        body = batch.merged_body()
+
+        message_id = body["message_id"]
+
+        self.logger.info(
+            "BATCH %s MERGED %d messages from %s/%s: %s",
+            message_id,
+            len(batch),
+            batch.exchange_name,
+            batch.routing_key,
+            [item_body["message_id"] for item_body in batch.bodies],
+        )
+
+        # pylint: disable=W0718
+        # same as process_message(): requeue all if pre-pipeline hook fails
+        try:
+            self.on_start_message(body, None)
+        except Exception as error:
+            self.logger.exception(error)
+            for message in batch.messages:
+                message.requeue()
+            return
+        # pylint: enable=W0718
+
+        failed = False
+
+        try:
+            reports = self._execute_engines(batch.routing_key, body)
+
+        except Exception as exception:  # pylint: disable=W0703
+            # any message of the batch may be the faulty one
+            if isinstance(exception, OpenSearchConnectionError):
+                self.db_connection_manager.invalidate()
+
+            self.logger.warning(
+                "BATCH %s FALLBACK to per message processing due to error: %s",
+                message_id,
+                exception,
+            )
+            failed = True
+
+        else:
+            pipeline = body.get("pipeline", []) + self.current_pipeline
+
+            if reports:
+                self.notify_reports(
+                    self.amqp_settings.exchanges["etl-exchange"],
+                    reports,
+                    max(
+                        message.properties.get(
+                            "priority", round(self.args.amqp_max_priority / 2)
+                        )
+                        for message in batch.messages
+                    ),
+                    ancestor_ids=body["ancestor_ids"] + [message_id],
+                    pipeline=pipeline,
+                    force=body.get("force", True),
+                )
+
+            self.logger.info(
+                "BATCH %s ACK %d messages %s Completed pipeline: %s",
+                message_id,
+                len(batch),
+                batch.routing_key,
+                pipeline,
+            )
+
+            for message in batch.messages:
+                message.ack()
+
         finally:
-            self.on_end_message(body, message)
+            self.on_end_message(body, None)
+
+        if failed:
+            for item_body, message in batch.items:
+                self.process_message(item_body, message)
 
-    def on_start_message(self, body: Dict[str, Any], message: kombu.Message) -> None:
+    def on_start_message(
+        self, body: Dict[str, Any], message: kombu.Message | None
+    ) -> None:
         """
-        Hook for pre-pipeline execution: setup db connection
+        Hook for pre-pipeline execution: acquire the opensearch connection
 
         Args:
             body (Dict[str, Any]): message body
-            message (kombu.Message): message
+            message (kombu.Message | None): message, None for a merged batch
         """
 
-        self.logger.debug("on_start_message: create connection to opensearch")
-        self.db_connection = db_connections.create_connection(
-            hosts=[self.args.es_url],
-            retry_on_timeout=True,
-            max_retries=self.args.es_retries,
-            timeout=self.args.es_timeout,
-            verify_certs=not self.args.es_ignore_certs_verification,
-            ssl_show_warn=not self.args.es_ignore_certs_verification,
+        self.logger.debug("on_start_message: acquire connection to opensearch")
+
+        reconnect_count = self.db_connection_manager.reconnect_count
+
+        # worker threads may be querying with the current client: don't close it
+        self.db_connection = self.db_connection_manager.acquire(
+            retire=self.workers is not None
         )
 
-    def on_end_message(self, body: Dict[str, Any], message: kombu.Message) -> None:
+        if (
+            self.workers is not None
+            and self.db_connection_manager.reconnect_count != reconnect_count
+        ):
+            self._retiring_futures.extend(self.workers.futures)
+
+    def close_retired_db_clients(self) -> None:
+        """close the opensearch clients replaced by a reconnection once the pipelines
+        in progress at that time are finished"""
+        if not self.db_connection_manager or not (
+            self.db_connection_manager.retired_clients
+        ):
+            return
+
+        self._retiring_futures = [
+            future for future in self._retiring_futures if not future.done()
+        ]
+
+        if not self._retiring_futures:
+            self.db_connection_manager.close_retired()
+
+    def on_end_message(
+        self, body: Dict[str, Any], message: kombu.Message | None
+    ) -> None:
         """
-        Hook for post-pipeline execution: close opensearch connection
+        Hook for post-pipeline execution: release opensearch connection, which is
+        only closed in the legacy connection per message mode
 
         Args:
             body (Dict[str, Any]): message body
-            message (kombu.Message): message
+            message (kombu.Message | None): message, None for a merged batch
         """
-        if self.db_connection:
-            self.logger.debug("on_end_message: close connection to opensearch")
-            self.db_connection.close()
-            db_connections.remove_connection("default")
-            self.db_connection = None
+        if self.db_connection_manager:
+            self.logger.debug("on_end_message: release connection to opensearch")
+            self.db_connection_manager.release()
+
+            if self.db_connection_manager.client is None:
+                self.db_connection = None
 
     def _execute_engines(
         self, routing_key: str, body: Dict[str, Any]
@@ -253,6 +624,9 @@ class MaasEngineConsumer(MaasConsumerMixin):
             item_ids (list[str]): id list of the data_type items at the origin of
                 the computation
         """
+        # updated documents may be cached by the engines of the process
+        invalidate_caches(routing_key, body.get("document_ids"))
+
         engine_list: List[Engine] = [
             Engine.get(engine_args, self.args)
             for engine_args in self.amqp_settings.event_mapping[routing_key]
@@ -453,4 +827,11 @@ class MaasEngineConsumer(MaasConsumerMixin):
         consumer.setup()
 
         # run the listening loop
-        consumer.run()
+        try:
+            consumer.run()
+        finally:
+            if consumer.workers is not None:
+                consumer.workers.shutdown()
+
+            if consumer.db_connection_manager:
+                consumer.db_connection_manager.close()
@@ -0,0 +1,162 @@
+"""Worker thread pools executing engine pipelines for the engine consumer"""
+
+import dataclasses
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+import kombu
+
+
+@dataclasses.dataclass
+class PendingMessage:
+    """A message whose pipeline is executed by a worker thread"""
+
+    routing_key: str
+
+    body: Dict[str, Any]
+
+    message: kombu.Message
+
+    future: Future
+
+
+class WorkerPools:
+    """One thread pool per routing key, so a slow pipeline only blocks its own queue.
+
+    Messages are submitted and completed from the consumer thread: only pipeline
+    executions run in worker threads, acks and publications never leave the
+    consumer thread as kombu channels are not thread safe.
+    """
+
+    def __init__(
+        self,
+        default_concurrency: int,
+        concurrency_dict: Optional[Dict[str, int]] = None,
+    ):
+        """Constructor
+
+        Args:
+            default_concurrency (int): number of threads of a routing key pool
+            concurrency_dict (Optional[Dict[str, int]], optional): number of threads
+                by routing key, overriding default_concurrency. Defaults to None.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.default_concurrency = default_concurrency
+
+        self.concurrency_dict = concurrency_dict or {}
+
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+
+        self._pending: List[PendingMessage] = []
+
+    def __len__(self) -> int:
+        """number of messages in progress"""
+        return len(self._pending)
+
+    def get_concurrency(self, routing_key: str) -> int:
+        """get the number of threads for a routing key
+
+        Args:
+            routing_key (str): routing key
+
+        Returns:
+            int: number of threads
+        """
+        return self.concurrency_dict.get(routing_key) or self.default_concurrency
+
+    def _get_executor(self, routing_key: str) -> ThreadPoolExecutor:
+        """get or create the pool of a routing key
+
+        Args:
+            routing_key (str): routing key
+
+        Returns:
+            ThreadPoolExecutor: the pool
+        """
+        if routing_key not in self._executors:
+            concurrency = self.get_concurrency(routing_key)
+
+            self.logger.info(
+                "Starting %d worker threads for %s", concurrency, routing_key
+            )
+
+            self._executors[routing_key] = ThreadPoolExecutor(
+                max_workers=concurrency, thread_name_prefix=routing_key
+            )
+
+        return self._executors[routing_key]
+
+    def submit(
+        self,
+        routing_key: str,
+        body: Dict[str, Any],
+        message: kombu.Message,
+        function: Callable[[str, Dict[str, Any]], Any],
+    ) -> PendingMessage:
+        """execute function(routing_key, body) in the pool of the routing key
+
+        Args:
+            routing_key (str): routing key
+            body (Dict[str, Any]): message body
+            message (kombu.Message): message to complete later
+            function (Callable[[str, Dict[str, Any]], Any]): pipeline execution
+
+        Returns:
+            PendingMessage: the message in progress
+        """
+        pending = PendingMessage(
+            routing_key,
+            body,
+            message,
+            self._get_executor(routing_key).submit(function, routing_key, body),
+        )
+
+        self._pending.append(pending)
+
+        return pending
+
+    @property
+    def futures(self) -> List[Future]:
+        """futures of the messages in progress"""
+        return [pending.future for pending in self._pending]
+
+    def pop_completed(self, timeout: Optional[float] = 0) -> List[PendingMessage]:
+        """Remove and return the messages whose execution is finished
+
+        Args:
+            timeout (Optional[float], optional): time to wait for at least one
+                completion, None to wait for all. Defaults to 0.
+
+        Returns:
+            List[PendingMessage]: completed messages, in submission order
+        """
+        if not self._pending:
+            return []
+
+        if timeout != 0:
+            wait(
+                self.futures,
+                timeout=timeout,
+                return_when="ALL_COMPLETED" if timeout is None else "FIRST_COMPLETED",
+            )
+
+        completed = []
+
+        running = []
+
+        # a single done() call per future so no completion is lost
+        for pending in self._pending:
+            (completed if pending.future.done() else running).append(pending)
+
+        self._pending = running
+
+        return completed
+
+    def shutdown(self) -> None:
+        """stop all the pools after the end of the running executions"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+
+        self._executors.clear()
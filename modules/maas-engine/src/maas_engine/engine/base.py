@@ -11,7 +11,8 @@ import importlib
 import json
 import logging
 import os
-from typing import Any, ClassVar, Dict, Iterator, List, Optional, Type
+import time
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Set, Type
 from types import ModuleType
 
 from maas_model import MAASDocument, MAASMessage, MAASBaseMessage
@@ -208,13 +209,84 @@ class Engine(ABC):
             logging.critical("Unknown engine: %s", engine_id)
             raise
 
+        # bulk writer and update by query options are not constructor arguments, so
+        # data engine implementations don't have to forward them
+        bulk_options = engine_args.pop("bulk", None)
+
+        update_by_query_options = engine_args.pop("update_by_query", None)
+
         engine_args["args"] = args
 
         logging.debug(
             "Instanciating engine: %s with args: %s", engine_class, engine_args
         )
 
-        return cls.__ALL_ENGINES[engine_id](**engine_args)
+        engine = cls.__ALL_ENGINES[engine_id](**engine_args)
+
+        if bulk_options:
+            if not hasattr(engine, "bulk_options"):
+                raise ValueError(f"{engine_id} does not support bulk options")
+
+            engine.bulk_options = engine.bulk_options | bulk_options
+
+        if update_by_query_options is not None:
+            if not hasattr(engine, "update_by_query_options"):
+                raise ValueError(f"{engine_id} does not support update by query")
+
+            engine.update_by_query_options = update_by_query_options
+
+        return engine
+
+    @classmethod
+    def get_declared_engine_ids(cls) -> Set[str]:
+        """Get the identifiers of the engines declared in the configuration
+
+        Raises:
+            TypeError: if an event configuration is not a string or a dict
+
+        Returns:
+            Set[str]: engine identifiers
+        """
+        declared_engine_ids = set()
+        for exchange_dict in cls.CONFIG_DICT["amqp"]:
+            for queue_dict in exchange_dict["queues"]:
+                for event_config in queue_dict["events"]:
+                    if isinstance(event_config, str):
+                        declared_engine_ids.add(event_config)
+                    elif isinstance(event_config, dict):
+                        declared_engine_ids.add(event_config["id"])
+                    else:
+                        raise TypeError(f"{event_config} is not a string or a dict")
+
+        return declared_engine_ids
+
+    @classmethod
+    def warm_up(cls) -> None:
+        """Load process level resources before the first message.
+
+        Engine instances only live for a message: implementations override this
+        hook to load their slow to build resources once at startup.
+        """
+
+    @classmethod
+    def warm_up_engines(cls) -> None:
+        """Call the warm up hook of the engines declared in the configuration"""
+        engine_classes = {
+            cls.__ALL_ENGINES[engine_id]
+            for engine_id in cls.get_declared_engine_ids()
+            if engine_id in cls.__ALL_ENGINES
+        }
+
+        for engine_class in sorted(engine_classes, key=lambda klass: klass.ENGINE_ID):
+            start = time.perf_counter()
+
+            engine_class.warm_up()
+
+            logging.debug(
+                "Warmed up %s in %.3f s",
+                engine_class.ENGINE_ID,
+                time.perf_counter() - start,
+            )
 
     @classmethod
     def get_model(cls, model_name: str) -> "MAASDocument":
@@ -432,16 +504,7 @@ class Engine(ABC):
                         configured_exchange["queues"].append(queue)
                         
         # a set of all engine identifiers in the configuration
-        declared_engine_ids = set()
-        for exchange_dict in cls.CONFIG_DICT["amqp"]:
-            for queue_dict in exchange_dict["queues"]:
-                for event_config in queue_dict["events"]:
-                    if isinstance(event_config, str):
-                        declared_engine_ids.add(event_config)
-                    elif isinstance(event_config, dict):
-                        declared_engine_ids.add(event_config["id"])
-                    else:
-                        raise TypeError(f"{event_config} is not a string or a dict")
+        declared_engine_ids = cls.get_declared_engine_ids()
 
         # check all declared engine identifier have implementations
         if not all(name in cls.__ALL_ENGINES for name in declared_engine_ids):
@@ -0,0 +1,311 @@
+"""Bulk writer used by data engines to push actions to the database"""
+
+import dataclasses
+import enum
+import logging
+import time
+from multiprocessing.pool import ThreadPool
+from queue import Queue
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# opensearch-py does not expose the chunking helpers used by parallel_bulk(): they are
+# reused to measure each chunk round-trip
+from opensearchpy.helpers.actions import (
+    _chunk_actions,
+    _process_bulk_chunk,
+    expand_action,
+)
+
+
+class RefreshMode(str, enum.Enum):
+    """Refresh policy of the bulk requests"""
+
+    # refresh the shards after each bulk request
+    TRUE = "true"
+
+    # wait for the next scheduled refresh before answering each bulk request
+    WAIT_FOR = "wait_for"
+
+    # no refresh: documents will be searchable after the index refresh interval
+    FALSE = "false"
+
+    # no refresh during bulk requests, a single refresh of the written indices is
+    # done by flush(), before reports are published
+    DEFERRED = "deferred"
+
+
+@dataclasses.dataclass
+class BulkOptions:
+    """Tunable options of the bulk writer"""
+
+    refresh: RefreshMode = RefreshMode.TRUE
+
+    # number of actions in a bulk request
+    chunk_size: int = 500
+
+    # number of threads sending bulk requests
+    thread_count: int = 4
+
+    # maximum size of a bulk request in bytes
+    max_chunk_bytes: int = 100 * 1024 * 1024
+
+    # number of serialized chunks waiting for a thread
+    queue_size: int = 4
+
+    def __post_init__(self):
+        # also accept booleans as in opensearch api
+        if isinstance(self.refresh, bool):
+            self.refresh = str(self.refresh).lower()
+
+        # raise ValueError on invalid values
+        self.refresh = RefreshMode(self.refresh)
+
+        for name in ("chunk_size", "thread_count", "max_chunk_bytes", "queue_size"):
+            if getattr(self, name) < 1:
+                raise ValueError(f"Bulk option {name} shall be strictly positive")
+
+    @classmethod
+    def from_dict(cls, options: Dict[str, Any]) -> "BulkOptions":
+        """create options from a configuration dictionnary
+
+        Args:
+            options (Dict[str, Any]): options, like {"refresh": "wait_for"}
+
+        Raises:
+            ValueError: if an option is unknown
+
+        Returns:
+            BulkOptions: options instance
+        """
+        field_names = {field.name for field in dataclasses.fields(cls)}
+
+        if unknown := set(options) - field_names:
+            raise ValueError(f"Unknown bulk options: {' '.join(sorted(unknown))}")
+
+        return cls(**options)
+
+
+@dataclasses.dataclass
+class BulkChunkStatistics:
+    """Store statistics about the bulk requests of a writer"""
+
+    chunks: int = 0
+
+    actions: int = 0
+
+    bytes: int = 0
+
+    # cumulated duration of the bulk requests, in seconds
+    duration: float = 0.0
+
+    min_duration: float = 0.0
+
+    max_duration: float = 0.0
+
+    # duration of the deferred refresh, in seconds
+    refresh_duration: float = 0.0
+
+    def update(self, actions: int, size: int, duration: float) -> None:
+        """add a chunk to the statistics
+
+        Args:
+            actions (int): number of actions in the chunk
+            size (int): size of the chunk in bytes
+            duration (float): round-trip duration of the bulk request
+        """
+        if not self.chunks or duration < self.min_duration:
+            self.min_duration = duration
+
+        self.max_duration = max(self.max_duration, duration)
+
+        self.chunks += 1
+
+        self.actions += actions
+
+        self.bytes += size
+
+        self.duration += duration
+
+    @property
+    def mean_duration(self) -> float:
+        """mean round-trip duration of a bulk request
+
+        Returns:
+            float: time in seconds
+        """
+        return self.duration / self.chunks if self.chunks else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """number of actions processed per second of bulk request
+
+        Returns:
+            float: actions per second
+        """
+        return self.actions / self.duration if self.duration else 0.0
+
+
+class BulkWriter:
+    """Send actions to the database with bulk requests sent by a thread pool.
+
+    Behaves like opensearchpy.helpers.parallel_bulk() but measures every bulk request
+    and supports a refresh deferred to flush().
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        options: Optional[BulkOptions] = None,
+        request_timeout: int = 120,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """Constructor
+
+        Args:
+            client (Any): opensearch client
+            options (Optional[BulkOptions], optional): bulk options.
+                Defaults to None for default options.
+            request_timeout (int, optional): bulk request timeout. Defaults to 120.
+            logger (Optional[logging.Logger], optional): logger. Defaults to None.
+        """
+        self.client = client
+
+        self.options = options or BulkOptions()
+
+        self.request_timeout = request_timeout
+
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+        self.stats = BulkChunkStatistics()
+
+        # indices written since last flush, for deferred refresh
+        self._written_indices: Set[str] = set()
+
+    @property
+    def bulk_refresh(self) -> str:
+        """refresh parameter of the bulk requests
+
+        Returns:
+            str: bulk api refresh value
+        """
+        if self.options.refresh == RefreshMode.DEFERRED:
+            return RefreshMode.FALSE.value
+        return self.options.refresh.value
+
+    def _process_chunk(
+        self, bulk_chunk: Tuple[List[Any], List[str]]
+    ) -> Tuple[List[Tuple[bool, Dict[str, Any]]], int, int, float]:
+        """send a chunk and measure the request
+
+        Args:
+            bulk_chunk (Tuple[List[Any], List[str]]): (data, serialized actions)
+
+        Returns:
+            Tuple[List[Tuple[bool, Dict[str, Any]]], int, int, float]: results like
+                parallel_bulk() ones, action count, size in bytes and duration
+        """
+        bulk_data, bulk_actions = bulk_chunk
+
+        start = time.perf_counter()
+
+        results = list(
+            _process_bulk_chunk(
+                self.client,
+                bulk_actions,
+                bulk_data,
+                raise_on_exception=False,
+                raise_on_error=False,
+                refresh=self.bulk_refresh,
+                request_timeout=self.request_timeout,
+            )
+        )
+
+        duration = time.perf_counter() - start
+
+        # chunks are processed in threads, but statistics are updated from the
+        # consuming thread to avoid locking: return the measure with the results.
+        # size is counted like the chunker does for max_chunk_bytes: utf-8 bytes of
+        # each serialized line plus its trailing new line
+        return (
+            results,
+            len(bulk_data),
+            sum(len(line.encode("utf-8")) + 1 for line in bulk_actions),
+            duration,
+        )
+
+    def bulk(
+        self, actions: Iterable[Dict[str, Any]]
+    ) -> Iterator[Tuple[bool, Dict[str, Any]]]:
+        """send actions to the database
+
+        Args:
+            actions (Iterable[Dict[str, Any]]): bulk actions
+
+        Yields:
+            Iterator[Tuple[bool, Dict[str, Any]]]: (success, info) for each action
+        """
+        options = self.options
+
+        queue_size = max(options.queue_size, options.thread_count)
+
+        class BlockingPool(ThreadPool):
+            """thread pool with a bounded task queue, like parallel_bulk() one"""
+
+            def _setup_queues(self) -> None:
+                super()._setup_queues()
+                # pylint: disable=attribute-defined-outside-init
+                self._inqueue = Queue(queue_size)
+                self._quick_put = self._inqueue.put
+
+        pool = BlockingPool(options.thread_count)
+
+        try:
+            for results, count, size, duration in pool.imap(
+                self._process_chunk,
+                _chunk_actions(
+                    map(expand_action, actions),
+                    options.chunk_size,
+                    options.max_chunk_bytes,
+                    self.client.transport.serializer,
+                ),
+            ):
+                self.stats.update(count, size, duration)
+
+                self.logger.debug(
+                    "Bulk chunk: %d actions, %d bytes in %.3fs", count, size, duration
+                )
+
+                for success, info in results:
+                    if success:
+                        for details in info.values():
+                            if isinstance(details, dict) and "_index" in details:
+                                self._written_indices.add(details["_index"])
+
+                    yield success, info
+
+        finally:
+            pool.close()
+            pool.join()
+
+    def flush(self) -> None:
+        """refresh written indices when the refresh is deferred"""
+        if self.options.refresh != RefreshMode.DEFERRED or not self._written_indices:
+            self._written_indices.clear()
+            return
+
+        start = time.perf_counter()
+
+        self.client.indices.refresh(
+            index=",".join(sorted(self._written_indices)),
+            request_timeout=self.request_timeout,
+        )
+
+        self.stats.refresh_duration += time.perf_counter() - start
+
+        self.logger.debug(
+            "Deferred refresh of %d indices in %.3fs",
+            len(self._written_indices),
+            self.stats.refresh_duration,
+        )
+
+        self._written_indices.clear()
@@ -0,0 +1,317 @@
+"""Process level caches for slow-changing reference data read by engines
+
+Engine instances only live for a single message, so reference data loaded by an
+engine is lost between messages. Reference caches are shared by all the engines of
+the process, bounded in size and in time, and invalidated by the consumer when a
+message with a matching routing key is received.
+"""
+
+import collections
+import dataclasses
+import fnmatch
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class CacheStatistics:
+    """Counters of a reference cache"""
+
+    hits: int = 0
+
+    misses: int = 0
+
+    # entries removed to respect the maximum size
+    evictions: int = 0
+
+    # entries removed because their time to live was over
+    expirations: int = 0
+
+    # entries removed by routing key invalidation
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """ratio of lookups served by the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ReferenceCache:
+    """Thread safe LRU cache whose entries expire after a time to live"""
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        invalidation_routing_keys: Iterable[str] = (),
+        by_document_id: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Constructor
+
+        Args:
+            name (str): cache name, used in logs and statistics
+            maxsize (int, optional): maximum number of entries. Defaults to 1024.
+            ttl (float, optional): time to live of an entry in seconds.
+                Defaults to 300.0.
+            invalidation_routing_keys (Iterable[str], optional): routing key
+                patterns (fnmatch syntax) invalidating the cache. Defaults to ().
+            by_document_id (bool, optional): keys are document identifiers, so an
+                invalidation only removes the document identifiers of the message
+                instead of clearing the cache. Defaults to False.
+            clock (Callable[[], float], optional): time source.
+                Defaults to time.monotonic.
+        """
+        self.name = name
+
+        self.maxsize = maxsize
+
+        self.ttl = ttl
+
+        self.invalidation_routing_keys = tuple(invalidation_routing_keys)
+
+        self.by_document_id = by_document_id
+
+        self.clock = clock
+
+        self.stats = CacheStatistics()
+
+        # key -> (expiration time, value), least recently used first
+        self._entries: collections.OrderedDict[Hashable, Tuple[float, Any]] = (
+            collections.OrderedDict()
+        )
+
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """get a value from the cache
+
+        Args:
+            key (Hashable): entry key
+            default (Any, optional): value returned on miss. Defaults to None.
+
+        Returns:
+            Any: cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                self.stats.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.stats.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """store a value in the cache, evicting the least recently used entries if
+        the cache is full
+
+        Args:
+            key (Hashable): entry key
+            value (Any): value to store
+        """
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def values(self) -> list:
+        """get the values that have not expired, without counting hits
+
+        Returns:
+            list: cached values
+        """
+        now = self.clock()
+
+        with self._lock:
+            return [
+                value
+                for expiration, value in self._entries.values()
+                if expiration > now
+            ]
+
+    def matches(self, routing_key: str) -> bool:
+        """tell if a routing key invalidates this cache
+
+        Args:
+            routing_key (str): message routing key
+
+        Returns:
+            bool: flag
+        """
+        return any(
+            fnmatch.fnmatchcase(routing_key, pattern)
+            for pattern in self.invalidation_routing_keys
+        )
+
+    def invalidate(self, keys: Optional[Iterable[Hashable]] = None) -> int:
+        """remove entries from the cache
+
+        Args:
+            keys (Optional[Iterable[Hashable]], optional): keys to remove, all the
+                entries if None. Defaults to None.
+
+        Returns:
+            int: number of removed entries
+        """
+        with self._lock:
+            if keys is None:
+                count = len(self._entries)
+                self._entries.clear()
+            else:
+                count = 0
+                for key in keys:
+                    if self._entries.pop(key, None) is not None:
+                        count += 1
+
+            self.stats.invalidations += count
+
+        return count
+
+
+# all the reference caches of the process, by name
+_CACHES: Dict[str, ReferenceCache] = {}
+
+_CACHES_LOCK = threading.Lock()
+
+
+def get_cache(name: str, **kwargs) -> ReferenceCache:
+    """get a reference cache of the process, creating it on first call
+
+    Args:
+        name (str): cache name
+        **kwargs: ReferenceCache constructor arguments, only used on creation
+
+    Returns:
+        ReferenceCache: the cache
+    """
+    with _CACHES_LOCK:
+        if name not in _CACHES:
+            _CACHES[name] = ReferenceCache(name, **kwargs)
+
+        return _CACHES[name]
+
+
+def invalidate_caches(
+    routing_key: str, document_ids: Optional[Iterable[str]] = None
+) -> int:
+    """invalidate the caches matching a routing key
+
+    Args:
+        routing_key (str): message routing key
+        document_ids (Optional[Iterable[str]], optional): document identifiers of
+            the message, only removed from caches keyed by document identifier.
+            Defaults to None.
+
+    Returns:
+        int: number of removed entries
+    """
+    count = 0
+
+    for cache in list(_CACHES.values()):
+        if not cache.matches(routing_key):
+            continue
+
+        if cache.by_document_id and document_ids is not None:
+            count += cache.invalidate(document_ids)
+        else:
+            count += cache.invalidate()
+
+    if count:
+        LOGGER.debug("Invalidated %d cached references on %s", count, routing_key)
+
+    return count
+
+
+def clear_caches() -> None:
+    """remove all the entries of the reference caches of the process"""
+    for cache in list(_CACHES.values()):
+        cache.invalidate()
+
+
+def get_cache_statistics() -> Dict[str, Dict[str, Any]]:
+    """get the statistics of all the reference caches of the process
+
+    Returns:
+        Dict[str, Dict[str, Any]]: statistics by cache name
+    """
+    return {
+        name: dict(
+            dataclasses.asdict(cache.stats),
+            hit_ratio=cache.stats.hit_ratio,
+            size=len(cache),
+        )
+        for name, cache in _CACHES.items()
+    }
+
+
+def cached_reference(
+    name: str,
+    maxsize: int = 128,
+    ttl: float = 3600.0,
+    invalidation_routing_keys: Iterable[str] = (),
+) -> Callable:
+    """Decorator caching the result of a reference loading function in a process
+    level cache, keyed by the function arguments
+
+    The underlying function remains available as the __wrapped__ attribute.
+
+    Args:
+        name (str): cache name
+        maxsize (int, optional): maximum number of entries. Defaults to 128.
+        ttl (float, optional): time to live in seconds. Defaults to 3600.0.
+        invalidation_routing_keys (Iterable[str], optional): routing key patterns
+            clearing the cache. Defaults to ().
+
+    Returns:
+        Callable: decorator
+    """
+
+    def decorator(function: Callable) -> Callable:
+        cache = get_cache(
+            name,
+            maxsize=maxsize,
+            ttl=ttl,
+            invalidation_routing_keys=invalidation_routing_keys,
+        )
+
+        missing = object()
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+
+            value = cache.get(key, missing)
+
+            if value is missing:
+                value = function(*args, **kwargs)
+                cache.put(key, value)
+
+            return value
+
+        wrapper.cache = cache
+
+        return wrapper
+
+    return decorator
@@ -2,17 +2,24 @@
 
 import abc
 import dataclasses
+import datetime
 import logging
 import time
 import typing
 
-from typing import ClassVar, Dict, Iterator, List, Type
+from typing import Any, ClassVar, Dict, Iterator, List, Type
 
+from opensearchpy import Q
 from opensearchpy.connection.connections import connections as db_connections
-from opensearchpy.helpers import parallel_bulk
 
 import maas_model
 from maas_engine.engine.base import Engine, EngineReport
+from maas_engine.engine.bulk import BulkChunkStatistics, BulkOptions, BulkWriter
+from maas_engine.engine.update_by_query import (
+    UpdateByQueryOptions,
+    UpdateByQueryRequest,
+    UpdateByQueryRunner,
+)
 from maas_engine.exceptions import CannotProcessMessageException, HandleMessageException
 
 
@@ -36,6 +43,9 @@ class DataEngineStatistics:
 
     end_timestamp: float = dataclasses.field(default_factory=time.time, init=True)
 
+    # statistics about bulk requests
+    bulk: BulkChunkStatistics = dataclasses.field(default_factory=BulkChunkStatistics)
+
     @property
     def duration(self) -> float:
         """get the run duration
@@ -63,6 +73,10 @@ class DataEngineStatistics:
             self.deleted += 1
             self.logger.debug("Deleted %s id: %s", details, document_id)
 
+        elif result == "noop":
+            # partial update with the values already stored
+            self.logger.debug("Unchanged %s id: %s", details, document_id)
+
         else:
             self.errors += 1
             self.logger.error("Unexpected result: %s", result)
@@ -81,6 +95,20 @@ class DataEngineStatistics:
             self.duration,
         )
 
+        if self.bulk.chunks:
+            self.logger.info(
+                "bulk: %d chunks, %d actions, %d bytes, chunk latency "
+                "min %.3fs mean %.3fs max %.3fs, %.1f actions/s, refresh %.3fs",
+                self.bulk.chunks,
+                self.bulk.actions,
+                self.bulk.bytes,
+                self.bulk.min_duration,
+                self.bulk.mean_duration,
+                self.bulk.max_duration,
+                self.bulk.throughput,
+                self.bulk.refresh_duration,
+            )
+
     @staticmethod
     def get_details(info) -> dict:
         """extract details dict from opensearch response info"""
@@ -107,9 +135,20 @@ class DataEngine(Engine):
         "deleted": maas_model.DataAction.DELETE,
     }
 
+    # default bulk writer options of the engine class, see BulkOptions. They can be
+    # overriden for each engine in the configuration with the "bulk" key
+    BULK_OPTIONS: ClassVar[Dict[str, Any]] = {}
+
     def __init__(self, args=None, send_reports=True, chunk_size=0):
         super().__init__(args, send_reports=send_reports, chunk_size=chunk_size)
 
+        # bulk writer options of this instance
+        self.bulk_options: Dict[str, Any] = dict(self.BULK_OPTIONS)
+
+        # update by query options, set with the "update_by_query" key of the
+        # configuration. None when the engine propagates values with bulk actions
+        self.update_by_query_options: Dict[str, Any] | None = None
+
         # store raw dsl class, updated by payload
         self.input_model = None
 
@@ -159,14 +198,9 @@ class DataEngine(Engine):
 
         error_msg = ""
 
-        for success, info in parallel_bulk(
-            db_connections.get_connection(),
-            self.action_iterator(),
-            refresh=True,  # TODO set refresh as engine option
-            raise_on_error=False,
-            raise_on_exception=False,
-            request_timeout=self.args.es_timeout if self.args else 120,
-        ):
+        bulk_writer = self.get_bulk_writer()
+
+        for success, info in bulk_writer.bulk(self.action_iterator()):
             # store the action specific dict feedback
             details = self._stats.get_details(info)
 
@@ -174,6 +208,8 @@ class DataEngine(Engine):
                 self.logger.warning("Unhandled bulk info: %s", info)
                 continue
 
+            self.on_bulk_result(success, details)
+
             if not success:
                 self._stats.errors += 1
 
@@ -192,6 +228,14 @@ class DataEngine(Engine):
             if self.send_reports:
                 self._handle_es_result_for_report(details)
 
+        for request in self.update_by_query_iterator():
+            error_msg += self._run_update_by_query(request)
+
+        # make written documents searchable before reports are published
+        bulk_writer.flush()
+
+        self._stats.bulk = bulk_writer.stats
+
         self._stats.finish()
 
         if self._stats.errors and self._stats.conflicts != self._stats.errors:
@@ -223,6 +267,124 @@ class DataEngine(Engine):
             self.reports.append(report)
             yield report
 
+    def get_bulk_options(self) -> BulkOptions:
+        """Get the bulk writer options: command line default refresh mode, overriden
+        by engine class and configuration options
+
+        Returns:
+            BulkOptions: bulk options
+        """
+        options = {}
+
+        if self.args and getattr(self.args, "es_bulk_refresh", None):
+            options["refresh"] = self.args.es_bulk_refresh
+
+        return BulkOptions.from_dict(options | self.bulk_options)
+
+    @property
+    def use_update_by_query(self) -> bool:
+        """Tell if values are propagated with update by query tasks
+
+        Returns:
+            bool: True if the engine is configured with update by query options
+        """
+        return self.update_by_query_options is not None
+
+    def get_update_by_query_runner(self) -> UpdateByQueryRunner:
+        """Create the update by query runner used by run()
+
+        Returns:
+            UpdateByQueryRunner: update by query runner
+        """
+        return UpdateByQueryRunner(
+            db_connections.get_connection(),
+            UpdateByQueryOptions.from_dict(self.update_by_query_options or {}),
+            request_timeout=self.args.es_timeout if self.args else 120,
+            logger=self.logger,
+        )
+
+    def _run_update_by_query(self, request: UpdateByQueryRequest) -> str:
+        """Run an update by query task and store the updated documents for reports
+
+        Args:
+            request (UpdateByQueryRequest): propagation request
+
+        Raises:
+            HandleMessageException: if the task does not complete in time
+
+        Returns:
+            str: error message, empty if the task had no failure
+        """
+        update_time = (
+            maas_model.datetime_to_zulu(datetime.datetime.now(tz=datetime.timezone.utc))
+            if request.stamped
+            else None
+        )
+
+        try:
+            result = self.get_update_by_query_runner().run(request, update_time)
+        except TimeoutError as error:
+            raise HandleMessageException(
+                f"{self.__class__.__name__}: {error}"
+            ) from error
+
+        self._stats.updated += result.updated
+
+        # conflicting documents are not updated, the message will be requeued
+        self._stats.errors += result.version_conflicts + len(result.failures)
+
+        self._stats.conflicts += result.version_conflicts
+
+        if result.failures:
+            self.logger.error("Error updating by query: %s", result.failures)
+
+        if self.send_reports and request.report and result.updated:
+            self._report_updated_by_query(request, result.updated, update_time)
+
+        return " ".join(str(failure) for failure in result.failures)
+
+    def _report_updated_by_query(
+        self, request: UpdateByQueryRequest, count: int, update_time: str | None
+    ):
+        """Store the documents updated by an update by query task for reports
+
+        Args:
+            request (UpdateByQueryRequest): propagation request
+            count (int): number of updated documents
+            update_time (str | None): update time stamped by the task
+        """
+        if update_time is None:
+            self.logger.warning(
+                "%s has no update time: won't send report for %d updated documents",
+                request.document_class.__name__,
+                count,
+            )
+            return
+
+        # the task does not return identifiers: find the documents it stamped
+        search_request = (
+            request.document_class.search()
+            .query(Q("bool", filter=[request.query, Q("term", updateTime=update_time)]))
+            .params(ignore=404)
+        )
+
+        for document in search_request.scan():
+            if self.shall_report(document):
+                self._push_report_data(document, "updated")
+
+    def get_bulk_writer(self) -> BulkWriter:
+        """Create the bulk writer used by run()
+
+        Returns:
+            BulkWriter: bulk writer
+        """
+        return BulkWriter(
+            db_connections.get_connection(),
+            self.get_bulk_options(),
+            request_timeout=self.args.es_timeout if self.args else 120,
+            logger=self.logger,
+        )
+
     def _load_input_documents(
         self, payload: maas_model.MAASMessage, routing_key: str = ""
     ):
@@ -461,3 +623,20 @@ class DataEngine(Engine):
         Iterator to feed the bulk by yielding action dictionnaries
         """
         raise NotImplementedError()
+
+    def on_bulk_result(self, success: bool, details: dict):
+        """Template method called with the outcome of each bulk action, before the
+        statistics and reports are updated.
+
+        Args:
+            success (bool): True if the action succeeded
+            details (dict): Elastic search result details dict
+        """
+
+    def update_by_query_iterator(self) -> typing.Iterator[UpdateByQueryRequest]:
+        """
+        Iterator of the update by query tasks to run after the bulk actions. Engines
+        yield requests when use_update_by_query is set instead of bulk actions, so
+        documents are updated in the database without being loaded by the engine.
+        """
+        yield from []
@@ -0,0 +1,331 @@
+"""Server side propagation of field values with update by query tasks"""
+
+import dataclasses
+import logging
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from opensearchpy import Q
+
+import maas_model
+
+# assign the fields which values differ and stamp the update time, or skip the
+# document so unchanged documents are not written
+PROPAGATION_SCRIPT = """
+boolean changed = false;
+for (entry in params.fields.entrySet()) {
+    if (entry.getValue() == null) {
+        if (ctx._source.containsKey(entry.getKey())) {
+            ctx._source.remove(entry.getKey());
+            changed = true;
+        }
+    } else if (ctx._source[entry.getKey()] != entry.getValue()) {
+        ctx._source[entry.getKey()] = entry.getValue();
+        changed = true;
+    }
+}
+if (!changed) {
+    ctx.op = 'noop';
+} else if (params.update_time != null) {
+    ctx._source.updateTime = params.update_time;
+}
+"""
+
+
+@dataclasses.dataclass
+class UpdateByQueryOptions:
+    """Tunable options of the update by query tasks"""
+
+    # maximum number of documents updated per second, -1 disables the throttling
+    requests_per_second: float = -1
+
+    # number of slices updated in parallel, "auto" for one slice per shard
+    slices: int | str = "auto"
+
+    # number of documents read by each scroll request of the task
+    scroll_size: int = 1000
+
+    # seconds between two checks of the task status
+    poll_interval: float = 1.0
+
+    # seconds to wait for the task completion
+    timeout: float = 600.0
+
+    def __post_init__(self):
+        if self.requests_per_second != -1 and self.requests_per_second <= 0:
+            raise ValueError(
+                "Update by query option requests_per_second shall be -1 or positive"
+            )
+
+        if self.slices != "auto" and (
+            not isinstance(self.slices, int) or self.slices < 1
+        ):
+            raise ValueError(
+                "Update by query option slices shall be auto or strictly positive"
+            )
+
+        for name in ("scroll_size", "poll_interval", "timeout"):
+            if getattr(self, name) <= 0:
+                raise ValueError(
+                    f"Update by query option {name} shall be strictly positive"
+                )
+
+    @classmethod
+    def from_dict(cls, options: Dict[str, Any]) -> "UpdateByQueryOptions":
+        """create options from a configuration dictionnary
+
+        Args:
+            options (Dict[str, Any]): options, like {"requests_per_second": 500}
+
+        Raises:
+            ValueError: if an option is unknown
+
+        Returns:
+            UpdateByQueryOptions: options instance
+        """
+        field_names = {field.name for field in dataclasses.fields(cls)}
+
+        if unknown := set(options) - field_names:
+            raise ValueError(
+                f"Unknown update by query options: {' '.join(sorted(unknown))}"
+            )
+
+        return cls(**options)
+
+
+@dataclasses.dataclass
+class UpdateByQueryRequest:
+    """Field values to set on the documents of a model matching a query"""
+
+    document_class: Type[maas_model.MAASDocument]
+
+    query: Q
+
+    # field name to value, None removes the field
+    fields: Dict[str, Any]
+
+    # search the updated documents afterwards to report them
+    report: bool = True
+
+    @property
+    def stamped(self) -> bool:
+        """the update time of the updated documents can be stamped
+
+        Returns:
+            bool: True if the model has an updateTime field
+        """
+        return "updateTime" in self.document_class._doc_type.mapping
+
+
+@dataclasses.dataclass
+class UpdateByQueryResult:
+    """Outcome of a completed update by query task"""
+
+    task_id: str
+
+    total: int = 0
+
+    updated: int = 0
+
+    noops: int = 0
+
+    version_conflicts: int = 0
+
+    failures: List[Any] = dataclasses.field(default_factory=list)
+
+    # seconds between the task submission and its completion
+    duration: float = 0.0
+
+    @classmethod
+    def from_task(
+        cls, task_id: str, task: Dict[str, Any], duration: float
+    ) -> "UpdateByQueryResult":
+        """create the result from a tasks api response
+
+        Args:
+            task_id (str): task identifier
+            task (Dict[str, Any]): completed task, as returned by the tasks api
+            duration (float): time in seconds
+
+        Returns:
+            UpdateByQueryResult: result instance
+        """
+        response = task.get("response", {})
+
+        failures = list(response.get("failures", []))
+
+        if "error" in task:
+            failures.append(task["error"])
+
+        return cls(
+            task_id,
+            total=response.get("total", 0),
+            updated=response.get("updated", 0),
+            noops=response.get("noops", 0),
+            version_conflicts=response.get("version_conflicts", 0),
+            failures=failures,
+            duration=duration,
+        )
+
+
+class UpdateByQueryRunner:
+    """Submit update by query tasks and wait for their completion.
+
+    The task runs asynchronously in the database so a long update does not hit the
+    request timeout, and its status is polled until it completes.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        options: Optional[UpdateByQueryOptions] = None,
+        request_timeout: int = 120,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """Constructor
+
+        Args:
+            client (Any): opensearch client
+            options (Optional[UpdateByQueryOptions], optional): task options.
+                Defaults to None for default options.
+            request_timeout (int, optional): request timeout. Defaults to 120.
+            logger (Optional[logging.Logger], optional): logger. Defaults to None.
+        """
+        self.client = client
+
+        self.options = options or UpdateByQueryOptions()
+
+        self.request_timeout = request_timeout
+
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+    def get_body(
+        self, request: UpdateByQueryRequest, update_time: str | None = None
+    ) -> Dict[str, Any]:
+        """build the update by query request body
+
+        Args:
+            request (UpdateByQueryRequest): propagation request
+            update_time (str | None, optional): zulu date stamped on the updated
+                documents. Defaults to None.
+
+        Returns:
+            Dict[str, Any]: request body
+        """
+        return {
+            "query": request.query.to_dict(),
+            "script": {
+                "source": PROPAGATION_SCRIPT,
+                "lang": "painless",
+                "params": {"fields": request.fields, "update_time": update_time},
+            },
+        }
+
+    def submit(
+        self, request: UpdateByQueryRequest, update_time: str | None = None
+    ) -> str:
+        """start an update by query task
+
+        Args:
+            request (UpdateByQueryRequest): propagation request
+            update_time (str | None, optional): zulu date stamped on the updated
+                documents. Defaults to None.
+
+        Returns:
+            str: task identifier
+        """
+        response = self.client.update_by_query(
+            index=request.document_class.Index.name,
+            body=self.get_body(request, update_time),
+            conflicts="proceed",
+            refresh=True,
+            wait_for_completion=False,
+            requests_per_second=self.options.requests_per_second,
+            slices=self.options.slices,
+            scroll_size=self.options.scroll_size,
+            ignore_unavailable=True,
+            request_timeout=self.request_timeout,
+        )
+
+        return response["task"]
+
+    def wait(self, task_id: str) -> Dict[str, Any]:
+        """poll a task until it completes
+
+        Args:
+            task_id (str): task identifier
+
+        Raises:
+            TimeoutError: if the task is not completed within the options timeout
+
+        Returns:
+            Dict[str, Any]: completed task, as returned by the tasks api
+        """
+        deadline = time.monotonic() + self.options.timeout
+
+        while True:
+            task = self.client.tasks.get(
+                task_id=task_id, request_timeout=self.request_timeout
+            )
+
+            if task.get("completed"):
+                return task
+
+            status = task.get("task", {}).get("status", {})
+
+            self.logger.debug(
+                "[%s][PENDING] - %s / %s",
+                task_id,
+                status.get("updated", 0) + status.get("noops", 0),
+                status.get("total", 0),
+            )
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Update by query task {task_id} not completed "
+                    f"after {self.options.timeout}s"
+                )
+
+            time.sleep(self.options.poll_interval)
+
+    def run(
+        self, request: UpdateByQueryRequest, update_time: str | None = None
+    ) -> UpdateByQueryResult:
+        """start an update by query task and wait for its completion
+
+        Args:
+            request (UpdateByQueryRequest): propagation request
+            update_time (str | None, optional): zulu date stamped on the updated
+                documents. Defaults to None.
+
+        Returns:
+            UpdateByQueryResult: task outcome
+        """
+        start = time.perf_counter()
+
+        task_id = self.submit(request, update_time)
+
+        self.logger.debug(
+            "[%s] Update by query of %s on %s",
+            task_id,
+            ", ".join(request.fields),
+            request.document_class.Index.name,
+        )
+
+        result = UpdateByQueryResult.from_task(
+            task_id, self.wait(task_id), time.perf_counter() - start
+        )
+
+        self.logger.info(
+            "[%s][COMPLETED] - %d documents: %d updated, %d unchanged, "
+            "%d conflicts, %d failures in %.3fs",
+            task_id,
+            result.total,
+            result.updated,
+            result.noops,
+            result.version_conflicts,
+            len(result.failures),
+            result.duration,
+        )
+
+        return result
@@ -4,6 +4,8 @@ import dataclasses
 from flask import Flask
 from healthcheck import HealthCheck, EnvironmentDump
 
+from maas_engine.engine.cache import get_cache_statistics
+
 
 class ServiceHealthCheck:
     """Encapsulate healthcheck functions and a Flask application"""
@@ -23,6 +25,8 @@ class ServiceHealthCheck:
         # assign to py-healthcheck
         self.health.add_check(self.amqp_available)
 
+        self.health.add_check(self.opensearch_available)
+
         self.envdump.add_section("application", self.application_data)
 
         # Add a flask route to expose information
@@ -38,6 +42,20 @@ class ServiceHealthCheck:
             message = "AMQP not connected"
         return self.consumer.is_ok, message
 
+    def opensearch_available(self):
+        """add check function to the healthcheck, based on the last known status of
+        the opensearch connection manager. No request is sent to the cluster."""
+        manager = getattr(self.consumer, "db_connection_manager", None)
+
+        if manager is None or manager.per_message or manager.client is None:
+            # no long-lived connection to check
+            return True, "Opensearch not monitored"
+
+        if not manager.is_ok:
+            return False, "Opensearch connection invalidated"
+
+        return True, "Opensearch ok"
+
     def application_data(self):
         """add your own data to the environment dump"""
         status = {}
@@ -47,6 +65,18 @@ class ServiceHealthCheck:
         info["password"] = "***"
         status["amqp"] = info
 
+        # opensearch connection info
+        if manager := getattr(self.consumer, "db_connection_manager", None):
+            status["opensearch"] = {
+                "per_message": manager.per_message,
+                "pool_maxsize": manager.pool_maxsize,
+                "connect_count": manager.connect_count,
+                "reconnect_count": manager.reconnect_count,
+            }
+
+        # reference caches hits and misses
+        status["caches"] = get_cache_statistics()
+
         # service statistics
         if hasattr(self.consumer, "stats"):
             status["statistics"] = dataclasses.asdict(self.consumer.stats)
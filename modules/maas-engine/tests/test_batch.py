@@ -0,0 +1,135 @@
+from argparse import Namespace
+from unittest import mock
+
+from maas_engine.consumer.batch import MessageBatch, MessageBatcher
+from maas_engine.consumer.engine_consumer import MaasEngineConsumer
+
+
+def make_message(routing_key="new.raw-data", exchange="collect-exchange"):
+    message = mock.MagicMock()
+    message.delivery_info = {"exchange": exchange, "routing_key": routing_key}
+    message.properties = {"priority": 2}
+    return message
+
+
+def make_body(message_id, document_ids, document_indices=None, **kwargs):
+    return {
+        "message_id": message_id,
+        "ancestor_ids": [],
+        "pipeline": [],
+        "force": True,
+        "document_class": "SomeRawDocument",
+        "document_ids": document_ids,
+        "document_indices": document_indices or [],
+        "date": "2024-01-01T00:00:00.000Z",
+        **kwargs,
+    }
+
+
+def test_batch_key():
+    key = MessageBatcher.batch_key("ex", "rk", make_body("a", ["1"]))
+    assert key == MessageBatcher.batch_key("ex", "rk", make_body("b", ["2"]))
+
+    assert key != MessageBatcher.batch_key(
+        "ex", "rk", make_body("b", ["2"], document_class="OtherDocument")
+    )
+
+    # not a MAASMessage
+    assert (
+        MessageBatcher.batch_key("ex", "rk", make_body("a", ["1"], query_string="*"))
+        is None
+    )
+
+    # nothing to merge
+    assert MessageBatcher.batch_key("ex", "rk", make_body("a", [])) is None
+
+
+def test_batcher_full_and_expired():
+    batcher = MessageBatcher(max_size=2, max_wait=0.5)
+
+    key = ("ex", "rk")
+
+    assert batcher.add(key, make_body("a", ["1"]), make_message()) is None
+    assert len(batcher) == 1
+
+    batch = batcher.add(key, make_body("b", ["2"]), make_message())
+    assert len(batch) == 2
+    assert len(batcher) == 0
+
+    batcher.add(key, make_body("c", ["3"]), make_message())
+    assert not batcher.pop_expired()
+
+    expired = batcher.pop_expired(now=batcher._batches[key].created + 1)
+    assert len(expired) == 1
+    assert len(batcher) == 0
+
+
+def test_merged_body():
+    batch = MessageBatch("ex", "rk")
+    batch.items.append(
+        (make_body("a", ["1", "2"], ["idx-2023"], ancestor_ids=["z"]), None)
+    )
+    batch.items.append((make_body("b", ["2", "3"], ["idx-2024", "idx-2023"]), None))
+
+    merged = batch.merged_body()
+
+    assert merged["document_ids"] == ["1", "2", "3"]
+    assert merged["document_indices"] == ["idx-2023", "idx-2024"]
+    assert merged["ancestor_ids"] == ["z", "a", "b"]
+    assert merged["message_id"] not in ("a", "b")
+    assert merged["document_class"] == "SomeRawDocument"
+
+
+def make_consumer():
+    consumer = MaasEngineConsumer(
+        Namespace(batch_size=3, batch_max_wait=100, amqp_max_priority=10)
+    )
+    consumer.batcher = MessageBatcher(3, 0.1)
+    consumer.amqp_settings = mock.MagicMock()
+    consumer.db_connection_manager = mock.MagicMock()
+    consumer.notify_reports = mock.MagicMock()
+    return consumer
+
+
+def test_process_batch_ack_all():
+    consumer = make_consumer()
+
+    messages = [make_message() for _ in range(3)]
+
+    with mock.patch.object(
+        consumer, "_execute_engines", return_value=[]
+    ) as execute_engines:
+        for i, message in enumerate(messages):
+            consumer.on_message(make_body(str(i), [str(i)]), message)
+
+    # a single pipeline execution for the three messages
+    execute_engines.assert_called_once()
+    assert execute_engines.call_args.args[1]["document_ids"] == ["0", "1", "2"]
+
+    for message in messages:
+        message.ack.assert_called_once()
+
+
+def test_process_batch_fallback():
+    consumer = make_consumer()
+
+    messages = [make_message() for _ in range(3)]
+
+    def execute_engines(routing_key, body):
+        if "1" in body["document_ids"]:
+            raise ValueError("faulty message")
+        return []
+
+    with mock.patch.object(
+        consumer, "_execute_engines", side_effect=execute_engines
+    ) as execute_engines_mock:
+        for i, message in enumerate(messages):
+            consumer.on_message(make_body(str(i), [str(i)]), message)
+
+    # one batch run then one run per message
+    assert execute_engines_mock.call_count == 4
+
+    messages[0].ack.assert_called_once()
+    messages[1].reject.assert_called_once()
+    messages[1].ack.assert_not_called()
+    messages[2].ack.assert_called_once()
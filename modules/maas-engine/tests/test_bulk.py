@@ -0,0 +1,157 @@
+import json
+from unittest import mock
+
+import pytest
+
+from opensearchpy.serializer import JSONSerializer
+
+from maas_engine.engine.bulk import BulkOptions, BulkWriter, RefreshMode
+from maas_engine.engine.data import DataEngine
+
+
+def fake_client():
+    """a client answering bulk requests with a creation for each action"""
+
+    def bulk(body, **kwargs):
+        items = []
+        for line in body.splitlines()[::2]:
+            (op_type, meta), *_ = json.loads(line).items()
+            items.append(
+                {
+                    op_type: {
+                        "_index": meta["_index"],
+                        "_id": meta["_id"],
+                        "result": "created",
+                        "status": 201,
+                    }
+                }
+            )
+        return {"errors": False, "items": items}
+
+    client = mock.MagicMock()
+    client.transport.serializer = JSONSerializer()
+    client.bulk.side_effect = bulk
+    return client
+
+
+def make_actions(count, index="test-index"):
+    return (
+        {"_op_type": "create", "_index": index, "_id": str(i), "_source": {"i": i}}
+        for i in range(count)
+    )
+
+
+def test_bulk_options():
+    assert BulkOptions().refresh == RefreshMode.TRUE
+
+    assert BulkOptions(refresh=False).refresh == RefreshMode.FALSE
+
+    assert BulkOptions.from_dict({"refresh": "wait_for"}).refresh == "wait_for"
+
+    with pytest.raises(ValueError):
+        BulkOptions(refresh="sometimes")
+
+    with pytest.raises(ValueError):
+        BulkOptions(chunk_size=0)
+
+    with pytest.raises(ValueError):
+        BulkOptions.from_dict({"chunk": 12})
+
+
+def test_bulk_writer_chunks():
+    client = fake_client()
+
+    writer = BulkWriter(
+        client, BulkOptions(refresh="wait_for", chunk_size=10, thread_count=2)
+    )
+
+    results = list(writer.bulk(make_actions(25)))
+
+    assert len(results) == 25
+    assert all(success for success, _ in results)
+    assert [info["create"]["_id"] for _, info in results] == [
+        str(i) for i in range(25)
+    ]
+
+    assert writer.stats.chunks == 3
+    assert writer.stats.actions == 25
+    assert writer.stats.bytes > 0
+    assert writer.stats.min_duration <= writer.stats.mean_duration
+    assert writer.stats.mean_duration <= writer.stats.max_duration
+
+    assert client.bulk.call_count == 3
+    assert client.bulk.call_args.kwargs["refresh"] == "wait_for"
+
+    # no refresh request if not deferred
+    writer.flush()
+    client.indices.refresh.assert_not_called()
+
+
+def test_bulk_writer_deferred_refresh():
+    client = fake_client()
+
+    writer = BulkWriter(client, BulkOptions(refresh="deferred", chunk_size=4))
+
+    list(writer.bulk(make_actions(5, "index-b")))
+    list(writer.bulk(make_actions(5, "index-a")))
+
+    assert client.bulk.call_args.kwargs["refresh"] == "false"
+
+    writer.flush()
+
+    client.indices.refresh.assert_called_once()
+    assert client.indices.refresh.call_args.kwargs["index"] == "index-a,index-b"
+
+    # nothing written since last flush
+    writer.flush()
+    client.indices.refresh.assert_called_once()
+
+
+def test_bulk_writer_bytes():
+    client = fake_client()
+
+    actions = [
+        {
+            "_op_type": "create",
+            "_index": "test-index",
+            "_id": str(i),
+            "_source": {"name": "Sentinel-1 été – \U0001f6f0"},
+        }
+        for i in range(4)
+    ]
+
+    serializer = client.transport.serializer
+    expected = sum(
+        len(serializer.dumps(line).encode("utf-8")) + 1
+        for action in actions
+        for line in (
+            {"create": {"_index": "test-index", "_id": action["_id"]}},
+            action["_source"],
+        )
+    )
+
+    # room for two actions per chunk, counted in bytes and not in characters
+    writer = BulkWriter(client, BulkOptions(max_chunk_bytes=expected // 2))
+
+    assert len(list(writer.bulk(actions))) == 4
+
+    assert writer.stats.bytes == expected
+    assert writer.stats.chunks == 2
+
+
+def test_data_engine_bulk_options():
+    class BulkTestEngine(DataEngine):
+        BULK_OPTIONS = {"refresh": "wait_for", "chunk_size": 100}
+
+        def action_iterator(self):
+            yield from ()
+
+    engine = BulkTestEngine()
+    assert engine.get_bulk_options() == BulkOptions(
+        refresh="wait_for", chunk_size=100
+    )
+
+    # configuration override
+    engine.bulk_options |= {"refresh": "deferred"}
+    assert engine.get_bulk_options().refresh == RefreshMode.DEFERRED
+    assert BulkTestEngine.BULK_OPTIONS["refresh"] == "wait_for"
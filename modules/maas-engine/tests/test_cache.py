@@ -0,0 +1,88 @@
+from maas_engine.engine.cache import (
+    ReferenceCache,
+    cached_reference,
+    clear_caches,
+    get_cache,
+    get_cache_statistics,
+    invalidate_caches,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_and_lru():
+    clock = FakeClock()
+    cache = ReferenceCache("test", maxsize=2, ttl=10, clock=clock)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    # touch a so b is the least recently used
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+
+    clock.now = 11
+
+    assert cache.get("a") is None
+    assert cache.values() == []
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 2
+    assert cache.stats.expirations == 1
+
+
+def test_invalidate_by_routing_key():
+    documents = get_cache(
+        "test-documents",
+        invalidation_routing_keys=("update.cds-datatake*",),
+        by_document_id=True,
+    )
+    documents.put("S1A-1", "datatake 1")
+    documents.put("S1A-2", "datatake 2")
+
+    assert invalidate_caches("update.cds-product-s1", ["S1A-1"]) == 0
+    assert invalidate_caches("update.cds-datatake-s1", ["S1A-1"]) == 1
+
+    assert documents.get("S1A-1") is None
+    assert documents.get("S1A-2") == "datatake 2"
+
+    # without identifiers the whole cache is cleared
+    assert invalidate_caches("update.cds-datatake-s1") == 1
+    assert len(documents) == 0
+
+    assert get_cache_statistics()["test-documents"]["invalidations"] == 2
+
+
+def test_cached_reference():
+    calls = []
+
+    @cached_reference("test-reference", invalidation_routing_keys=("update.config",))
+    def load_reference(mission):
+        calls.append(mission)
+        return {"mission": mission}
+
+    assert load_reference("S1") == {"mission": "S1"}
+    assert load_reference("S1") == {"mission": "S1"}
+    assert load_reference("S2") == {"mission": "S2"}
+    assert calls == ["S1", "S2"]
+
+    invalidate_caches("update.config")
+
+    load_reference("S1")
+    assert calls == ["S1", "S2", "S1"]
+
+    clear_caches()
+
+    load_reference("S1")
+    assert calls == ["S1", "S2", "S1", "S1"]
+    assert load_reference.cache.stats.hits == 1
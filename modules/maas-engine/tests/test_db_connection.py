@@ -0,0 +1,116 @@
+from unittest import mock
+
+from opensearchpy.exceptions import ConnectionError as OpenSearchConnectionError
+
+from maas_engine.consumer.db_connection import OpenSearchConnectionManager
+
+
+def _patch_create_connection():
+    return mock.patch(
+        "maas_engine.consumer.db_connection.db_connections.create_connection",
+        side_effect=lambda **kwargs: mock.MagicMock(),
+    )
+
+
+def test_pooled_connection_is_reused():
+    with _patch_create_connection() as create_connection:
+        manager = OpenSearchConnectionManager(
+            "http://localhost:9200", pool_maxsize=4, health_check_interval=3600
+        )
+
+        first = manager.acquire()
+        manager.release()
+        second = manager.acquire()
+        manager.release()
+
+    assert first is second
+    assert create_connection.call_count == 1
+    assert create_connection.call_args.kwargs["pool_maxsize"] == 4
+    assert manager.is_ok
+
+
+def test_per_message_connection():
+    with _patch_create_connection() as create_connection, mock.patch(
+        "maas_engine.consumer.db_connection.db_connections.remove_connection"
+    ) as remove_connection:
+        manager = OpenSearchConnectionManager(
+            "http://localhost:9200", per_message=True
+        )
+
+        first = manager.acquire()
+        manager.release()
+        second = manager.acquire()
+        manager.release()
+
+    assert first is not second
+    assert create_connection.call_count == 2
+    assert remove_connection.call_count == 2
+    assert manager.client is None
+
+
+def test_reconnect_on_invalidation():
+    with _patch_create_connection() as create_connection, mock.patch(
+        "maas_engine.consumer.db_connection.db_connections.remove_connection"
+    ):
+        manager = OpenSearchConnectionManager(
+            "http://localhost:9200", health_check_interval=3600
+        )
+
+        first = manager.acquire()
+        manager.invalidate()
+        assert not manager.is_ok
+
+        second = manager.acquire()
+
+    assert first is not second
+    assert create_connection.call_count == 2
+    assert manager.reconnect_count == 1
+    assert manager.is_ok
+
+
+def test_reconnect_on_failed_health_check():
+    with _patch_create_connection() as create_connection, mock.patch(
+        "maas_engine.consumer.db_connection.db_connections.remove_connection"
+    ):
+        manager = OpenSearchConnectionManager(
+            "http://localhost:9200", health_check_interval=0
+        )
+
+        first = manager.acquire()
+        first.ping.side_effect = OpenSearchConnectionError("N/A", "unreachable", None)
+
+        second = manager.acquire()
+        second.ping.return_value = True
+
+        third = manager.acquire()
+
+    assert first is not second
+    assert second is third
+    assert create_connection.call_count == 2
+
+
+def test_retire_on_reconnection():
+    with _patch_create_connection() as create_connection, mock.patch(
+        "maas_engine.consumer.db_connection.db_connections.remove_connection"
+    ) as remove_connection:
+        manager = OpenSearchConnectionManager(
+            "http://localhost:9200", health_check_interval=3600
+        )
+
+        first = manager.acquire()
+        manager.invalidate()
+
+        second = manager.acquire(retire=True)
+
+        # the new client replaces the previous one, still open for queries in progress
+        assert first is not second
+        assert create_connection.call_count == 2
+        assert not first.close.called
+        assert not remove_connection.called
+        assert manager.retired_clients == [first]
+
+        manager.close_retired()
+
+    assert first.close.call_count == 1
+    assert not second.close.called
+    assert not manager.retired_clients
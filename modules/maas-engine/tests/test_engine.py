@@ -1,9 +1,10 @@
 from collections import namedtuple
 import math
+from unittest import mock
 
 import maas_model
 
-from maas_engine.engine.base import EngineReport
+from maas_engine.engine.base import Engine, EngineReport
 from maas_engine.engine.rawdata import RawDataEngine
 
 
@@ -67,3 +68,35 @@ def test_initial_state_other_type():
     rde = RawDataEngine()
     rde.populate_initial_state([(23, 1), (27, 2)])
     assert rde.initial_state_dict == {}
+
+
+class WarmUpEngine(RawDataEngine):
+    ENGINE_ID = "TEST_WARM_UP_ENGINE"
+
+    WARM_UP_CALLS = 0
+
+    @classmethod
+    def warm_up(cls):
+        cls.WARM_UP_CALLS += 1
+
+
+def test_warm_up_engines():
+    config = {
+        "amqp": [
+            {
+                "name": "exchange",
+                "queues": [
+                    {"name": "queue-1", "events": ["TEST_WARM_UP_ENGINE"]},
+                    {"name": "queue-2", "events": [{"id": "TEST_WARM_UP_ENGINE"}]},
+                ],
+            }
+        ]
+    }
+
+    with mock.patch.object(Engine, "CONFIG_DICT", config):
+        assert Engine.get_declared_engine_ids() == {"TEST_WARM_UP_ENGINE"}
+
+        Engine.warm_up_engines()
+
+    # once by engine class, whatever the number of queues
+    assert WarmUpEngine.WARM_UP_CALLS == 1
@@ -0,0 +1,217 @@
+import itertools
+from unittest import mock
+
+import pytest
+
+from opensearchpy import Keyword, Q
+from opensearchpy.serializer import JSONSerializer
+
+from maas_model import MAASDocument, ZuluDate
+
+from maas_engine.engine.data import DataEngine
+from maas_engine.engine.update_by_query import (
+    UpdateByQueryOptions,
+    UpdateByQueryRequest,
+    UpdateByQueryResult,
+    UpdateByQueryRunner,
+)
+from maas_engine.exceptions import HandleMessageException
+
+
+class StampedDocument(MAASDocument):
+    """document with an update time"""
+
+    name = Keyword()
+
+    updateTime = ZuluDate()
+
+    class Index:
+        "inner class for DSL"
+
+        name = "test-stamped"
+
+
+class UnstampedDocument(MAASDocument):
+    """document without update time"""
+
+    name = Keyword()
+
+    class Index:
+        "inner class for DSL"
+
+        name = "test-unstamped"
+
+
+def fake_client(updated=2, version_conflicts=0, pending=1):
+    """a client completing update by query tasks after some status requests"""
+    statuses = [{"completed": False, "task": {"status": {"total": 3}}}] * pending
+
+    client = mock.MagicMock()
+    client.transport.serializer = JSONSerializer()
+    client.update_by_query.return_value = {"task": "node:1"}
+    client.tasks.get.side_effect = itertools.cycle(
+        statuses
+        + [
+            {
+                "completed": True,
+                "response": {
+                    "total": 3,
+                    "updated": updated,
+                    "noops": 3 - updated - version_conflicts,
+                    "version_conflicts": version_conflicts,
+                    "failures": [],
+                },
+            }
+        ]
+    )
+    return client
+
+
+def make_request(document_class=StampedDocument, report=True):
+    return UpdateByQueryRequest(
+        document_class, Q("term", name="a"), {"name": "b"}, report=report
+    )
+
+
+def test_update_by_query_options():
+    assert UpdateByQueryOptions().slices == "auto"
+
+    assert UpdateByQueryOptions.from_dict({"slices": 4}).slices == 4
+
+    with pytest.raises(ValueError):
+        UpdateByQueryOptions(slices=0)
+
+    with pytest.raises(ValueError):
+        UpdateByQueryOptions(requests_per_second=0)
+
+    with pytest.raises(ValueError):
+        UpdateByQueryOptions.from_dict({"throttle": 12})
+
+
+def test_update_by_query_request():
+    assert make_request().stamped
+
+    assert not make_request(UnstampedDocument).stamped
+
+
+def test_update_by_query_runner():
+    client = fake_client(pending=2)
+
+    runner = UpdateByQueryRunner(
+        client,
+        UpdateByQueryOptions(requests_per_second=500, slices=2, poll_interval=0.01),
+    )
+
+    result = runner.run(make_request(), "2024-01-01T00:00:00.000Z")
+
+    assert result == UpdateByQueryResult(
+        "node:1", total=3, updated=2, noops=1, duration=result.duration
+    )
+
+    # the task runs asynchronously and is polled until completion
+    assert client.tasks.get.call_count == 3
+
+    kwargs = client.update_by_query.call_args.kwargs
+
+    assert kwargs["index"] == "test-stamped"
+    assert kwargs["wait_for_completion"] is False
+    assert kwargs["conflicts"] == "proceed"
+    assert kwargs["requests_per_second"] == 500
+    assert kwargs["slices"] == 2
+    assert kwargs["body"]["query"] == {"term": {"name": "a"}}
+    assert kwargs["body"]["script"]["params"] == {
+        "fields": {"name": "b"},
+        "update_time": "2024-01-01T00:00:00.000Z",
+    }
+
+
+def test_update_by_query_runner_timeout():
+    runner = UpdateByQueryRunner(
+        fake_client(pending=100),
+        UpdateByQueryOptions(poll_interval=0.01, timeout=0.02),
+    )
+
+    with pytest.raises(TimeoutError):
+        runner.run(make_request())
+
+
+class UpdateByQueryTestEngine(DataEngine):
+    """engine propagating values with update by query"""
+
+    def __init__(self, requests, **kwargs):
+        super().__init__(**kwargs)
+
+        self.requests = requests
+
+        self.update_by_query_options = {"poll_interval": 0.01}
+
+    def action_iterator(self):
+        yield from ()
+
+    def update_by_query_iterator(self):
+        yield from self.requests
+
+
+class StandInSearch:
+    """search chain of the documents stamped by the task"""
+
+    queries = []
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def query(self, query):
+        self.queries.append(query)
+        return self
+
+    def params(self, *args, **kwargs):
+        return self
+
+    def scan(self):
+        return iter(self.documents)
+
+
+def test_data_engine_update_by_query():
+    updated = StampedDocument(name="b")
+
+    updated.meta.id = "updated-id"
+
+    engine = UpdateByQueryTestEngine([make_request(), make_request(report=False)])
+
+    engine.input_documents = [updated]
+
+    with mock.patch(
+        "maas_engine.engine.data.db_connections.get_connection",
+        return_value=fake_client(),
+    ), mock.patch.object(StampedDocument, "search", lambda: StandInSearch([updated])):
+        reports = list(engine.run("test", None))
+
+    assert engine.use_update_by_query
+    assert engine._stats.updated == 4
+
+    # only the first request is followed by a search of the stamped documents
+    assert len(StandInSearch.queries) == 1
+
+    update_time = StandInSearch.queries[0].filter[1].updateTime
+
+    assert update_time.endswith("Z")
+    assert StandInSearch.queries[0].filter[0] == Q("term", name="a")
+
+    assert [(report.action, report.data_ids) for report in reports] == [
+        ("update.test-stamped", ["updated-id"])
+    ]
+
+
+def test_data_engine_update_by_query_conflicts():
+    engine = UpdateByQueryTestEngine([make_request(UnstampedDocument)])
+
+    engine.input_documents = [UnstampedDocument()]
+
+    with mock.patch(
+        "maas_engine.engine.data.db_connections.get_connection",
+        return_value=fake_client(updated=1, version_conflicts=1),
+    ):
+        with pytest.raises(HandleMessageException):
+            list(engine.run("test", None))
+
+    assert engine._stats.conflicts == 1
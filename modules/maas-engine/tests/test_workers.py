@@ -0,0 +1,208 @@
+from argparse import Namespace
+import contextlib
+import functools
+import threading
+from unittest import mock
+
+import kombu
+
+from maas_engine.consumer.amqp_settings import AMQPSettings, QueuePrefetchConsumer
+from maas_engine.consumer.db_connection import OpenSearchConnectionManager
+from maas_engine.consumer.engine_consumer import MaasEngineConsumer
+from maas_engine.consumer.workers import WorkerPools
+from maas_engine.exceptions import HandleMessageException
+
+CONFIG = {
+    "amqp": [
+        {
+            "name": "collect-exchange",
+            "queues": [
+                {
+                    "name": "collect-new.raw.data.fast",
+                    "routing_key": "new.raw.data.fast",
+                    "events": ["FAST_ENGINE"],
+                },
+                {
+                    "name": "collect-new.raw.data.slow",
+                    "routing_key": "new.raw.data.slow",
+                    "events": ["SLOW_ENGINE"],
+                    "concurrency": 3,
+                    "prefetch_count": 6,
+                },
+            ],
+        }
+    ]
+}
+
+
+def make_message(routing_key):
+    message = mock.MagicMock()
+    message.delivery_info = {"exchange": "collect-exchange", "routing_key": routing_key}
+    message.properties = {}
+    return message
+
+
+def test_queue_options():
+    settings = AMQPSettings("amqp://localhost:5672//")
+    settings.build_queues(CONFIG, 10)
+
+    assert settings.concurrency_dict == {"new.raw.data.slow": 3}
+
+    consumer_class = mock.MagicMock()
+
+    consumers = settings.get_queue_consumers(consumer_class, None, None, 2)
+
+    prefetch_counts = [
+        call.kwargs["prefetch_count"] for call in consumer_class.call_args_list
+    ]
+
+    assert len(consumers) == 2
+    assert prefetch_counts == [2, 6]
+
+
+def test_queue_consumers_prefetch_before_consume():
+    settings = AMQPSettings("memory://")
+    settings.build_queues(CONFIG, 10)
+
+    channel = kombu.Connection("memory://").channel()
+
+    calls = []
+
+    basic_qos, basic_consume = channel.basic_qos, channel.basic_consume
+
+    def record_qos(prefetch_size, prefetch_count, apply_global=False):
+        calls.append(("qos", prefetch_count))
+        return basic_qos(prefetch_size, prefetch_count, apply_global)
+
+    def record_consume(queue, *args, **kwargs):
+        calls.append(("consume", queue))
+        return basic_consume(queue, *args, **kwargs)
+
+    with mock.patch.object(channel, "basic_qos", record_qos), mock.patch.object(
+        channel, "basic_consume", record_consume
+    ):
+        consumers = settings.get_queue_consumers(
+            functools.partial(QueuePrefetchConsumer, channel), channel, None, 2
+        )
+
+        # no qos is applied before consuming
+        assert not calls
+
+        with contextlib.ExitStack() as stack:
+            for consumer in consumers:
+                stack.enter_context(consumer)
+
+    # the prefetch count of each queue is in force when its consumption starts
+    assert calls == [
+        ("qos", 2),
+        ("consume", "collect-new.raw.data.fast"),
+        ("qos", 6),
+        ("consume", "collect-new.raw.data.slow"),
+    ]
+
+
+def test_worker_pools_concurrency():
+    pools = WorkerPools(2, {"slow": 3})
+
+    assert pools.get_concurrency("slow") == 3
+    assert pools.get_concurrency("fast") == 2
+
+    release = threading.Event()
+
+    pools.submit("slow", {}, None, lambda routing_key, body: release.wait(5))
+    pools.submit("fast", {}, None, lambda routing_key, body: routing_key)
+
+    completed = pools.pop_completed(timeout=5)
+    assert [pending.routing_key for pending in completed] == ["fast"]
+    assert len(pools) == 1
+
+    release.set()
+
+    completed = pools.pop_completed(timeout=None)
+    assert [pending.routing_key for pending in completed] == ["slow"]
+    assert len(pools) == 0
+
+    pools.shutdown()
+
+
+def test_consumer_worker_threads():
+    consumer = MaasEngineConsumer(
+        Namespace(worker_threads=2, amqp_max_priority=10, batch_size=1)
+    )
+    consumer.workers = WorkerPools(2)
+    consumer.amqp_settings = mock.MagicMock()
+    consumer.db_connection_manager = mock.MagicMock()
+
+    def execute_engines(routing_key, body):
+        consumer.current_pipeline = [routing_key.upper()]
+        if body["message_id"] == "requeue":
+            raise HandleMessageException("conflict")
+        return []
+
+    ok_message = make_message("fast")
+    requeue_message = make_message("slow")
+
+    with mock.patch.object(consumer, "_execute_engines", side_effect=execute_engines):
+        consumer.on_message({"message_id": "ok"}, ok_message)
+        consumer.on_message({"message_id": "requeue"}, requeue_message)
+
+        # acks are only done by the consumer thread
+        consumer.on_consume_end(None, None)
+
+    ok_message.ack.assert_called_once()
+    requeue_message.requeue.assert_called_once()
+    requeue_message.ack.assert_not_called()
+    assert len(consumer.workers) == 0
+
+    # pipeline of worker threads does not leak to the consumer thread
+    assert consumer.current_pipeline == []
+
+    consumer.workers.shutdown()
+
+
+def test_consumer_worker_threads_reconnection():
+    consumer = MaasEngineConsumer(
+        Namespace(worker_threads=2, amqp_max_priority=10, batch_size=1)
+    )
+    consumer.workers = WorkerPools(2)
+    consumer.amqp_settings = mock.MagicMock()
+
+    with mock.patch(
+        "maas_engine.consumer.db_connection.db_connections.create_connection",
+        side_effect=lambda **kwargs: mock.MagicMock(),
+    ):
+        consumer.db_connection_manager = OpenSearchConnectionManager(
+            "http://localhost:9200", health_check_interval=3600
+        )
+
+        release = threading.Event()
+
+        consumer.on_start_message({}, None)
+
+        first = consumer.db_connection
+
+        consumer.workers.submit(
+            "slow", {}, None, lambda routing_key, body: release.wait(5)
+        )
+
+        consumer.db_connection_manager.invalidate()
+
+        consumer.on_start_message({}, None)
+
+    # the pipeline in progress still uses the previous client
+    assert consumer.db_connection is not first
+
+    consumer.close_retired_db_clients()
+
+    assert not first.close.called
+
+    release.set()
+
+    consumer.workers.pop_completed(timeout=None)
+
+    consumer.close_retired_db_clients()
+
+    assert first.close.call_count == 1
+    assert not consumer.db_connection_manager.retired_clients
+
+    consumer.workers.shutdown()
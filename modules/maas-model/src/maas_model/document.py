@@ -4,6 +4,7 @@ __all__ = ["MAASDocument", "MAASRawDocument"]
 
 import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Any,
     Dict,
@@ -50,6 +51,12 @@ class MAASDocument(Document):
 
     _PARTITION_FIELD_FORMAT: str = "%Y"
 
+    # maximum number of identifiers in a query of mget_by_ids()
+    _MGET_CHUNK_SIZE: int = 1000
+
+    # maximum number of concurrent queries of mget_by_ids()
+    _MGET_MAX_WORKERS: int = 4
+
     _INITIAL_FIELDS: Dict[str, Field]
 
     def __init_subclass__(cls) -> None:
@@ -57,6 +64,35 @@ class MAASDocument(Document):
         # cache attribute list
         cls._INITIAL_FIELDS = cls.get_initial_field_names(cls)
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        # names of the fields modified since track_changes(), None if not tracked
+        changed_fields = self.__dict__.get("_changed_fields")
+
+        if (
+            changed_fields is not None
+            and name not in changed_fields
+            and name != "meta"
+            and self._d_.get(name) != value
+        ):
+            changed_fields.add(name)
+
+        super().__setattr__(name, value)
+
+    def track_changes(self) -> Self:
+        """Record the fields modified from now on, for to_partial_update_action()
+
+        Returns:
+            Self: the document
+        """
+        self.__dict__["_changed_fields"] = set()
+
+        return self
+
+    @property
+    def changed_fields(self) -> FrozenSet[str]:
+        """names of the fields modified since track_changes()"""
+        return frozenset(self.__dict__.get("_changed_fields") or ())
+
     # pylint: disable=too-few-public-methods
     class Index:
         """stub to override"""
@@ -210,12 +246,25 @@ class MAASDocument(Document):
         document_indices: List[str] | None = None,
         ignore_missing_index: bool = False,
         log_missing: bool = False,
+        chunk_size: int | None = None,
+        max_workers: int | None = None,
     ) -> Iterator[Optional["MAASDocument"]]:
         """get documents by id in the alias
 
+        Large identifier lists are split in chunks queried concurrently. If
+        document_indices is a single concrete index, the native multi get API is
+        used instead of a search.
+
         Args:
             document_ids (list): document identifiers
             document_indices (list): document indices
+            ignore_missing_index (bool): yield None for all identifiers if the
+                indices do not exist
+            log_missing (bool): log a warning if some documents are not found
+            chunk_size (int, optional): maximum number of identifiers by query.
+                Defaults to _MGET_CHUNK_SIZE.
+            max_workers (int, optional): maximum number of concurrent queries.
+                Defaults to _MGET_MAX_WORKERS.
 
         Raises:
             Exception: if there is multiple documents with the same id in the alias
@@ -224,8 +273,197 @@ class MAASDocument(Document):
             [MAASRawDocument]: the concrete MAASRawDocument found, or None if not found
         """
 
+        if cls._is_concrete_index(document_indices):
+            # a realtime multi get on the partition is cheaper than a search
+            yield from cls.mget_by_ids_in_partitions(
+                document_ids,
+                [document_indices[0]] * len(document_ids),
+                ignore_missing_index=ignore_missing_index,
+                log_missing=log_missing,
+                chunk_size=chunk_size,
+            )
+            return
+
         index = document_indices if document_indices else cls.Index.name
 
+        # a search cannot return more than 10000 hits, and an identifier can match
+        # twice during partition migrations
+        chunk_size = min(chunk_size or cls._MGET_CHUNK_SIZE, 5000)
+
+        chunks = [
+            document_ids[offset : offset + chunk_size]
+            for offset in range(0, len(document_ids), chunk_size)
+        ]
+
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers or cls._MGET_MAX_WORKERS, len(chunks))
+            ) as executor:
+                chunk_dicts = list(
+                    executor.map(
+                        lambda chunk: cls._search_by_ids(
+                            chunk, index, ignore_missing_index, log_missing
+                        ),
+                        chunks,
+                    )
+                )
+        else:
+            chunk_dicts = [
+                cls._search_by_ids(chunk, index, ignore_missing_index, log_missing)
+                for chunk in chunks
+            ]
+
+        response_dict = {}
+
+        for chunk_dict in chunk_dicts:
+            response_dict.update(chunk_dict)
+
+        LOGGER.debug(
+            "Query %d %s in %d chunks, found %d",
+            len(document_ids),
+            cls,
+            len(chunks),
+            len(response_dict),
+        )
+
+        for document_id in document_ids:
+            # mimic nice mget behavior:
+            # return None if document_id is not found in the indices
+            yield response_dict.get(document_id, None)
+
+    @classmethod
+    def mget_by_ids_in_partitions(
+        cls,
+        document_ids: List[str],
+        partition_indices: List[str],
+        ignore_missing_index: bool = False,
+        log_missing: bool = False,
+        chunk_size: int | None = None,
+    ) -> Iterator[Optional["MAASDocument"]]:
+        """get documents by id with the multi get API on their concrete index
+
+        Unlike a search, a multi get is realtime: it does not depend on the refresh
+        of the index and only reaches the shard holding the document. The partition
+        index of a document can be derived from the values of its partition fields,
+        for example cls(**values).partition_index_name
+
+        Args:
+            document_ids (List[str]): document identifiers
+            partition_indices (List[str]): concrete index of each identifier
+            ignore_missing_index (bool, optional): yield None for the identifiers
+                whose index does not exist. Defaults to False.
+            log_missing (bool, optional): log a warning if some documents are not
+                found. Defaults to False.
+            chunk_size (int, optional): maximum number of identifiers by request.
+                Defaults to _MGET_CHUNK_SIZE.
+
+        Raises:
+            ValueError: if identifiers and indices lengths differ
+            NotFoundError: if an index does not exist and ignore_missing_index is
+                not set
+
+        Returns:
+            Iterator[Optional[MAASDocument]]: the documents in input order, or None
+                if not found
+        """
+        if len(document_ids) != len(partition_indices):
+            raise ValueError(
+                f"Got {len(document_ids)} identifiers for "
+                f"{len(partition_indices)} indices"
+            )
+
+        chunk_size = chunk_size or cls._MGET_CHUNK_SIZE
+
+        client = cls._get_connection()
+
+        missing_count = 0
+
+        for offset in range(0, len(document_ids), chunk_size):
+            response = client.mget(
+                body={
+                    "docs": [
+                        {"_id": document_id, "_index": index}
+                        for document_id, index in zip(
+                            document_ids[offset : offset + chunk_size],
+                            partition_indices[offset : offset + chunk_size],
+                        )
+                    ]
+                }
+            )
+
+            for doc in response["docs"]:
+                if doc.get("found"):
+                    yield cls.from_opensearch(doc)
+                    continue
+
+                missing_count += 1
+
+                if "error" in doc:
+                    if (
+                        doc["error"].get("type") == "index_not_found_exception"
+                        and ignore_missing_index
+                    ):
+                        LOGGER.info(
+                            "Mget failed: index %s have not been yet populated",
+                            doc["_index"],
+                        )
+                    else:
+                        raise NotFoundError(
+                            404, doc["error"].get("type", "mget_error"), doc
+                        )
+
+                yield None
+
+        if log_missing and missing_count:
+            LOGGER.warning(
+                "Anormal behaviour of mget : %d documents of %s not found",
+                missing_count,
+                cls,
+            )
+
+    @classmethod
+    def _is_concrete_index(cls, document_indices: List[str] | None) -> bool:
+        """tell if the indices designate a single concrete index, that can be used
+        by the multi get API
+
+        Args:
+            document_indices (List[str] | None): document indices
+
+        Returns:
+            bool: flag
+        """
+        if not document_indices or len(document_indices) != 1:
+            return False
+
+        index = document_indices[0]
+
+        return (
+            bool(index)
+            and index != cls.Index.name
+            and not any(character in index for character in "*,")
+        )
+
+    @classmethod
+    def _search_by_ids(
+        cls,
+        document_ids: List[str],
+        index: str | List[str],
+        ignore_missing_index: bool = False,
+        log_missing: bool = False,
+    ) -> Dict[str, "MAASDocument"]:
+        """Retrieve documents with a single ids query
+
+        Args:
+            document_ids (List[str]): document identifiers
+            index (str | List[str]): index, alias or index list
+            ignore_missing_index (bool, optional): return no document if the indices
+                do not exist. Defaults to False.
+            log_missing (bool, optional): log a warning if some documents are not
+                found. Defaults to False.
+
+        Returns:
+            Dict[str, MAASDocument]: found documents by identifier
+        """
         try:
             max_size = min(len(document_ids) * 2, 10000)
             response: Response = (
@@ -259,12 +497,9 @@ class MAASDocument(Document):
                     "Search failed: a yearly index for %s have not been yet populated",
                     index,
                 )
-                # yield Nones to not break
-                for _ in document_ids:
-                    yield None
+                return {}
 
-            else:
-                raise
+            raise
 
         response_dict = {}
 
@@ -282,14 +517,7 @@ class MAASDocument(Document):
 
             response_dict[document.meta.id] = document
 
-        LOGGER.debug(
-            "Query %d %s, found %d", len(document_ids), cls, len(response_dict)
-        )
-
-        for document_id in document_ids:
-            # mimic nice mget behavior:
-            # return None if document_id is not found in the indices
-            yield response_dict.get(document_id, None)
+        return response_dict
 
     def to_bulk_action(
         self, op_type: str | None = None, _id: str | None = None
@@ -371,6 +599,59 @@ class MAASDocument(Document):
 
         return document_dict
 
+    def to_partial_update_action(self) -> Optional[Dict[str, Any]]:
+        """JSON serialization of the fields modified since track_changes() as an
+        update bulk action
+
+        Only the modified fields are sent, and the document is only updated if it has
+        not been modified meanwhile, like the index action of to_bulk_action().
+
+        Returns:
+            Optional[Dict[str, Any]]: bulk action, None if no field was modified
+        """
+        if not self.changed_fields:
+            return None
+
+        if hasattr(self, "updateTime"):
+            setattr(self, "updateTime", datetime.datetime.now(tz=datetime.timezone.utc))
+
+        partial_dict = {}
+
+        for name in self.changed_fields:
+            value = self._d_.get(name)
+
+            # pylint: disable=protected-access
+            field = self._ObjectBase__get_field(name)
+
+            if field is not None and field._coerce and value is not None:
+                value = field.serialize(value)
+            # pylint: enable=protected-access
+
+            elif isinstance(value, (AttrList, list)):
+                value = list(value)
+
+            elif hasattr(value, "to_dict"):
+                value = value.to_dict()
+
+            partial_dict[name] = value
+
+        action = {
+            "_op_type": "update",
+            "_index": self.meta.index,
+            "_id": self.meta.id,
+            "doc": partial_dict,
+        }
+
+        # optimistic concurrency control
+        if "seq_no" in self.meta and "primary_term" in self.meta:
+            action["if_seq_no"] = self.meta.seq_no
+            action["if_primary_term"] = self.meta.primary_term
+
+        # next modifications are tracked from this action
+        self.track_changes()
+
+        return action
+
     @classmethod
     def get_initial_field_names(
         cls, doc_class: Type["MAASDocument"]
@@ -479,6 +760,9 @@ class MAASRawDocument(MAASDocument):
 
     reportFolder: Field = Keyword()
 
+    # hash of the extracted data, to detect unmodified documents at collection
+    contentHash: Field = Keyword(index=False)
+
     ingestionTime: Field = ZuluDate()
 
     # commented out but left if any need comes in, as save strategy if bulk-based
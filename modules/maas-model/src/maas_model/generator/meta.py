@@ -29,7 +29,7 @@ class ModelClassMeta:
 
     RAW_DATA_PREFIX = "raw-data-"
 
-    RAW_DATA_FIELDS = ("ingestionTime", "reportName")
+    RAW_DATA_FIELDS = ("ingestionTime", "reportName", "contentHash")
 
     INDEX_SUFFIX = "_template.json"
 
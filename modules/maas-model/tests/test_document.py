@@ -1,6 +1,9 @@
-from opensearchpy import Keyword
+import datetime
+from unittest import mock
+
+from opensearchpy import Keyword, NotFoundError
 import pytest
-from maas_model import MAASDocument
+from maas_model import MAASDocument, ZuluDate
 
 
 def test_sort():
@@ -56,3 +59,176 @@ def test_copy_common():
     a_doc = ADocument(foo="zip", zap="gz", bar="plop")
     a_doc.fill_common_fields(b_doc, exclude=("foo",))
     assert a_doc.to_dict() == {"foo": "zip", "zap": "hz", "bar": "plop"}
+
+
+def test_mget_by_ids_chunks():
+    document_ids = [f"id-{i}" for i in range(25)]
+
+    def search_by_ids(chunk, index, ignore_missing_index, log_missing):
+        assert len(chunk) <= 10
+        assert index == ["bar-2022", "bar-2023"]
+        return {
+            document_id: ADocument(meta={"id": document_id})
+            for document_id in chunk
+            if int(document_id.split("-")[1]) % 2 == 0
+        }
+
+    with mock.patch.object(
+        ADocument, "_search_by_ids", side_effect=search_by_ids
+    ) as search_mock:
+        documents = list(
+            ADocument.mget_by_ids(
+                document_ids,
+                document_indices=["bar-2022", "bar-2023"],
+                chunk_size=10,
+            )
+        )
+
+    assert search_mock.call_count == 3
+    assert len(documents) == 25
+
+    for i, document in enumerate(documents):
+        if i % 2:
+            assert document is None
+        else:
+            assert document.meta.id == f"id-{i}"
+
+
+def test_mget_by_ids_missing_index():
+    search_mock = mock.MagicMock()
+    search_mock.return_value.query.return_value.params.return_value.execute.side_effect = NotFoundError(
+        404, "index_not_found_exception", {}
+    )
+
+    with mock.patch.object(ADocument, "search", search_mock):
+        assert list(ADocument.mget_by_ids(["a", "b"], ignore_missing_index=True)) == [
+            None,
+            None,
+        ]
+
+        with pytest.raises(NotFoundError):
+            list(ADocument.mget_by_ids(["a", "b"]))
+
+
+def test_mget_by_ids_concrete_index():
+    client = mock.MagicMock()
+    client.mget.return_value = {
+        "docs": [
+            {
+                "_index": "bar-2023",
+                "_id": "a",
+                "_version": 2,
+                "_seq_no": 5,
+                "_primary_term": 1,
+                "found": True,
+                "_source": {"foo": "2023", "zap": "z"},
+            },
+            {"_index": "bar-2023", "_id": "b", "found": False},
+        ]
+    }
+
+    with mock.patch.object(ADocument, "_get_connection", return_value=client):
+        documents = list(ADocument.mget_by_ids(["a", "b"], ["bar-2023"]))
+
+    client.mget.assert_called_once_with(
+        body={
+            "docs": [
+                {"_id": "a", "_index": "bar-2023"},
+                {"_id": "b", "_index": "bar-2023"},
+            ]
+        }
+    )
+    assert documents[0].zap == "z"
+    assert documents[0].meta.seq_no == 5
+    assert documents[1] is None
+
+
+def test_mget_by_ids_in_partitions_missing_index():
+    client = mock.MagicMock()
+    client.mget.return_value = {
+        "docs": [
+            {
+                "_index": "bar-2022",
+                "_id": "a",
+                "error": {"type": "index_not_found_exception"},
+            },
+        ]
+    }
+
+    with mock.patch.object(ADocument, "_get_connection", return_value=client):
+        assert list(
+            ADocument.mget_by_ids_in_partitions(
+                ["a"], ["bar-2022"], ignore_missing_index=True
+            )
+        ) == [None]
+
+        with pytest.raises(NotFoundError):
+            list(ADocument.mget_by_ids_in_partitions(["a"], ["bar-2022"]))
+
+        with pytest.raises(ValueError):
+            list(ADocument.mget_by_ids_in_partitions(["a"], []))
+
+
+def test_is_concrete_index():
+    assert ADocument._is_concrete_index(["bar-2023"])
+    assert not ADocument._is_concrete_index(None)
+    assert not ADocument._is_concrete_index(["bar"])
+    assert not ADocument._is_concrete_index(["bar-*"])
+    assert not ADocument._is_concrete_index(["bar-2022", "bar-2023"])
+
+
+class CDocument(MAASDocument):
+    foo = Keyword()
+
+    tags = Keyword(multi=True)
+
+    date = ZuluDate()
+
+    class Index:
+        name = "cdoc"
+
+
+def test_partial_update_action():
+    document = CDocument.from_opensearch(
+        {
+            "_id": "doc-1",
+            "_index": "cdoc-2024",
+            "_seq_no": 12,
+            "_primary_term": 3,
+            "_source": {"foo": "zip", "tags": ["a"], "date": "2024-01-01T00:00:00Z"},
+        }
+    )
+
+    document.track_changes()
+
+    # same value
+    document.foo = "zip"
+
+    assert document.to_partial_update_action() is None
+
+    document.tags = ["a", "b"]
+
+    document.date = datetime.datetime(2024, 2, 1)
+
+    assert document.changed_fields == {"tags", "date"}
+
+    assert document.to_partial_update_action() == {
+        "_op_type": "update",
+        "_index": "cdoc-2024",
+        "_id": "doc-1",
+        "doc": {"tags": ["a", "b"], "date": "2024-02-01T00:00:00.000Z"},
+        "if_seq_no": 12,
+        "if_primary_term": 3,
+    }
+
+    # changes are tracked again from the last action
+    assert not document.changed_fields
+
+
+def test_changes_not_tracked_by_default():
+    document = CDocument(foo="zip")
+
+    document.foo = "zap"
+
+    assert not document.changed_fields
+    assert document.to_partial_update_action() is None